@@ -30,17 +30,13 @@ import uuid
 import base64
 import secrets
 import tempfile
-import threading
-import webbrowser
 import socket
-import signal
 import shutil
 import gzip
 import io
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Optional, Tuple
-from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse
 import mimetypes
 
@@ -56,7 +52,7 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from bedrock_agentcore.tools.browser_client import BrowserClient
 from bedrock_agentcore._utils.endpoints import get_control_plane_endpoint
 from .browser_viewer_replay import BrowserViewerServer
-from .session_replay_viewer import S3DataSource, SessionReplayViewer, SessionReplayHandler
+from .session_replay_viewer import S3DataSource, SessionReplayViewer
 
 # Initialize console
 console = Console()
@@ -266,7 +262,7 @@ def run_live_viewer_with_control(browser_client):
         print("\n⏹️  Stopping live viewer...")
 
 def view_recordings(s3_location):
-    """View the recorded sessions directly with custom SessionReplayViewer"""
+    """View the latest recorded session with SessionReplayViewer"""
     
     print("\n📼 Checking for recordings in S3...")
     print(f"Location: s3://{s3_location['bucket']}/{s3_location['prefix']}/")
@@ -506,154 +502,6 @@ def view_recordings(s3_location):
                     traceback.print_exc()
                     return None
 
-        # Create a custom HTTP handler that fixes the JSON response issue
-        class CustomSessionReplayHandler(SessionReplayHandler):
-            """Custom HTTP request handler for session replay viewer"""
-            
-            def serve_recordings_list(self):
-                """Return list of recordings - FIX FOR HTML RESPONSE ISSUE"""
-                try:
-                    recordings = self.data_source.list_recordings()
-                    response = json.dumps(recordings)
-                    
-                    # Debug output to see what we're returning
-                    print(f"Serving recordings list: {response[:100]}...")
-                    
-                    # Ensure proper content type and headers
-                    self.send_response(200)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Content-Length', str(len(response)))
-                    # Add CORS headers to prevent issues
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                    self.send_header('Access-Control-Allow-Headers', '*')
-                    self.end_headers()
-                    
-                    # Write the response as bytes
-                    self.wfile.write(response.encode('utf-8'))
-                    
-                except Exception as e:
-                    print(f"❌ Error in serve_recordings_list: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    
-                    # Return a proper error response as JSON with empty recordings array
-                    error_response = json.dumps({
-                        "error": str(e),
-                        "recordings": []
-                    })
-                    self.send_response(200)  # Use 200 so client can process the error
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Content-Length', str(len(error_response)))
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(error_response.encode('utf-8'))
-            
-            def download_and_serve_recording(self, recording_id):
-                """Download recording and serve it - FIX FOR HTML RESPONSE ISSUE"""
-                try:
-                    recording_data = self.data_source.download_recording(recording_id)
-                    
-                    if recording_data:
-                        response = json.dumps({
-                            'success': True,
-                            'data': recording_data
-                        })
-                        
-                        self.send_response(200)
-                        self.send_header('Content-Type', 'application/json')
-                        self.send_header('Content-Length', str(len(response)))
-                        self.send_header('Access-Control-Allow-Origin', '*')
-                        self.end_headers()
-                        self.wfile.write(response.encode('utf-8'))
-                    else:
-                        error_response = json.dumps({
-                            'success': False,
-                            'error': 'Recording not found'
-                        })
-                        self.send_response(404)
-                        self.send_header('Content-Type', 'application/json')
-                        self.send_header('Content-Length', str(len(error_response)))
-                        self.send_header('Access-Control-Allow-Origin', '*')
-                        self.end_headers()
-                        self.wfile.write(error_response.encode('utf-8'))
-                        
-                except Exception as e:
-                    print(f"❌ Error in download_and_serve_recording: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    
-                    error_response = json.dumps({
-                        'success': False,
-                        'error': str(e)
-                    })
-                    self.send_response(500)
-                    self.send_header('Content-Type', 'application/json')
-                    self.send_header('Content-Length', str(len(error_response)))
-                    self.send_header('Access-Control-Allow-Origin', '*')
-                    self.end_headers()
-                    self.wfile.write(error_response.encode('utf-8'))
-            
-            def do_OPTIONS(self):
-                """Handle OPTIONS requests for CORS preflight"""
-                self.send_response(200)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                self.send_header('Access-Control-Allow-Headers', '*')
-                self.end_headers()
-
-        # Create custom viewer with our fixed handler
-        class CustomSessionReplayViewer(SessionReplayViewer):
-            def start(self):
-                """Start the replay viewer server with custom handler"""
-                # Ensure viewer directory exists
-                self.viewer_path.mkdir(parents=True, exist_ok=True)
-                
-                # Find available port
-                port = self.find_available_port()
-                
-                # Create request handler
-                def handler_factory(*args, **kwargs):
-                    return CustomSessionReplayHandler(self.data_source, self.viewer_path, *args, **kwargs)
-                
-                # Start server
-                self.server = HTTPServer(('', port), handler_factory)
-                
-                # Start in thread
-                server_thread = threading.Thread(target=self.server.serve_forever)
-                server_thread.daemon = True
-                server_thread.start()
-                
-                url = f"http://localhost:{port}"
-                
-                console.print(Panel(
-                    f"[bold cyan]Session Replay Viewer Running[/bold cyan]\n\n"
-                    f"URL: [link]{url}[/link]\n\n"
-                    f"[yellow]Press Ctrl+C to stop[/yellow]",
-                    title="Ready",
-                    border_style="green"
-                ))
-                
-                # Open browser
-                webbrowser.open(url)
-                
-                # Handle shutdown
-                def signal_handler(sig, frame):
-                    console.print("\n[yellow]Shutting down...[/yellow]")
-                    self.server.shutdown()
-                    if hasattr(self.data_source, 'cleanup'):
-                        self.data_source.cleanup()
-                    sys.exit(0)
-                
-                signal.signal(signal.SIGINT, signal_handler)
-                
-                # Keep running
-                try:
-                    while True:
-                        time.sleep(1)
-                except KeyboardInterrupt:
-                    pass
-        
         # Create data source
         data_source = CustomS3DataSource(
             bucket=s3_location['bucket'],
@@ -662,7 +510,7 @@ def view_recordings(s3_location):
         )
         
         print(f"🎬 Starting session replay viewer for: {latest_session}")
-        viewer = CustomSessionReplayViewer(data_source=data_source, port=8002)
+        viewer = SessionReplayViewer(data_source=data_source, port=8002)
         viewer.start()  # This will block until Ctrl+C
         
     except Exception as e:
@@ -0,0 +1,183 @@
+"""
+Local cache and parallel downloader for recording files stored in S3
+
+Files are cached on disk by their S3 ETag, so a file is downloaded once no
+matter how often its recording is opened, and recordings that share batch
+files share cache entries. The cache persists between viewer runs and is
+trimmed to a size limit, least recently used files first.
+
+Environment Variables:
+    REPLAY_CACHE_DIR        - Cache directory (default: ~/.cache/bedrock_agentcore_replay)
+    REPLAY_CACHE_MAX_BYTES  - Cache size limit in bytes (default: 2 GiB)
+    REPLAY_DOWNLOAD_WORKERS - Concurrent S3 downloads (default: 8)
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import closing
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'bedrock_agentcore_replay'
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_DOWNLOAD_WORKERS = 8
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class RecordingCache:
+    """Content-addressed file cache keyed by S3 ETag with size-based LRU eviction"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = Path(cache_dir or os.environ.get('REPLAY_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes or os.environ.get('REPLAY_CACHE_MAX_BYTES') or DEFAULT_CACHE_MAX_BYTES)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Entry sizes, so eviction does not have to stat the whole directory
+        self._sizes = {
+            path.name: path.stat().st_size
+            for path in self.cache_dir.iterdir()
+            if path.is_file() and not path.name.startswith('.')
+        }
+        self._total_bytes = sum(self._sizes.values())
+
+    @staticmethod
+    def entry_name(etag):
+        """File name of the entry for an ETag (quotes and other separators removed)"""
+        name = re.sub(r'[^0-9A-Za-z-]', '', etag)
+        if not name:
+            raise ValueError(f"Unusable ETag: {etag!r}")
+        return name
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, etag):
+        """Return the cached file for etag, marking it recently used, or None"""
+        name = self.entry_name(etag)
+        with self._lock:
+            if name not in self._sizes:
+                return None
+            path = self.cache_dir / name
+            try:
+                # The modification time orders entries for eviction
+                os.utime(path)
+            except FileNotFoundError:
+                # Removed by another process sharing the directory
+                self._forget(name)
+                return None
+            return path
+
+    def store(self, etag, stream):
+        """Copy a binary stream into the cache as the entry for etag and return its path"""
+        name = self.entry_name(etag)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.download-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(stream, f, COPY_CHUNK_SIZE)
+            size = os.path.getsize(temp_path)
+            path = self.cache_dir / name
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            self._forget(name)
+            self._sizes[name] = size
+            self._total_bytes += size
+            self._evict(keep=name)
+        return path
+
+    def clear(self):
+        """Remove every cached file"""
+        with self._lock:
+            for name in list(self._sizes):
+                (self.cache_dir / name).unlink(missing_ok=True)
+                self._forget(name)
+
+    def _forget(self, name):
+        self._total_bytes -= self._sizes.pop(name, 0)
+
+    def _evict(self, keep):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        entries = []
+        for name in self._sizes:
+            if name == keep:
+                continue
+            try:
+                entries.append(((self.cache_dir / name).stat().st_mtime, name))
+            except FileNotFoundError:
+                entries.append((0, name))
+        for _, name in sorted(entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            (self.cache_dir / name).unlink(missing_ok=True)
+            self._forget(name)
+
+
+class S3BatchDownloader:
+    """
+    Downloads S3 objects into a RecordingCache with bounded concurrency
+
+    Objects are described by the dicts list_objects_v2 returns (Key, ETag,
+    Size). A cached object costs no S3 request; an object already being
+    downloaded is waited for rather than fetched twice. Each download asks S3
+    for the listed ETag, so a file changed since it was listed is never stored
+    under the old ETag.
+    """
+
+    def __init__(self, s3_client, cache=None, max_workers=None):
+        self.s3_client = s3_client
+        self.cache = cache or RecordingCache()
+        max_workers = int(max_workers or os.environ.get('REPLAY_DOWNLOAD_WORKERS') or DEFAULT_DOWNLOAD_WORKERS)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='s3-download')
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.downloads = 0
+
+    def submit(self, bucket, obj):
+        """Return a Future resolving to the local path of an S3 object"""
+        etag = obj['ETag']
+        with self._lock:
+            future = self._inflight.get(etag)
+            if future is not None:
+                return future
+            path = self.cache.get(etag)
+            if path is not None:
+                self.cache_hits += 1
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._executor.submit(self._download, bucket, obj)
+            self._inflight[etag] = future
+            return future
+
+    def fetch(self, bucket, objects):
+        """Return local paths for objects, in the same order, downloading in parallel"""
+        futures = [self.submit(bucket, obj) for obj in objects]
+        return [future.result() for future in futures]
+
+    def _download(self, bucket, obj):
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=obj['Key'], IfMatch=obj['ETag'])
+            with closing(response['Body']) as body:
+                path = self.cache.store(obj['ETag'], body)
+            with self._lock:
+                self.downloads += 1
+            return path
+        finally:
+            with self._lock:
+                self._inflight.pop(obj['ETag'], None)
+
+    def close(self):
+        """Wait for running downloads and stop the worker threads"""
+        self._executor.shutdown(wait=True)
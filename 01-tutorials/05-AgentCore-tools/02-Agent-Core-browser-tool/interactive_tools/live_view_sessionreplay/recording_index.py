@@ -0,0 +1,180 @@
+"""
+Seek index for rrweb recordings stored as batch-*.ndjson.gz files
+
+The index is built by reading every batch once and records, per batch, the
+time range and event count and the position of each full snapshot (rrweb
+event type 2). Playback can start at any snapshot, so with the index the
+viewer can jump to a timestamp by streaming from the nearest snapshot before
+it instead of loading everything recorded earlier.
+
+Positions are byte offsets into the decompressed NDJSON of a batch. When a
+full snapshot directly follows a meta event (type 4, which carries the page
+size), the snapshot's offset is the meta event's, so both are replayed.
+
+The index is stored next to the batches as index.json. It lists the batch
+files it was built from (with their sizes and, for S3, ETags) and is
+ignored once they change.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+
+INDEX_FILE_NAME = 'index.json'
+INDEX_VERSION = 1
+
+# rrweb event types
+FULL_SNAPSHOT = 2
+META = 4
+
+
+def scan_batch(stream):
+    """Index one gzip-compressed NDJSON batch read from a binary stream"""
+    events = 0
+    offset = 0
+    start = end = None
+    snapshots = []
+    previous = None  # (type, offset, event number) of the last event
+
+    with gzip.GzipFile(fileobj=stream) as gz:
+        for line in gz:
+            line_offset = offset
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(event, dict) or 'type' not in event or 'timestamp' not in event:
+                continue
+
+            timestamp = event['timestamp']
+            start = timestamp if start is None else min(start, timestamp)
+            end = timestamp if end is None else max(end, timestamp)
+
+            if event['type'] == FULL_SNAPSHOT:
+                if previous is not None and previous[0] == META:
+                    snapshot_offset, snapshot_event = previous[1], previous[2]
+                else:
+                    snapshot_offset, snapshot_event = line_offset, events
+                snapshots.append({'timestamp': timestamp, 'event': snapshot_event, 'offset': snapshot_offset})
+
+            previous = (event['type'], line_offset, events)
+            events += 1
+
+    return {
+        'events': events,
+        'start': start,
+        'end': end,
+        'bytes': offset,
+        'snapshots': snapshots
+    }
+
+
+def build_index(batches, open_batch):
+    """
+    Build the index of a recording
+
+    Args:
+        batches: the recording's batches in playback order, as returned by
+            DataSource.list_batches
+        open_batch: callable taking a batch name and returning a context
+            manager that yields the batch's binary stream
+    """
+    entries = []
+    for batch in batches:
+        with open_batch(batch['name']) as stream:
+            entry = scan_batch(stream)
+        entry['name'] = batch['name']
+        entry['size'] = batch.get('size')
+        if batch.get('etag'):
+            entry['etag'] = batch['etag']
+        entries.append(entry)
+
+    starts = [entry['start'] for entry in entries if entry['start'] is not None]
+    ends = [entry['end'] for entry in entries if entry['end'] is not None]
+    start = min(starts) if starts else None
+    end = max(ends) if ends else None
+    return {
+        'version': INDEX_VERSION,
+        'events': sum(entry['events'] for entry in entries),
+        'start': start,
+        'end': end,
+        'duration': end - start if starts else 0,
+        'snapshots': sum(len(entry['snapshots']) for entry in entries),
+        'batches': entries
+    }
+
+
+def is_current(index, batches):
+    """True if index was built from exactly these batches"""
+    if not index or index.get('version') != INDEX_VERSION:
+        return False
+    indexed = index.get('batches', [])
+    if len(indexed) != len(batches):
+        return False
+    for entry, batch in zip(indexed, batches):
+        if entry.get('name') != batch['name']:
+            return False
+        if entry.get('etag') and batch.get('etag'):
+            if entry['etag'] != batch['etag']:
+                return False
+        elif entry.get('size') != batch.get('size'):
+            return False
+    return True
+
+
+def find_keyframe(index, timestamp):
+    """
+    Find where to start playback to show the recording at timestamp
+
+    Returns:
+        tuple: (batch position, snapshot) for the last full snapshot at or
+        before timestamp, or the first snapshot if timestamp is earlier than
+        all of them; None if the recording has no full snapshots
+    """
+    found = None
+    for position, entry in enumerate(index.get('batches', [])):
+        for snapshot in entry['snapshots']:
+            if found is not None and snapshot['timestamp'] > timestamp:
+                return found
+            found = (position, snapshot)
+    return found
+
+
+def read_index(stream):
+    """Parse a stored index, returning None if it is unreadable or from another version"""
+    try:
+        index = json.load(stream)
+    except ValueError:
+        return None
+    if not isinstance(index, dict) or index.get('version') != INDEX_VERSION:
+        return None
+    return index
+
+
+def index_cache_key(batches):
+    """RecordingCache key for an index built from these batches"""
+    digest = hashlib.sha1()
+    for batch in batches:
+        digest.update(f"{batch['name']}\0{batch.get('etag') or batch.get('size')}\n".encode('utf-8'))
+    return f"index-{digest.hexdigest()}"
+
+
+def cached_index(cache, batches, open_batch):
+    """Return the index for batches from a RecordingCache, building and caching it if missing"""
+    key = index_cache_key(batches)
+    path = cache.get(key)
+    if path is not None:
+        try:
+            with open(path, 'rb') as f:
+                index = read_index(f)
+            if is_current(index, batches):
+                return index
+        except FileNotFoundError:
+            pass
+    index = build_index(batches, open_batch)
+    cache.store(key, io.BytesIO(json.dumps(index).encode('utf-8')))
+    return index
@@ -0,0 +1,541 @@
+"""
+Asynchronous HTTP server for the session replay viewer
+
+A FastAPI application served by uvicorn. Requests are handled concurrently:
+blocking DataSource calls (listing, S3 downloads, indexing) run in the
+thread pool, so a slow recording does not hold up other viewers or static
+files.
+
+Static files and stored batch files support conditional GET (ETag and
+Last-Modified) and single-range HTTP Range requests. They are sent with
+sendfile when the ASGI server offers the zero-copy send extension, and read
+in chunks otherwise; no file is read into memory whole. Responses are
+compressed with brotli (when the brotli package is installed) or gzip, as
+negotiated by Accept-Encoding.
+
+Endpoints: / and the viewer's static files, /api/recordings (one page of
+recordings), /api/recordings/{recording_id}/events (NDJSON event stream),
+/api/recordings/{recording_id}/index (seek index),
+/api/recordings/{recording_id}/batches/{name} (a batch file as stored) and
+/api/download/{recording_id} (a whole recording as JSON).
+"""
+
+import functools
+import gzip
+import json
+import mimetypes
+import os
+import threading
+import time
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from .session_replay_viewer import (
+        STREAM_CHUNK_SIZE, console, create_index_html, iter_batch_events, recordings_page, select_batches
+    )
+except ImportError:
+    from session_replay_viewer import (
+        STREAM_CHUNK_SIZE, console, create_index_html, iter_batch_events, recordings_page, select_batches
+    )
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/x-ndjson',
+    'application/xml', 'image/svg+xml'
+)
+# Smaller bodies are sent as they are
+MIN_COMPRESS_SIZE = 1024
+# Larger static files are not compressed, so they can be sent with sendfile
+MAX_PRECOMPRESSED_FILE_SIZE = 8 * 1024 * 1024
+# Compression level for responses built per request; static files use the maximum
+DYNAMIC_BROTLI_QUALITY = 5
+DYNAMIC_GZIP_LEVEL = 6
+
+UNSATISFIABLE = 'unsatisfiable'
+
+
+def is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None to send the body as it is"""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    candidates = (['br'] if brotli else []) + ['gzip']
+    quality = lambda encoding: qualities.get(encoding, qualities.get('*', 0.0))
+    best = max(candidates, key=quality)
+    return best if quality(best) > 0 else None
+
+
+def compress_bytes(data, encoding, static=False):
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if static else DYNAMIC_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if static else DYNAMIC_GZIP_LEVEL)
+
+
+class StreamCompressor:
+    """Incremental brotli or gzip compressor that flushes every chunk, so streamed events arrive promptly"""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=DYNAMIC_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(DYNAMIC_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses as negotiated by Accept-Encoding
+
+    Only 200 responses of a compressible type that are not already encoded
+    are compressed. File responses (those with Accept-Ranges) are left
+    alone: file_response has already compressed the ones worth it, and the
+    rest must keep their Content-Length, ETag and byte ranges. A response
+    sent in one piece is compressed whole; a streamed one is compressed
+    chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size=MIN_COMPRESS_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The start message is held until the first body message shows
+        # whether the body is worth compressing
+        state = {'start': None, 'compressor': None}
+
+        async def send_compressed(message):
+            if message['type'] == 'http.response.start':
+                headers = Headers(raw=message['headers'])
+                if message['status'] == 200 and 'content-encoding' not in headers \
+                        and 'accept-ranges' not in headers \
+                        and is_compressible(headers.get('content-type', '')):
+                    state['start'] = message
+                else:
+                    await send(message)
+                return
+
+            compressor = state['compressor']
+            if compressor is not None:
+                more_body = message.get('more_body', False)
+                body = compressor.compress(message.get('body', b''))
+                if not more_body:
+                    body += compressor.finish()
+                await send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+                return
+
+            start, state['start'] = state['start'], None
+            if start is None:
+                await send(message)
+                return
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            if message['type'] != 'http.response.body' or (not more_body and len(body) < self.minimum_size):
+                await send(start)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=list(start['headers']))
+            if 'content-length' in headers:
+                del headers['content-length']
+            headers['content-encoding'] = encoding
+            headers.add_vary_header('Accept-Encoding')
+            # The compressed body is a different representation of the same content
+            etag = headers.get('etag')
+            if etag and not etag.startswith('W/'):
+                headers['etag'] = 'W/' + etag
+
+            if more_body:
+                compressor = state['compressor'] = StreamCompressor(encoding)
+                await send({**start, 'headers': headers.raw})
+                await send({'type': 'http.response.body', 'body': compressor.compress(body), 'more_body': True})
+            else:
+                body = compress_bytes(body, encoding)
+                headers['content-length'] = str(len(body))
+                await send({**start, 'headers': headers.raw})
+                await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class FileRangeResponse(Response):
+    """
+    Send `length` bytes of a file starting at `offset`
+
+    Uses the ASGI zero-copy send extension (sendfile) when the server offers
+    it, and otherwise reads the file in chunks in the thread pool.
+    """
+
+    def __init__(self, path, offset, length, status_code=200, headers=None, media_type=None):
+        headers = dict(headers or {})
+        headers['Content-Length'] = str(length)
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    async def __call__(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        if scope.get('method') == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        f = await run_in_threadpool(open, self.path, 'rb')
+        try:
+            if 'http.response.zerocopysend' in scope.get('extensions', {}):
+                await send({
+                    'type': 'http.response.zerocopysend',
+                    'file': f,
+                    'offset': self.offset,
+                    'count': self.length,
+                    'more_body': False
+                })
+                return
+
+            await run_in_threadpool(f.seek, self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await run_in_threadpool(f.read, min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+            if remaining > 0 or self.length == 0:
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            await run_in_threadpool(f.close)
+
+
+def etag_matches(header, etag):
+    """Weak comparison of an ETag against an If-None-Match header"""
+    strip = lambda tag: tag[2:] if tag.startswith('W/') else tag
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or strip(etag) in [strip(tag) for tag in tags]
+
+
+def _not_after(date_header, mtime):
+    """True if a file modified at mtime has not changed since an HTTP date"""
+    try:
+        return int(mtime) <= parsedate_to_datetime(date_header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def is_not_modified(headers, etag, mtime):
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get('if-modified-since')
+    return bool(if_modified_since) and _not_after(if_modified_since, mtime)
+
+
+def parse_range(header, size):
+    """
+    Parse a Range header for a file of `size` bytes
+
+    Returns:
+        (first, last) byte positions, inclusive; UNSATISFIABLE; or None to
+        ignore the header and send the whole file (malformed headers and
+        multiple ranges)
+    """
+    units, _, ranges = header.partition('=')
+    if units.strip().lower() != 'bytes' or ',' in ranges:
+        return None
+    first, separator, last = ranges.strip().partition('-')
+    if not separator:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0 or size == 0:
+                return UNSATISFIABLE
+            return max(0, size - suffix), size - 1
+        first = int(first)
+        last = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        return UNSATISFIABLE
+    if last < first:
+        return None
+    return first, min(last, size - 1)
+
+
+@functools.lru_cache(maxsize=64)
+def _precompressed(path, mtime_ns, size, encoding):
+    """A static file compressed once per version and encoding"""
+    with open(path, 'rb') as f:
+        return compress_bytes(f.read(), encoding, static=True)
+
+
+def file_response(request, path, media_type=None, etag=None):
+    """
+    Serve a file with conditional GET, Range requests and negotiated compression
+
+    Args:
+        etag: the file's ETag, if it has a better one than its modification
+            time and size (such as its S3 ETag)
+    """
+    stat = os.stat(path)
+    media_type = media_type or mimetypes.guess_type(str(path))[0] or 'application/octet-stream'
+    etag = etag or f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        'Last-Modified': formatdate(stat.st_mtime, usegmt=True),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'no-cache'
+    }
+    compressible = is_compressible(media_type) and stat.st_size <= MAX_PRECOMPRESSED_FILE_SIZE
+    if compressible:
+        headers['Vary'] = 'Accept-Encoding'
+
+    byte_range = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    if byte_range and if_range and if_range != etag and not (
+            not if_range.startswith(('"', 'W/')) and _not_after(if_range, stat.st_mtime)):
+        # The client's partial copy is out of date; send the whole file
+        byte_range = None
+
+    # Ranges refer to the file as stored, so they are never compressed
+    encoding = None
+    if compressible and not byte_range and stat.st_size >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+    if encoding:
+        etag = f'{etag[:-1]}-{encoding}"'
+    headers['ETag'] = etag
+
+    if is_not_modified(request.headers, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    if byte_range:
+        parsed = parse_range(byte_range, stat.st_size)
+        if parsed == UNSATISFIABLE:
+            return Response(status_code=416, headers={**headers, 'Content-Range': f'bytes */{stat.st_size}'})
+        if parsed:
+            first, last = parsed
+            headers['Content-Range'] = f'bytes {first}-{last}/{stat.st_size}'
+            return FileRangeResponse(path, first, last - first + 1, 206, headers, media_type)
+
+    if encoding:
+        body = _precompressed(str(path), stat.st_mtime_ns, stat.st_size, encoding)
+        return Response(body, headers={**headers, 'Content-Encoding': encoding}, media_type=media_type)
+    return FileRangeResponse(path, 0, stat.st_size, 200, headers, media_type)
+
+
+def json_error(status, message):
+    return JSONResponse({'success': False, 'error': message}, status_code=status)
+
+
+def create_app(data_source, viewer_path):
+    """Build the replay viewer's ASGI application around a DataSource"""
+    viewer_path = Path(viewer_path)
+    app = FastAPI(title="Bedrock Agentcore Session Replay Viewer")
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=['*'],
+        allow_methods=['GET', 'POST', 'OPTIONS'],
+        allow_headers=['*'],
+        expose_headers=['X-Batch-Count', 'X-Batch-Start', 'ETag']
+    )
+
+    # Endpoints are plain functions, so FastAPI runs them in its thread pool
+    # and blocking data source calls do not stall the event loop
+
+    @app.get('/api/recordings')
+    def list_recordings(request: Request):
+        try:
+            body, etag = recordings_page(data_source, parse_qs(request.url.query))
+        except ValueError as e:
+            return json_error(400, str(e))
+        except Exception as e:
+            console.print(f"[red]Error in list_recordings: {e}[/red]")
+            # Use 200 to ensure client gets the error
+            return JSONResponse({'error': str(e), 'recordings': []})
+
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('if-none-match', ''), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='application/json', headers=headers)
+
+    @app.get('/api/recordings/{recording_id}/events')
+    def recording_events(recording_id: str, request: Request):
+        """
+        Stream a recording's rrweb events as NDJSON, batch by batch
+
+        `from` and `to` select batches by position (`to` exclusive, both
+        optional) and the X-Batch-Count header gives the recording's number of
+        batches, so a client can fetch the first batch, start playback and then
+        fetch the rest. A single batch requested by a client that accepts gzip
+        is passed through as stored, with Content-Encoding: gzip; otherwise
+        batches are decompressed chunk by chunk while they are sent.
+
+        `at` (a timestamp in milliseconds) replaces `from`: the stream starts
+        at the last full snapshot at or before it, found in the recording's
+        index, and X-Batch-Start gives the position of the batch it is in.
+
+        Data sources without list_batches/open_batch are streamed from
+        download_recording instead, as a single batch.
+        """
+        try:
+            batches = data_source.list_batches(recording_id)
+        except (AttributeError, NotImplementedError):
+            return downloaded_events(recording_id)
+        if batches is None:
+            return json_error(404, 'Recording not found')
+
+        try:
+            first, last, skip = select_batches(data_source, recording_id, batches, parse_qs(request.url.query))
+        except ValueError as e:
+            return json_error(400, str(e))
+        selected = batches[first:last]
+
+        pass_through = len(selected) == 1 and skip == 0 and 'gzip' in request.headers.get('accept-encoding', '')
+        headers = {'X-Batch-Count': str(len(batches)), 'X-Batch-Start': str(first)}
+        if pass_through:
+            headers['Content-Encoding'] = 'gzip'
+            if selected[0].get('size') is not None:
+                headers['Content-Length'] = str(selected[0]['size'])
+
+        def stream():
+            try:
+                yield from iter_batch_events(data_source, recording_id, selected, skip, pass_through)
+            except Exception as e:
+                # Headers are sent; all that is left is to cut the stream short
+                console.print(f"[red]Error streaming recording {recording_id}: {e}[/red]")
+
+        return StreamingResponse(stream(), media_type='application/x-ndjson', headers=headers)
+
+    def downloaded_events(recording_id):
+        """Stream the events of download_recording, for data sources without batch access"""
+        recording_data = data_source.download_recording(recording_id)
+        if not recording_data:
+            return json_error(404, 'Recording not found')
+        lines = (json.dumps(event).encode('utf-8') + b'\n' for event in recording_data.get('events', []))
+        return StreamingResponse(lines, media_type='application/x-ndjson', headers={'X-Batch-Count': '1'})
+
+    @app.get('/api/recordings/{recording_id}/index')
+    def recording_index(recording_id: str):
+        try:
+            index = data_source.get_index(recording_id)
+        except (AttributeError, NotImplementedError):
+            return json_error(404, 'This data source does not index recordings')
+        except Exception as e:
+            console.print(f"[red]Error indexing recording {recording_id}: {e}[/red]")
+            return json_error(500, str(e))
+        if index is None:
+            return json_error(404, 'Recording not found')
+        return JSONResponse(index)
+
+    @app.get('/api/recordings/{recording_id}/batches/{name}')
+    def recording_batch(recording_id: str, name: str, request: Request):
+        """A batch file as stored (gzip-compressed NDJSON), with Range and conditional GET"""
+        try:
+            batches = data_source.list_batches(recording_id)
+        except (AttributeError, NotImplementedError):
+            return json_error(404, 'This data source does not serve batch files')
+        batch = next((batch for batch in batches or [] if batch['name'] == name), None)
+        if batch is None:
+            return json_error(404, 'Batch not found')
+
+        with data_source.open_batch(recording_id, name) as stream:
+            path = getattr(stream, 'name', None)
+        if isinstance(path, str) and os.path.isfile(path):
+            return file_response(request, path, 'application/gzip', batch.get('etag'))
+
+        # Not backed by a local file: stream it, without Range support
+        def stream_batch():
+            with data_source.open_batch(recording_id, name) as stream:
+                while True:
+                    chunk = stream.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        return StreamingResponse(stream_batch(), media_type='application/gzip')
+
+    @app.get('/api/download/{recording_id}')
+    def download_recording(recording_id: str):
+        try:
+            recording_data = data_source.download_recording(recording_id)
+        except Exception as e:
+            console.print(f"[red]Error in download_recording: {e}[/red]")
+            return json_error(500, str(e))
+        if not recording_data:
+            return json_error(404, 'Recording not found')
+        return JSONResponse({'success': True, 'data': recording_data})
+
+    def static_file(request, file_path):
+        root = viewer_path.resolve()
+        full_path = (viewer_path / file_path).resolve()
+        if root not in full_path.parents:
+            return Response(f"File not found: {file_path}", status_code=404, media_type='text/plain')
+        if not full_path.is_file():
+            # Create index.html on the fly
+            if file_path != 'index.html':
+                return Response(f"File not found: {file_path}", status_code=404, media_type='text/plain')
+            create_index_html(full_path)
+        return file_response(request, full_path)
+
+    @app.get('/')
+    def index(request: Request):
+        return static_file(request, 'index.html')
+
+    @app.get('/{file_path:path}')
+    def static(file_path: str, request: Request):
+        return static_file(request, file_path)
+
+    return app
+
+
+def serve_in_thread(app, port):
+    """Run app with uvicorn on a daemon thread; returns the uvicorn.Server and the thread once it is listening"""
+    server = uvicorn.Server(uvicorn.Config(app, host='0.0.0.0', port=port, log_level='error'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started and thread.is_alive():
+        time.sleep(0.05)
+    return server, thread
@@ -10,17 +10,16 @@ import os
 import sys
 import json
 import time
-import tempfile
 import threading
 import webbrowser
 import socket
 import signal
-import shutil
 import gzip
+import re
+import base64
+import hashlib
+from concurrent.futures import as_completed
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
-import mimetypes
 from datetime import datetime
 
 import boto3
@@ -29,78 +28,222 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+try:
+    from .recording_cache import S3BatchDownloader
+    from .recording_index import (
+        INDEX_FILE_NAME, build_index, cached_index, find_keyframe, index_cache_key, is_current, read_index
+    )
+except ImportError:
+    from recording_cache import S3BatchDownloader
+    from recording_index import (
+        INDEX_FILE_NAME, build_index, cached_index, find_keyframe, index_cache_key, is_current, read_index
+    )
+
 console = Console()
 
+# Bytes copied per write when streaming recording batches
+STREAM_CHUNK_SIZE = 64 * 1024
+
+BATCH_FILE_SUFFIXES = ('.ndjson.gz', '.jsonl.gz')
+
+
+def is_batch_file(filename):
+    """True for rrweb event batch files (batch-*.ndjson.gz or batch-*.jsonl.gz)"""
+    return filename.startswith('batch-') and filename.endswith(BATCH_FILE_SUFFIXES)
+
+
+def batch_sort_key(filename):
+    """Order batch files by their number, so batch-10 plays after batch-9"""
+    numbers = re.findall(r'\d+', filename)
+    return (int(numbers[0]) if numbers else -1, filename)
+
+
+# Seconds an S3 recordings listing is reused before S3 is listed again
+LIST_CACHE_TTL = float(os.environ.get('REPLAY_LIST_CACHE_TTL', 30))
+
+
+def listing_signature(objects):
+    """(newest LastModified, object count) of listed S3 objects; changes when any is added, replaced or removed"""
+    newest = None
+    count = 0
+    for obj in objects:
+        count += 1
+        if newest is None or obj['LastModified'] > newest:
+            newest = obj['LastModified']
+    return (newest, count)
 
-class SessionReplayHandler(BaseHTTPRequestHandler):
-    """HTTP request handler for session replay viewer"""
+
+# Recordings per /api/recordings page
+RECORDINGS_PAGE_SIZE = 50
+MAX_RECORDINGS_PAGE_SIZE = 1000
+RECORDING_SORT_FIELDS = ('timestamp', 'duration', 'events', 'id')
+
+
+def recording_sort_key(recording, sort):
+    """Sort key of a recording: the sort field, then the ID to break ties"""
+    if sort == 'id':
+        return ('', str(recording['id']))
+    try:
+        value = float(recording.get(sort) or 0)
+    except (TypeError, ValueError):
+        value = 0.0
+    return (value, str(recording['id']))
+
+
+def paginate_recordings(recordings, sort='timestamp', descending=True, cursor=None, limit=RECORDINGS_PAGE_SIZE):
+    """
+    Return one page of recordings and the cursor of the next page
     
-    def __init__(self, data_source, viewer_path, *args, **kwargs):
-        self.data_source = data_source
-        self.viewer_path = viewer_path
-        super().__init__(*args, **kwargs)
+    The cursor is the sort key of the last recording returned, so pages stay
+    consistent when recordings are added or removed between requests.
+    
+    Raises:
+        ValueError: if the cursor is not one returned by this function
+    """
+    ordered = sorted(recordings, key=lambda r: recording_sort_key(r, sort), reverse=descending)
+    if cursor:
+        try:
+            after = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode('ascii'))))
+        except (TypeError, ValueError, UnicodeEncodeError):
+            after = ()
+        value_type = str if sort == 'id' else (int, float)
+        if len(after) != 2 or not isinstance(after[0], value_type) or not isinstance(after[1], str):
+            raise ValueError(f"Invalid cursor for sort '{sort}': {cursor}")
+        if descending:
+            ordered = [r for r in ordered if recording_sort_key(r, sort) < after]
+        else:
+            ordered = [r for r in ordered if recording_sort_key(r, sort) > after]
+    
+    page = ordered[:limit]
+    next_cursor = None
+    if len(ordered) > limit:
+        last_key = list(recording_sort_key(page[-1], sort))
+        next_cursor = base64.urlsafe_b64encode(json.dumps(last_key).encode('utf-8')).decode('ascii')
+    return page, next_cursor
+
+
+def recordings_page(data_source, query):
+    """
+    Build one /api/recordings page
     
-    def log_message(self, format, *args):
-        """Override to reduce server logging noise"""
-        pass
+    Args:
+        query: parsed query string (parse_qs) with optional `limit`, `cursor`,
+            `sort` (one of RECORDING_SORT_FIELDS) and `order` (asc or desc)
     
-    def do_GET(self):
-        """Handle GET requests"""
+    Returns:
+        tuple: (JSON body, ETag of the body)
+    
+    Raises:
+        ValueError: for invalid query parameters
+    """
+    sort = query.get('sort', ['timestamp'])[0]
+    order = query.get('order', ['desc'])[0]
+    cursor = query.get('cursor', [''])[0]
+    try:
+        limit = int(query.get('limit', [RECORDINGS_PAGE_SIZE])[0])
+    except ValueError:
+        limit = 0
+    if sort not in RECORDING_SORT_FIELDS or order not in ('asc', 'desc') \
+            or not 0 < limit <= MAX_RECORDINGS_PAGE_SIZE:
+        raise ValueError(f"Expected sort in {', '.join(RECORDING_SORT_FIELDS)}, "
+                         f"order asc or desc and limit 1-{MAX_RECORDINGS_PAGE_SIZE}")
+    
+    recordings = data_source.list_recordings()
+    page, next_cursor = paginate_recordings(recordings, sort, order == 'desc', cursor, limit)
+    body = json.dumps({
+        'recordings': page,
+        'total': len(recordings),
+        'nextCursor': next_cursor
+    }).encode('utf-8')
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def select_batches(data_source, recording_id, batches, query):
+    """
+    Resolve the `from`, `to` and `at` parameters of an events request
+    
+    Returns:
+        tuple: (first, last, skip) - the batch positions to send (`last`
+        exclusive) and the number of bytes of the first batch's NDJSON to
+        leave out, so that a seek starts at a full snapshot
+    
+    Raises:
+        ValueError: for invalid parameters, or `at` on a data source that
+        cannot seek
+    """
+    try:
+        first = int(query.get('from', ['0'])[0] or 0)
+        last = int(query.get('to', [str(len(batches))])[0] or len(batches))
+        at = query.get('at', [''])[0]
+        at = int(float(at)) if at else None
+    except ValueError:
+        raise ValueError("'from' and 'to' must be batch numbers and 'at' a timestamp")
+    
+    skip = 0
+    if at is not None:
         try:
-            path = self.path.split('?')[0]
-            
-            if path == '/':
-                self.serve_file('index.html')
-            elif path == '/api/recordings':
-                self.serve_recordings_list()
-            elif path.startswith('/api/download/'):
-                recording_id = path.split('/')[-1]
-                self.download_and_serve_recording(recording_id)
-            else:
-                self.serve_file(path.lstrip('/'))
-                
-        except Exception as e:
-            console.print(f"[red]Error handling request: {e}[/red]")
-            self.send_error(500, str(e))
+            index = data_source.get_index(recording_id, batches)
+        except (AttributeError, NotImplementedError):
+            raise ValueError('Seeking is not supported by this data source')
+        keyframe = find_keyframe(index, at) if index else None
+        if keyframe is None:
+            first = 0
+        else:
+            first, snapshot = keyframe
+            skip = snapshot['offset']
     
-    def serve_file(self, file_path):
-        """Serve static files"""
-        full_path = self.viewer_path / file_path
-        
-        if not full_path.exists():
-            # Create index.html on the fly
-            if file_path == 'index.html':
-                self._create_index_html(full_path)
-            else:
-                self.send_error(404, f"File not found: {file_path}")
-                return
-        
-        content_type, _ = mimetypes.guess_type(str(full_path))
-        if content_type is None:
-            content_type = 'application/octet-stream'
-        
-        with open(full_path, 'rb') as f:
-            content = f.read()
-        
-        self.send_response(200)
-        self.send_header('Content-Type', content_type)
-        self.send_header('Content-Length', str(len(content)))
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(content)
-    
-    def _create_index_html(self, path):
-        """Create the viewer HTML interface"""
-        import os
-        print(f"\n======= DEBUGGING =======")
-        print(f"Creating index.html at: {path}")
-        print(f"Path exists: {os.path.exists(path)}")
-        print(f"Parent directory exists: {os.path.exists(path.parent)}")
-        
-        # Ensure the directory exists
-        path.parent.mkdir(parents=True, exist_ok=True)
-        
-        html_content = r'''<!DOCTYPE html>
+    if first < 0 or last < first:
+        raise ValueError(f"Invalid batch range {first}-{last}")
+    return first, last, skip
+
+
+def iter_batch_events(data_source, recording_id, batches, skip=0, pass_through=False):
+    """
+    Yield the events of batches as NDJSON, one chunk at a time
+    
+    Batches are decompressed while they are read, starting `skip` bytes into
+    the first one. With pass_through the stored gzip bytes are yielded as they
+    are instead.
+    """
+    for batch in batches:
+        with data_source.open_batch(recording_id, batch['name']) as stream:
+            if pass_through:
+                while True:
+                    chunk = stream.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+                continue
+            last_byte = b'\n'
+            with gzip.GzipFile(fileobj=stream) as gz:
+                while skip:
+                    skipped = len(gz.read(min(skip, STREAM_CHUNK_SIZE)))
+                    if not skipped:
+                        break
+                    skip -= skipped
+                while True:
+                    chunk = gz.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+                    last_byte = chunk[-1:]
+            # Keep the next batch's first event on its own line
+            if last_byte != b'\n':
+                yield b'\n'
+
+
+def create_index_html(path):
+    """Create the viewer HTML interface"""
+    import os
+    print(f"\n======= DEBUGGING =======")
+    print(f"Creating index.html at: {path}")
+    print(f"Path exists: {os.path.exists(path)}")
+    print(f"Parent directory exists: {os.path.exists(path.parent)}")
+
+    # Ensure the directory exists
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    html_content = r'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -108,31 +251,31 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
     <title>Bedrock Agentcore Session Replay Viewer</title>
     <style>
         * { box-sizing: border-box; }
-        
+
         body {
             margin: 0;
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
             background: #f5f5f5;
         }
-        
+
         .header {
             background: #232f3e;
             color: white;
             padding: 15px 20px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
         }
-        
+
         .header h1 {
             margin: 0;
             font-size: 20px;
             font-weight: 400;
         }
-        
+
         .container {
             display: flex;
             height: calc(100vh - 60px);
         }
-        
+
         .sidebar {
             width: 350px;
             background: white;
@@ -140,20 +283,20 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
             display: flex;
             flex-direction: column;
         }
-        
+
         .sidebar-header {
             padding: 15px;
             background: #f8f9fa;
             border-bottom: 1px solid #e0e0e0;
             font-weight: 500;
         }
-        
+
         .recordings-list {
             flex: 1;
             overflow-y: auto;
             padding: 10px;
         }
-        
+
         .recording-item {
             padding: 12px;
             margin: 5px 0;
@@ -163,42 +306,72 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
             transition: all 0.2s;
             border: 1px solid transparent;
         }
-        
+
         .recording-item:hover {
             background: #e9ecef;
             border-color: #dee2e6;
         }
-        
+
         .recording-item.active {
             background: #0073bb;
             color: white;
             border-color: #0073bb;
         }
-        
+
         .recording-item .date {
             font-size: 12px;
             opacity: 0.8;
             margin-bottom: 4px;
         }
-        
+
         .recording-item .session-id {
             font-family: monospace;
             font-size: 13px;
             margin-bottom: 4px;
         }
-        
+
         .recording-item .stats {
             font-size: 12px;
             opacity: 0.7;
         }
-        
+
+        .load-more {
+            padding: 12px;
+            text-align: center;
+            color: #0073bb;
+            cursor: pointer;
+            font-size: 13px;
+        }
+
+        .load-more:hover {
+            text-decoration: underline;
+        }
+
         .viewer {
             flex: 1;
             display: flex;
             flex-direction: column;
             background: #e9ecef;
         }
-        
+
+        .seek-bar {
+            display: none;
+            align-items: center;
+            gap: 10px;
+            padding: 10px 20px 0;
+            font-size: 13px;
+            color: #495057;
+        }
+
+        .seek-bar.ready {
+            display: flex;
+        }
+
+        .seek-bar input {
+            flex: 1;
+            max-width: 600px;
+        }
+
         .player-container {
             flex: 1;
             display: flex;
@@ -206,7 +379,7 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
             justify-content: center;
             padding: 20px;
         }
-        
+
         #player {
             width: 100%;
             max-width: 1200px;
@@ -216,13 +389,13 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
             box-shadow: 0 4px 12px rgba(0,0,0,0.1);
             border-radius: 8px;
         }
-        
+
         .empty-state {
             text-align: center;
             color: #6c757d;
             padding: 40px;
         }
-        
+
         .loading {
             display: inline-block;
             width: 20px;
@@ -233,12 +406,12 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
             animation: spin 1s linear infinite;
             margin-right: 10px;
         }
-        
+
         @keyframes spin {
             0% { transform: rotate(0deg); }
             100% { transform: rotate(360deg); }
         }
-        
+
         .error {
             color: #dc3545;
             padding: 20px;
@@ -253,7 +426,7 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
     <div class="header">
         <h1>Bedrock Agentcore Session Replay Viewer</h1>
     </div>
-    
+
     <div class="container">
         <div class="sidebar">
             <div class="sidebar-header">
@@ -267,8 +440,13 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
                 </div>
             </div>
         </div>
-        
+
         <div class="viewer">
+            <div class="seek-bar" id="seekBar">
+                <label for="seekInput">Jump to</label>
+                <input type="range" id="seekInput" min="0" max="0" step="1000" value="0">
+                <span id="seekLabel">0s</span>
+            </div>
             <div class="player-container">
                 <div id="player">
                     <div class="empty-state">
@@ -279,55 +457,84 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
             </div>
         </div>
     </div>
-    
+
     <script src="https://cdn.jsdelivr.net/npm/rrweb@latest/dist/rrweb.min.js"></script>
     <script src="https://cdn.jsdelivr.net/npm/rrweb-player@latest/dist/index.js"></script>
     <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/rrweb-player@latest/dist/style.css">
-    
+
     <script>
         let currentPlayer = null;
         let recordings = [];
-        
+
+        // Recordings are listed a page at a time, newest first
+        const PAGE_SIZE = 50;
+        let nextCursor = null;
+        let totalRecordings = 0;
+
+        // The server sends an ETag with each page, so unchanged pages are
+        // revalidated by the browser instead of downloaded again
+        async function fetchRecordingsPage(cursor, limit) {
+            let url = '/api/recordings?limit=' + limit;
+            if (cursor) {
+                url += '&cursor=' + encodeURIComponent(cursor);
+            }
+            const response = await fetch(url);
+            const data = await response.json();
+
+            // Check if response has error
+            if (data.error) {
+                console.error('Server returned error:', data.error);
+                throw new Error(data.error);
+            }
+
+            // Older servers return a plain array
+            if (Array.isArray(data)) {
+                return { recordings: data, nextCursor: null, total: data.length };
+            }
+            return {
+                recordings: data.recordings || [],
+                nextCursor: data.nextCursor || null,
+                total: data.total || 0
+            };
+        }
+
+        function renderRecordings() {
+            const listEl = document.getElementById('recordingsList');
+            const countEl = document.getElementById('recordingCount');
+
+            if (recordings.length === 0) {
+                listEl.innerHTML = '<div class="empty-state">No recordings found</div>';
+                countEl.textContent = '(0)';
+                return;
+            }
+
+            // CHANGED: Use string concatenation instead of template literals
+            countEl.textContent = recordings.length < totalRecordings ?
+                '(' + recordings.length + ' of ' + totalRecordings + ')' :
+                '(' + recordings.length + ')';
+
+            // CHANGED: Create HTML using map with string concatenation
+            listEl.innerHTML = recordings.map(function(recording, index) {
+                return '<div class="recording-item" data-index="' + index + '" onclick="loadRecording(' + index + ')">' +
+                    '<div class="date">' + recording.date + '</div>' +
+                    '<div class="session-id">' + recording.sessionId + '</div>' +
+                    '<div class="stats">' + 
+                        recording.events + ' events • ' + formatDuration(recording.duration) +
+                    '</div>' +
+                '</div>';
+            }).join('') + (nextCursor ?
+                '<div class="load-more" onclick="loadMoreRecordings()">Load more recordings</div>' : '');
+        }
+
         async function loadRecordings() {
             try {
-                const response = await fetch('/api/recordings');
-                const data = await response.json();
-                
-                // Check if response has error
-                if (data.error) {
-                    console.error('Server returned error:', data.error);
-                    document.getElementById('recordingsList').innerHTML = 
-                        '<div class="error">Failed to load recordings: ' + data.error + '</div>';
-                    document.getElementById('recordingCount').textContent = '(0)';
-                    return;
-                }
-                
-                // Make sure recordings is an array
-                recordings = Array.isArray(data) ? data : (data.recordings || []);
-                
-                const listEl = document.getElementById('recordingsList');
-                const countEl = document.getElementById('recordingCount');
-                
-                if (recordings.length === 0) {
-                    listEl.innerHTML = '<div class="empty-state">No recordings found</div>';
-                    countEl.textContent = '(0)';
-                    return;
-                }
-                
-                // CHANGED: Use string concatenation instead of template literals
-                countEl.textContent = '(' + recordings.length + ')';
-                
-                // CHANGED: Create HTML using map with string concatenation
-                listEl.innerHTML = recordings.map(function(recording, index) {
-                    return '<div class="recording-item" data-index="' + index + '" onclick="loadRecording(' + index + ')">' +
-                        '<div class="date">' + recording.date + '</div>' +
-                        '<div class="session-id">' + recording.sessionId + '</div>' +
-                        '<div class="stats">' + 
-                            recording.events + ' events • ' + formatDuration(recording.duration) +
-                        '</div>' +
-                    '</div>';
-                }).join('');
-                
+                // Refresh every recording shown so far, not just the first page
+                const page = await fetchRecordingsPage(null, Math.max(PAGE_SIZE, recordings.length));
+                recordings = page.recordings;
+                nextCursor = page.nextCursor;
+                totalRecordings = page.total;
+                renderRecordings();
+
             } catch (e) {
                 console.error('Failed to load recordings:', e);
                 document.getElementById('recordingsList').innerHTML = 
@@ -335,12 +542,27 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
                 document.getElementById('recordingCount').textContent = '(0)';
             }
         }
-        
+
+        async function loadMoreRecordings() {
+            if (!nextCursor) {
+                return;
+            }
+            try {
+                const page = await fetchRecordingsPage(nextCursor, PAGE_SIZE);
+                recordings = recordings.concat(page.recordings);
+                nextCursor = page.nextCursor;
+                totalRecordings = page.total;
+                renderRecordings();
+            } catch (e) {
+                console.error('Failed to load more recordings:', e);
+            }
+        }
+
         function formatDuration(ms) {
             const seconds = Math.floor(ms / 1000);
             const minutes = Math.floor(seconds / 60);
             const hours = Math.floor(minutes / 60);
-            
+
             // CHANGED: Use string concatenation instead of template literals
             if (hours > 0) {
                 return hours + 'h ' + (minutes % 60) + 'm';
@@ -350,19 +572,130 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
                 return seconds + 's';
             }
         }
-        
-        async function loadRecording(index) {
+
+        // Incremented on every recording selection, so a superseded download stops
+        let loadGeneration = 0;
+
+        // Seek index of the selected recording, once the server has provided it
+        let selectedRecording = null;
+        let recordingIndex = null;
+
+        // With startAt, the batch is streamed from its last full snapshot at or before that time
+        async function fetchEventBatch(recordingId, index, startAt) {
+            const range = startAt === undefined ? 'from=' + index : 'at=' + startAt;
+            const response = await fetch('/api/recordings/' + encodeURIComponent(recordingId) +
+                '/events?' + range + '&to=' + (index + 1));
+            if (!response.ok) {
+                let message = 'HTTP ' + response.status;
+                try {
+                    message = (await response.json()).error || message;
+                } catch (e) {}
+                throw new Error(message);
+            }
+
+            const text = await response.text();
+            const events = [];
+            text.split('\n').forEach(function(line) {
+                if (!line.trim()) {
+                    return;
+                }
+                try {
+                    const event = JSON.parse(line);
+                    // Validate event structure for rrweb
+                    if ('type' in event && 'timestamp' in event) {
+                        events.push(event);
+                    }
+                } catch (e) {
+                    console.warn('Skipping invalid event line: ' + line.slice(0, 50));
+                }
+            });
+            return {
+                events: events,
+                batchCount: parseInt(response.headers.get('X-Batch-Count') || '1', 10)
+            };
+        }
+
+        // Position of the batch holding the last full snapshot at or before timestamp
+        function keyframeBatch(index, timestamp) {
+            let found = 0;
+            let seen = false;
+            for (let i = 0; i < index.batches.length; i++) {
+                const snapshots = index.batches[i].snapshots;
+                for (let j = 0; j < snapshots.length; j++) {
+                    if (seen && snapshots[j].timestamp > timestamp) {
+                        return found;
+                    }
+                    found = i;
+                    seen = true;
+                }
+            }
+            return found;
+        }
+
+        async function loadSeekIndex(recording, generation) {
+            try {
+                const response = await fetch('/api/recordings/' + encodeURIComponent(recording.id) + '/index');
+                if (!response.ok || generation !== loadGeneration) {
+                    return;
+                }
+                const index = await response.json();
+                if (generation !== loadGeneration || !index.duration) {
+                    return;
+                }
+                recordingIndex = index;
+                const seekInput = document.getElementById('seekInput');
+                seekInput.max = index.duration;
+                seekInput.value = 0;
+                document.getElementById('seekLabel').textContent = formatDuration(0);
+                document.getElementById('seekBar').classList.add('ready');
+            } catch (e) {
+                console.warn('Seeking unavailable: ' + e.message);
+            }
+        }
+
+        function createPlayer(playerEl, events) {
+            if (typeof rrwebPlayer !== 'function') {
+                throw new Error('rrwebPlayer not found - make sure the library is loaded');
+            }
+
+            playerEl.innerHTML = '';
+
+            const width = Math.min(playerEl.offsetWidth, 1200);
+            const height = Math.min(playerEl.offsetHeight, 800);
+
+            console.log('Creating player with dimensions ' + width + 'x' + height);
+
+            return new rrwebPlayer({
+                target: playerEl,
+                props: {
+                    events: events,
+                    width: width,
+                    height: height,
+                    autoPlay: true,
+                    showController: true
+                }
+            });
+        }
+
+        async function loadRecording(index, startAt) {
             const recording = recordings[index];
-            
+            const generation = ++loadGeneration;
+
+            // A new selection loses the previous recording's seek index
+            if (startAt === undefined) {
+                selectedRecording = index;
+                recordingIndex = null;
+                document.getElementById('seekBar').classList.remove('ready');
+            }
+
             document.querySelectorAll('.recording-item').forEach(el => {
                 el.classList.remove('active');
             });
-            // CHANGED: Use string concatenation
             document.querySelector('[data-index="' + index + '"]').classList.add('active');
-            
+
             const playerEl = document.getElementById('player');
             playerEl.innerHTML = '<div class="empty-state"><div class="loading"></div>Downloading recording...</div>';
-            
+
             try {
                 // Safely dispose of the existing player first
                 if (currentPlayer) {
@@ -377,185 +710,160 @@ class SessionReplayHandler(BaseHTTPRequestHandler):
                     }
                     currentPlayer = null;
                 }
-                
-                // CHANGED: Use string concatenation
-                const response = await fetch('/api/download/' + recording.id);
-                const result = await response.json();
-                
-                if (!result.success || !result.data) {
-                    throw new Error(result.error || 'Failed to download recording');
-                }
-                
-                const { events } = result.data;
-                
-                if (!events || events.length === 0) {
-                    throw new Error('Recording contains no events');
+
+                // Events are fetched one batch at a time; playback starts as soon
+                // as there is enough to render and later batches are appended.
+                // A seek starts at the batch holding the nearest full snapshot.
+                const first = startAt === undefined ? 0 : keyframeBatch(recordingIndex, startAt);
+                let pending = [];
+                let batchCount = first + 1;
+                let loaded = 0;
+                for (let batch = first; batch < batchCount; batch++) {
+                    const result = await fetchEventBatch(recording.id, batch, batch === first ? startAt : undefined);
+                    if (generation !== loadGeneration) {
+                        return;
+                    }
+                    batchCount = result.batchCount;
+                    loaded += result.events.length;
+                    if (batch === first && startAt === undefined) {
+                        loadSeekIndex(recording, generation);
+                    }
+
+                    if (currentPlayer) {
+                        result.events.forEach(function(event) {
+                            currentPlayer.addEvent(event);
+                        });
+                    } else {
+                        pending = pending.concat(result.events);
+                        // rrweb needs at least a meta and a full snapshot event to render
+                        if (pending.length >= 2) {
+                            console.log('Starting playback after batch ' + (batch + 1) + ' of ' + batchCount +
+                                '. First event type: ' + pending[0].type);
+                            currentPlayer = createPlayer(playerEl, pending);
+                            if (startAt !== undefined) {
+                                currentPlayer.goto(Math.max(0, startAt - pending[0].timestamp), true);
+                            }
+                            pending = [];
+                        }
+                    }
                 }
-                
-                // CHANGED: Use string concatenation for logging
-                console.log('Loaded ' + events.length + ' events. First event type: ' + events[0].type);
-                
-                playerEl.innerHTML = '';
-                
-                if (typeof rrwebPlayer !== 'function') {
-                    throw new Error('rrwebPlayer not found - make sure the library is loaded');
+
+                if (!currentPlayer) {
+                    throw new Error(loaded === 0 ? 'Recording contains no events' : 'Recording has too few events to play');
                 }
-                
-                const width = Math.min(playerEl.offsetWidth, 1200);
-                const height = Math.min(playerEl.offsetHeight, 800);
-                
-                // CHANGED: Use string concatenation
-                console.log('Creating player with dimensions ' + width + 'x' + height);
-                
-                currentPlayer = new rrwebPlayer({
-                    target: playerEl,
-                    props: {
-                        events: events,
-                        width: width,
-                        height: height,
-                        autoPlay: true,
-                        showController: true
-                    }
-                });
-                
-                console.log('Player created:', currentPlayer);
-                
+                console.log('Loaded ' + loaded + ' events in ' + batchCount + ' batches');
+
             } catch (e) {
+                if (generation !== loadGeneration) {
+                    return;
+                }
                 console.error('Failed to load recording:', e);
-                // CHANGED: Use string concatenation
                 playerEl.innerHTML = '<div class="error">Error: ' + e.message + '</div>';
             }
         }
-        
+
         // Initialize
         document.addEventListener('DOMContentLoaded', function() {
             console.log('Session Replay Viewer loaded');
             loadRecordings();
+
+            const seekInput = document.getElementById('seekInput');
+            seekInput.addEventListener('input', function() {
+                document.getElementById('seekLabel').textContent = formatDuration(parseInt(seekInput.value, 10));
+            });
+            seekInput.addEventListener('change', function() {
+                if (recordingIndex && selectedRecording !== null) {
+                    loadRecording(selectedRecording, recordingIndex.start + parseInt(seekInput.value, 10));
+                }
+            });
         });
-        
+
         // Auto-refresh recordings list periodically
         setInterval(loadRecordings, 30000);
     </script>
 </body>
 </html>'''
-        
-        print(f"Original content length: {len(html_content)}")
-        print(f"Contains 'DOLLAR': {'DOLLAR' in html_content}")
-        
-        # Try to replace DOLLAR with $ just in case
-        if 'DOLLAR' in html_content:
-            html_content = html_content.replace('DOLLAR', '$')
-            print(f"After replacement, contains 'DOLLAR': {'DOLLAR' in html_content}")
-        
-        print(f"Writing to file: {path}")
-        
-        try:
-            with open(path, 'w') as f:
-                f.write(html_content)
-            
-            # Verify the file was written correctly
-            file_size = os.path.getsize(path)
-            print(f"File written successfully, size: {file_size} bytes")
-            
-            # Verify content in file
-            with open(path, 'r') as f:
-                first_100 = f.read(100)
-            print(f"First 100 chars of file: {first_100}")
-            
-        except Exception as e:
-            print(f"ERROR writing file: {e}")
-        
-        print("======= END DEBUGGING =======\n")
-    
-    def serve_recordings_list(self):
-        """Return list of recordings with proper headers"""
-        try:
-            recordings = self.data_source.list_recordings()
-            response = json.dumps(recordings)
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(response)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', '*')
-            self.end_headers()
-            
-            self.wfile.write(response.encode('utf-8'))
-            
-        except Exception as e:
-            console.print(f"[red]Error in serve_recordings_list: {e}[/red]")
-            
-            error_response = json.dumps({"error": str(e), "recordings": []})
-            self.send_response(200)  # Use 200 to ensure client gets the error
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(error_response)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(error_response.encode('utf-8'))
-
-    def download_and_serve_recording(self, recording_id):
-        """Download recording and serve it with proper headers"""
-        try:
-            recording_data = self.data_source.download_recording(recording_id)
-            
-            if recording_data:
-                response = json.dumps({
-                    'success': True,
-                    'data': recording_data
-                })
-                
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(response)))
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(response.encode('utf-8'))
-            else:
-                error_response = json.dumps({
-                    'success': False,
-                    'error': 'Recording not found'
-                })
-                self.send_response(404)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(error_response)))
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(error_response.encode('utf-8'))
-                
-        except Exception as e:
-            console.print(f"[red]Error in download_and_serve_recording: {e}[/red]")
-            import traceback
-            traceback.print_exc()
-            
-            error_response = json.dumps({
-                'success': False,
-                'error': str(e)
-            })
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(error_response)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(error_response.encode('utf-8'))
-
-    def do_OPTIONS(self):
-        """Handle OPTIONS requests for CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', '*')
-        self.end_headers()
+
+    print(f"Original content length: {len(html_content)}")
+    print(f"Contains 'DOLLAR': {'DOLLAR' in html_content}")
+
+    # Try to replace DOLLAR with $ just in case
+    if 'DOLLAR' in html_content:
+        html_content = html_content.replace('DOLLAR', '$')
+        print(f"After replacement, contains 'DOLLAR': {'DOLLAR' in html_content}")
+
+    print(f"Writing to file: {path}")
+
+    try:
+        with open(path, 'w') as f:
+            f.write(html_content)
+
+        # Verify the file was written correctly
+        file_size = os.path.getsize(path)
+        print(f"File written successfully, size: {file_size} bytes")
+
+        # Verify content in file
+        with open(path, 'r') as f:
+            first_100 = f.read(100)
+        print(f"First 100 chars of file: {first_100}")
+
+    except Exception as e:
+        print(f"ERROR writing file: {e}")
+
+    print("======= END DEBUGGING =======\n")
 
 
 class DataSource:
-    """Base class for data sources"""
+    """
+    Base class for data sources
+    
+    list_recordings and download_recording are required. A data source that
+    also implements list_batches and open_batch lets the viewer stream a
+    recording batch by batch instead of loading it whole, and one that
+    implements get_index lets the viewer seek (see recording_index).
+    """
     
     def list_recordings(self):
         raise NotImplementedError
     
     def download_recording(self, recording_id):
         raise NotImplementedError
+    
+    def list_batches(self, recording_id):
+        """
+        List a recording's event batches in playback order
+        
+        Returns:
+            list: dicts with the batch file 'name' and its compressed 'size'
+            in bytes (None if unknown), or None if the recording does not exist
+        """
+        raise NotImplementedError
+    
+    def open_batch(self, recording_id, name):
+        """
+        Open one batch of gzip-compressed NDJSON
+        
+        Returns:
+            A context manager yielding a binary stream with a read(size) method
+        """
+        raise NotImplementedError
+    
+    def get_index(self, recording_id, batches=None):
+        """
+        Return a recording's seek index, building it if there is none
+        
+        Args:
+            batches: the recording's list_batches result, if already listed
+        
+        Returns:
+            dict: the index (see recording_index.build_index), or None if the
+            recording does not exist
+        """
+        raise NotImplementedError
+    
+    def save_index(self, recording_id, index):
+        """Store a recording's index next to its batches"""
+        raise NotImplementedError
 
 
 class LocalDataSource(DataSource):
@@ -583,12 +891,17 @@ class LocalDataSource(DataSource):
                     timestamp = parts[1]
                     session_id = '-'.join(parts[2:])
                     
-                    # Try to get metadata
-                    metadata = {}
-                    metadata_file = item / 'metadata.json'
-                    if metadata_file.exists():
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
+                    # Prefer the index; fall back to metadata
+                    index = self._stored_index(recording_id)
+                    if index:
+                        events, duration = index['events'], index['duration']
+                    else:
+                        metadata = {}
+                        metadata_file = item / 'metadata.json'
+                        if metadata_file.exists():
+                            with open(metadata_file, 'r') as f:
+                                metadata = json.load(f)
+                        events, duration = metadata.get('totalEvents', 0), metadata.get('duration', 0)
                     
                     recordings.append({
                         'id': recording_id,
@@ -597,8 +910,9 @@ class LocalDataSource(DataSource):
                         'date': datetime.fromtimestamp(
                             int(timestamp) / 1000
                         ).strftime('%Y-%m-%d %H:%M:%S'),
-                        'events': metadata.get('totalEvents', 0),
-                        'duration': metadata.get('duration', 0)
+                        'events': events,
+                        'duration': duration,
+                        'indexed': index is not None
                     })
         
         recordings.sort(key=lambda x: x['timestamp'], reverse=True)
@@ -621,7 +935,7 @@ class LocalDataSource(DataSource):
                 metadata = json.load(f)
         
         # Load batch files
-        batch_files = sorted(recording_dir.glob('batch-*.ndjson.gz'))
+        batch_files = [recording_dir / batch['name'] for batch in self.list_batches(recording_id)]
         
         for batch_file in batch_files:
             with gzip.open(batch_file, 'rt') as f:
@@ -633,151 +947,317 @@ class LocalDataSource(DataSource):
             'metadata': metadata,
             'events': all_events
         }
+    
+    def list_batches(self, recording_id):
+        """List the recording's batch files"""
+        recording_dir = self.recordings_dir / recording_id
+        if Path(recording_id).name != recording_id or not recording_dir.is_dir():
+            return None
+        
+        batch_files = [path for path in recording_dir.iterdir() if is_batch_file(path.name)]
+        batch_files.sort(key=lambda path: batch_sort_key(path.name))
+        return [{'name': path.name, 'size': path.stat().st_size} for path in batch_files]
+    
+    def _stored_index(self, recording_id, batches=None):
+        """Read the recording's index.json if it matches its batch files"""
+        index_file = self.recordings_dir / recording_id / INDEX_FILE_NAME
+        if not index_file.exists():
+            return None
+        with open(index_file, 'rb') as f:
+            index = read_index(f)
+        if batches is None:
+            batches = self.list_batches(recording_id)
+        return index if batches is not None and is_current(index, batches) else None
+    
+    def get_index(self, recording_id, batches=None):
+        """Read the recording's index.json, building and writing it if missing or out of date"""
+        if batches is None:
+            batches = self.list_batches(recording_id)
+        if batches is None:
+            return None
+        index = self._stored_index(recording_id, batches)
+        if index is None:
+            console.print(f"[cyan]Indexing recording: {recording_id}[/cyan]")
+            index = build_index(batches, lambda name: self.open_batch(recording_id, name))
+            try:
+                self.save_index(recording_id, index)
+            except OSError as e:
+                console.print(f"[yellow]Warning: Could not save index for {recording_id}: {e}[/yellow]")
+        return index
+    
+    def save_index(self, recording_id, index):
+        """Write the recording's index.json"""
+        with open(self.recordings_dir / recording_id / INDEX_FILE_NAME, 'w') as f:
+            json.dump(index, f)
+    
+    def open_batch(self, recording_id, name):
+        """Open a batch file"""
+        return open(self.recordings_dir / recording_id / Path(name).name, 'rb')
 
 
 class S3DataSource(DataSource):
     """S3 data source"""
     
-    def __init__(self, bucket, prefix=''):
+    def __init__(self, bucket, prefix='', cache=None):
         self.s3_client = boto3.client('s3')
         self.bucket = bucket
         self.prefix = prefix.rstrip('/')
-        self.temp_dir = Path(tempfile.mkdtemp(prefix="bedrock_agentcore_replay_"))
+        # Recording files are kept in a persistent cache keyed by ETag
+        self.downloader = S3BatchDownloader(self.s3_client, cache)
+        # Listed objects by (recording ID, file name), for their ETags
+        self._objects = {}
+        # Last recordings listing and each recording's entry, keyed by a
+        # (newest LastModified, object count) signature of what they were built from
+        self._listing = None
+        self._summaries = {}
+        self._listing_lock = threading.Lock()
         
         console.print(f"[cyan]Using S3 location:[/cyan]")
         console.print(f"  Bucket: {bucket}")
         console.print(f"  Prefix: {prefix}")
+        console.print(f"  Cache: {self.downloader.cache.cache_dir}")
     
     def cleanup(self):
-        """Clean up temp files"""
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
+        """Stop the download threads; cached files are kept for the next run"""
+        self.downloader.close()
     
     def list_recordings(self):
-        """List recordings from S3"""
-        recordings = []
+        """
+        List recordings from S3, reading their event counts and durations from their indexes
         
-        try:
-            paginator = self.s3_client.get_paginator('list_objects_v2')
+        The listing is reused for LIST_CACHE_TTL seconds. After that the prefix
+        is listed again, and only recordings whose objects changed (newer
+        LastModified or a different object count) have their index or
+        metadata read again, in parallel.
+        """
+        with self._listing_lock:
+            if self._listing and time.monotonic() - self._listing['listed_at'] < LIST_CACHE_TTL:
+                return self._listing['recordings']
             
-            # Look for any directories (not just rrweb-*)
-            for page in paginator.paginate(
-                Bucket=self.bucket, 
-                Prefix=self.prefix,
-                Delimiter='/'
-            ):
-                if 'CommonPrefixes' in page:
-                    console.print(f"Found {len(page['CommonPrefixes'])} directories in prefix {self.prefix}")
-                    
-                    for prefix_info in page['CommonPrefixes']:
-                        prefix = prefix_info['Prefix']
-                        recording_id = prefix.rstrip('/').split('/')[-1]
-                        
-                        # Check if it's a recording directory by looking for metadata.json
-                        metadata = self._get_metadata(recording_id)
-                        if metadata:
-                            # This is a valid recording directory
-                            session_id = recording_id  # Use the folder name as the session ID
-                            timestamp = int(metadata.get('startTime', time.time() * 1000))
-                            
-                            recordings.append({
-                                'id': recording_id,
-                                'sessionId': session_id,
-                                'timestamp': timestamp,
-                                'date': datetime.fromtimestamp(
-                                    timestamp / 1000
-                                ).strftime('%Y-%m-%d %H:%M:%S'),
-                                'events': metadata.get('eventCount', 0),
-                                'duration': metadata.get('duration', 0)
-                            })
-                            console.print(f"✅ Found recording: {recording_id}")
-                        else:
-                            console.print(f"⚠️ Directory without metadata: {recording_id}")
-                
-                recordings.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
-                console.print(f"[green]Found {len(recordings)} recordings[/green]")
-                
-            # If no recordings found with CommonPrefixes, try a direct list
-            if not recordings:
-                console.print("Trying alternative method to find recordings...")
-                
-                # Get a flat list of all objects
-                all_objects = []
-                for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
-                    if 'Contents' in page:
-                        all_objects.extend(page['Contents'])
-                
-                # Extract unique directory names
-                dirs = set()
-                for obj in all_objects:
-                    key = obj['Key']
-                    if '/' in key[len(self.prefix):]:
-                        dir_name = key.split('/', 1)[0] if not self.prefix else key[len(self.prefix):].split('/', 1)[0]
-                        dirs.add(dir_name)
-                
-                console.print(f"Found directories: {dirs}")
-                
-                # Check each directory for metadata
-                for dir_name in dirs:
-                    metadata = self._get_metadata(dir_name)
-                    if metadata:
-                        session_id = dir_name
-                        timestamp = int(metadata.get('startTime', time.time() * 1000))
-                        
-                        recordings.append({
-                            'id': dir_name,
-                            'sessionId': session_id,
-                            'timestamp': timestamp,
-                            'date': datetime.fromtimestamp(
-                                timestamp / 1000
-                            ).strftime('%Y-%m-%d %H:%M:%S'),
-                            'events': metadata.get('eventCount', 0),
-                            'duration': metadata.get('duration', 0)
-                        })
-                
-                recordings.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
-                console.print(f"[green]Found {len(recordings)} recordings with alternative method[/green]")
-                
+            try:
+                objects_by_recording = self._list_objects_by_recording()
+            except Exception as e:
+                console.print(f"[red]Error listing recordings: {e}[/red]")
+                import traceback
+                traceback.print_exc()
+                return self._listing['recordings'] if self._listing else []
+            
+            signatures = {
+                recording_id: listing_signature(objects.values())
+                for recording_id, objects in objects_by_recording.items()
+            }
+            signature = listing_signature(
+                obj for objects in objects_by_recording.values() for obj in objects.values()
+            )
+            if self._listing and self._listing['signature'] == signature:
+                self._listing['listed_at'] = time.monotonic()
+                return self._listing['recordings']
+            
+            console.print(f"Found {len(objects_by_recording)} directories in prefix {self.prefix}")
+            changed = [
+                recording_id for recording_id, recording_signature in signatures.items()
+                if self._summaries.get(recording_id, (None, None))[0] != recording_signature
+            ]
+            
+            # Start downloading every changed recording's index (or metadata) at once
+            for recording_id in changed:
+                objects = objects_by_recording[recording_id]
+                obj = objects.get(INDEX_FILE_NAME) or objects.get('metadata.json')
+                if obj is not None:
+                    self.downloader.submit(self.bucket, obj)
+            
+            summaries = {
+                recording_id: self._summaries[recording_id]
+                for recording_id in signatures if recording_id not in changed
+            }
+            for recording_id in changed:
+                summary = self._recording_summary(recording_id, objects_by_recording[recording_id])
+                summaries[recording_id] = (signatures[recording_id], summary)
+            self._summaries = summaries
+            
+            recordings = [summary for _, summary in summaries.values() if summary is not None]
+            recordings.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
+            console.print(f"[green]Found {len(recordings)} recordings "
+                          f"({len(changed)} read, {len(summaries) - len(changed)} unchanged)[/green]")
+            
+            self._listing = {'signature': signature, 'listed_at': time.monotonic(), 'recordings': recordings}
+            return recordings
+    
+    def _recording_summary(self, recording_id, objects):
+        """The list_recordings entry of a recording, or None if it has neither index nor metadata"""
+        try:
+            index = self._stored_index(recording_id, objects)
+            if index:
+                timestamp = int(index['start'] or time.time() * 1000)
+                events, duration = index['events'], index['duration']
+            else:
+                # Check if it's a recording directory by looking for metadata.json
+                metadata = self._get_metadata(objects)
+                if not metadata:
+                    console.print(f"⚠️ Directory without metadata: {recording_id}")
+                    return None
+                timestamp = int(metadata.get('startTime', time.time() * 1000))
+                events, duration = metadata.get('eventCount', 0), metadata.get('duration', 0)
         except Exception as e:
-            console.print(f"[red]Error listing recordings: {e}[/red]")
-            import traceback
-            traceback.print_exc()
+            console.print(f"[red]Error reading recording {recording_id}: {e}[/red]")
+            return None
         
-        return recordings
+        return {
+            'id': recording_id,
+            'sessionId': recording_id,  # Use the folder name as the session ID
+            'timestamp': timestamp,
+            'date': datetime.fromtimestamp(
+                timestamp / 1000
+            ).strftime('%Y-%m-%d %H:%M:%S'),
+            'events': events,
+            'duration': duration,
+            'indexed': index is not None
+        }
     
-    def _get_metadata(self, recording_id):
-        """Get metadata for a recording"""
-        try:
-            # Try both possible metadata paths
-            keys_to_try = [
-                f"{self.prefix}/{recording_id}/metadata.json",
-                f"{recording_id}/metadata.json",
-                f"{self.prefix}{recording_id}/metadata.json"
-            ]
-            
-            for key in keys_to_try:
-                try:
-                    console.print(f"[dim]Trying metadata path: {key}[/dim]")
-                    response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
-                    data = json.loads(response['Body'].read().decode('utf-8'))
-                    console.print(f"[dim]Found metadata at: {key}[/dim]")
-                    return data
-                except Exception as e:
-                    console.print(f"[dim]No metadata at: {key} ({str(e)})[/dim]")
+    def _forget_summary(self, recording_id):
+        """Make the next list_recordings read this recording again"""
+        with self._listing_lock:
+            self._summaries.pop(recording_id, None)
+            self._listing = None
+    
+    def _list_objects_by_recording(self):
+        """List every object under the prefix in one pass, grouped by recording and file name"""
+        objects_by_recording = {}
+        base = f"{self.prefix}/" if self.prefix else ''
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=base):
+            for obj in page.get('Contents', []):
+                parts = obj['Key'][len(base):].split('/')
+                if len(parts) != 2 or not parts[1]:
                     continue
-            
+                recording_id, filename = parts
+                objects_by_recording.setdefault(recording_id, {})[filename] = obj
+                self._objects[(recording_id, filename)] = obj
+        return objects_by_recording
+    
+    def _get_metadata(self, objects):
+        """Read a recording's metadata.json through the cache, given its objects by file name"""
+        obj = objects.get('metadata.json')
+        if obj is None:
             return {}
+        try:
+            with open(self.downloader.submit(self.bucket, obj).result(), 'r') as f:
+                return json.load(f)
         except Exception as e:
             console.print(f"[dim]Error getting metadata: {e}[/dim]")
             return {}
     
+    def _batches_from_objects(self, objects):
+        """list_batches entries for a recording's objects by file name"""
+        batch_objects = self._batch_objects(list(objects.values()))
+        return [
+            {'name': obj['Key'].split('/')[-1], 'size': obj['Size'], 'etag': obj['ETag']}
+            for obj in batch_objects
+        ]
+    
+    def _stored_index(self, recording_id, objects, batches=None):
+        """
+        Return an index matching the recording's batches without building one
+        
+        An index.json uploaded with --build-index is used first, then one
+        built earlier by this viewer and kept in the local cache.
+        """
+        if batches is None:
+            batches = self._batches_from_objects(objects)
+        obj = objects.get(INDEX_FILE_NAME)
+        if obj is not None:
+            try:
+                with open(self.downloader.submit(self.bucket, obj).result(), 'rb') as f:
+                    index = read_index(f)
+                if is_current(index, batches):
+                    return index
+            except Exception as e:
+                console.print(f"[dim]Error reading index of {recording_id}: {e}[/dim]")
+        cached = self.downloader.cache.get(index_cache_key(batches))
+        if cached is not None:
+            with open(cached, 'rb') as f:
+                index = read_index(f)
+            if is_current(index, batches):
+                return index
+        return None
+    
+    def get_index(self, recording_id, batches=None):
+        """Return the recording's index, building it into the local cache on first use"""
+        objects = {obj['Key'].split('/')[-1]: obj for obj in self._list_recording_objects(recording_id)}
+        if not objects:
+            return None
+        if batches is None:
+            batches = self._batches_from_objects(objects)
+        index = self._stored_index(recording_id, objects, batches)
+        if index is None:
+            console.print(f"[cyan]Indexing recording: {recording_id}[/cyan]")
+            # Start every batch download before scanning the first
+            for batch in batches:
+                self.downloader.submit(self.bucket, objects[batch['name']])
+            index = cached_index(self.downloader.cache, batches, lambda name: self.open_batch(recording_id, name))
+            # The listing entry can now come from the index
+            self._forget_summary(recording_id)
+        return index
+    
+    def save_index(self, recording_id, index):
+        """Upload the recording's index.json next to its batches"""
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=self._recording_prefix(recording_id) + INDEX_FILE_NAME,
+            Body=json.dumps(index).encode('utf-8'),
+            ContentType='application/json'
+        )
+        self._forget_summary(recording_id)
+    
+    def _recording_prefix(self, recording_id):
+        return f"{self.prefix}/{recording_id}/" if self.prefix else f"{recording_id}/"
+    
+    def _list_recording_objects(self, recording_id):
+        """List the objects of a recording, remembering them for open_batch"""
+        objects = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._recording_prefix(recording_id)):
+            for obj in page.get('Contents', []):
+                objects.append(obj)
+                self._objects[(recording_id, obj['Key'].split('/')[-1])] = obj
+        return objects
+    
+    def _batch_objects(self, objects):
+        batch_objects = [obj for obj in objects if is_batch_file(obj['Key'].split('/')[-1])]
+        batch_objects.sort(key=lambda obj: batch_sort_key(obj['Key'].split('/')[-1]))
+        return batch_objects
+    
+    def list_batches(self, recording_id):
+        """List the recording's batch objects and start caching them in the background"""
+        objects = self._list_recording_objects(recording_id)
+        if not objects:
+            return None
+        batch_objects = self._batch_objects(objects)
+        # The viewer asks for batches in order; download ahead of it in parallel
+        for obj in batch_objects:
+            self.downloader.submit(self.bucket, obj)
+        return [
+            {'name': obj['Key'].split('/')[-1], 'size': obj['Size'], 'etag': obj['ETag']}
+            for obj in batch_objects
+        ]
+    
+    def open_batch(self, recording_id, name):
+        """Open a batch from the local cache, downloading it first if needed"""
+        obj = self._objects.get((recording_id, name))
+        if obj is None:
+            key = self._recording_prefix(recording_id) + name
+            head = self.s3_client.head_object(Bucket=self.bucket, Key=key)
+            obj = {'Key': key, 'ETag': head['ETag'], 'Size': head['ContentLength']}
+        try:
+            return open(self.downloader.submit(self.bucket, obj).result(), 'rb')
+        except FileNotFoundError:
+            # Evicted between download and open by a full cache
+            return open(self.downloader.submit(self.bucket, obj).result(), 'rb')
+    
     def download_recording(self, recording_id):
         """Download recording from S3"""
         console.print(f"[cyan]Downloading recording: {recording_id}[/cyan]")
         
-        recording_dir = self.temp_dir / recording_id
-        recording_dir.mkdir(exist_ok=True)
-        
         try:
             with Progress(
                 SpinnerColumn(),
@@ -786,30 +1266,29 @@ class S3DataSource(DataSource):
             ) as progress:
                 
                 # List files for this recording
-                prefix = f"{self.prefix}/{recording_id}/" if self.prefix else f"{recording_id}/"
+                prefix = self._recording_prefix(recording_id)
                 console.print(f"Looking for files with prefix: {prefix}")
                 
-                paginator = self.s3_client.get_paginator('list_objects_v2')
+                objects = self._list_recording_objects(recording_id)
+                metadata_objects = [obj for obj in objects if obj['Key'].endswith('/metadata.json')]
+                files_to_download = metadata_objects + self._batch_objects(objects)
                 
-                files_to_download = []
-                for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
-                    if 'Contents' in page:
-                        for obj in page['Contents']:
-                            files_to_download.append(obj['Key'])
+                # Download files in parallel; cached files cost no S3 request
+                hits_before = self.downloader.cache_hits
+                console.print(f"Fetching {len(files_to_download)} files")
+                task = progress.add_task(f"Fetching {len(files_to_download)} files...", total=len(files_to_download))
                 
-                # Download files
-                console.print(f"Downloading {len(files_to_download)} files")
-                task = progress.add_task(f"Downloading {len(files_to_download)} files...", total=len(files_to_download))
+                futures = [self.downloader.submit(self.bucket, obj) for obj in files_to_download]
+                for _ in as_completed(futures):
+                    progress.advance(task)
+                local_paths = [future.result() for future in futures]
+                console.print(f"[dim]{self.downloader.cache_hits - hits_before} of {len(files_to_download)} files served from cache[/dim]")
                 
                 all_events = []
                 metadata = {}
                 
-                for key in files_to_download:
-                    filename = key.split('/')[-1]
-                    local_path = recording_dir / filename
-                    
-                    self.s3_client.download_file(self.bucket, key, str(local_path))
-                    progress.advance(task)
+                for obj, local_path in zip(files_to_download, local_paths):
+                    filename = obj['Key'].split('/')[-1]
                     
                     # Process file
                     if filename == 'metadata.json':
@@ -882,8 +1361,8 @@ class S3DataSource(DataSource):
                 
                 # List downloaded files for debugging
                 console.print("Downloaded files:")
-                for path in recording_dir.iterdir():
-                    console.print(f"  - {path.name} ({path.stat().st_size} bytes)")
+                for obj in files_to_download:
+                    console.print(f"  - {obj['Key'].split('/')[-1]} ({obj['Size']} bytes)")
             
             return {
                 'metadata': metadata,
@@ -905,6 +1384,7 @@ class SessionReplayViewer:
         self.port = port
         self.viewer_path = Path(__file__).parent.parent / "static" / "replay-viewer"
         self.server = None
+        self.server_thread = None
     
     def find_available_port(self):
         """Find an available port"""
@@ -919,23 +1399,21 @@ class SessionReplayViewer:
     
     def start(self):
         """Start the replay viewer server"""
+        # fastapi and uvicorn are only needed to run the viewer, not to use the data sources
+        try:
+            from .replay_server import create_app, serve_in_thread
+        except ImportError:
+            from replay_server import create_app, serve_in_thread
+        
         # Ensure viewer directory exists
         self.viewer_path.mkdir(parents=True, exist_ok=True)
         
         # Find available port
         port = self.find_available_port()
         
-        # Create request handler
-        def handler_factory(*args, **kwargs):
-            return SessionReplayHandler(self.data_source, self.viewer_path, *args, **kwargs)
-        
-        # Start server
-        self.server = HTTPServer(('', port), handler_factory)
-        
-        # Start in thread
-        server_thread = threading.Thread(target=self.server.serve_forever)
-        server_thread.daemon = True
-        server_thread.start()
+        # Start server in thread
+        app = create_app(self.data_source, self.viewer_path)
+        self.server, self.server_thread = serve_in_thread(app, port)
         
         url = f"http://localhost:{port}"
         
@@ -953,9 +1431,7 @@ class SessionReplayViewer:
         # Handle shutdown
         def signal_handler(sig, frame):
             console.print("\n[yellow]Shutting down...[/yellow]")
-            self.server.shutdown()
-            if hasattr(self.data_source, 'cleanup'):
-                self.data_source.cleanup()
+            self.stop()
             sys.exit(0)
         
         signal.signal(signal.SIGINT, signal_handler)
@@ -966,9 +1442,32 @@ class SessionReplayViewer:
                 time.sleep(1)
         except KeyboardInterrupt:
             console.print("\n[yellow]Shutting down...[/yellow]")
-            self.server.shutdown()
-            if hasattr(self.data_source, 'cleanup'):
-                self.data_source.cleanup()
+            self.stop()
+    
+    def stop(self):
+        """Stop the server and release the data source"""
+        if self.server:
+            self.server.should_exit = True
+            self.server_thread.join(timeout=5)
+            self.server = None
+        if hasattr(self.data_source, 'cleanup'):
+            self.data_source.cleanup()
+
+
+def build_indexes(data_source):
+    """Index every recording of a data source and save the indexes"""
+    try:
+        for recording in data_source.list_recordings():
+            batches = data_source.list_batches(recording['id'])
+            if not batches:
+                continue
+            index = build_index(batches, lambda name: data_source.open_batch(recording['id'], name))
+            data_source.save_index(recording['id'], index)
+            console.print(f"[green]✓ Indexed {recording['id']}: {index['events']} events, "
+                          f"{index['snapshots']} full snapshots in {len(batches)} batches[/green]")
+    finally:
+        if hasattr(data_source, 'cleanup'):
+            data_source.cleanup()
 
 
 def main():
@@ -995,6 +1494,11 @@ def main():
         default=8080,
         help='Port to run server on (default: 8080)'
     )
+    parser.add_argument(
+        '--build-index',
+        action='store_true',
+        help='Index every recording for seeking, save the indexes next to the batches and exit'
+    )
     
     args = parser.parse_args()
     
@@ -1013,6 +1517,10 @@ def main():
         
         data_source = S3DataSource(bucket, prefix)
     
+    if args.build_index:
+        build_indexes(data_source)
+        return
+    
     # Start viewer
     viewer = SessionReplayViewer(data_source, port=args.port)
     viewer.start()
@@ -0,0 +1,135 @@
+"""
+Tests for the ETag-keyed recording cache and the parallel S3 downloader
+
+S3 is replaced by moto's in-process stand-in, so no AWS account or network
+access is needed:
+
+    pip install -r requirements.txt moto pytest
+    python -m pytest tests
+"""
+import gzip
+import io
+import json
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from recording_cache import RecordingCache, S3BatchDownloader  # noqa: E402
+
+BUCKET = 'test-recordings'
+REGION = 'us-east-1'
+
+
+def batch(*timestamps):
+    lines = [json.dumps({'type': 3, 'timestamp': t, 'data': {}}) for t in timestamps]
+    return gzip.compress('\n'.join(lines).encode('utf-8'))
+
+
+def listed(s3, prefix):
+    return s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix)['Contents']
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    with mock_aws():
+        client = boto3.client('s3', region_name=REGION)
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def downloader(s3, tmp_path):
+    downloader = S3BatchDownloader(s3, RecordingCache(tmp_path / 'cache'), max_workers=4)
+    yield downloader
+    downloader.close()
+
+
+def test_fetch_returns_paths_in_listing_order(s3, downloader):
+    for i in range(6):
+        s3.put_object(Bucket=BUCKET, Key=f'rec/batch-{i}.ndjson.gz', Body=batch(i))
+
+    paths = downloader.fetch(BUCKET, listed(s3, 'rec/'))
+    timestamps = [json.loads(gzip.decompress(path.read_bytes()))['timestamp'] for path in paths]
+    assert timestamps == list(range(6))
+    assert downloader.downloads == 6
+
+
+def test_reopening_a_recording_makes_no_s3_requests(s3, downloader, monkeypatch):
+    s3.put_object(Bucket=BUCKET, Key='rec/batch-0.ndjson.gz', Body=batch(1, 2))
+    objects = listed(s3, 'rec/')
+    first = downloader.fetch(BUCKET, objects)
+
+    def no_download(**kwargs):
+        raise AssertionError(f"unexpected get_object: {kwargs['Key']}")
+
+    monkeypatch.setattr(s3, 'get_object', no_download)
+    assert downloader.fetch(BUCKET, objects) == first
+    assert downloader.downloads == 1
+    assert downloader.cache_hits == 1
+
+
+def test_cache_survives_a_new_downloader(s3, downloader, tmp_path):
+    s3.put_object(Bucket=BUCKET, Key='rec/batch-0.ndjson.gz', Body=batch(1))
+    objects = listed(s3, 'rec/')
+    downloader.fetch(BUCKET, objects)
+
+    restarted = S3BatchDownloader(s3, RecordingCache(tmp_path / 'cache'))
+    try:
+        restarted.fetch(BUCKET, objects)
+        assert restarted.downloads == 0
+        assert restarted.cache_hits == 1
+    finally:
+        restarted.close()
+
+
+def test_batches_shared_between_recordings_download_once(s3, downloader):
+    body = batch(1, 2, 3)
+    s3.put_object(Bucket=BUCKET, Key='rec-a/batch-0.ndjson.gz', Body=body)
+    s3.put_object(Bucket=BUCKET, Key='rec-b/batch-0.ndjson.gz', Body=body)
+
+    path_a, = downloader.fetch(BUCKET, listed(s3, 'rec-a/'))
+    path_b, = downloader.fetch(BUCKET, listed(s3, 'rec-b/'))
+    assert path_a == path_b
+    assert downloader.downloads == 1
+
+
+def test_changed_object_is_downloaded_again(s3, downloader):
+    s3.put_object(Bucket=BUCKET, Key='rec/metadata.json', Body=b'{"v": 1}')
+    old, = downloader.fetch(BUCKET, listed(s3, 'rec/'))
+    s3.put_object(Bucket=BUCKET, Key='rec/metadata.json', Body=b'{"v": 2}')
+    new, = downloader.fetch(BUCKET, listed(s3, 'rec/'))
+
+    assert old != new
+    assert json.loads(new.read_bytes()) == {'v': 2}
+    assert downloader.downloads == 2
+
+
+def test_eviction_removes_least_recently_used_entries(tmp_path):
+    cache = RecordingCache(tmp_path, max_bytes=250)
+    a = cache.store('"a"', io.BytesIO(b'a' * 100))
+    b = cache.store('"b"', io.BytesIO(b'b' * 100))
+    os.utime(a, (1, 1))
+    os.utime(b, (2, 2))
+    assert cache.get('"a"') == a  # a is now the most recently used
+
+    c = cache.store('"c"', io.BytesIO(b'c' * 100))
+    assert cache.get('"b"') is None
+    assert not b.exists()
+    assert a.exists() and c.exists()
+    assert cache.total_bytes == 200
+
+
+def test_entry_larger_than_the_cache_is_kept_until_the_next_store(tmp_path):
+    cache = RecordingCache(tmp_path, max_bytes=10)
+    big = cache.store('"big"', io.BytesIO(b'x' * 50))
+    assert big.exists()
+
+    cache.store('"small"', io.BytesIO(b'y'))
+    assert not big.exists()
+    assert cache.total_bytes == 1
@@ -0,0 +1,108 @@
+"""
+Tests for the recording seek index
+
+    python -m pytest tests
+"""
+import gzip
+import io
+import json
+import os
+import sys
+from contextlib import closing
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from recording_index import (  # noqa: E402
+    build_index, find_keyframe, index_cache_key, is_current, read_index, scan_batch
+)
+
+
+def ndjson(*events):
+    return ''.join(json.dumps(event) + '\n' for event in events).encode('utf-8')
+
+
+def event(event_type, timestamp):
+    return {'type': event_type, 'timestamp': timestamp, 'data': {}}
+
+
+BATCHES = {
+    'batch-0.ndjson.gz': ndjson(event(4, 100), event(2, 110), event(3, 120)),
+    'batch-1.ndjson.gz': ndjson(event(3, 200), event(4, 300), event(2, 310), event(3, 320)),
+    'batch-2.ndjson.gz': ndjson(event(3, 400), event(2, 500)),
+}
+
+
+def listed():
+    return [{'name': name, 'size': len(gzip.compress(data))} for name, data in BATCHES.items()]
+
+
+def open_batch(name):
+    return closing(io.BytesIO(gzip.compress(BATCHES[name])))
+
+
+def test_scan_batch_counts_events_and_finds_snapshots():
+    data = BATCHES['batch-1.ndjson.gz']
+    entry = scan_batch(io.BytesIO(gzip.compress(data)))
+
+    assert entry['events'] == 4
+    assert (entry['start'], entry['end']) == (200, 320)
+    assert entry['bytes'] == len(data)
+    snapshot, = entry['snapshots']
+    # A snapshot right after a meta event starts at the meta event
+    assert snapshot == {'timestamp': 310, 'event': 1, 'offset': data.index(b'{"type": 4')}
+
+
+def test_snapshot_offset_points_at_its_line():
+    data = BATCHES['batch-2.ndjson.gz']
+    snapshot, = scan_batch(io.BytesIO(gzip.compress(data)))['snapshots']
+    assert json.loads(data[snapshot['offset']:].split(b'\n')[0]) == event(2, 500)
+
+
+def test_invalid_lines_are_skipped_but_counted_in_offsets():
+    data = b'not json\n\n' + ndjson({'no': 'type'}, event(2, 7))
+    entry = scan_batch(io.BytesIO(gzip.compress(data)))
+    assert entry['events'] == 1
+    assert entry['snapshots'][0]['offset'] == data.index(b'{"type"')
+
+
+def test_build_index_totals():
+    index = build_index(listed(), open_batch)
+    assert index['events'] == 9
+    assert (index['start'], index['end'], index['duration']) == (100, 500, 400)
+    assert index['snapshots'] == 3
+    assert [entry['name'] for entry in index['batches']] == list(BATCHES)
+
+
+def test_find_keyframe_picks_last_snapshot_not_after_timestamp():
+    index = build_index(listed(), open_batch)
+    assert find_keyframe(index, 50)[0] == 0
+    assert find_keyframe(index, 309)[0] == 0
+    assert find_keyframe(index, 310)[0] == 1
+    assert find_keyframe(index, 499)[1]['timestamp'] == 310
+    assert find_keyframe(index, 10_000)[0] == 2
+
+
+def test_find_keyframe_without_snapshots():
+    index = build_index([{'name': 'batch-0.ndjson.gz', 'size': 1}],
+                        lambda name: closing(io.BytesIO(gzip.compress(ndjson(event(3, 1))))))
+    assert find_keyframe(index, 1) is None
+
+
+def test_index_goes_stale_when_batches_change():
+    batches = listed()
+    index = build_index(batches, open_batch)
+    assert is_current(index, batches)
+    assert not is_current(index, batches[:2])
+    assert not is_current(index, batches[:2] + [dict(batches[2], size=1)])
+
+    with_etags = [dict(batch, etag=f'"{i}"') for i, batch in enumerate(batches)]
+    index = build_index(with_etags, open_batch)
+    assert is_current(index, with_etags)
+    assert not is_current(index, with_etags[:2] + [dict(with_etags[2], etag='"new"')])
+    assert index_cache_key(with_etags) != index_cache_key(with_etags[:2])
+
+
+def test_read_index_rejects_other_versions():
+    index = build_index(listed(), open_batch)
+    assert read_index(io.BytesIO(json.dumps(index).encode('utf-8'))) == index
+    assert read_index(io.BytesIO(json.dumps(dict(index, version=0)).encode('utf-8'))) is None
+    assert read_index(io.BytesIO(b'{broken')) is None
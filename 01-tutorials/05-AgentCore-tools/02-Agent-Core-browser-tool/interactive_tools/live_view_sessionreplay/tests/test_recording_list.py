@@ -0,0 +1,127 @@
+"""
+Tests for the cached S3 recordings listing and /api/recordings pagination
+
+S3 is replaced by moto's in-process stand-in, so no AWS account or network
+access is needed:
+
+    pip install -r requirements.txt boto3 moto pytest
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import session_replay_viewer  # noqa: E402
+from recording_cache import RecordingCache  # noqa: E402
+from session_replay_viewer import S3DataSource, paginate_recordings  # noqa: E402
+
+BUCKET = 'test-recordings'
+REGION = 'us-east-1'
+
+
+def put_recording(s3, recording_id, start, events):
+    metadata = {'startTime': start, 'eventCount': events, 'duration': events * 10}
+    s3.put_object(Bucket=BUCKET, Key=f'replay/{recording_id}/metadata.json', Body=json.dumps(metadata))
+    s3.put_object(Bucket=BUCKET, Key=f'replay/{recording_id}/batch-0.ndjson.gz', Body=b'')
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', REGION)
+    with mock_aws():
+        client = boto3.client('s3', region_name=REGION)
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def source(s3, tmp_path):
+    for i in range(5):
+        put_recording(s3, f'rec-{i}', 1_700_000_000_000 + i * 1000, i)
+    source = S3DataSource(BUCKET, 'replay', cache=RecordingCache(tmp_path))
+    yield source
+    source.cleanup()
+
+
+def count_calls(monkeypatch, client, name):
+    calls = []
+    original = getattr(client, name)
+
+    def counted(*args, **kwargs):
+        calls.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(client, name, counted)
+    return calls
+
+
+def test_lists_recordings_newest_first(source):
+    recordings = source.list_recordings()
+    assert [r['id'] for r in recordings] == [f'rec-{i}' for i in reversed(range(5))]
+    assert [r['events'] for r in recordings] == [4, 3, 2, 1, 0]
+    assert not any(r['indexed'] for r in recordings)
+
+
+def test_listing_is_reused_within_the_ttl(source, monkeypatch):
+    source.list_recordings()
+    lists = count_calls(monkeypatch, source.s3_client, 'get_paginator')
+    gets = count_calls(monkeypatch, source.s3_client, 'get_object')
+
+    assert len(source.list_recordings()) == 5
+    assert lists == [] and gets == []
+
+
+def test_unchanged_prefix_is_listed_but_not_read_again(source, monkeypatch):
+    source.list_recordings()
+    monkeypatch.setattr(session_replay_viewer, 'LIST_CACHE_TTL', 0)
+    lists = count_calls(monkeypatch, source.s3_client, 'get_paginator')
+    gets = count_calls(monkeypatch, source.s3_client, 'get_object')
+
+    assert len(source.list_recordings()) == 5
+    assert len(lists) == 1
+    assert gets == []
+
+
+def test_only_new_recordings_are_read(s3, source, monkeypatch):
+    source.list_recordings()
+    monkeypatch.setattr(session_replay_viewer, 'LIST_CACHE_TTL', 0)
+    put_recording(s3, 'rec-new', 1_800_000_000_000, 42)
+    gets = count_calls(monkeypatch, source.s3_client, 'get_object')
+
+    recordings = source.list_recordings()
+    assert recordings[0]['id'] == 'rec-new' and recordings[0]['events'] == 42
+    assert [call['Key'] for call in gets] == ['replay/rec-new/metadata.json']
+
+
+def test_paginate_with_cursor_covers_every_recording_once():
+    recordings = [{'id': f'r{i}', 'timestamp': i // 2, 'events': i} for i in range(7)]
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate_recordings(recordings, 'timestamp', True, cursor, limit=3)
+        seen += [r['id'] for r in page]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(r['id'] for r in recordings)
+    assert len(seen) == len(set(seen))
+    assert [r['timestamp'] for r in paginate_recordings(recordings, limit=7)[0]] == [3, 2, 2, 1, 1, 0, 0]
+
+
+def test_paginate_ascending_by_id():
+    recordings = [{'id': name} for name in ('b', 'c', 'a')]
+    page, cursor = paginate_recordings(recordings, 'id', False, None, limit=2)
+    assert [r['id'] for r in page] == ['a', 'b']
+    page, cursor = paginate_recordings(recordings, 'id', False, cursor, limit=2)
+    assert [r['id'] for r in page] == ['c'] and cursor is None
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', 'WzFd', 'WyJ4IiwgIngiXQ=='])
+def test_paginate_rejects_bad_cursors(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        paginate_recordings([{'id': 'a', 'timestamp': 1}], 'timestamp', True, cursor)
@@ -0,0 +1,135 @@
+"""
+Tests for the replay viewer's ASGI server, against local recordings
+
+    pip install -r requirements.txt boto3 pytest httpx
+    python -m pytest tests
+"""
+import gzip
+import json
+import os
+import sys
+
+import pytest
+from starlette.testclient import TestClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import replay_server  # noqa: E402
+from replay_server import create_app, parse_range, UNSATISFIABLE  # noqa: E402
+from session_replay_viewer import LocalDataSource  # noqa: E402
+
+RECORDING = 'rrweb-1700000000000-abc'
+
+
+def event(event_type, timestamp):
+    return {'type': event_type, 'timestamp': timestamp, 'data': {'padding': 'x' * 500}}
+
+
+@pytest.fixture
+def client(tmp_path):
+    recordings = tmp_path / 'recordings'
+    batches = [
+        [event(4, 100), event(2, 110), event(3, 120)],
+        [event(3, 200), event(4, 300), event(2, 310)],
+    ]
+    (recordings / RECORDING).mkdir(parents=True)
+    for i, events in enumerate(batches):
+        with gzip.open(recordings / RECORDING / f'batch-{i}.ndjson.gz', 'wt') as f:
+            f.write(''.join(json.dumps(e) + '\n' for e in events))
+
+    viewer = tmp_path / 'viewer'
+    viewer.mkdir()
+    (viewer / 'app.js').write_text('console.log("replay");\n' * 200)
+    return TestClient(create_app(LocalDataSource(str(recordings)), viewer))
+
+
+def batch_url(name='batch-0.ndjson.gz'):
+    return f'/api/recordings/{RECORDING}/batches/{name}'
+
+
+def test_recordings_list_is_conditional(client):
+    response = client.get('/api/recordings')
+    assert response.json()['total'] == 1
+    etag = response.headers['etag']
+    assert client.get('/api/recordings', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/api/recordings?limit=0').status_code == 400
+
+
+def test_events_stream_and_seek(client):
+    response = client.get(f'/api/recordings/{RECORDING}/events', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['x-batch-count'] == '2'
+    assert response.headers['content-encoding'] == 'gzip'
+    assert len(response.text.splitlines()) == 6
+
+    response = client.get(f'/api/recordings/{RECORDING}/events?at=315')
+    assert response.headers['x-batch-start'] == '1'
+    assert [json.loads(line)['timestamp'] for line in response.text.splitlines()] == [300, 310]
+
+
+def test_batch_range_requests(client):
+    full = client.get(batch_url(), headers={'Accept-Encoding': 'identity'})
+    size = len(full.content)
+    assert full.headers['accept-ranges'] == 'bytes'
+
+    response = client.get(batch_url(), headers={'Range': 'bytes=2-5'})
+    assert response.status_code == 206
+    assert response.headers['content-range'] == f'bytes 2-5/{size}'
+    assert response.content == full.content[2:6]
+
+    response = client.get(batch_url(), headers={'Range': 'bytes=-4'})
+    assert response.content == full.content[-4:]
+
+    response = client.get(batch_url(), headers={'Range': f'bytes={size}-'})
+    assert response.status_code == 416
+    assert response.headers['content-range'] == f'bytes */{size}'
+
+    # A partial copy that is out of date gets the whole file
+    response = client.get(batch_url(), headers={'Range': 'bytes=2-5', 'If-Range': '"stale"'})
+    assert response.status_code == 200 and response.content == full.content
+
+
+def test_batch_conditional_get(client):
+    full = client.get(batch_url())
+    assert client.get(batch_url(), headers={'If-None-Match': full.headers['etag']}).status_code == 304
+    assert client.get(batch_url(), headers={'If-Modified-Since': full.headers['last-modified']}).status_code == 304
+    assert client.get(batch_url('batch-9.ndjson.gz')).status_code == 404
+
+
+def test_static_files_are_compressed_per_encoding(client):
+    plain = client.get('/app.js', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in plain.headers
+
+    compressed = client.get('/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['content-encoding'] == 'gzip'
+    assert compressed.text == plain.text
+    assert compressed.headers['etag'] != plain.headers['etag']
+    assert client.get('/app.js', headers={
+        'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['etag']
+    }).status_code == 304
+
+
+def test_static_files_stay_inside_the_viewer_directory(client):
+    assert client.get('/..%2frecordings%2f' + RECORDING + '%2fbatch-0.ndjson.gz').status_code == 404
+    assert client.get('/missing.js').status_code == 404
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-9', (0, 9)),
+    ('bytes=5-', (5, 99)),
+    ('bytes=90-200', (90, 99)),
+    ('bytes=-10', (90, 99)),
+    ('bytes=100-', UNSATISFIABLE),
+    ('bytes=0-1,5-6', None),
+    ('items=0-1', None),
+    ('bytes=5-2', None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+def test_large_static_files_are_sent_as_stored(client, monkeypatch):
+    monkeypatch.setattr(replay_server, 'MAX_PRECOMPRESSED_FILE_SIZE', 1024)
+    plain = client.get('/app.js', headers={'Accept-Encoding': 'identity'})
+    response = client.get('/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in response.headers
+    assert response.headers['content-length'] == str(len(plain.content))
+    assert response.headers['etag'] == plain.headers['etag']
@@ -14,6 +14,7 @@ Example:
 Environment Variables:
     AWS_REGION          - AWS region (default: us-west-2)
     AWS_PROFILE         - AWS profile to use for credentials (optional)
+    REPLAY_CACHE_DIR    - Recording cache directory (default: ~/.cache/bedrock_agentcore_replay)
 """
 
 import os
@@ -21,28 +22,21 @@ import sys
 import time
 import json
 import uuid
-import tempfile
-import threading
-import webbrowser
 import socket
-import signal
-import shutil
 import gzip
-import io
 import argparse
-from pathlib import Path
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
 
 import boto3
 from rich.console import Console
-from rich.panel import Panel
 
 # Create console
 console = Console()
 
 # Direct import from session_replay_viewer in the same folder
-from session_replay_viewer import SessionReplayViewer, SessionReplayHandler
+from session_replay_viewer import SessionReplayViewer, is_batch_file, batch_sort_key
+from recording_cache import S3BatchDownloader
+from recording_index import INDEX_FILE_NAME, cached_index, is_current, read_index
 
 # Define CustomS3DataSource directly in this script to avoid import issues
 class CustomS3DataSource:
@@ -54,12 +48,24 @@ class CustomS3DataSource:
         self.prefix = prefix
         self.session_id = session_id
         self.session_prefix = f"{prefix}/{session_id}"
-        self.temp_dir = Path(tempfile.mkdtemp(prefix='bedrock_agentcore_replay_'))
+        # Recording files are kept in a persistent cache keyed by ETag
+        self.downloader = S3BatchDownloader(self.s3_client)
+        self._objects = None
         
     def cleanup(self):
-        """Clean up temp files"""
-        if self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
+        """Stop the download threads; cached files are kept for the next run"""
+        self.downloader.close()
+    
+    def _session_objects(self, refresh=False):
+        """Map file names to the session's listed S3 objects"""
+        if self._objects is None or refresh:
+            objects = {}
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{self.session_prefix}/"):
+                for obj in page.get('Contents', []):
+                    objects[obj['Key'].split('/')[-1]] = obj
+            self._objects = objects
+        return self._objects
     
     def list_recordings(self):
         """List recordings directly"""
@@ -130,20 +136,59 @@ class CustomS3DataSource:
         
         return recordings
     
+    def list_batches(self, recording_id):
+        """List the session's batch objects, for streaming playback"""
+        if recording_id != self.session_id:
+            return None
+        
+        objects = self._session_objects(refresh=True)
+        names = sorted((name for name in objects if is_batch_file(name)), key=batch_sort_key)
+        # The viewer asks for batches in order; download ahead of it in parallel
+        for name in names:
+            self.downloader.submit(self.bucket, objects[name])
+        return [{'name': name, 'size': objects[name]['Size'], 'etag': objects[name]['ETag']} for name in names]
+    
+    def open_batch(self, recording_id, name):
+        """Open a batch from the local cache, downloading it first if needed"""
+        obj = self._session_objects().get(name) or self._session_objects(refresh=True).get(name)
+        if obj is None:
+            raise FileNotFoundError(name)
+        try:
+            return open(self.downloader.submit(self.bucket, obj).result(), 'rb')
+        except FileNotFoundError:
+            # Evicted between download and open by a full cache
+            return open(self.downloader.submit(self.bucket, obj).result(), 'rb')
+    
+    def get_index(self, recording_id, batches=None):
+        """Return the session's seek index: its uploaded index.json, or one built into the local cache"""
+        if recording_id != self.session_id:
+            return None
+        if batches is None:
+            batches = self.list_batches(recording_id)
+        index_obj = self._session_objects().get(INDEX_FILE_NAME)
+        if index_obj is not None:
+            try:
+                with open(self.downloader.submit(self.bucket, index_obj).result(), 'rb') as f:
+                    index = read_index(f)
+                if is_current(index, batches):
+                    return index
+            except Exception as e:
+                print(f"⚠️ Could not read {INDEX_FILE_NAME}: {e}")
+        return cached_index(self.downloader.cache, batches, lambda name: self.open_batch(recording_id, name))
+    
     def download_recording(self, recording_id):
         """Download recording from S3"""
         print(f"Downloading recording: {recording_id}")
         
-        recording_dir = self.temp_dir / recording_id
-        recording_dir.mkdir(exist_ok=True)
-        
         try:
+            objects = self._session_objects(refresh=True)
+            
             # Get metadata
             metadata = {}
             try:
-                metadata_key = f"{self.session_prefix}/metadata.json"
-                response = self.s3_client.get_object(Bucket=self.bucket, Key=metadata_key)
-                metadata = json.loads(response['Body'].read().decode('utf-8'))
+                metadata_path = self.downloader.submit(self.bucket, objects['metadata.json']).result()
+                with open(metadata_path, 'r') as f:
+                    metadata = json.load(f)
                 print(f"✅ Downloaded metadata: {metadata}")
             except Exception as e:
                 print(f"⚠️ No metadata found: {e}")
@@ -152,34 +197,28 @@ class CustomS3DataSource:
             batch_files = []
             if 'batches' in metadata and isinstance(metadata['batches'], list):
                 for batch in metadata['batches']:
-                    if 'file' in batch:
-                        batch_files.append(f"{self.session_prefix}/{batch['file']}")
+                    if 'file' in batch and batch['file'] in objects:
+                        batch_files.append(batch['file'])
             
             # If no batch files found in metadata, look for them directly
             if not batch_files:
-                response = self.s3_client.list_objects_v2(
-                    Bucket=self.bucket,
-                    Prefix=f"{self.session_prefix}/batch-"
-                )
-                
-                if 'Contents' in response:
-                    batch_files = [obj['Key'] for obj in response['Contents']]
+                batch_files = sorted((name for name in objects if is_batch_file(name)), key=batch_sort_key)
             
-            all_events = []
+            # Start every download before reading the first batch
             print(f"Processing {len(batch_files)} batch files: {batch_files}")
+            hits_before = self.downloader.cache_hits
+            futures = [self.downloader.submit(self.bucket, objects[name]) for name in batch_files]
             
-            for key in batch_files:
+            all_events = []
+            for name, future in zip(batch_files, futures):
+                key = objects[name]['Key']
                 try:
-                    print(f"Downloading batch file: {key}")
-                    response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+                    print(f"Reading batch file: {key}")
                     
                     # Try to read as gzipped JSON lines
-                    with gzip.GzipFile(fileobj=io.BytesIO(response['Body'].read())) as gz:
-                        content = gz.read().decode('utf-8')
-                        print(f"Read {len(content)} bytes of content")
-                        
+                    with gzip.open(future.result(), 'rt', encoding='utf-8') as gz:
                         # Process each line as a JSON event
-                        for line in content.splitlines():
+                        for line in gz:
                             if line.strip():
                                 try:
                                     event = json.loads(line)
@@ -198,7 +237,8 @@ class CustomS3DataSource:
                     import traceback
                     traceback.print_exc()
             
-            print(f"✅ Loaded {len(all_events)} events")
+            print(f"✅ Loaded {len(all_events)} events "
+                  f"({self.downloader.cache_hits - hits_before} of {len(batch_files)} batch files from cache)")
             
             # If no events were loaded, create sample events
             if len(all_events) < 2:
@@ -237,153 +277,6 @@ class CustomS3DataSource:
             traceback.print_exc()
             return None
 
-# Define CustomSessionReplayHandler directly in this script
-class CustomSessionReplayHandler(SessionReplayHandler):
-    """Custom HTTP request handler for session replay viewer"""
-    
-    def serve_recordings_list(self):
-        """Return list of recordings - FIX FOR HTML RESPONSE ISSUE"""
-        try:
-            recordings = self.data_source.list_recordings()
-            response = json.dumps(recordings)
-            
-            # Debug output to see what we're returning
-            print(f"Serving recordings list: {response[:100]}...")
-            
-            # Ensure proper content type and headers
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(response)))
-            # Add CORS headers to prevent issues
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', '*')
-            self.end_headers()
-            
-            # Write the response as bytes
-            self.wfile.write(response.encode('utf-8'))
-            
-        except Exception as e:
-            print(f"❌ Error in serve_recordings_list: {e}")
-            import traceback
-            traceback.print_exc()
-            
-            # Return a proper error response as JSON with empty recordings array
-            error_response = json.dumps({
-                "error": str(e),
-                "recordings": []
-            })
-            self.send_response(200)  # Use 200 so client can process the error
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(error_response)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(error_response.encode('utf-8'))
-    
-    def download_and_serve_recording(self, recording_id):
-        """Download recording and serve it - FIX FOR HTML RESPONSE ISSUE"""
-        try:
-            recording_data = self.data_source.download_recording(recording_id)
-            
-            if recording_data:
-                response = json.dumps({
-                    'success': True,
-                    'data': recording_data
-                })
-                
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(response)))
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(response.encode('utf-8'))
-            else:
-                error_response = json.dumps({
-                    'success': False,
-                    'error': 'Recording not found'
-                })
-                self.send_response(404)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(error_response)))
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(error_response.encode('utf-8'))
-                
-        except Exception as e:
-            print(f"❌ Error in download_and_serve_recording: {e}")
-            import traceback
-            traceback.print_exc()
-            
-            error_response = json.dumps({
-                'success': False,
-                'error': str(e)
-            })
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(error_response)))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(error_response.encode('utf-8'))
-    
-    def do_OPTIONS(self):
-        """Handle OPTIONS requests for CORS preflight"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', '*')
-        self.end_headers()
-
-# Define CustomSessionReplayViewer directly in this script
-class CustomSessionReplayViewer(SessionReplayViewer):
-    def start(self):
-        """Start the replay viewer server with custom handler"""
-        # Ensure viewer directory exists
-        self.viewer_path.mkdir(parents=True, exist_ok=True)
-        
-        # Find available port
-        port = self.find_available_port()
-        
-        # Create request handler
-        def handler_factory(*args, **kwargs):
-            return CustomSessionReplayHandler(self.data_source, self.viewer_path, *args, **kwargs)
-        
-        # Start server
-        self.server = HTTPServer(('', port), handler_factory)
-        
-        # Start in thread
-        server_thread = threading.Thread(target=self.server.serve_forever)
-        server_thread.daemon = True
-        server_thread.start()
-        
-        url = f"http://localhost:{port}"
-        
-        console.print(Panel(
-            f"[bold cyan]Session Replay Viewer Running[/bold cyan]\n\n"
-            f"URL: [link]{url}[/link]\n\n"
-            f"[yellow]Press Ctrl+C to stop[/yellow]",
-            title="Ready",
-            border_style="green"
-        ))
-        
-        # Open browser
-        webbrowser.open(url)
-        
-        # Handle shutdown
-        def signal_handler(sig, frame):
-            console.print("\n[yellow]Shutting down...[/yellow]")
-            self.server.shutdown()
-            if hasattr(self.data_source, 'cleanup'):
-                self.data_source.cleanup()
-            sys.exit(0)
-        
-        signal.signal(signal.SIGINT, signal_handler)
-        
-        # Keep running
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            pass
 
 def main():
     parser = argparse.ArgumentParser(description="Standalone Session Replay Viewer")
@@ -458,7 +351,7 @@ def main():
     print(f"🎬 Starting session replay viewer for: {args.session}")
     print(f"  Bucket: {args.bucket}")
     print(f"  Prefix: {args.prefix}")
-    viewer = CustomSessionReplayViewer(data_source=data_source, port=args.port)
+    viewer = SessionReplayViewer(data_source=data_source, port=args.port)
     viewer.start()  # This will block until Ctrl+C
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for read-only query validation on large inputs.
+
+Compares the previous splitter (which rescanned the query from the start for
+every semicolon to decide whether it was quoted) with the single-pass
+tokenizer in sql_validator.
+
+Usage:
+    python benchmark_sql_validator.py --size-kb 100 200
+"""
+import argparse
+import re
+import time
+
+from sql_validator import validate_query
+
+STATEMENT = (
+    "SELECT o.id, o.note, 'status;open' AS label, \"Odd;Name\" "
+    "FROM orders o /* recent; only */ WHERE o.created_at > now() - interval '1 day'"
+)
+
+
+def _legacy_validate_query(query):
+    """validate_query as pg-analyze-performance implemented it before sql_validator"""
+    def is_within_quotes(text, position):
+        single_quotes = False
+        double_quotes = False
+        for i in range(position):
+            if text[i] == "'" and not double_quotes:
+                single_quotes = not single_quotes
+            elif text[i] == '"' and not single_quotes:
+                double_quotes = not double_quotes
+        return single_quotes or double_quotes
+
+    statements = []
+    current_stmt = []
+    i = 0
+    comment_block = False
+    line_comment = False
+    while i < len(query):
+        char = query[i]
+        if query[i:i+2] == '/*' and not line_comment:
+            comment_block = True
+            current_stmt.append(char)
+            i += 1
+        elif query[i:i+2] == '*/' and comment_block:
+            comment_block = False
+            current_stmt.append(char)
+            i += 1
+        elif query[i:i+2] == '--' and not comment_block:
+            line_comment = True
+            current_stmt.append(char)
+            i += 1
+        elif char == '\n' and line_comment:
+            line_comment = False
+            current_stmt.append(char)
+        elif char == ';' and not comment_block and not line_comment and not is_within_quotes(query, i):
+            current_stmt.append(char)
+            stmt = ''.join(current_stmt).strip()
+            if stmt:
+                statements.append(stmt)
+            current_stmt = []
+        else:
+            current_stmt.append(char)
+        i += 1
+    last_stmt = ''.join(current_stmt).strip()
+    if last_stmt:
+        statements.append(last_stmt)
+
+    dangerous_operations = [
+        r'\binsert\b', r'\bupdate\b', r'\bdelete\b', r'\bdrop\b',
+        r'\btruncate\b', r'\balter\b', r'\bcreate\b', r'\bgrant\b',
+        r'\brevoke\b', r'\bexecute\b', r'\bcopy\b'
+    ]
+    validated_statements = []
+    for stmt in statements:
+        stmt = stmt.strip().rstrip(';')
+        query_for_check = ''
+        in_quote = False
+        quote_char = None
+        for char in stmt:
+            if char in ["'", '"'] and (not quote_char or char == quote_char):
+                in_quote = not in_quote
+                quote_char = char if in_quote else None
+            elif not in_quote:
+                query_for_check += char
+        for operation in dangerous_operations:
+            if re.search(operation, query_for_check.lower()):
+                raise ValueError(f"Statement contains prohibited operation: {operation}")
+        validated_statements.append(stmt)
+    return validated_statements
+
+
+def _make_query(size_kb):
+    count = size_kb * 1024 // (len(STATEMENT) + 2) + 1
+    return ";\n".join([STATEMENT] * count)
+
+
+def _time_it(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQL statement validation")
+    parser.add_argument("--size-kb", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true",
+                        help="Only time the single-pass validator")
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'statements':>11} {'single-pass':>12} {'legacy':>10} {'speedup':>8}")
+    for size_kb in args.size_kb:
+        query = _make_query(size_kb)
+        statements = len(validate_query(query))
+        single_pass = _time_it(lambda: validate_query(query), args.repeat)
+        if args.skip_legacy:
+            print(f"{size_kb:>6}KB {statements:>11} {single_pass:>11.3f}s")
+            continue
+        # Quadratic: one run is enough
+        legacy = _time_it(lambda: _legacy_validate_query(query), 1)
+        print(
+            f"{size_kb:>6}KB {statements:>11} {single_pass:>11.3f}s "
+            f"{legacy:>9.2f}s {legacy / single_pass:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Connection management shared by the DB performance analyzer Lambdas.
+
+Secrets Manager secrets and SSM parameters are cached with a TTL, and a warm
+psycopg2 connection pool is kept per secret for the lifetime of the Lambda
+container. Every checkout validates the connection and resets its session
+state (read-only transactions, statement timeout) before handing it out.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import boto3
+import psycopg2
+from botocore.exceptions import ClientError
+from psycopg2 import pool
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = int(os.environ.get('DB_SECRET_CACHE_TTL', '300'))
+POOL_MIN_CONNECTIONS = int(os.environ.get('DB_POOL_MIN_CONNECTIONS', '1'))
+POOL_MAX_CONNECTIONS = int(os.environ.get('DB_POOL_MAX_CONNECTIONS', '4'))
+STATEMENT_TIMEOUT = os.environ.get('DB_STATEMENT_TIMEOUT', '30s')
+IDLE_IN_TRANSACTION_TIMEOUT = '60s'
+CONNECT_TIMEOUT_SECONDS = 10
+
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader(key) when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+
+        value = loader(key)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self.misses += 1
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def _is_auth_error(error):
+    """True if a connection error means the credentials are no longer valid"""
+    message = str(error).lower()
+    return 'authentication failed' in message or 'password' in message
+
+
+class ConnectionManager:
+    """
+    Warm, per-secret psycopg2 connection pools with cached credentials.
+
+    Use `checkout`/`release` (or the `connection` context manager) instead of
+    `psycopg2.connect`/`conn.close()`. Connections survive across warm Lambda
+    invocations; stale ones are detected on checkout and replaced, and an
+    authentication failure reloads the secret (e.g. after rotation) and
+    rebuilds the pool once.
+    """
+
+    def __init__(self, min_connections=POOL_MIN_CONNECTIONS,
+                 max_connections=POOL_MAX_CONNECTIONS, cache_ttl=CACHE_TTL_SECONDS):
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._secrets = TTLCache(cache_ttl)
+        self._parameters = TTLCache(cache_ttl)
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._pools = {}
+        self._known_connections = set()
+        self._owners = {}
+        self._metrics = {
+            'checkouts': 0,
+            'pool_hits': 0,
+            'pool_misses': 0,
+            'discarded': 0,
+            'credential_refreshes': 0,
+        }
+
+    def _client(self, service_name):
+        """Return a boto3 client reused across invocations"""
+        with self._lock:
+            if service_name not in self._clients:
+                self._clients[service_name] = boto3.client(
+                    service_name, region_name=os.environ.get('REGION')
+                )
+            return self._clients[service_name]
+
+    def _load_secret(self, secret_name):
+        try:
+            secret_value = self._client('secretsmanager').get_secret_value(SecretId=secret_name)
+            return json.loads(secret_value['SecretString'])
+        except ClientError as e:
+            raise Exception(f"Failed to get secret: {str(e)}")
+
+    def _load_parameter(self, parameter_name):
+        response = self._client('ssm').get_parameter(Name=parameter_name)
+        return response['Parameter']['Value']
+
+    def get_secret(self, secret_name):
+        """Get a secret from AWS Secrets Manager, cached for the TTL"""
+        return self._secrets.get(secret_name, self._load_secret)
+
+    def get_parameter(self, parameter_name):
+        """Get an SSM parameter value, cached for the TTL"""
+        return self._parameters.get(parameter_name, self._load_parameter)
+
+    def _get_pool(self, secret_name):
+        with self._lock:
+            db_pool = self._pools.get(secret_name)
+        if db_pool is not None:
+            return db_pool
+
+        secret = self.get_secret(secret_name)
+        db_pool = pool.ThreadedConnectionPool(
+            self.min_connections,
+            self.max_connections,
+            host=secret['host'],
+            database=secret['dbname'],
+            user=secret['username'],
+            password=secret['password'],
+            port=secret['port'],
+            connect_timeout=CONNECT_TIMEOUT_SECONDS,
+            application_name='db-performance-analyzer',
+            keepalives=1,
+        )
+        with self._lock:
+            existing = self._pools.setdefault(secret_name, db_pool)
+        if existing is not db_pool:
+            # Another thread created the pool first
+            db_pool.closeall()
+        return existing
+
+    def _refresh_credentials(self, secret_name):
+        """Drop the cached secret and the pool built from it"""
+        self._secrets.invalidate(secret_name)
+        with self._lock:
+            db_pool = self._pools.pop(secret_name, None)
+            self._metrics['credential_refreshes'] += 1
+        if db_pool is not None:
+            db_pool.closeall()
+
+    @staticmethod
+    def _reset_session(conn, read_only, statement_timeout):
+        """Return a pooled connection to a clean session for the next caller"""
+        if conn.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+        # Rolls back anything left open and runs RESET ALL; doubles as a liveness check
+        conn.reset()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(
+                "SET statement_timeout = %s; SET idle_in_transaction_session_timeout = %s",
+                (statement_timeout, IDLE_IN_TRANSACTION_TIMEOUT)
+            )
+        conn.set_session(readonly=read_only, autocommit=False)
+
+    def _discard(self, db_pool, conn):
+        with self._lock:
+            self._known_connections.discard(id(conn))
+            self._metrics['discarded'] += 1
+        try:
+            db_pool.putconn(conn, close=True)
+        except Exception:
+            conn.close()
+
+    def checkout(self, secret_name, read_only=True, statement_timeout=STATEMENT_TIMEOUT):
+        """
+        Take a validated connection from the pool for secret_name.
+
+        Args:
+            secret_name (str): Secret containing database credentials
+            read_only (bool): Start every transaction READ ONLY
+            statement_timeout (str): PostgreSQL statement_timeout for the session
+
+        Returns:
+            psycopg2 connection; hand it back with release()
+        """
+        refreshed = False
+        # A pool can hold at most max_connections stale connections
+        for _ in range(self.max_connections + 2):
+            try:
+                db_pool = self._get_pool(secret_name)
+                conn = db_pool.getconn()
+            except psycopg2.OperationalError as e:
+                if not refreshed and _is_auth_error(e):
+                    # Credentials were probably rotated: reload the secret once
+                    logger.warning("Database authentication failed, refreshing credentials")
+                    self._refresh_credentials(secret_name)
+                    refreshed = True
+                    continue
+                raise Exception(f"Failed to connect to the database: {str(e)}")
+            except pool.PoolError as e:
+                raise Exception(f"Failed to connect to the database: {str(e)}")
+
+            reused = id(conn) in self._known_connections
+            try:
+                self._reset_session(conn, read_only, statement_timeout)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                # Dropped by the server (idle timeout, failover): replace it
+                logger.info(f"Discarding stale pooled connection: {str(e)}")
+                self._discard(db_pool, conn)
+                continue
+
+            with self._lock:
+                self._known_connections.add(id(conn))
+                self._owners[id(conn)] = db_pool
+                self._metrics['checkouts'] += 1
+                self._metrics['pool_hits' if reused else 'pool_misses'] += 1
+            return conn
+
+        raise Exception("Failed to connect to the database: no usable pooled connection")
+
+    def release(self, conn):
+        """Return a connection obtained from checkout() to its pool"""
+        with self._lock:
+            db_pool = self._owners.pop(id(conn), None)
+        if db_pool is None:
+            conn.close()
+            return
+        try:
+            if not conn.closed:
+                conn.rollback()
+            db_pool.putconn(conn, close=bool(conn.closed))
+        except Exception as e:
+            # Pool was rebuilt meanwhile or the connection broke
+            logger.info(f"Closing connection instead of pooling it: {str(e)}")
+            self._discard(db_pool, conn)
+
+    @contextmanager
+    def connection(self, secret_name, read_only=True, statement_timeout=STATEMENT_TIMEOUT):
+        """Context manager around checkout()/release()"""
+        conn = self.checkout(secret_name, read_only, statement_timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def metrics(self):
+        """Pool and credential cache hit/miss counters for this container"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['pools'] = len(self._pools)
+        metrics.update({
+            'secret_cache_hits': self._secrets.hits,
+            'secret_cache_misses': self._secrets.misses,
+            'parameter_cache_hits': self._parameters.hits,
+            'parameter_cache_misses': self._parameters.misses,
+        })
+        return metrics
+
+
+# Module-level manager so pools and caches survive warm invocations
+connection_manager = ConnectionManager()
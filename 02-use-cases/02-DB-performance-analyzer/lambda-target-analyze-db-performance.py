@@ -16,7 +16,7 @@ lambda_target_config = {
                 "inlinePayload": [
                     {
                         "name": "explain_query",
-                        "description": "Analyzes and explains the execution plan for a given SQL query. Get the environment and query from the user and use the action_type value as explain_query. ",
+                        "description": "Analyzes and explains the execution plan for a given SQL query. Get the environment and query from the user and use the action_type value as explain_query. Plans are cached per query shape; set plan_mode to refresh to re-run EXPLAIN ANALYZE, or to diff to compare the current plan with the cached one without executing the query. ",
                         "inputSchema": {
                             "type": "object",
                             "properties": {
@@ -28,6 +28,10 @@ lambda_target_config = {
                                 },
                                  "query": {
                                     "type": "string"
+                                },
+                                "plan_mode": {
+                                    "type": "string",
+                                    "description": "One of cached (default), refresh or diff"
                                 }
                             },
                             "required": ["environment","action_type","query"]
@@ -59,6 +63,43 @@ lambda_target_config = {
                             }
                         },
                         {
+                        "name": "extract_ddl_bulk",
+                        "description": "Extracts the DDL, description and an explanation for many database objects in one call. Use it instead of repeated extract_ddl calls when explaining several objects or a whole schema. Get the environment from the user, pass either objects (a list of object_type, object_schema and object_name) or object_schema (to extract every table, view, function, procedure, trigger, sequence and index in that schema), and use the action_type value as extract_ddl_bulk. ",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string"
+                                },
+                                "objects": {
+                                    "type": "array",
+                                    "items": {
+                                        "type": "object",
+                                        "properties": {
+                                            "object_type": {
+                                                "type": "string"
+                                            },
+                                            "object_schema": {
+                                                "type": "string"
+                                            },
+                                            "object_name": {
+                                                "type": "string"
+                                            }
+                                        },
+                                        "required": ["object_type","object_schema","object_name"]
+                                    }
+                                },
+                                "object_schema": {
+                                    "type": "string"
+                                }
+                            },
+                            "required": ["environment","action_type"]
+                            }
+                        },
+                        {
                         "name": "execute_query",
                         "description": "Execute read-only queries safely and return results with monitoring. Get the environment and query from the user and use the action_type value as execute_query. ",
                         "inputSchema": {
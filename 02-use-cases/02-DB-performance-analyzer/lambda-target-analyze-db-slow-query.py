@@ -112,6 +112,22 @@ lambda_target_config = {
                         {
                         "name": "system_health",
                         "description": "Analyzes systems health using pg_stat_statements. Get the environment from the user and use the action_type value as system_health",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string"
+                                }
+                            },
+                            "required": ["environment","action_type"]
+                            }
+                        },
+                        {
+                        "name": "full_diagnostic",
+                        "description": "Runs all analyses (slow queries, connections, indexes, autovacuum, IO, replication and system health) concurrently and returns one combined report with per-section timings. Prefer this for a complete health check. Get the environment from the user and use the action_type value as full_diagnostic",
                         "inputSchema": {
                             "type": "object",
                             "properties": {
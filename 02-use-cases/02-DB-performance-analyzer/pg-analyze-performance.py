@@ -1,17 +1,28 @@
-import json
-import boto3
-import psycopg2
+import io
 import os
+import psycopg2
 import re
 import time
 import logging
 from datetime import datetime
-from botocore.exceptions import ClientError
+
+from db_connection import connection_manager
+from plan_cache import PlanCache, captured_at_iso, diff_plans, plan_cache
+from sql_validator import fingerprint_query, statement_command, validate_query
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip from a server-side cursor
+RESULT_FETCH_SIZE = 100
+# Budget for the rendered result text of one request, well under the Lambda payload limit
+MAX_RESULT_BYTES = int(os.environ.get('DB_MAX_RESULT_BYTES', '262144'))
+# Charged per statement, with its text, for the lines written around its table
+RESULT_SECTION_BYTES = 256
+# Longest value shown in a result cell
+MAX_CELL_CHARS = 500
+
 class QueryComplexityError(Exception):
     """Custom exception for query complexity violations"""
     pass
@@ -80,9 +91,13 @@ def analyze_query_complexity(query):
 
 def validate_and_execute_queries(secret_name, query, max_rows=20, 
                                max_statements=5, max_total_rows=1000, 
-                               max_complexity=15):
+                               max_complexity=15, max_total_bytes=MAX_RESULT_BYTES):
     """
     Enhanced query validation and execution with additional controls
+
+    SELECT statements are fetched through server-side cursors; fetching stops
+    once max_rows for the statement or max_total_rows / max_total_bytes for
+    the whole request is reached.
     """
     response = {
         'results': [],
@@ -94,6 +109,7 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
     start_time = time.time()
     conn = None
     total_rows = 0
+    total_bytes = 0
     
     try:
         # Validate and split queries
@@ -140,15 +156,17 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                 }
                 
                 stmt_lower = stmt.lower().strip()
+                # The command word, after any leading comments
+                is_select_query = statement_command(stmt) == 'select'
+                remaining_rows = max_total_rows - total_rows
+                limit_rows = min(max_rows, remaining_rows)
                 
                 # Only add LIMIT for SELECT queries
-                if stmt_lower.startswith('select') and 'limit' not in stmt_lower:
-                    remaining_rows = max_total_rows - total_rows
-                    limit_rows = min(max_rows, remaining_rows)
+                if is_select_query and 'limit' not in stmt_lower:
                     stmt = f"{stmt} LIMIT {limit_rows + 1}"
                 
                 # Execute with explain plan first for SELECT queries
-                if stmt_lower.startswith('select'):
+                if is_select_query:
                     #cur.execute(f"EXPLAIN (FORMAT JSON) {stmt}")
                     #explain_plan = cur.fetchone()[0]
                     
@@ -160,40 +178,42 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                             for suggestion in optimization_suggestions
                         )
                 
-                # Execute actual query
-                cur.execute(stmt)
-                
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
+                # The statement text and the lines around its table count too
+                total_bytes += len(stmt.encode('utf-8')) + RESULT_SECTION_BYTES
                 
-                # Fetch results
-                rows = cur.fetchall()
-                row_count = len(rows)
+                # Execute actual query, streaming rows until a budget is reached
+                # (SHOW cannot run in a server-side cursor)
+                fetched = fetch_rows(
+                    conn, stmt, limit_rows, max_total_bytes - total_bytes,
+                    cursor_name=f"analyzer_stmt_{stmt_index}" if is_select_query else None
+                )
+                stmt_response['columns'] = fetched['columns']
+                total_rows += len(fetched['rows'])
+                total_bytes += fetched['bytes']
                 
                 # Check total row limit
-                total_rows += row_count
-                if total_rows > max_total_rows:
+                if fetched['truncated'] == 'rows' and limit_rows < max_rows:
                     stmt_response['truncated'] = True
-                    excess_rows = total_rows - max_total_rows
-                    rows = rows[:-excess_rows]
                     stmt_response['message'] = (
                         f"Results truncated. Maximum total rows ({max_total_rows}) reached"
                     )
-                    total_rows = max_total_rows
                 
                 # Check individual statement limit
-                elif row_count > max_rows:
+                elif fetched['truncated'] == 'rows':
                     stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
                     stmt_response['message'] = (
                         f"Results truncated to {max_rows} rows"
                     )
                 
-                stmt_response['row_count'] = len(rows)
-                stmt_response['rows'] = [
-                    dict(zip(stmt_response['columns'], row))
-                    for row in rows
-                ]
+                # Check output size limit
+                elif fetched['truncated'] == 'bytes':
+                    stmt_response['truncated'] = True
+                    stmt_response['message'] = (
+                        f"Results truncated. Maximum output size ({max_total_bytes} bytes) reached"
+                    )
+                
+                stmt_response['row_count'] = len(fetched['rows'])
+                stmt_response['rows'] = fetched['rows']
                 
                 response['results'].append(stmt_response)
             
@@ -203,6 +223,7 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                 'execution_time': total_time,
                 'statements_executed': len(statements),
                 'total_rows': total_rows,
+                'total_bytes': total_bytes,
                 'timestamp': datetime.utcnow().isoformat(),
                 'needs_analysis': total_time > 5,
                 'performance_message': (
@@ -235,68 +256,114 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
     
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    secret_name = secret_name
-    region_name = os.environ['REGION']
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
-    try:
-        secret_value = client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(secret_value['SecretString'])
-        return secret
-    except ClientError as e:
-        raise Exception(f"Failed to get secret: {str(e)}")
+    """Get secret from AWS Secrets Manager (cached across warm invocations)"""
+    return connection_manager.get_secret(secret_name)
 
 def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
     """Retrieve the secret name for the specified environment"""
-    if environment == 'prod':
-        try:
-            # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            print(response['Parameter']['Value'])
-            return response['Parameter']['Value']
-        except ssm_client.exceptions.ParameterNotFound:
-            error_message = f"Parameter not found: {parameter_name}"
-            print(error_message)
-            raise Exception(error_message)
-    elif environment == 'dev':
-        try:
-            # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            return response['Parameter']['Value']
-        except Exception as e:
-            raise Exception(f"Failed to get dev secret name from Parameter Store: {str(e)}")
-    else:
+    if environment not in ('prod', 'dev'):
         print("environement does not exist")
         raise ValueError(f"Unknown environment: {environment}")
+    parameter_name = f'/AuroraOps/{environment}'
+    try:
+        # Get the secret name from Parameter Store
+        return connection_manager.get_parameter(parameter_name)
+    except Exception as e:
+        raise Exception(f"Failed to get {environment} secret name from Parameter Store: {str(e)}")
 
 def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
+    """Check out a read-only connection from the warm pool; return it with release_db_connection"""
+    return connection_manager.checkout(secret_name, read_only=True)
+
+def release_db_connection(conn):
+    """Return a connection obtained from connect_to_db to the pool"""
+    connection_manager.release(conn)
+
+def format_cell(value):
+    """Render a result value for display, cutting very wide values"""
+    text = str(value)
+    if len(text) > MAX_CELL_CHARS:
+        text = f"{text[:MAX_CELL_CHARS]}... [{len(text) - MAX_CELL_CHARS} more characters]"
+    return text
+
+def _multibyte_extra(text):
+    """UTF-8 bytes of text beyond one per character"""
+    return len(text.encode('utf-8')) - len(text)
+
+def table_bytes(widths, row_count, multibyte_extra=0):
+    """
+    Size in bytes of the table write_result_table renders
+
+    Every line (header, separator and rows) is padded to the same length, so
+    the size follows from the column widths in characters, the row count and
+    the extra bytes of multi-byte characters in the header and cells.
+    """
+    if not widths:
+        return 0
+    line_chars = sum(widths) + 3 * (len(widths) - 1) + 1
+    return (row_count + 2) * line_chars + multibyte_extra
+
+def fetch_rows(conn, stmt, max_rows, max_bytes, cursor_name=None):
+    """
+    Execute a statement and fetch its rows in batches until a budget is reached
+
+    With cursor_name the statement runs in a named server-side cursor, so rows
+    beyond the budget are never produced or sent by the database. Values are
+    rendered with format_cell as they arrive; only the kept rows are held.
+    The byte budget is charged on the table as write_result_table renders it,
+    so a wide value also counts for the padding it adds to every other row.
+
+    Args:
+        conn: Database connection inside a transaction
+        stmt (str): SELECT statement (or any statement when cursor_name is None)
+        max_rows (int): Maximum number of rows to keep; None for no row limit
+        max_bytes (int): Maximum rendered size of the table in bytes
+        cursor_name (str): Name for a server-side cursor; None for a client-side one
+
+    Returns:
+        dict: columns, rows (dicts of display strings), bytes used and
+        truncated ('rows', 'bytes' or None)
+    """
+    result = {'columns': [], 'rows': [], 'bytes': 0, 'truncated': None}
+    widths = []
+    multibyte_extra = 0
+    cur = conn.cursor(name=cursor_name) if cursor_name else conn.cursor()
     try:
-        conn = psycopg2.connect(
-            host=secret['host'],
-            database=secret['dbname'],
-            user=secret['username'],
-            password=secret['password'],
-            port=secret['port']
-        )
-        return conn
-    except Exception as e:
-        raise Exception(f"Failed to connect to the database: {str(e)}")
+        cur.execute(stmt)
+        # One row beyond the limit tells whether the result was cut
+        batch_size = RESULT_FETCH_SIZE if max_rows is None else min(RESULT_FETCH_SIZE, max_rows + 1)
+        while result['truncated'] is None:
+            batch = cur.fetchmany(batch_size)
+            # Named cursors only describe their columns after the first fetch
+            if not result['columns'] and cur.description:
+                result['columns'] = [str(desc[0]) for desc in cur.description]
+                widths = [len(col) for col in result['columns']]
+                multibyte_extra = sum(_multibyte_extra(col) for col in result['columns'])
+                result['bytes'] = table_bytes(widths, 0, multibyte_extra)
+            if not batch:
+                break
+            for row in batch:
+                if max_rows is not None and len(result['rows']) >= max_rows:
+                    result['truncated'] = 'rows'
+                    break
+                cells = [format_cell(value) for value in row]
+                row_widths = [max(width, len(cell)) for width, cell in zip(widths, cells)]
+                row_extra = multibyte_extra + sum(_multibyte_extra(cell) for cell in cells)
+                size = table_bytes(row_widths, len(result['rows']) + 1, row_extra)
+                if size > max_bytes:
+                    result['truncated'] = 'bytes'
+                    break
+                widths, multibyte_extra = row_widths, row_extra
+                result['bytes'] = size
+                result['rows'].append(cells)
+
+        result['rows'] = [dict(zip(result['columns'], cells)) for cells in result['rows']]
+        return result
+    finally:
+        cur.close()
 
 # Define the queries dictionary for different object types
 queries = {
@@ -462,6 +529,161 @@ queries = {
     """
 }
 
+# Set-based variants of `queries` for bulk extraction. Each selects every
+# object of its type matching {filter}; all requested types are combined with
+# UNION ALL so a batch of objects costs one catalog round trip.
+bulk_queries = {
+    'table': ("n.nspname", "c.relname", """
+        SELECT
+            n.nspname as object_schema,
+            c.relname as name,
+            'TABLE' as object_type,
+            format(
+                'CREATE TABLE %%I.%%I (\n%%s\n);',
+                n.nspname,
+                c.relname,
+                string_agg(
+                    '    ' || quote_ident(a.attname) || ' ' ||
+                    pg_catalog.format_type(a.atttypid, a.atttypmod) ||
+                    CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END ||
+                    CASE WHEN ad.adbin IS NOT NULL
+                        THEN ' DEFAULT ' || pg_get_expr(ad.adbin, ad.adrelid)
+                        ELSE ''
+                    END,
+                    E',\n' ORDER BY a.attnum
+                )
+            ) as definition,
+            obj_description(c.oid, 'pg_class') as description,
+            NULL::regtype as return_type,
+            NULL::text as qualifier
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_catalog.pg_attribute a
+            ON a.attrelid = c.oid
+            AND a.attnum > 0
+            AND NOT a.attisdropped
+        LEFT JOIN pg_catalog.pg_attrdef ad
+            ON ad.adrelid = c.oid
+            AND ad.adnum = a.attnum
+        WHERE c.relkind IN ('r', 'p') AND {filter}
+        GROUP BY n.nspname, c.relname, c.oid
+    """),
+
+    'view': ("n.nspname", "c.relname", """
+        SELECT
+            n.nspname, c.relname, 'VIEW',
+            format(
+                'CREATE OR REPLACE VIEW %%I.%%I AS\n%%s',
+                n.nspname,
+                c.relname,
+                pg_get_viewdef(c.oid, true)
+            ),
+            obj_description(c.oid, 'pg_class'),
+            NULL::regtype,
+            NULL::text
+        FROM pg_catalog.pg_class c
+        JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'v' AND {filter}
+    """),
+
+    'function': ("n.nspname", "p.proname", """
+        SELECT
+            n.nspname, p.proname, 'FUNCTION',
+            pg_get_functiondef(p.oid),
+            obj_description(p.oid, 'pg_proc'),
+            p.prorettype::regtype,
+            '(' || pg_get_function_identity_arguments(p.oid) || ')'
+        FROM pg_catalog.pg_proc p
+        JOIN pg_catalog.pg_namespace n ON n.oid = p.pronamespace
+        WHERE p.prokind = 'f' AND {filter}
+    """),
+
+    'procedure': ("n.nspname", "p.proname", """
+        SELECT
+            n.nspname, p.proname, 'PROCEDURE',
+            pg_get_functiondef(p.oid),
+            obj_description(p.oid, 'pg_proc'),
+            NULL::regtype,
+            '(' || pg_get_function_identity_arguments(p.oid) || ')'
+        FROM pg_catalog.pg_proc p
+        JOIN pg_catalog.pg_namespace n ON n.oid = p.pronamespace
+        WHERE p.prokind = 'p' AND {filter}
+    """),
+
+    'trigger': ("n.nspname", "t.tgname", """
+        SELECT
+            n.nspname, t.tgname, 'TRIGGER',
+            pg_get_triggerdef(t.oid, true),
+            obj_description(t.oid, 'pg_trigger'),
+            NULL::regtype,
+            ' ON ' || c.relname
+        FROM pg_catalog.pg_trigger t
+        JOIN pg_catalog.pg_class c ON t.tgrelid = c.oid
+        JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
+        WHERE NOT t.tgisinternal AND {filter}
+    """),
+
+    'sequence': ("n.nspname", "c.relname", """
+        SELECT
+            n.nspname, c.relname, 'SEQUENCE',
+            format(
+                'CREATE SEQUENCE %%I.%%I\n    INCREMENT %%s\n    MINVALUE %%s\n    MAXVALUE %%s\n    START %%s\n    CACHE %%s%%s;',
+                n.nspname,
+                c.relname,
+                s.seqincrement,
+                s.seqmin,
+                s.seqmax,
+                s.seqstart,
+                s.seqcache,
+                CASE WHEN s.seqcycle THEN '\n    CYCLE' ELSE '' END
+            ),
+            obj_description(c.oid, 'pg_class'),
+            NULL::regtype,
+            NULL::text
+        FROM pg_catalog.pg_sequence s
+        JOIN pg_catalog.pg_class c ON s.seqrelid = c.oid
+        JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
+        WHERE {filter}
+    """),
+
+    'index': ("n.nspname", "c.relname", """
+        SELECT
+            n.nspname, c.relname, 'INDEX',
+            pg_get_indexdef(i.indexrelid),
+            obj_description(i.indexrelid, 'pg_class'),
+            NULL::regtype,
+            NULL::text
+        FROM pg_catalog.pg_index i
+        JOIN pg_catalog.pg_class c ON i.indexrelid = c.oid
+        JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
+        WHERE {filter}
+    """)
+}
+
+def build_bulk_ddl_query(object_types):
+    """
+    Combine the bulk catalog queries for object_types into one statement
+
+    Each type's part matches the whole schema %(<type>_schema)s, or any
+    (schema, name pattern) pair from the %(<type>_schemas)s and
+    %(<type>_names)s arrays; names are matched with ILIKE as in
+    extract_database_object_ddl.
+    """
+    parts = []
+    for object_type in object_types:
+        schema_column, name_column, query = bulk_queries[object_type]
+        object_filter = f"""{schema_column} NOT IN ('pg_catalog', 'information_schema')
+            AND ({schema_column} = %({object_type}_schema)s
+                OR EXISTS (
+                    SELECT 1
+                    FROM unnest(%({object_type}_schemas)s::text[], %({object_type}_names)s::text[])
+                        AS requested(schema_name, name_pattern)
+                    WHERE {schema_column} = requested.schema_name
+                    AND {name_column} ILIKE requested.name_pattern
+                ))"""
+        parts.append(query.format(filter=object_filter))
+    return "\nUNION ALL\n".join(parts) + "\nORDER BY 3, 1, 2, 7"
+
 def extract_database_object_ddl(secret_name, object_type, object_name=None, object_schema=None):
     """
     Extract DDL and description for database objects
@@ -476,6 +698,7 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
         list: List of dictionaries containing object information
         str: Error message if no objects found
     """
+    conn = None
     try:
         # Input validation
         if not object_name or not object_schema:
@@ -570,10 +793,122 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
     finally:
         if conn:
             try:
-                conn.close()
-                print("\nDatabase connection closed")
+                release_db_connection(conn)
+                print("\nDatabase connection released")
+            except Exception as e:
+                print(f"\nError releasing connection: {str(e)}")
+
+def ilike_matches(pattern, value):
+    """Python equivalent of PostgreSQL `value ILIKE pattern`"""
+    regex = ''.join(
+        '.*' if ch == '%' else '.' if ch == '_' else re.escape(ch)
+        for ch in pattern
+    )
+    return re.fullmatch(regex, value, re.IGNORECASE | re.DOTALL) is not None
+
+def extract_database_objects_ddl(secret_name, objects=None, object_schema=None):
+    """
+    Extract DDL, description and explanation for many database objects at once
+
+    All requested objects are fetched with a single set-based catalog query
+    on one connection, instead of one query and connection per object.
+
+    Args:
+        secret_name (str): The name of the secret containing database credentials
+        objects (list, optional): (object_type, object_schema, object_name)
+            tuples, or dicts with those keys; object_name may be an ILIKE pattern
+        object_schema (str, optional): Schema whose objects of every type are
+            all extracted
+
+    Returns:
+        dict: 'type:schema.name' -> object information including 'explanation',
+        with the argument types of a function or procedure and the table of a
+        trigger appended to the key; requested objects without a match map
+        to "No matching objects found"
+    """
+    conn = None
+    try:
+        requested = []
+        for obj in objects or []:
+            if isinstance(obj, dict):
+                obj = (obj.get('object_type'), obj.get('object_schema'), obj.get('object_name'))
+            if len(obj) != 3 or not all(obj):
+                raise ValueError(f"Each object needs object_type, object_schema and object_name: {obj}")
+            object_type_lower = obj[0].lower()
+            if object_type_lower not in bulk_queries:
+                valid_types = ', '.join(bulk_queries.keys())
+                raise ValueError(f"Invalid object_type: {obj[0]}. Valid types are: {valid_types}")
+            requested.append((object_type_lower, obj[1], obj[2]))
+
+        if not requested and not object_schema:
+            raise ValueError("Either objects or object_schema is required")
+
+        object_types = list(bulk_queries) if object_schema else []
+        object_types += [t for t in dict.fromkeys(t for t, _, _ in requested) if t not in object_types]
+
+        params = {}
+        for object_type in object_types:
+            params[f'{object_type}_schema'] = object_schema
+            params[f'{object_type}_schemas'] = [s for t, s, _ in requested if t == object_type]
+            params[f'{object_type}_names'] = [n for t, _, n in requested if t == object_type]
+
+        conn = connect_to_db(secret_name)
+        with conn.cursor() as cur:
+            print(f"\nExtracting DDL for {len(requested)} objects, schema: {object_schema}, types: {object_types}")
+            cur.execute(build_bulk_ddl_query(object_types), params)
+            columns = ['object_schema', 'name', 'object_type', 'definition', 'description', 'return_type', 'qualifier']
+            rows = [dict(zip(columns, row)) for row in cur.fetchall()]
+
+        results = {}
+        for result in rows:
+            result['object_name'] = f"{result['object_schema']}.{result['name']}"
+            if result['return_type'] is None:
+                del result['return_type']
+            # e.g. function:public.add(integer, integer), trigger:public.audit ON orders
+            qualifier = result.pop('qualifier') or ''
+            result['explanation'] = generate_object_explanation(result)
+            results[f"{result['object_type'].lower()}:{result['object_name']}{qualifier}"] = result
+
+        # Report requests that matched nothing
+        for object_type, schema, name in requested:
+            matched = any(
+                result['object_type'].lower() == object_type
+                and result['object_schema'] == schema
+                and ilike_matches(name, result['name'])
+                for result in rows
+            )
+            if not matched:
+                results[f"{object_type}:{schema}.{name}"] = "No matching objects found"
+
+        print(f"\nSuccessfully retrieved {len(rows)} objects")
+        return results
+
+    except Exception as e:
+        error_msg = f"Failed to extract database object DDL: {str(e)}"
+        print(f"\nError: {error_msg}")
+        raise
+
+    finally:
+        if conn:
+            try:
+                release_db_connection(conn)
+                print("\nDatabase connection released")
             except Exception as e:
-                print(f"\nError closing connection: {str(e)}")
+                print(f"\nError releasing connection: {str(e)}")
+
+def format_bulk_ddl_results(results):
+    """Format bulk DDL extraction results in a human-readable string"""
+    output = []
+    for key, result in results.items():
+        output.append(f"== {key} ==")
+        if isinstance(result, str):
+            output.append(result)
+        else:
+            output.append(result['definition'] or "No definition available")
+            output.append("")
+            output.append(result['explanation'])
+        output.append("")
+    return "\n".join(output)
 
 
 def analyze_table_definition(definition):
@@ -621,12 +956,18 @@ def generate_object_explanation(obj_info):
             explanation.append(f"Description: {description}")
 
         # Analyze based on object type
-        if obj_type == 'TABLE':
-            explanation.extend(analyze_table_definition(definition))
+        if not definition:
+            pass
+        elif obj_type == 'TABLE':
+            explanation.append(analyze_table_definition(definition))
         elif obj_type == 'VIEW':
-            explanation.extend(analyze_view_definition(definition))
+            explanation.append(analyze_view_definition(definition))
         elif obj_type in ('FUNCTION', 'PROCEDURE'):
-            explanation.extend(analyze_routine_definition(definition))
+            explanation.append(analyze_routine_definition(definition))
+        elif obj_type == 'TRIGGER':
+            explanation.append(analyze_trigger_definition(definition))
+        else:
+            explanation.append(f"DDL for {obj_type.lower()}")
 
         return '\n'.join(explanation) if explanation else "No explanation available"
 
@@ -754,16 +1095,27 @@ def clean_query_for_explain(query):
     
     return cleaned_query.strip()
 
-def analyze_query_performance(secret_name, query_or_object_name, parameters=None, object_type=None):
+def analyze_query_performance(secret_name, query_or_object_name, parameters=None, object_type=None,
+                              plan_mode='cached'):
     """
     Analyze query performance and provide optimization recommendations
     
+    Plans are cached by query fingerprint (the query with literals stripped),
+    so re-analyzing the same query shape does not run EXPLAIN ANALYZE again.
+    
     Parameters:
     - secret_name: Secret containing database credentials
     - query_or_object_name: SQL query string or object name to analyze
     - parameters: Optional. List of parameter values for parameterized queries
     - object_type: Optional. If provided, will fetch definition from database object
+    - plan_mode: Optional. 'cached' reuses a cached plan when there is one,
+      'refresh' always re-runs EXPLAIN and replaces the cached plan, and
+      'diff' runs a plain EXPLAIN (the query is not executed) and compares it
+      node by node with the cached plan, which becomes the baseline if absent
     """
+    if plan_mode not in ('cached', 'refresh', 'diff'):
+        raise ValueError(f"Unknown plan_mode: {plan_mode}")
+
     conn = connect_to_db(secret_name)
     try:
         with conn.cursor() as cur:
@@ -779,34 +1131,50 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
             # Check if the query contains parameter placeholders
             has_parameters = any(f'${i}' in query_to_analyze for i in range(1, 21))
 
+            explain_target = query_to_analyze
             if has_parameters:
                 # Replace $n parameters with dummy placeholders
-                modified_query = query_to_analyze
                 param_count = 0
                 for i in range(1, 21):
-                    if f'${i}' in modified_query:
+                    if f'${i}' in explain_target:
                         param_count = max(param_count, i)
-                        modified_query = modified_query.replace(f'${i}', 'NULL')
+                        explain_target = explain_target.replace(f'${i}', 'NULL')
 
-                # Use GENERIC_PLAN for parameterized queries
-                cur.execute(f"EXPLAIN (GENERIC_PLAN, BUFFERS, FORMAT JSON) {modified_query}")
-                plan = cur.fetchone()[0]
+            cache_key = PlanCache.key(secret_name, fingerprint_query(query_to_analyze), has_parameters)
+            cached = plan_cache.get(cache_key) if plan_mode != 'refresh' else None
 
-                cur.execute(f"EXPLAIN (FORMAT JSON) {modified_query}")
-                estimated_plan = cur.fetchone()[0]
-                
-                # Pass True for is_generic_plan
-                analysis = analyze_execution_plan(plan[0], estimated_plan[0], True)
+            if cached:
+                plan = cached['plan']
+                estimated_plan = cached['estimated_plan']
             else:
-                # For non-parameterized queries, use ANALYZE
-                cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query_to_analyze}")
+                if has_parameters:
+                    # Use GENERIC_PLAN for parameterized queries
+                    cur.execute(f"EXPLAIN (GENERIC_PLAN, BUFFERS, FORMAT JSON) {explain_target}")
+                else:
+                    # For non-parameterized queries, use ANALYZE
+                    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {explain_target}")
                 plan = cur.fetchone()[0]
-                
-                cur.execute(f"EXPLAIN (FORMAT JSON) {query_to_analyze}")
+
+                cur.execute(f"EXPLAIN (FORMAT JSON) {explain_target}")
                 estimated_plan = cur.fetchone()[0]
-                
-                # Pass False for is_generic_plan
-                analysis = analyze_execution_plan(plan[0], estimated_plan[0], False)
+
+            analysis = analyze_execution_plan(plan[0], estimated_plan[0], has_parameters)
+            analysis['plan_source'] = 'cache' if cached else 'database'
+
+            if plan_mode == 'diff' and cached:
+                # Only the planner runs, so expensive queries are not re-executed
+                cur.execute(f"EXPLAIN (FORMAT JSON) {explain_target}")
+                new_plan = cur.fetchone()[0]
+                analysis['plan_diff'] = diff_plans(plan[0], new_plan[0])
+                analysis['plan_diff']['baseline_captured_at'] = captured_at_iso(cached)
+            elif plan_mode == 'diff':
+                # Nothing to compare with yet; this plan becomes the baseline
+                analysis['plan_diff'] = None
+
+            if not cached:
+                cached = plan_cache.put(cache_key, query_to_analyze, plan, estimated_plan)
+            analysis['plan_captured_at'] = captured_at_iso(cached)
+            logger.info(f"Plan cache: {plan_cache.stats()}")
 
             return analysis
 
@@ -814,7 +1182,7 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
         raise Exception(f"Failed to analyze query performance: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def analyze_execution_plan(actual_plan, estimated_plan, is_generic_plan):
     """
@@ -1027,8 +1395,15 @@ def format_analysis_output(analysis):
         output.append(f"- Actual Rows: {analysis['performance_stats'].get('actual_rows', 'N/A')}")
         output.append(f"- Estimated Rows: {analysis['performance_stats'].get('estimated_rows', 'N/A')}")
     
+    if analysis.get('plan_source') == 'cache':
+        output.append(f"- Plan Source: cached plan captured at {analysis['plan_captured_at']}")
+    
     output.append("")
 
+    # Plan comparison against the cached baseline
+    if 'plan_diff' in analysis:
+        output.extend(format_plan_diff(analysis['plan_diff']))
+
     # Issues
     if analysis['issues']:
         output.append("Identified Issues:")
@@ -1046,6 +1421,59 @@ def format_analysis_output(analysis):
 
     return "\n".join(output)
 
+def format_plan_diff(plan_diff):
+    """
+    Format a plan comparison from diff_plans as output lines
+    """
+    if plan_diff is None:
+        return [
+            "Plan Comparison:",
+            "- No cached plan for this query yet; the current plan is stored as the baseline.",
+            ""
+        ]
+
+    def change_text(change):
+        return f" ({change:+.0%})" if change is not None else ""
+
+    total_cost = plan_diff['total_cost']
+    output = [
+        f"Plan Comparison (baseline captured at {plan_diff['baseline_captured_at']}):",
+        f"- Total Cost: {total_cost['baseline']} -> {total_cost['new']}{change_text(total_cost['change'])}",
+        f"- Plan Shape Changed: {'Yes' if plan_diff['shape_changed'] else 'No'}",
+        f"- Regressed Nodes: {len(plan_diff['regressions'])}",
+    ]
+
+    if plan_diff['changes']:
+        output.append("Changed Nodes:")
+    for node in plan_diff['changes']:
+        if node['status'] == 'added':
+            output.append(f"- [{node['path']}] Added {node['new']}")
+            continue
+        if node['status'] == 'removed':
+            output.append(f"- [{node['path']}] Removed {node['baseline']}")
+            continue
+
+        label = node['new']
+        if node['status'] == 'replaced':
+            label += f" (was {node['baseline']})"
+        line = (
+            f"- [{node['path']}] {label}: "
+            f"cost {node['cost'][0]} -> {node['cost'][1]}{change_text(node['cost_change'])}, "
+            f"rows {node['rows'][0]} -> {node['rows'][1]}{change_text(node['rows_change'])}"
+        )
+        measured = []
+        if node['baseline_actual_time_ms'] is not None:
+            measured.append(f"{node['baseline_actual_time_ms']:.2f} ms")
+        if node['baseline_actual_rows'] is not None:
+            measured.append(f"{node['baseline_actual_rows']} rows")
+        measured.extend(f"{count} shared blocks {name}" for name, count in node['baseline_buffers'].items())
+        if measured:
+            line += f"; baseline measured {', '.join(measured)}"
+        output.append(line)
+
+    output.append("")
+    return output
+
 def monitor_query_performance(query, start_time, rows_returned):
     """
     Monitor query performance and suggest analysis if needed
@@ -1096,131 +1524,7 @@ def monitor_query_performance(query, start_time, rows_returned):
     
     return metrics
 
-def validate_query(query):
-    """
-    Validate query for security concerns and split into statements
-    
-    Args:
-        query (str): SQL query to validate
-    
-    Returns:
-        list: List of validated statements
-        
-    Raises:
-        ValueError: If query contains prohibited operations
-    """
-    if not query or not isinstance(query, str):
-        raise ValueError("Query must be a non-empty string")
-
-    def is_within_quotes(text, position):
-        """Check if a position in text is within quotes"""
-        single_quotes = False
-        double_quotes = False
-        for i in range(position):
-            if text[i] == "'" and not double_quotes:
-                single_quotes = not single_quotes
-            elif text[i] == '"' and not single_quotes:
-                double_quotes = not double_quotes
-        return single_quotes or double_quotes
-
-    def split_statements(query_text):
-        """Split query into individual statements, respecting quotes and comments"""
-        statements = []
-        current_stmt = []
-        i = 0
-        comment_block = False
-        line_comment = False
-        
-        while i < len(query_text):
-            char = query_text[i]
-            
-            # Handle comment blocks
-            if query_text[i:i+2] == '/*' and not line_comment:
-                comment_block = True
-                current_stmt.append(char)
-                i += 1
-            elif query_text[i:i+2] == '*/' and comment_block:
-                comment_block = False
-                current_stmt.append(char)
-                i += 1
-            # Handle line comments
-            elif query_text[i:i+2] == '--' and not comment_block:
-                line_comment = True
-                current_stmt.append(char)
-                i += 1
-            elif char == '\n' and line_comment:
-                line_comment = False
-                current_stmt.append(char)
-            # Handle semicolons
-            elif char == ';' and not comment_block and not line_comment and not is_within_quotes(query_text, i):
-                current_stmt.append(char)
-                stmt = ''.join(current_stmt).strip()
-                if stmt:
-                    statements.append(stmt)
-                current_stmt = []
-            else:
-                current_stmt.append(char)
-            i += 1
-        
-        # Add the last statement if exists
-        last_stmt = ''.join(current_stmt).strip()
-        if last_stmt:
-            statements.append(last_stmt)
-        
-        return [stmt for stmt in statements if stmt]
-
-    # Split into statements
-    statements = split_statements(query)
-    validated_statements = []
-
-    # Validate each statement
-    for stmt in statements:
-        stmt = stmt.strip()
-        if stmt.endswith(';'):
-            stmt = stmt[:-1]
-        
-        stmt_lower = stmt.lower().strip()
-        
-        # Get the command type
-        first_word = stmt_lower.split()[0] if stmt_lower.split() else ''
-        
-        if first_word not in ['select', 'show']:
-            raise ValueError(f"Prohibited operation detected: {first_word}")
-        
-        # For SELECT statements, check for dangerous operations
-        if first_word == 'select':
-            dangerous_operations = [
-                r'\binsert\b', r'\bupdate\b', r'\bdelete\b', r'\bdrop\b', 
-                r'\btruncate\b', r'\balter\b', r'\bcreate\b', r'\bgrant\b', 
-                r'\brevoke\b', r'\bexecute\b', r'\bcopy\b'
-            ]
-            
-            # Remove content within quotes for checking
-            query_for_check = ''
-            in_quote = False
-            quote_char = None
-            
-            for char in stmt:
-                if char in ["'", '"'] and (not quote_char or char == quote_char):
-                    if not in_quote:
-                        quote_char = char
-                        in_quote = True
-                    else:
-                        quote_char = None
-                        in_quote = False
-                elif not in_quote:
-                    query_for_check += char
-            
-            # Check for dangerous operations
-            for operation in dangerous_operations:
-                if re.search(operation, query_for_check.lower()):
-                    raise ValueError(f"Statement contains prohibited operation: {operation}")
-        
-        validated_statements.append(stmt)
-    
-    return validated_statements
-
-def execute_read_query(secret_name, query, max_rows=20):
+def execute_read_query(secret_name, query, max_rows=20, max_bytes=MAX_RESULT_BYTES):
     """
     Execute read-only queries safely and return results with monitoring
     
@@ -1228,6 +1532,7 @@ def execute_read_query(secret_name, query, max_rows=20):
         secret_name (str): Secret containing database credentials
         query (str): SQL query to execute
         max_rows (int): Maximum number of rows to return (only for SELECT queries)
+        max_bytes (int): Maximum rendered size of all returned tables
     
     Returns:
         dict: Query results and metadata
@@ -1242,6 +1547,7 @@ def execute_read_query(secret_name, query, max_rows=20):
     
     start_time = time.time()
     conn = None
+    total_bytes = 0
     
     try:
         # Validate and split queries
@@ -1266,47 +1572,46 @@ def execute_read_query(secret_name, query, max_rows=20):
                     'query': stmt
                 }
                 
-                # Determine if it's a SELECT query
+                # Determine if it's a SELECT query, skipping any leading comments
                 stmt_lower = stmt.lower().strip()
-                is_select_query = stmt_lower.lstrip('(').startswith('select')
+                is_select_query = statement_command(stmt) == 'select'
                 
                 # Prepare the final query
                 final_query = stmt
                 if is_select_query and 'limit' not in stmt_lower:
                     final_query = f"{stmt} LIMIT {max_rows + 1}"
                 
-                # Execute query
+                # The statement text and the lines around its table count too
+                total_bytes += len(stmt.encode('utf-8')) + RESULT_SECTION_BYTES
+                
+                # Execute query, streaming rows until a budget is reached
                 try:
-                    cur.execute(final_query)
+                    fetched = fetch_rows(
+                        conn, final_query, max_rows if is_select_query else None, max_bytes - total_bytes,
+                        cursor_name=f"analyzer_stmt_{stmt_index}" if is_select_query else None
+                    )
                 except psycopg2.Error as pe:
                     logger.error(f"Error executing query: {final_query}")
                     logger.error(f"Error details: {str(pe)}")
                     raise
                 
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
-                
-                # Fetch results
-                rows = cur.fetchall()
-                total_rows = len(rows)
+                stmt_response['columns'] = fetched['columns']
+                total_bytes += fetched['bytes']
                 
-                # Handle row limiting only for SELECT queries
-                if is_select_query and total_rows > max_rows:
+                # Handle row and output size limits
+                if fetched['truncated'] == 'rows':
                     stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
                     stmt_response['message'] = (
                         f"Results truncated to {max_rows} rows for performance reasons. "
-                        f"Total rows available: {total_rows}"
+                        "More rows are available"
                     )
-                    stmt_response['row_count'] = max_rows
-                else:
-                    stmt_response['row_count'] = total_rows
-                
-                # Convert rows to list of dictionaries
-                stmt_response['rows'] = [
-                    dict(zip(stmt_response['columns'], row))
-                    for row in rows
-                ]
+                elif fetched['truncated'] == 'bytes':
+                    stmt_response['truncated'] = True
+                    stmt_response['message'] = (
+                        f"Results truncated at {max_bytes} bytes of output for performance reasons"
+                    )
+                stmt_response['row_count'] = len(fetched['rows'])
+                stmt_response['rows'] = fetched['rows']
                 
                 # Add performance monitoring only for SELECT queries
                 if is_select_query:
@@ -1355,79 +1660,73 @@ def execute_read_query(secret_name, query, max_rows=20):
     
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
+
+def write_result_table(out, columns, rows):
+    """Write rows as an aligned text table to a text stream"""
+    widths = {col: len(str(col)) for col in columns}
+    for row in rows:
+        for col in columns:
+            widths[col] = max(widths[col], len(str(row[col])))
+
+    header = " | ".join(str(col).ljust(widths[col]) for col in columns)
+    out.write(header + "\n")
+    out.write("-" * len(header) + "\n")
+    for row in rows:
+        out.write(" | ".join(str(row[col]).ljust(widths[col]) for col in columns))
+        out.write("\n")
 
 def format_enhanced_results(results):
     """
     Format results with enhanced information
     """
-    formatted_output = []
+    out = io.StringIO()
     
     # Add performance summary
     metrics = results['performance_metrics']
-    formatted_output.append("Query Execution Summary:")
-    formatted_output.append(f"- Total execution time: {metrics['execution_time']:.2f} seconds")
-    formatted_output.append(f"- Statements executed: {metrics['statements_executed']}")
-    formatted_output.append(f"- Total rows returned: {metrics['total_rows']}")
-    formatted_output.append("")
+    out.write("Query Execution Summary:\n")
+    out.write(f"- Total execution time: {metrics['execution_time']:.2f} seconds\n")
+    out.write(f"- Statements executed: {metrics['statements_executed']}\n")
+    out.write(f"- Total rows returned: {metrics['total_rows']}\n")
+    out.write("\n")
     
     # Add warnings if any
     if results['warnings']:
-        formatted_output.append("Warnings:")
+        out.write("Warnings:\n")
         for warning in results['warnings']:
-            formatted_output.append(f"- {warning}")
-        formatted_output.append("")
+            out.write(f"- {warning}\n")
+        out.write("\n")
     
     # Add optimization suggestions if any
     if results['optimization_suggestions']:
-        formatted_output.append("Optimization Suggestions:")
+        out.write("Optimization Suggestions:\n")
         for suggestion in results['optimization_suggestions']:
-            formatted_output.append(f"- {suggestion}")
-        formatted_output.append("")
+            out.write(f"- {suggestion}\n")
+        out.write("\n")
     
     # Format each statement's results
     for i, result in enumerate(results['results'], 1):
-        formatted_output.append(f"Statement {i}:")
-        formatted_output.append(f"Query: {result['query']}")
+        out.write(f"Statement {i}:\n")
+        out.write(f"Query: {result['query']}\n")
         
         # Add complexity metrics
         complexity = result['complexity_metrics']
-        formatted_output.append("Complexity Analysis:")
-        formatted_output.append(f"- Score: {complexity['complexity_score']}")
-        formatted_output.append(f"- Joins: {complexity['join_count']}")
-        formatted_output.append(f"- Subqueries: {complexity['subquery_count']}")
-        formatted_output.append(f"- Aggregations: {complexity['aggregation_count']}")
+        out.write("Complexity Analysis:\n")
+        out.write(f"- Score: {complexity['complexity_score']}\n")
+        out.write(f"- Joins: {complexity['join_count']}\n")
+        out.write(f"- Subqueries: {complexity['subquery_count']}\n")
+        out.write(f"- Aggregations: {complexity['aggregation_count']}\n")
         
         if result['message']:
-            formatted_output.append(f"Note: {result['message']}")
+            out.write(f"Note: {result['message']}\n")
         
         if result['columns']:
-            # Calculate column widths
-            widths = {
-                col: max(len(str(col)), 
-                        max(len(str(row[col])) for row in result['rows']))
-                for col in result['columns']
-            }
-            
-            # Add header
-            header = " | ".join(
-                str(col).ljust(widths[col])
-                for col in result['columns']
-            )
-            formatted_output.append(header)
-            formatted_output.append("-" * len(header))
-            
-            # Add rows
-            for row in result['rows']:
-                formatted_output.append(" | ".join(
-                    str(row[col]).ljust(widths[col])
-                    for col in result['columns']
-                ))
+            write_result_table(out, result['columns'], result['rows'])
             
-        formatted_output.append(f"Rows returned: {result['row_count']}")
-        formatted_output.append("")
+        out.write(f"Rows returned: {result['row_count']}\n")
+        out.write("\n")
     
-    return "\n".join(formatted_output)
+    return out.getvalue().rstrip("\n")
 
 def format_query_results(results):
     """
@@ -1439,93 +1738,49 @@ def format_query_results(results):
     Returns:
         str: Formatted results string
     """
-    formatted_output = []
+    out = io.StringIO()
     
     # Add performance message first
     if results['performance_metrics'] and results['performance_metrics']['performance_message']:
-        formatted_output.append(results['performance_metrics']['performance_message'] + "\n")
+        out.write(results['performance_metrics']['performance_message'] + "\n\n")
     
     # Add truncation message if applicable
     if results['message']:
-        formatted_output.append(f"Note: {results['message']}\n")
+        out.write(f"Note: {results['message']}\n\n")
     
-    # Add column headers
+    # Add column headers and rows
     if results['columns']:
-        # Calculate column widths
-        widths = {}
-        for col in results['columns']:
-            widths[col] = len(str(col))
-            for row in results['rows']:
-                widths[col] = max(widths[col], len(str(row[col])))
-        
-        # Create header
-        header = " | ".join(
-            str(col).ljust(widths[col])
-            for col in results['columns']
-        )
-        formatted_output.append(header)
-        
-        # Add separator
-        separator = "-" * len(header)
-        formatted_output.append(separator)
-        
-        # Add rows
-        for row in results['rows']:
-            formatted_row = " | ".join(
-                str(row[col]).ljust(widths[col])
-                for col in results['columns']
-            )
-            formatted_output.append(formatted_row)
+        write_result_table(out, results['columns'], results['rows'])
     
     # Add summary
-    formatted_output.append(f"\nTotal rows: {results['row_count']}")
+    out.write(f"\nTotal rows: {results['row_count']}")
     
-    return "\n".join(formatted_output)
+    return out.getvalue()
 
 def format_multi_query_results(results):
     """Format results from multiple statements"""
-    formatted_output = []
+    out = io.StringIO()
     
     # Add performance summary
     metrics = results['performance_metrics']
-    formatted_output.append(f"Query Execution Summary:")
-    formatted_output.append(f"- Total execution time: {metrics['execution_time']:.2f} seconds")
-    formatted_output.append(f"- Statements executed: {metrics['statements_executed']}")
-    formatted_output.append("")
+    out.write("Query Execution Summary:\n")
+    out.write(f"- Total execution time: {metrics['execution_time']:.2f} seconds\n")
+    out.write(f"- Statements executed: {metrics['statements_executed']}\n")
+    out.write("\n")
     
     # Format each statement's results
     for i, result in enumerate(results['results'], 1):
-        formatted_output.append(f"Statement {i}: {result['query']}")
+        out.write(f"Statement {i}: {result['query']}\n")
         if result['message']:
-            formatted_output.append(f"Note: {result['message']}")
+            out.write(f"Note: {result['message']}\n")
         
         if result['columns']:
-            # Calculate column widths
-            widths = {
-                col: max(len(str(col)), 
-                        max(len(str(row[col])) for row in result['rows']))
-                for col in result['columns']
-            }
-            
-            # Add header
-            header = " | ".join(
-                str(col).ljust(widths[col])
-                for col in result['columns']
-            )
-            formatted_output.append(header)
-            formatted_output.append("-" * len(header))
-            
-            # Add rows
-            for row in result['rows']:
-                formatted_output.append(" | ".join(
-                    str(row[col]).ljust(widths[col])
-                    for col in result['columns']
-                ))
+            write_result_table(out, result['columns'], result['rows'])
             
-        formatted_output.append(f"Rows returned: {result['row_count']}")
-        formatted_output.append("")
+        out.write(f"Rows returned: {result['row_count']}\n")
+        out.write("\n")
     
-    return "\n".join(formatted_output)
+    return out.getvalue().rstrip("\n")
 
 def lambda_handler(event, context):
     try:
@@ -1537,8 +1792,9 @@ def lambda_handler(event, context):
         # Get explain plan for a query
         if action_type == 'explain_query':
             query = event['query']
+            plan_mode = event.get('plan_mode', 'cached')
             print("Executing explain query scripts")
-            results = analyze_query_performance(secret_name, query)
+            results = analyze_query_performance(secret_name, query, plan_mode=plan_mode)
             formatted_results = format_analysis_output(results)
         elif action_type == 'extract_ddl':
             object_type = event['object_type']
@@ -1548,6 +1804,14 @@ def lambda_handler(event, context):
             results = extract_database_object_ddl(secret_name, object_type=object_type, object_name=object_name, object_schema=object_schema)
             # Convert results to string if it's not already
             formatted_results = str(results) if results else "No results found"
+        elif action_type == 'extract_ddl_bulk':
+            print("Generating the DDL scripts for multiple objects")
+            results = extract_database_objects_ddl(
+                secret_name,
+                objects=event.get('objects'),
+                object_schema=event.get('object_schema')
+            )
+            formatted_results = format_bulk_ddl_results(results) if results else "No results found"
         elif action_type == 'execute_query':
             query = event['query']
             print("Executing read-only queries")
@@ -1580,7 +1844,8 @@ def lambda_handler(event, context):
                 'responseBody': response_body
             }
         }
-        
+
+        logger.info(f"Connection pool metrics: {connection_manager.metrics()}")
         return function_response
 
     except Exception as e:
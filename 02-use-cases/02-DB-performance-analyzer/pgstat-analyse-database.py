@@ -1,27 +1,16 @@
 
 import json
-import boto3
-import psycopg2
-import os
-from botocore.exceptions import ClientError
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db_connection import connection_manager
+
+# Secrets whose database is known to have pg_stat_statements installed
+_pg_stat_statements_ready = set()
 
 def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    #secret_name = os.environ['SECRET_NAME']
-    region_name = os.environ['REGION']
-    
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
-    try:
-        secret_value = client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(secret_value['SecretString'])
-        return secret
-    except ClientError as e:
-        raise Exception(f"Failed to get secret: {str(e)}")
+    """Get secret from AWS Secrets Manager (cached across warm invocations)"""
+    return connection_manager.get_secret(secret_name)
 
 def execute_slow_query(secret_name, min_exec_time):
     """Execute multiple performance-related queries"""
@@ -110,18 +99,11 @@ def execute_slow_query(secret_name, min_exec_time):
     }
     
     print("Connecting to the database...")
+    ensure_pg_stat_statements(secret_name)
     conn = connect_to_db(secret_name)
     print("Connected to the database.")
     
     try:
-        # First, ensure pg_stat_statements is installed
-        print(" I am here 1")
-        with conn.cursor() as cur:
-            print(" I am here 2")
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
         print(" I am here 3") 
         # Execute the main query
         
@@ -143,7 +125,7 @@ def execute_slow_query(secret_name, min_exec_time):
         raise Exception(f"Failed to retrieve slow queries: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def format_results_for_slow_query(results):
     """Format results in a human-readable string"""
@@ -282,15 +264,9 @@ def execute_connect_issues(secret_name, min_exec_time):
         """
     }
     
+    ensure_pg_stat_statements(secret_name)
     conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
             
         # Execute the main query
         
@@ -318,7 +294,7 @@ def execute_connect_issues(secret_name, min_exec_time):
         raise Exception(f"Failed to retrieve connection metrics: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def format_results_for_conn_issues(results):
     """Format connection management results in a human-readable string"""
@@ -434,15 +410,9 @@ def execute_index_analysis(secret_name):
         """
     }
     
+    ensure_pg_stat_statements(secret_name)
     conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
             
         # Execute the main query    
         results = {}
@@ -465,7 +435,7 @@ def execute_index_analysis(secret_name):
         raise Exception(f"Failed to retrieve index metrics: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
     
 def format_results_for_index_analysis(results):
     """Format index analysis results in a human-readable string"""
@@ -569,15 +539,9 @@ def execute_autovacuum_analysis(secret_name):
         """
     }
     
+    ensure_pg_stat_statements(secret_name)
     conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
             
         # Execute the main query    
         results = {}
@@ -600,7 +564,7 @@ def execute_autovacuum_analysis(secret_name):
         raise Exception(f"Failed to retrieve autovacuum metrics: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def format_results_for_autovacuum_analysis(results):
     """Format autovacuum analysis results in a human-readable string"""
@@ -716,15 +680,9 @@ def execute_io_analysis(secret_name):
         """
     }
     
+    ensure_pg_stat_statements(secret_name)
     conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
         
         results = {}
         
@@ -746,7 +704,7 @@ def execute_io_analysis(secret_name):
         raise Exception(f"Failed to retrieve I/O metrics: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def format_results_for_io_analysis(results):
     """Format I/O analysis results in a human-readable string"""
@@ -857,15 +815,9 @@ def execute_replication_analysis(secret_name):
         """
     }
     
+    ensure_pg_stat_statements(secret_name)
     conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
         results = {}
         
         # Execute each query and collect results
@@ -886,7 +838,7 @@ def execute_replication_analysis(secret_name):
         raise Exception(f"Failed to retrieve replication metrics: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def format_results_for_replication_analysis(results):
     """Format replication analysis results in a human-readable string"""
@@ -1007,15 +959,9 @@ def execute_system_health(secret_name):
         """
     }
     
+    ensure_pg_stat_statements(secret_name)
     conn = connect_to_db(secret_name)
     try:
-        # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
         
         results = {}
         
@@ -1037,7 +983,7 @@ def execute_system_health(secret_name):
         raise Exception(f"Failed to retrieve system health metrics: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_db_connection(conn)
 
 def format_results_for_system_health(results):
     """Format system health analysis results in a human-readable string"""
@@ -1132,53 +1078,105 @@ def format_results_for_system_health(results):
     return output
 
 def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
-    print(secret)
-    try:
-        print("in connect_to_db")
-        conn = psycopg2.connect(
-            host=secret['host'],
-            database=secret['dbname'],
-            user=secret['username'],
-            password=secret['password'],
-            port=secret['port']
-        )
-        return conn
-    except Exception as e:
-        raise Exception(f"Failed to connect to the database: {str(e)}")
+    """Check out a read-only connection from the warm pool; return it with release_db_connection"""
+    return connection_manager.checkout(secret_name, read_only=True)
 
-def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
-    print("in get_env_secret")
-    """Retrieve the secret name for the specified environment"""
-    if environment == 'prod':
-        print("in get_env_secret1")
-        try:
-            # Get the secret name from Parameter Store
-            print("in get_env_secret-try")
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOpsGPT/{environment}'
-            )
-            print(response['Parameter']['Value'])
-            return response['Parameter']['Value']
-        except ssm_client.exceptions.ParameterNotFound:
-            error_message = f"Parameter not found: {parameter_name}"
-            print(error_message)
-            raise Exception(error_message)
-    elif environment == 'dev':
+def release_db_connection(conn):
+    """Return a connection obtained from connect_to_db to the pool"""
+    connection_manager.release(conn)
+
+def ensure_pg_stat_statements(secret_name):
+    """Create pg_stat_statements once per database and warm container"""
+    if secret_name in _pg_stat_statements_ready:
+        return
+    with connection_manager.connection(secret_name, read_only=False) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
+            """)
+        conn.commit()
+    _pg_stat_statements_ready.add(secret_name)
+
+def execute_full_diagnostic(secret_name, min_exec_time):
+    """
+    Run every diagnostic category concurrently, one pooled read-only connection each
+
+    Returns:
+        dict: Per-section formatted report, error and elapsed time, plus the total time
+    """
+    sections = {
+        'slow_query': (
+            lambda: execute_slow_query(secret_name, min_exec_time), format_results_for_slow_query),
+        'connection_management_issues': (
+            lambda: execute_connect_issues(secret_name, min_exec_time), format_results_for_conn_issues),
+        'index_analysis': (
+            lambda: execute_index_analysis(secret_name), format_results_for_index_analysis),
+        'autovacuum_analysis': (
+            lambda: execute_autovacuum_analysis(secret_name), format_results_for_autovacuum_analysis),
+        'io_analysis': (
+            lambda: execute_io_analysis(secret_name), format_results_for_io_analysis),
+        'replication_analysis': (
+            lambda: execute_replication_analysis(secret_name), format_results_for_replication_analysis),
+        'system_health': (
+            lambda: execute_system_health(secret_name), format_results_for_system_health),
+    }
+
+    def run_section(name):
+        execute, formatter = sections[name]
+        section_start = time.time()
+        section = {'report': None, 'error': None}
         try:
-            # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOpsGPT/{environment}'
-            )
-            return response['Parameter']['Value']
+            section['report'] = formatter(execute())
         except Exception as e:
-            raise Exception(f"Failed to get dev secret name from Parameter Store: {str(e)}")
-    else:
+            print(f"Error running {name}: {str(e)}")
+            section['error'] = str(e)
+        section['elapsed_seconds'] = time.time() - section_start
+        return name, section
+
+    start_time = time.time()
+    # Once up front, so the concurrent sections only need read-only connections
+    ensure_pg_stat_statements(secret_name)
+    # One connection per running section; never more than the pool can hand out
+    max_workers = min(len(sections), connection_manager.max_connections)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(executor.map(run_section, sections))
+
+    return {
+        'sections': results,
+        'total_seconds': time.time() - start_time
+    }
+
+def format_results_for_full_diagnostic(results):
+    """Format the combined diagnostic report in a human-readable string"""
+    output = "Full Database Diagnostic Report\n\n"
+    output += f"Total time: {results['total_seconds']:.2f} seconds\n"
+    output += "Section timings:\n"
+    for name, section in results['sections'].items():
+        status = "failed" if section['error'] else "ok"
+        output += f"- {name}: {section['elapsed_seconds']:.2f} seconds ({status})\n"
+    output += "\n"
+
+    for name, section in results['sections'].items():
+        output += "=" * 60 + "\n"
+        if section['error']:
+            output += f"{name}: Error: {section['error']}\n\n"
+        else:
+            output += section['report'] + "\n"
+
+    return output
+
+def get_env_secret(environment):
+    """Retrieve the secret name for the specified environment"""
+    print("in get_env_secret")
+    if environment not in ('prod', 'dev'):
         print("environement does not exist")
         raise ValueError(f"Unknown environment: {environment}")
+    parameter_name = f'/AuroraOpsGPT/{environment}'
+    try:
+        # Get the secret name from Parameter Store
+        return connection_manager.get_parameter(parameter_name)
+    except Exception as e:
+        raise Exception(f"Failed to get {environment} secret name from Parameter Store: {str(e)}")
 
 def lambda_handler(event, context):
     try:
@@ -1222,6 +1220,10 @@ def lambda_handler(event, context):
             print("Executing system_health")
             results = execute_system_health(secret_name)
             formatted_output = format_results_for_system_health(results)
+        elif action_type == 'full_diagnostic':
+            print("Executing full_diagnostic")
+            results = execute_full_diagnostic(secret_name, min_exec_time)
+            formatted_output = format_results_for_full_diagnostic(results)
         else:
             return {
                 "functionResponse": {
@@ -1229,6 +1231,7 @@ def lambda_handler(event, context):
                 }
             }
 
+        print(f"Connection pool metrics: {connection_manager.metrics()}")
         response_body = {
         'TEXT': {
             'body': formatted_output
@@ -0,0 +1,269 @@
+"""
+EXPLAIN plan cache and plan comparison for the DB performance analyzer.
+
+Plans are keyed by database secret, plan type and the literal-free query
+fingerprint from sql_validator, so the same query shape is only EXPLAINed
+(and ANALYZEd) once per cache lifetime. The cache lives in process memory with
+LRU eviction, which keeps it warm across invocations of one Lambda container;
+setting DB_PLAN_CACHE_PATH stores plans in a local SQLite file instead, for
+local runs that should keep plans between processes.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import zip_longest
+
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_TTL_SECONDS = int(os.environ.get('DB_PLAN_CACHE_TTL', '3600'))
+PLAN_CACHE_MAX_ENTRIES = int(os.environ.get('DB_PLAN_CACHE_MAX_ENTRIES', '256'))
+PLAN_CACHE_PATH = os.environ.get('DB_PLAN_CACHE_PATH')
+
+# Relative change in a node's estimated cost or rows reported by diff_plans
+CHANGE_THRESHOLD = 0.2
+
+
+class MemoryPlanStore:
+    """Thread-safe in-process LRU of plan entries"""
+
+    def __init__(self, max_entries=PLAN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLitePlanStore:
+    """Plan entries in a local SQLite file, shared between processes"""
+
+    def __init__(self, path, max_entries=PLAN_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            " key TEXT PRIMARY KEY, entry TEXT NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT entry FROM plans WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE plans SET used_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, entry):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plans (key, entry, used_at) VALUES (?, ?, ?)",
+                (key, json.dumps(entry), time.time())
+            )
+            # Least recently used entries beyond the limit
+            self._conn.execute(
+                "DELETE FROM plans WHERE key NOT IN "
+                "(SELECT key FROM plans ORDER BY used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+
+class PlanCache:
+    """
+    EXPLAIN output cached by (secret, plan type, query fingerprint).
+
+    An entry holds the plan JSON from EXPLAIN (ANALYZE or GENERIC_PLAN,
+    BUFFERS), the plain EXPLAIN estimate, the query text it was captured for
+    and the capture time. Entries older than `ttl` seconds are ignored, since
+    plans drift as table statistics change.
+    """
+
+    def __init__(self, store, ttl=PLAN_CACHE_TTL_SECONDS):
+        self.store = store
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(secret_name, fingerprint, is_generic_plan):
+        plan_type = 'generic' if is_generic_plan else 'analyzed'
+        return f"{secret_name}:{plan_type}:{fingerprint}"
+
+    def get(self, key):
+        """Return the cached entry for key, or None if missing or expired"""
+        entry = self.store.get(key)
+        if entry is None or entry['captured_at'] + self.ttl < time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, query, plan, estimated_plan):
+        entry = {
+            'query': query,
+            'plan': plan,
+            'estimated_plan': estimated_plan,
+            'captured_at': time.time(),
+        }
+        self.store.put(key, entry)
+        return entry
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.store)}
+
+
+def captured_at_iso(entry):
+    """Capture time of a cache entry as an ISO 8601 string"""
+    return datetime.fromtimestamp(entry['captured_at'], timezone.utc).isoformat()
+
+
+def _node_label(node):
+    label = node.get('Node Type', 'Unknown')
+    if node.get('Relation Name'):
+        label += f" on {node['Relation Name']}"
+    if node.get('Index Name'):
+        label += f" using {node['Index Name']}"
+    return label
+
+
+def _node_buffers(node):
+    """Shared buffer counters recorded for a node by EXPLAIN (ANALYZE, BUFFERS)"""
+    return {
+        name: node[f'Shared {name.title()} Blocks']
+        for name in ('hit', 'read')
+        if f'Shared {name.title()} Blocks' in node
+    }
+
+
+def _relative_change(old, new):
+    if old is None or new is None:
+        return None
+    if old == 0:
+        return 0.0 if new == 0 else None
+    return (new - old) / old
+
+
+def diff_plans(baseline_plan, new_plan, threshold=CHANGE_THRESHOLD):
+    """
+    Compare two plan trees node by node
+
+    Nodes are paired by position in the tree. For each pair the estimated
+    cost and rows are compared; the baseline's measured buffers, time and rows
+    (when it was captured with ANALYZE) are attached so a changed node can be
+    judged without running the new plan.
+
+    Args:
+        baseline_plan (dict): Cached plan JSON (the object holding 'Plan')
+        new_plan (dict): Freshly EXPLAINed plan JSON
+        threshold (float): Relative change in cost or rows worth reporting
+
+    Returns:
+        dict: total_cost, shape_changed, nodes (every paired node), changes
+        (nodes added, removed, replaced or past the threshold), regressions
+        (changes where the estimated cost went up)
+    """
+    diff = {
+        'total_cost': {
+            'baseline': baseline_plan['Plan'].get('Total Cost'),
+            'new': new_plan['Plan'].get('Total Cost'),
+            'change': _relative_change(
+                baseline_plan['Plan'].get('Total Cost'), new_plan['Plan'].get('Total Cost')
+            ),
+        },
+        'shape_changed': False,
+        'nodes': [],
+        'changes': [],
+        'regressions': [],
+    }
+
+    def walk(old, new, path):
+        if old is None or new is None:
+            diff['shape_changed'] = True
+            node = {
+                'path': path,
+                'status': 'added' if old is None else 'removed',
+                'baseline': _node_label(old) if old else None,
+                'new': _node_label(new) if new else None,
+            }
+            diff['nodes'].append(node)
+            diff['changes'].append(node)
+            return
+
+        node = {
+            'path': path,
+            'baseline': _node_label(old),
+            'new': _node_label(new),
+            'cost': (old.get('Total Cost'), new.get('Total Cost')),
+            'rows': (old.get('Plan Rows'), new.get('Plan Rows')),
+            'cost_change': _relative_change(old.get('Total Cost'), new.get('Total Cost')),
+            'rows_change': _relative_change(old.get('Plan Rows'), new.get('Plan Rows')),
+            'baseline_buffers': _node_buffers(old),
+            'baseline_actual_time_ms': old.get('Actual Total Time'),
+            'baseline_actual_rows': old.get('Actual Rows'),
+        }
+        if node['baseline'] != node['new']:
+            diff['shape_changed'] = True
+            node['status'] = 'replaced'
+        elif any(change is not None and abs(change) > threshold
+                 for change in (node['cost_change'], node['rows_change'])):
+            node['status'] = 'changed'
+        else:
+            node['status'] = 'unchanged'
+        diff['nodes'].append(node)
+
+        if node['status'] != 'unchanged':
+            diff['changes'].append(node)
+            if (node['cost_change'] or 0) > threshold:
+                diff['regressions'].append(node)
+
+        for index, (old_child, new_child) in enumerate(
+                zip_longest(old.get('Plans', []), new.get('Plans', []))):
+            walk(old_child, new_child, f"{path}.{index}")
+
+    walk(baseline_plan['Plan'], new_plan['Plan'], '0')
+    return diff
+
+
+def _create_plan_cache():
+    if PLAN_CACHE_PATH:
+        try:
+            return PlanCache(SQLitePlanStore(PLAN_CACHE_PATH))
+        except sqlite3.Error as e:
+            logger.warning(f"Plan cache file unusable, keeping plans in memory: {str(e)}")
+    return PlanCache(MemoryPlanStore())
+
+
+# Module-level cache so plans survive warm invocations
+plan_cache = _create_plan_cache()
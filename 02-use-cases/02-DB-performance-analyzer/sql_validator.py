@@ -0,0 +1,209 @@
+"""
+Read-only SQL validation for the DB performance analyzer Lambdas.
+
+A query is tokenized once, left to right. The same pass splits it into
+statements, skips string literals, quoted identifiers, dollar-quoted bodies and
+comments, and applies the read-only checks to the remaining keywords, so
+validation is linear in the length of the query. The same tokenizer also
+normalizes queries into literal-free fingerprints for the plan cache.
+"""
+import hashlib
+import re
+
+# Commands a statement may start with
+ALLOWED_COMMANDS = {'select', 'show'}
+
+# Keywords that may not appear anywhere outside literals and comments
+PROHIBITED_KEYWORDS = {
+    'insert', 'update', 'delete', 'drop', 'truncate', 'alter',
+    'create', 'grant', 'revoke', 'execute', 'copy'
+}
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<line_comment>--[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<literal>
+        [eE]'(?:[^'\\]|\\.|'')*'        # escape string, E'it\'s'
+      | '(?:[^']|'')*'                  # standard string, 'it''s'
+      | "(?:[^"]|"")*"                  # quoted identifier
+    )
+  | (?P<dollar_quote>\$(?:[^\W\d]\w*)?\$)
+  | (?P<unterminated>[eE]?['"])
+  | (?P<word>[^\W\d][\w$]*)
+  | (?P<semicolon>;)
+  | (?P<other>\w+|.)
+""", re.VERBOSE | re.DOTALL)
+
+_BLOCK_COMMENT_RE = re.compile(r'/\*|\*/')
+
+
+def _skip_block_comment(text, pos):
+    """Return the position after the (possibly nested) comment opened at pos"""
+    depth = 0
+    for match in _BLOCK_COMMENT_RE.finditer(text, pos):
+        depth += 1 if match.group() == '/*' else -1
+        if depth == 0:
+            return match.end()
+    raise ValueError("Unterminated /* comment")
+
+
+def _skip_dollar_quote(text, match):
+    """Return the position after the dollar-quoted string opened by match"""
+    tag = match.group()
+    end = text.find(tag, match.end())
+    if end < 0:
+        raise ValueError(f"Unterminated dollar-quoted string {tag}")
+    return end + len(tag)
+
+
+def _check_statement(first_word, prohibited):
+    if first_word not in ALLOWED_COMMANDS:
+        raise ValueError(f"Prohibited operation detected: {first_word}")
+    if prohibited:
+        raise ValueError(f"Statement contains prohibited operation: {prohibited}")
+
+
+def validate_query(query):
+    """
+    Validate query for security concerns and split into statements
+
+    Statements are separated by semicolons outside literals and comments. Each
+    must start with SELECT or SHOW (a leading parenthesis is allowed) and may
+    not contain a prohibited keyword outside string literals, quoted
+    identifiers, dollar-quoted strings and comments. Statements that hold only
+    comments are dropped.
+
+    Args:
+        query (str): SQL query to validate
+
+    Returns:
+        list: List of validated statements, without the terminating semicolon
+        or trailing comments
+
+    Raises:
+        ValueError: If query contains prohibited operations or an unterminated
+        literal or comment
+    """
+    if not query or not isinstance(query, str):
+        raise ValueError("Query must be a non-empty string")
+
+    statements = []
+    # Per statement: where it starts, where its last significant token ends,
+    # its command word and the first prohibited keyword found in it
+    start = None
+    end = None
+    first_word = None
+    prohibited = None
+
+    pos = 0
+    length = len(query)
+    while pos < length:
+        match = _TOKEN_RE.match(query, pos)
+        kind = match.lastgroup
+        token_end = match.end()
+
+        if kind == 'space':
+            pos = token_end
+            continue
+        if kind == 'unterminated':
+            raise ValueError("Unterminated quoted string or identifier")
+        if kind == 'semicolon':
+            if first_word is not None:
+                _check_statement(first_word, prohibited)
+                statements.append(query[start:end])
+            start = end = first_word = prohibited = None
+            pos = token_end
+            continue
+
+        if kind == 'block_comment':
+            token_end = _skip_block_comment(query, pos)
+        elif kind == 'dollar_quote':
+            token_end = _skip_dollar_quote(query, match)
+
+        if start is None:
+            # Leading comments stay with the statement (e.g. planner hints)
+            start = pos
+        if kind not in ('line_comment', 'block_comment'):
+            end = token_end
+            if kind == 'word':
+                word = match.group().lower()
+                if first_word is None:
+                    first_word = word
+                elif prohibited is None and word in PROHIBITED_KEYWORDS:
+                    prohibited = word
+            elif first_word is None and match.group() != '(':
+                first_word = query[pos:token_end].lower()
+        pos = token_end
+
+    if first_word is not None:
+        _check_statement(first_word, prohibited)
+        statements.append(query[start:end])
+
+    return statements
+
+
+def statement_command(statement):
+    """
+    Return the command word of a statement (e.g. 'select'), lower-cased
+
+    Leading whitespace, comments and opening parentheses are skipped, the same
+    way validate_query finds the command it checks. Returns None for a
+    statement that holds none.
+    """
+    pos = 0
+    length = len(statement)
+    while pos < length:
+        match = _TOKEN_RE.match(statement, pos)
+        kind = match.lastgroup
+        if kind == 'block_comment':
+            pos = _skip_block_comment(statement, pos)
+        elif kind in ('space', 'line_comment') or match.group() == '(':
+            pos = match.end()
+        else:
+            return match.group().lower()
+    return None
+
+
+def normalize_query(query):
+    """
+    Reduce a query to its shape: comments dropped, literals and numbers
+    replaced by ?, unquoted words lower-cased and whitespace collapsed
+
+    Queries that differ only in constants, comments, case or layout
+    normalize to the same text.
+
+    Raises:
+        ValueError: If query contains an unterminated literal or comment
+    """
+    parts = []
+    pos = 0
+    length = len(query)
+    while pos < length:
+        match = _TOKEN_RE.match(query, pos)
+        kind = match.lastgroup
+        token = match.group()
+        pos = match.end()
+
+        if kind == 'unterminated':
+            raise ValueError("Unterminated quoted string or identifier")
+        if kind == 'block_comment':
+            pos = _skip_block_comment(query, match.start())
+        elif kind == 'dollar_quote':
+            pos = _skip_dollar_quote(query, match)
+            parts.append('?')
+        elif kind == 'literal':
+            # Quoted identifiers are names, not constants
+            parts.append(token if token.startswith('"') else '?')
+        elif kind == 'word':
+            parts.append(token.lower())
+        elif kind == 'other':
+            parts.append('?' if token[0].isdigit() else token)
+        elif kind == 'semicolon':
+            parts.append(token)
+    return ' '.join(parts).rstrip(' ;')
+
+
+def fingerprint_query(query):
+    """Stable hash of normalize_query(query), for caching by query shape"""
+    return hashlib.sha256(normalize_query(query).encode('utf-8')).hexdigest()[:32]
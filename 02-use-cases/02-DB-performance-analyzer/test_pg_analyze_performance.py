@@ -0,0 +1,259 @@
+"""
+Tests for the query and DDL helpers of the performance analyzer Lambda,
+against fake connections (no database needed)
+"""
+import importlib.util
+import io
+import os
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    'pg_analyze_performance',
+    os.path.join(os.path.dirname(__file__), 'pg-analyze-performance.py')
+)
+pg_analyze_performance = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pg_analyze_performance)
+
+
+class FakeCursor:
+    """Answers each statement except SET with the connection's next result"""
+
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.columns = []
+        self.rows = []
+        self.description = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.executed.append((self.name, query, params))
+        if query.startswith('SET'):
+            return
+        self.columns, self.rows = self.conn.results.pop(0)
+        # Like psycopg2, a named cursor describes its columns only after a fetch
+        if self.name is None:
+            self.description = [(col,) for col in self.columns]
+
+    def fetchall(self):
+        return self.fetchmany(len(self.rows))
+
+    def fetchmany(self, size):
+        self.description = [(col,) for col in self.columns]
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.conn.fetched += len(batch)
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, *results):
+        """results: one (columns, rows) pair per statement, in order"""
+        self.results = list(results)
+        self.executed = []
+        self.fetched = 0
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+
+DDL_COLUMNS = ['object_schema', 'name', 'object_type', 'definition', 'description', 'return_type', 'qualifier']
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    """Serve results from a fake connection instead of the pool"""
+    def install(*results):
+        conn = FakeConnection(*results)
+        monkeypatch.setattr(pg_analyze_performance, 'connect_to_db', lambda secret_name: conn)
+        monkeypatch.setattr(pg_analyze_performance, 'release_db_connection', lambda conn: None)
+        return conn
+    return install
+
+
+def ddl_row(object_type, name, qualifier=None, schema='public', return_type=None):
+    return (schema, name, object_type, f'-- {object_type} {name}', None, return_type, qualifier)
+
+
+def test_bulk_query_combines_requested_types():
+    query = pg_analyze_performance.build_bulk_ddl_query(['table', 'function'])
+    assert query.count('UNION ALL') == 1
+    assert query.endswith('ORDER BY 3, 1, 2, 7')
+    for object_type in ('table', 'function'):
+        for suffix in ('schema', 'schemas', 'names'):
+            assert f'%({object_type}_{suffix})s' in query
+    assert '%(view_schema)s' not in query
+
+
+def test_bulk_query_escapes_literal_percent_signs():
+    # psycopg2 substitutes parameters the way % does with a mapping
+    params = {
+        f'{object_type}_{suffix}': 'x'
+        for object_type in pg_analyze_performance.bulk_queries
+        for suffix in ('schema', 'schemas', 'names')
+    }
+    query = pg_analyze_performance.build_bulk_ddl_query(list(pg_analyze_performance.bulk_queries))
+    rendered = query % params
+    assert "'CREATE SEQUENCE %I.%I" in rendered
+    assert "'CREATE TABLE %I.%I (" in rendered
+
+
+@pytest.mark.parametrize('pattern, value, expected', [
+    ('orders', 'orders', True),
+    ('orders', 'ORDERS', True),
+    ('orders', 'orders_archive', False),
+    ('orders%', 'orders_archive', True),
+    ('%audit%', 'orders_audit_log', True),
+    ('order_', 'orders', True),
+    ('order_', 'order', False),
+    ('a.b', 'axb', False),
+    ('100%', '100 percent', True),
+])
+def test_ilike_matches(pattern, value, expected):
+    assert pg_analyze_performance.ilike_matches(pattern, value) is expected
+
+
+def test_bulk_ddl_keeps_objects_that_share_a_name(connect):
+    connect((DDL_COLUMNS, [
+        ddl_row('FUNCTION', 'add', '(integer, integer)', return_type='integer'),
+        ddl_row('FUNCTION', 'add', '(numeric, numeric)', return_type='numeric'),
+        ddl_row('PROCEDURE', 'archive', '()'),
+        ddl_row('TRIGGER', 'audit', ' ON orders'),
+        ddl_row('TRIGGER', 'audit', ' ON customers'),
+    ]))
+    results = pg_analyze_performance.extract_database_objects_ddl('secret', objects=[
+        ('function', 'public', 'add'),
+        ('procedure', 'public', 'archive'),
+        ('trigger', 'public', 'audit'),
+    ])
+    assert list(results) == [
+        'function:public.add(integer, integer)',
+        'function:public.add(numeric, numeric)',
+        'procedure:public.archive()',
+        'trigger:public.audit ON orders',
+        'trigger:public.audit ON customers',
+    ]
+    result = results['function:public.add(numeric, numeric)']
+    assert result['object_name'] == 'public.add'
+    assert result['return_type'] == 'numeric'
+    assert 'qualifier' not in result
+    assert 'return_type' not in results['trigger:public.audit ON orders']
+
+
+def test_bulk_ddl_reports_requests_without_a_match(connect):
+    conn = connect((DDL_COLUMNS, [ddl_row('TABLE', 'Orders_2024')]))
+    results = pg_analyze_performance.extract_database_objects_ddl('secret', objects=[
+        {'object_type': 'Table', 'object_schema': 'public', 'object_name': 'orders%'},
+        {'object_type': 'table', 'object_schema': 'sales', 'object_name': 'orders%'},
+        {'object_type': 'view', 'object_schema': 'public', 'object_name': 'missing'},
+    ])
+    assert list(results) == ['table:public.Orders_2024', 'table:sales.orders%', 'view:public.missing']
+    assert results['table:sales.orders%'] == "No matching objects found"
+    assert results['view:public.missing'] == "No matching objects found"
+
+    _, _, params = conn.executed[0]
+    assert params['table_schemas'] == ['public', 'sales']
+    assert params['table_names'] == ['orders%', 'orders%']
+    assert params['view_names'] == ['missing']
+    assert params['table_schema'] is None
+
+
+def test_bulk_ddl_schema_requests_every_type(connect):
+    conn = connect((DDL_COLUMNS, []))
+    assert pg_analyze_performance.extract_database_objects_ddl('secret', object_schema='public') == {}
+    _, _, params = conn.executed[0]
+    assert {k for k in params if k.endswith('_schema')} == {
+        f'{object_type}_schema' for object_type in pg_analyze_performance.bulk_queries
+    }
+
+
+@pytest.mark.parametrize('objects', [
+    None,
+    [('table', 'public')],
+    [('table', 'public', '')],
+    [('rule', 'public', 'r1')],
+])
+def test_bulk_ddl_rejects_invalid_requests(objects):
+    with pytest.raises(ValueError):
+        pg_analyze_performance.extract_database_objects_ddl('secret', objects=objects)
+
+
+def rendered(columns, rows):
+    out = io.StringIO()
+    pg_analyze_performance.write_result_table(out, columns, rows)
+    return out.getvalue().encode('utf-8')
+
+
+def test_fetch_rows_stops_at_the_row_limit():
+    conn = FakeConnection((['id', 'name'], [(i, f'n{i}') for i in range(250)]))
+    fetched = pg_analyze_performance.fetch_rows(conn, 'select', 20, 10_000, cursor_name='c1')
+    assert fetched['truncated'] == 'rows'
+    assert fetched['columns'] == ['id', 'name']
+    assert fetched['rows'][0] == {'id': '0', 'name': 'n0'}
+    assert len(fetched['rows']) == 20
+    # One row beyond the limit is read to tell that the result was cut
+    assert conn.fetched == 21
+    assert conn.executed == [('c1', 'select', None)]
+
+
+def test_fetch_rows_charges_the_budget_on_the_rendered_table():
+    rows = [(1, 'x' * 400)] + [(i, 'short') for i in range(2, 50)]
+    conn = FakeConnection((['id', 'note'], rows))
+    fetched = pg_analyze_performance.fetch_rows(conn, 'select', None, 4000, cursor_name='c1')
+
+    # Every row is padded to the wide note, so only a few fit
+    assert fetched['truncated'] == 'bytes'
+    assert len(fetched['rows']) == 7
+    table = rendered(fetched['columns'], fetched['rows'])
+    assert len(table) == fetched['bytes'] <= 4000
+
+
+def test_fetch_rows_counts_multibyte_characters():
+    conn = FakeConnection((['naïve'], [('café',), ('日本語テキスト',), ('a',)]))
+    fetched = pg_analyze_performance.fetch_rows(conn, 'select', None, 10_000, cursor_name='c1')
+    assert fetched['truncated'] is None
+    assert len(rendered(fetched['columns'], fetched['rows'])) == fetched['bytes']
+
+
+def test_fetch_rows_cuts_wide_values():
+    conn = FakeConnection((['doc'], [('y' * 2000,)]))
+    fetched = pg_analyze_performance.fetch_rows(conn, 'select', None, 10_000, cursor_name='c1')
+    cell = fetched['rows'][0]['doc']
+    assert cell.startswith('y' * pg_analyze_performance.MAX_CELL_CHARS)
+    assert cell.endswith('... [1500 more characters]')
+
+
+def test_fetch_rows_show_uses_a_client_cursor():
+    conn = FakeConnection((['name', 'setting'], [(f'p{i}', 'on') for i in range(150)]))
+    fetched = pg_analyze_performance.fetch_rows(conn, 'SHOW ALL', None, 100_000)
+    assert fetched['truncated'] is None
+    assert len(fetched['rows']) == 150
+    assert conn.executed == [(None, 'SHOW ALL', None)]
+
+
+def test_fetch_rows_without_rows_charges_the_header():
+    conn = FakeConnection((['id'], []))
+    fetched = pg_analyze_performance.fetch_rows(conn, 'select', 5, 10_000, cursor_name='c1')
+    assert fetched == {'columns': ['id'], 'rows': [], 'bytes': len(rendered(['id'], [])), 'truncated': None}
+
+
+def test_formatted_response_stays_near_the_budget(connect):
+    settings = [('work_mem', 'z' * 450)] + [(f'setting_{i}', 'on') for i in range(200)]
+    connect((['name', 'setting'], settings), (['name', 'setting'], settings))
+    results = pg_analyze_performance.validate_and_execute_queries(
+        'secret', 'SHOW ALL; SHOW ALL', max_rows=500, max_total_bytes=8000
+    )
+    assert [r['message'] for r in results['results']] == [
+        "Results truncated. Maximum output size (8000 bytes) reached"
+    ] * 2
+    text = pg_analyze_performance.format_enhanced_results(results)
+    # Only the request summary at the top is outside the budget
+    assert len(text.encode('utf-8')) <= 8000 + 200
@@ -0,0 +1,95 @@
+"""
+Tests for the EXPLAIN plan cache and plan comparison
+"""
+import time
+
+from plan_cache import MemoryPlanStore, PlanCache, SQLitePlanStore, diff_plans
+
+
+def make_plan(root_type='Hash Join', scan_type='Seq Scan', scan_cost=100.0, scan_rows=1000):
+    return {'Plan': {
+        'Node Type': root_type, 'Total Cost': scan_cost + 50.0, 'Plan Rows': 10,
+        'Plans': [
+            {'Node Type': scan_type, 'Relation Name': 'orders', 'Total Cost': scan_cost,
+             'Plan Rows': scan_rows, 'Actual Total Time': 12.5, 'Actual Rows': 900,
+             'Shared Hit Blocks': 40, 'Shared Read Blocks': 7},
+            {'Node Type': 'Hash', 'Total Cost': 10.0, 'Plan Rows': 20},
+        ]
+    }}
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryPlanStore(max_entries=2)
+    store.put('a', 1)
+    store.put('b', 2)
+    store.get('a')
+    store.put('c', 3)
+    assert store.get('b') is None
+    assert store.get('a') == 1 and store.get('c') == 3
+
+
+def test_sqlite_store_round_trip_and_eviction(tmp_path):
+    path = str(tmp_path / 'plans.db')
+    store = SQLitePlanStore(path, max_entries=2)
+    store.put('a', {'plan': [1]})
+    store.put('b', {'plan': [2]})
+    store.put('c', {'plan': [3]})
+    reopened = SQLitePlanStore(path)
+    assert len(reopened) == 2
+    assert reopened.get('a') is None
+    assert reopened.get('c') == {'plan': [3]}
+
+
+def test_plan_cache_expires_entries():
+    cache = PlanCache(MemoryPlanStore(), ttl=60)
+    key = PlanCache.key('secret', 'abc', False)
+    assert cache.get(key) is None
+    entry = cache.put(key, 'select 1', [make_plan()], [make_plan()])
+    assert cache.get(key) == entry
+    entry['captured_at'] = time.time() - 61
+    assert cache.get(key) is None
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 1}
+
+
+def test_keys_separate_databases_and_plan_types():
+    keys = {
+        PlanCache.key('prod', 'abc', False),
+        PlanCache.key('dev', 'abc', False),
+        PlanCache.key('prod', 'abc', True),
+    }
+    assert len(keys) == 3
+
+
+def test_identical_plans_have_no_changes():
+    diff = diff_plans(make_plan(), make_plan())
+    assert not diff['shape_changed']
+    assert diff['changes'] == [] and diff['regressions'] == []
+    assert [node['path'] for node in diff['nodes']] == ['0', '0.0', '0.1']
+
+
+def test_cost_regression_reports_baseline_measurements():
+    diff = diff_plans(make_plan(), make_plan(scan_cost=300.0))
+    assert not diff['shape_changed']
+    assert [node['path'] for node in diff['regressions']] == ['0', '0.0']
+    scan = diff['regressions'][1]
+    assert scan['cost_change'] == 2.0
+    assert scan['baseline_buffers'] == {'hit': 40, 'read': 7}
+    assert scan['baseline_actual_time_ms'] == 12.5
+
+
+def test_small_changes_stay_below_threshold():
+    diff = diff_plans(make_plan(), make_plan(scan_cost=110.0, scan_rows=1100))
+    assert diff['changes'] == []
+
+
+def test_shape_changes():
+    replaced = diff_plans(make_plan(), make_plan(scan_type='Index Scan'))
+    assert replaced['shape_changed']
+    assert replaced['changes'][0]['status'] == 'replaced'
+
+    new_plan = make_plan()
+    new_plan['Plan']['Plans'].pop()
+    removed = diff_plans(make_plan(), new_plan)
+    assert removed['changes'][0] == {
+        'path': '0.1', 'status': 'removed', 'baseline': 'Hash', 'new': None
+    }
@@ -0,0 +1,144 @@
+"""
+Tests for the read-only SQL validator shared by the analyzer Lambdas
+"""
+import pytest
+
+from sql_validator import fingerprint_query, normalize_query, statement_command, validate_query
+
+
+def test_single_statement():
+    assert validate_query("SELECT * FROM orders") == ["SELECT * FROM orders"]
+
+
+def test_splits_statements_and_drops_semicolons():
+    query = "SELECT 1; SHOW work_mem;\n  select 2 ;"
+    assert validate_query(query) == ["SELECT 1", "SHOW work_mem", "select 2"]
+
+
+def test_semicolon_inside_string_does_not_split():
+    query = "SELECT 'a;b' AS x; SELECT 'it''s; fine'"
+    assert validate_query(query) == ["SELECT 'a;b' AS x", "SELECT 'it''s; fine'"]
+
+
+def test_semicolon_inside_quoted_identifier_does_not_split():
+    assert validate_query('SELECT 1 AS "odd;name"') == ['SELECT 1 AS "odd;name"']
+
+
+def test_escape_string_with_backslash_quote():
+    query = r"SELECT E'it\'s; here' AS x; SELECT 2"
+    assert validate_query(query) == [r"SELECT E'it\'s; here' AS x", "SELECT 2"]
+
+
+def test_dollar_quoted_string():
+    query = "SELECT $tag$ ; delete 'x' $$ $tag$ AS body; SELECT $$;$$"
+    assert validate_query(query) == [
+        "SELECT $tag$ ; delete 'x' $$ $tag$ AS body",
+        "SELECT $$;$$",
+    ]
+
+
+def test_positional_parameter_is_not_a_dollar_quote():
+    assert validate_query("SELECT $1; SELECT $2") == ["SELECT $1", "SELECT $2"]
+
+
+def test_semicolons_in_comments_do_not_split():
+    query = "SELECT 1 -- one; two\n, 2 /* three; four */ AS y"
+    assert validate_query(query) == [query]
+
+
+def test_nested_block_comment():
+    query = "SELECT 1 /* outer /* inner; */ still comment; drop */ AS z"
+    assert validate_query(query) == [query]
+
+
+def test_leading_comment_kept_trailing_comment_dropped():
+    query = "/*+ SeqScan(t) */ SELECT * FROM t -- note\n; -- done"
+    assert validate_query(query) == ["/*+ SeqScan(t) */ SELECT * FROM t"]
+
+
+def test_parenthesized_select_and_no_space_after_keyword():
+    assert validate_query("(SELECT 1)") == ["(SELECT 1)"]
+    assert validate_query("select*from t") == ["select*from t"]
+
+
+def test_keywords_in_literals_and_identifiers_are_allowed():
+    statement = "SELECT 'drop table x', \"delete\", update_count, $$insert$$ FROM audit"
+    assert validate_query(statement + " -- truncate\n") == [statement]
+
+
+@pytest.mark.parametrize("query", [
+    "DELETE FROM orders",
+    "update orders set x = 1",
+    "WITH x AS (SELECT 1) SELECT * FROM x",
+    "SELECT 1; DROP TABLE orders",
+    "EXPLAIN SELECT 1",
+])
+def test_rejects_non_read_commands(query):
+    with pytest.raises(ValueError, match="Prohibited operation detected"):
+        validate_query(query)
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM t WHERE id IN (DELETE FROM t RETURNING id)",
+    "SELECT 1 FROM t; SELECT pg_catalog.execute()",
+    "SELECT 'a''b', x FROM t UNION SELECT copy FROM s",
+])
+def test_rejects_prohibited_keywords_in_select(query):
+    with pytest.raises(ValueError, match="Statement contains prohibited operation"):
+        validate_query(query)
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT 'unterminated",
+    'SELECT "unterminated',
+    "SELECT $x$ unterminated",
+    "SELECT 1 /* unterminated /* */",
+])
+def test_rejects_unterminated_literals_and_comments(query):
+    with pytest.raises(ValueError, match="Unterminated"):
+        validate_query(query)
+
+
+@pytest.mark.parametrize("query", [None, "", 42])
+def test_rejects_empty_or_non_string(query):
+    with pytest.raises(ValueError, match="non-empty string"):
+        validate_query(query)
+
+
+def test_comment_only_query_has_no_statements():
+    assert validate_query("-- nothing to run\n/* at all */") == []
+
+
+def test_large_input_is_linear():
+    statement = "SELECT 'a;b', \"c;d\", $$e;f$$ FROM t /* ; */ WHERE x = 1"
+    query = ";\n".join([statement] * 5000)
+    assert len(query) > 250_000
+    assert validate_query(query) == [statement] * 5000
+
+
+def test_normalize_query_strips_literals_comments_and_case():
+    assert normalize_query(
+        "SELECT * FROM t /* c */ WHERE a = 'x' AND b = 42 AND \"Col\" = $$q$$ -- d\n LIMIT 10;"
+    ) == 'select * from t where a = ? and b = ? and "Col" = ? limit ?'
+
+
+def test_fingerprint_ignores_constants_but_not_structure():
+    assert fingerprint_query("select * from t where id = 1") == \
+        fingerprint_query("SELECT *\n  FROM t WHERE id = 99  -- other id")
+    assert fingerprint_query("select * from t where id = 1") != \
+        fingerprint_query("select * from u where id = 1")
+    assert fingerprint_query('select "A" from t') != fingerprint_query('select "a" from t')
+
+
+@pytest.mark.parametrize('statement, command', [
+    ("select 1", 'select'),
+    ("-- note\nselect * from t", 'select'),
+    ("/* c /* nested */ */ SELECT 2", 'select'),
+    ("(\n  (select 1) union (select 2))", 'select'),
+    ("/* select */ show work_mem", 'show'),
+    ("-- only a comment", None),
+])
+def test_statement_command_skips_leading_comments(statement, command):
+    assert statement_command(statement) == command
+    for validated in validate_query(statement):
+        assert statement_command(validated) == command
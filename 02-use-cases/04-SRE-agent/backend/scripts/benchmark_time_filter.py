@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for per-request time filtering in the backend servers.
+
+Compares the previous approach (parse every record's timestamp and scan the
+whole list on each request) with the shared TimeIndex (timestamps parsed once,
+range resolved with two binary searches).
+
+Usage:
+    python backend/scripts/benchmark_time_filter.py --records 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "servers"))
+from time_index import TimeIndex, parse_timestamp  # noqa: E402
+
+
+def _linear_filter(records: list, start_time: str, end_time: str) -> list:
+    """Per-request filter as the servers implemented it before the TimeIndex"""
+    start_dt = parse_timestamp(start_time)
+    end_dt = parse_timestamp(end_time)
+    filtered = []
+    for record in records:
+        record_dt = parse_timestamp(record["timestamp"])
+        if record_dt < start_dt or record_dt > end_dt:
+            continue
+        filtered.append(record)
+    return filtered
+
+
+def _make_records(count: int) -> list:
+    base = datetime(2024, 1, 15, tzinfo=timezone.utc)
+    offsets = sorted(random.randint(0, 7 * 24 * 3600) for _ in range(count))
+    return [
+        {
+            "timestamp": (base + timedelta(seconds=offset)).strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z"
+            ),
+            "value": random.random(),
+        }
+        for offset in offsets
+    ]
+
+
+def _time_it(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time range filtering")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Generating {args.records:,} records...")
+    records = _make_records(args.records)
+    # A one-hour window in the middle of the week
+    start_time, end_time = "2024-01-18T12:00:00Z", "2024-01-18T13:00:00Z"
+
+    build_start = time.perf_counter()
+    index = TimeIndex(record["timestamp"] for record in records)
+    build_seconds = time.perf_counter() - build_start
+
+    linear = _time_it(
+        lambda: _linear_filter(records, start_time, end_time), args.repeat
+    )
+    indexed = _time_it(
+        lambda: [records[i] for i in index.ids_between(start_time, end_time)],
+        args.repeat,
+    )
+
+    matched = index.count_between(start_time, end_time)
+    assert matched == len(_linear_filter(records, start_time, end_time))
+
+    print(f"Matched records per request : {matched:,}")
+    print(f"TimeIndex build (once)      : {build_seconds * 1000:10.1f} ms")
+    print(f"Linear scan per request     : {linear * 1000:10.1f} ms")
+    print(f"TimeIndex per request       : {indexed * 1000:10.3f} ms")
+    print(f"Speed-up                    : {linear / indexed:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
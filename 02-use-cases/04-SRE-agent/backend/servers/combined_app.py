@@ -0,0 +1,167 @@
+import logging
+import multiprocessing
+import socket
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+
+class PortDispatcher:
+    """
+    ASGI app that serves several APIs from one process.
+
+    Each API keeps its own port (the OpenAPI specs and gateway targets stay
+    unchanged); a request is routed to the app that owns the local port it
+    arrived on. On startup every app's lifespan context is entered, and on
+    shutdown they are exited in reverse order.
+    """
+
+    def __init__(self, apps_by_port: Dict[int, object]) -> None:
+        self.apps_by_port = apps_by_port
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(scope, receive, send)
+            return
+
+        server = scope.get("server")
+        app = self.apps_by_port.get(server[1]) if server else None
+        if app is None:
+            if scope["type"] == "http":
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 404,
+                        "headers": [(b"content-type", b"application/json")],
+                    }
+                )
+                await send(
+                    {"type": "http.response.body", "body": b'{"error": "Unknown API port"}'}
+                )
+            return
+
+        await app(scope, receive, send)
+
+    async def _lifespan(self, scope, receive, send) -> None:
+        await receive()  # lifespan.startup
+        try:
+            async with AsyncExitStack() as stack:
+                try:
+                    for app in self.apps_by_port.values():
+                        state = await stack.enter_async_context(
+                            app.router.lifespan_context(app)
+                        )
+                        if state and "state" in scope:
+                            scope["state"].update(state)
+                except Exception as e:
+                    logging.error(f"Error starting combined APIs: {str(e)}")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+                await receive()  # lifespan.shutdown
+        except Exception as e:
+            logging.error(f"Error stopping combined APIs: {str(e)}")
+            await send({"type": "lifespan.shutdown.failed", "message": str(e)})
+            return
+        await send({"type": "lifespan.shutdown.complete"})
+
+
+def build_combined_app(ports: Dict[str, int]) -> PortDispatcher:
+    """Import every API server module and map its FastAPI app to its port"""
+    import k8s_server
+    import logs_server
+    import metrics_server
+    import runbooks_server
+
+    apps = {
+        "k8s": k8s_server.app,
+        "logs": logs_server.app,
+        "metrics": metrics_server.app,
+        "runbooks": runbooks_server.app,
+    }
+    return PortDispatcher({port: apps[name] for name, port in ports.items()})
+
+
+def bind_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    """Bind a listening TCP socket, optionally with SO_REUSEPORT"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_combined(
+    host: str,
+    ports: Dict[str, int],
+    workers: int = 1,
+    ssl_config: Optional[Dict[str, str]] = None,
+    sockets: Optional[List[socket.socket]] = None,
+) -> None:
+    """Run all APIs in this process on their own ports (one worker)"""
+    import uvicorn
+
+    from server import Server
+
+    config = uvicorn.Config(
+        build_combined_app(ports), host=host, workers=workers, **(ssl_config or {})
+    )
+    if sockets is None:
+        # Every worker binds its own listeners; the kernel balances
+        # connections between them
+        sockets = [
+            bind_socket(host, port, reuse_port=workers > 1) for port in ports.values()
+        ]
+
+    protocol = "https" if ssl_config else "http"
+    for name, port in ports.items():
+        logging.info(f"Serving {name} API on {protocol}://{host}:{port}")
+
+    Server(config).run(sockets=sockets)
+
+
+def run_combined(
+    host: str,
+    ports: Dict[str, int],
+    workers: int = 1,
+    ssl_config: Optional[Dict[str, str]] = None,
+) -> None:
+    """Serve all APIs from `workers` processes sharing the listening ports"""
+    if workers <= 1:
+        serve_combined(host, ports, 1, ssl_config)
+        return
+
+    sockets = None
+    if not hasattr(socket, "SO_REUSEPORT"):
+        # No SO_REUSEPORT (e.g. Windows): bind once here and hand the same
+        # sockets to every worker, which Server.startup shares per process
+        sockets = [bind_socket(host, port, reuse_port=False) for port in ports.values()]
+
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for _ in range(workers):
+        process = context.Process(
+            target=serve_combined, args=(host, ports, workers, ssl_config, sockets)
+        )
+        process.start()
+        processes.append(process)
+    logging.info(f"Started {workers} combined API workers")
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logging.info("Stopping combined API workers...")
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=5)
@@ -1,6 +1,5 @@
 import json
 import logging
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, List
 
@@ -15,6 +14,8 @@ from pydantic import BaseModel, Field
 from enum import Enum
 from fastapi.responses import JSONResponse
 
+from time_index import TimeSeries
+
 # Configure logging with basicConfig
 logging.basicConfig(
     level=logging.INFO,  # Set the log level to INFO
@@ -38,44 +39,8 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
-def _parse_timestamp(timestamp_str: str) -> datetime:
-    """Parse ISO timestamp string to datetime object"""
-    try:
-        # Handle both with and without timezone
-        if timestamp_str.endswith("Z"):
-            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        elif "+" in timestamp_str or timestamp_str.endswith("0"):
-            return datetime.fromisoformat(timestamp_str)
-        else:
-            return datetime.fromisoformat(timestamp_str + "+00:00")
-    except:
-        # Fallback: assume current time if parsing fails
-        return datetime.now(timezone.utc)
-
-
-def _filter_events_by_time(events: list, since: Optional[str] = None) -> list:
-    """Filter events by since timestamp"""
-    if not since:
-        return events
-
-    filtered_events = []
-    since_dt = _parse_timestamp(since)
-
-    for event in events:
-        event_timestamp = event.get("timestamp")
-        if not event_timestamp:
-            continue
-
-        try:
-            event_dt = _parse_timestamp(event_timestamp)
-
-            if event_dt >= since_dt:
-                filtered_events.append(event)
-        except:
-            # Include events with unparseable timestamps
-            filtered_events.append(event)
-
-    return filtered_events
+# Events with timestamps parsed once into a sorted time index
+EVENTS = TimeSeries(DATA_PATH / "events.json", "events")
 
 
 # Pydantic Models
@@ -333,17 +298,12 @@ async def get_cluster_events(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "events.json", "r") as f:
-            data = json.load(f)
-
-        events = data.get("events", [])
+        # Filter by since timestamp
+        events = EVENTS.between(start_time=since)
 
         if severity:
             events = [e for e in events if e.get("type") == severity]
 
-        # Filter by since timestamp
-        events = _filter_events_by_time(events, since)
-
         return EventsResponse(events=events)
     except Exception as e:
         logging.error(f"Error retrieving cluster events: {str(e)}")
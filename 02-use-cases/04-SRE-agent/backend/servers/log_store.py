@@ -0,0 +1,328 @@
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from time_index import TimeIndex
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Size of the backward chunks read by the tail reader
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def _tokenize(text: str) -> Set[str]:
+    """Split lowercased text into alphanumeric tokens"""
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+def _parse_log_line(line: str) -> dict:
+    """Parse a `<timestamp> [LEVEL] <service> <message>` line into a dict"""
+    parts = line.strip().split(" ", 3)
+    if len(parts) < 4:
+        return {"message": line.strip()}
+
+    timestamp, level_part, service, message = parts
+
+    # Extract log level from [LEVEL] format
+    level = "INFO"
+    if "[" in level_part and "]" in level_part:
+        level = level_part.strip("[]")
+
+    return {
+        "timestamp": timestamp,
+        "level": level,
+        "service": service,
+        "message": message,
+    }
+
+
+def iter_lines_reversed(
+    file_path: Path, block_size: int = TAIL_BLOCK_SIZE
+) -> Iterator[str]:
+    """
+    Yield the lines of a file from last to first.
+
+    The file is read backwards in fixed-size blocks, so the cost depends on
+    how many lines the caller consumes rather than on the file size.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        if position == 0:
+            return
+
+        remainder = b""
+        at_end = True
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            lines = (f.read(read_size) + remainder).split(b"\n")
+            # The first piece may be the tail of a line that starts in an
+            # earlier block; carry it over until that block is read
+            remainder = lines.pop(0)
+            if at_end and lines and lines[-1] == b"":
+                # Trailing newline does not start a new line
+                lines.pop()
+            at_end = False
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="replace")
+        yield remainder.decode("utf-8", errors="replace")
+
+
+def tail_log_file(
+    file_path: Path, limit: int, service: Optional[str] = None
+) -> List[dict]:
+    """Return the last `limit` entries of a text log, most recent first"""
+    recent = []
+    for line in iter_lines_reversed(file_path):
+        entry = _parse_log_line(line)
+        if service and service not in entry.get("service", ""):
+            continue
+        recent.append(entry)
+        if len(recent) >= limit:
+            break
+    return recent
+
+
+class LogStore:
+    """
+    In-memory, indexed view of a text application log.
+
+    The file is parsed once and then followed: every lookup checks the file
+    size and inode, reads only the bytes appended since the last refresh and
+    rebuilds from scratch when the file was truncated or rotated. A last line
+    still missing its newline is indexed as it reads now and replaced once the
+    rest of it is appended. Entries keep their file order (their position is
+    their id) and are indexed by level, service and message token, with a
+    TimeIndex for time ranges.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = Path(file_path)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._entries: List[dict] = []
+        self._lines: List[str] = []
+        self._by_level: Dict[str, Set[int]] = {}
+        self._by_service: Dict[str, Set[int]] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+        self._time_index = TimeIndex()
+        self._offset = 0
+        self._inode: Optional[int] = None
+        # Bytes of the last, not yet newline-terminated line, and whether it
+        # is indexed as the last entry
+        self._pending = b""
+        self._provisional = False
+
+    def refresh(self) -> None:
+        """Pick up appended lines, or reload if the file was truncated/rotated"""
+        with self._lock:
+            try:
+                stat = os.stat(self.file_path)
+            except FileNotFoundError:
+                if self._entries:
+                    logging.info(f"{self.file_path} disappeared, clearing log store")
+                    self._reset()
+                return
+
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                if self._inode is not None:
+                    logging.info(f"{self.file_path} was rotated, reloading log store")
+                self._reset()
+                self._inode = stat.st_ino
+
+            if stat.st_size == self._offset:
+                return
+
+            with open(self.file_path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read(stat.st_size - self._offset)
+            self._offset += len(chunk)
+
+            # Split before decoding, so a character cut by the end of a read
+            # is decoded once its line is complete
+            lines = (self._pending + chunk).split(b"\n")
+            # The last element is an incomplete line (or b"" after a trailing newline)
+            self._pending = lines.pop()
+            if self._provisional:
+                self._remove_last_line()
+            for line in lines:
+                self._add_line(line.decode("utf-8", errors="replace"))
+            self._provisional = bool(self._pending)
+            if self._provisional:
+                self._add_line(self._pending.decode("utf-8", errors="replace"))
+
+    def _add_line(self, line: str) -> None:
+        entry_id = len(self._entries)
+        entry = _parse_log_line(line)
+        lowered = line.strip().lower()
+
+        self._entries.append(entry)
+        self._lines.append(lowered)
+
+        for token in _tokenize(lowered):
+            self._by_token.setdefault(token, set()).add(entry_id)
+
+        if "level" in entry:
+            self._by_level.setdefault(entry["level"], set()).add(entry_id)
+        if "service" in entry:
+            self._by_service.setdefault(entry["service"], set()).add(entry_id)
+
+        self._time_index.add(entry_id, entry.get("timestamp"))
+
+    def _remove_last_line(self) -> None:
+        """Undo _add_line for the last entry"""
+        entry_id = len(self._entries) - 1
+        entry = self._entries.pop()
+        lowered = self._lines.pop()
+
+        postings = [(self._by_token, token) for token in _tokenize(lowered)]
+        if "level" in entry:
+            postings.append((self._by_level, entry["level"]))
+        if "service" in entry:
+            postings.append((self._by_service, entry["service"]))
+        for index, key in postings:
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    # A partial word must not stay in the vocabulary
+                    del index[key]
+
+        self._time_index.remove(entry_id, entry.get("timestamp"))
+
+    def _ids_matching_pattern(self, pattern: str) -> Set[int]:
+        needle = pattern.lower()
+        tokens = _tokenize(needle)
+        if tokens:
+            # Narrow candidates with the token index: a line containing the
+            # pattern must contain a vocabulary token that contains each
+            # pattern token. The substring check below keeps results exact.
+            candidates: Optional[Set[int]] = None
+            for token in tokens:
+                postings: Set[int] = set()
+                for word, ids in self._by_token.items():
+                    if token in word:
+                        postings |= ids
+                candidates = postings if candidates is None else candidates & postings
+                if not candidates:
+                    return set()
+        else:
+            candidates = set(range(len(self._entries)))
+
+        return {i for i in candidates if needle in self._lines[i]}
+
+    def _materialize(self, ids: Iterable[int]) -> List[dict]:
+        return [dict(self._entries[i]) for i in sorted(ids)]
+
+    def search(
+        self,
+        pattern: Optional[str] = None,
+        level: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """Return entries in file order matching every given filter"""
+        self.refresh()
+        with self._lock:
+            ids: Optional[Set[int]] = None
+            if level:
+                ids = set(self._by_level.get(level, ()))
+            if start_time or end_time:
+                in_range = set(self._time_index.ids_between(start_time, end_time))
+                ids = in_range if ids is None else ids & in_range
+            if pattern:
+                matching = self._ids_matching_pattern(pattern)
+                ids = matching if ids is None else ids & matching
+            if ids is None:
+                ids = set(range(len(self._entries)))
+
+            ordered = sorted(ids)
+            if limit is not None:
+                ordered = ordered[:limit]
+            return self._materialize(ordered)
+
+    def recent(self, limit: int, service: Optional[str] = None) -> List[dict]:
+        """Return the last `limit` entries, most recent first"""
+        self.refresh()
+        with self._lock:
+            if service:
+                ids: Set[int] = set()
+                for name, service_ids in self._by_service.items():
+                    if service in name:
+                        ids |= service_ids
+                ordered = sorted(ids)[-limit:]
+            else:
+                total = len(self._entries)
+                ordered = list(range(max(0, total - limit), total))
+            ordered.reverse()
+            return [dict(self._entries[i]) for i in ordered]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class JsonLogStore:
+    """
+    In-memory view of a JSON array log file (e.g. error.log).
+
+    The file is re-read only when its modification time or size changes.
+    Entries are indexed by service and by a TimeIndex.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = Path(file_path)
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._entries: List[dict] = []
+        self._by_service: Dict[str, List[int]] = {}
+        self._time_index = TimeIndex()
+
+    def refresh(self) -> None:
+        """Reload the file if it changed since the last load"""
+        with self._lock:
+            stat = os.stat(self.file_path)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return
+
+            with open(self.file_path, "r") as f:
+                entries = json.load(f)
+
+            by_service: Dict[str, List[int]] = {}
+            for entry_id, entry in enumerate(entries):
+                by_service.setdefault(entry.get("service"), []).append(entry_id)
+
+            self._entries = entries
+            self._by_service = by_service
+            self._time_index = TimeIndex(entry.get("timestamp") for entry in entries)
+            self._signature = signature
+
+    def query(
+        self, service: Optional[str] = None, since: Optional[str] = None
+    ) -> List[dict]:
+        """Return entries in file order for `service` at or after `since`"""
+        self.refresh()
+        with self._lock:
+            if service:
+                ids = set(self._by_service.get(service, ()))
+            else:
+                ids = set(range(len(self._entries)))
+            if since:
+                ids &= set(self._time_index.ids_between(start_time=since))
+            return [self._entries[i] for i in sorted(ids)]
@@ -1,6 +1,7 @@
 import json
 import logging
-from datetime import datetime, timezone
+import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
@@ -13,6 +14,8 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse
 
+from log_store import JsonLogStore, LogStore, tail_log_file
+
 # Configure logging with basicConfig
 logging.basicConfig(
     level=logging.INFO,  # Set the log level to INFO
@@ -20,13 +23,16 @@ logging.basicConfig(
     format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
 )
 
-app = FastAPI(title="Application Logs API", version="1.0.0")
-
 DATA_PATH = Path(__file__).parent.parent / "data" / "logs_data"
 
 # API Key for authentication
 EXPECTED_API_KEY = "test-key-123"
 
+# How /logs/recent is served: "tail" reads application.log backwards and stops
+# after `limit` matches (cost independent of file size), "index" answers from
+# the in-memory log store
+RECENT_LOGS_MODE = os.getenv("LOGS_RECENT_MODE", "tail")
+
 
 def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     """Validate API key from header"""
@@ -35,100 +41,23 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
-def _parse_timestamp(timestamp_str: str) -> datetime:
-    """Parse ISO timestamp string to datetime object"""
-    try:
-        # Handle both with and without timezone
-        if timestamp_str.endswith("Z"):
-            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        elif "+" in timestamp_str or timestamp_str.endswith("0"):
-            return datetime.fromisoformat(timestamp_str)
-        else:
-            return datetime.fromisoformat(timestamp_str + "+00:00")
-    except:
-        # Fallback: assume current time if parsing fails
-        return datetime.now(timezone.utc)
-
+# Parsed and indexed once, then followed incrementally as the files change
+application_log_store = LogStore(DATA_PATH / "application.log")
+error_log_store = JsonLogStore(DATA_PATH / "error.log")
 
-def _filter_by_time(
-    logs: list, start_time: Optional[str] = None, end_time: Optional[str] = None
-) -> list:
-    """Filter logs by time range"""
-    if not start_time and not end_time:
-        return logs
-
-    filtered_logs = []
-    start_dt = _parse_timestamp(start_time) if start_time else None
-    end_dt = _parse_timestamp(end_time) if end_time else None
-
-    for log in logs:
-        log_timestamp = log.get("timestamp")
-        if not log_timestamp:
-            continue
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the log stores so the first request does not pay for parsing"""
+    for store in (application_log_store, error_log_store):
         try:
-            log_dt = _parse_timestamp(log_timestamp)
-
-            if start_dt and log_dt < start_dt:
-                continue
-            if end_dt and log_dt > end_dt:
-                continue
-
-            filtered_logs.append(log)
-        except:
-            # Include logs with unparseable timestamps
-            filtered_logs.append(log)
-
-    return filtered_logs
+            store.refresh()
+        except FileNotFoundError:
+            logging.warning(f"Log file {store.file_path} not found, skipping warm-up")
+    yield
 
 
-def _parse_log_file(file_path: Path, pattern: Optional[str] = None):
-    """Parse log file and filter by pattern"""
-    logs = []
-
-    if file_path.suffix == ".json":
-        with open(file_path, "r") as f:
-            data = json.load(f)
-            # Handle both array and object with array
-            if isinstance(data, list):
-                logs = data
-            elif isinstance(data, dict):
-                # Get the first array value in the dict
-                for key, value in data.items():
-                    if isinstance(value, list):
-                        logs = value
-                        break
-    else:
-        # Parse text log files
-        with open(file_path, "r") as f:
-            for line in f:
-                if pattern and pattern.lower() not in line.lower():
-                    continue
-                # Parse log line to extract timestamp, level, and message
-                parts = line.strip().split(" ", 3)
-                if len(parts) >= 4:
-                    timestamp = parts[0]
-                    level_part = parts[1]
-                    service = parts[2]
-                    message = parts[3] if len(parts) > 3 else ""
-
-                    # Extract log level from [LEVEL] format
-                    level = "INFO"
-                    if "[" in level_part and "]" in level_part:
-                        level = level_part.strip("[]")
-
-                    logs.append(
-                        {
-                            "timestamp": timestamp,
-                            "level": level,
-                            "service": service,
-                            "message": message,
-                        }
-                    )
-                else:
-                    logs.append({"message": line.strip()})
-
-    return logs
+app = FastAPI(title="Application Logs API", version="1.0.0", lifespan=lifespan)
 
 
 @app.get("/logs/search")
@@ -143,18 +72,15 @@ async def search_logs(
 ):
     """Search logs by pattern/timeframe"""
     try:
-        application_logs = _parse_log_file(DATA_PATH / "application.log", pattern)
-
-        # Filter by log level if provided
-        if log_level:
-            application_logs = [
-                log for log in application_logs if log.get("level") == log_level
-            ]
-
-        # Filter by time range
-        application_logs = _filter_by_time(application_logs, start_time, end_time)
-
-        return {"logs": application_logs[:100]}  # Limit results
+        application_logs = application_log_store.search(
+            pattern=pattern,
+            level=log_level,
+            start_time=start_time,
+            end_time=end_time,
+            limit=100,  # Limit results
+        )
+
+        return {"logs": application_logs}
     except Exception as e:
         logging.error(f"Error searching logs: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -168,15 +94,7 @@ async def get_error_logs(
 ):
     """Retrieve error-specific entries"""
     try:
-        with open(DATA_PATH / "error.log", "r") as f:
-            error_logs = json.load(f)
-
-        if service:
-            error_logs = [log for log in error_logs if log.get("service") == service]
-
-        # Filter by since timestamp
-        if since:
-            error_logs = _filter_by_time(error_logs, start_time=since)
+        error_logs = error_log_store.query(service=service, since=since)
 
         return {"errors": error_logs}
     except Exception as e:
@@ -227,14 +145,13 @@ async def get_recent_logs(
 ):
     """Fetch latest log entries"""
     try:
-        all_logs = _parse_log_file(DATA_PATH / "application.log")
-
-        if service:
-            all_logs = [log for log in all_logs if service in log.get("service", "")]
-
-        # Return the most recent logs (last N entries)
-        recent_logs = all_logs[-limit:] if len(all_logs) > limit else all_logs
-        recent_logs.reverse()  # Most recent first
+        # Most recent first
+        if RECENT_LOGS_MODE == "index":
+            recent_logs = application_log_store.recent(limit, service=service)
+        else:
+            recent_logs = tail_log_file(
+                DATA_PATH / "application.log", limit, service=service
+            )
 
         return {"logs": recent_logs}
     except Exception as e:
@@ -1,6 +1,5 @@
 import json
 import logging
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
@@ -13,6 +12,9 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse
 
+from metrics_store import ColumnarMetrics, parse_step
+from time_index import TimeSeries
+
 # Configure logging with basicConfig
 logging.basicConfig(
     level=logging.INFO,  # Set the log level to INFO
@@ -35,51 +37,45 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
-def _parse_timestamp(timestamp_str: str) -> datetime:
-    """Parse ISO timestamp string to datetime object"""
-    try:
-        # Handle both with and without timezone
-        if timestamp_str.endswith("Z"):
-            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        elif "+" in timestamp_str or timestamp_str.endswith("0"):
-            return datetime.fromisoformat(timestamp_str)
-        else:
-            return datetime.fromisoformat(timestamp_str + "+00:00")
-    except:
-        # Fallback: assume current time if parsing fails
-        return datetime.now(timezone.utc)
-
-
-def _filter_metrics_by_time(
-    metrics: list, start_time: Optional[str] = None, end_time: Optional[str] = None
-) -> list:
-    """Filter metrics by time range"""
-    if not start_time and not end_time:
-        return metrics
-
-    filtered_metrics = []
-    start_dt = _parse_timestamp(start_time) if start_time else None
-    end_dt = _parse_timestamp(end_time) if end_time else None
-
-    for metric in metrics:
-        metric_timestamp = metric.get("timestamp")
-        if not metric_timestamp:
-            continue
-
-        try:
-            metric_dt = _parse_timestamp(metric_timestamp)
-
-            if start_dt and metric_dt < start_dt:
-                continue
-            if end_dt and metric_dt > end_dt:
-                continue
-
-            filtered_metrics.append(metric)
-        except:
-            # Include metrics with unparseable timestamps
-            filtered_metrics.append(metric)
-
-    return filtered_metrics
+# Data files with timestamps parsed once into a sorted time index
+RESPONSE_TIMES = TimeSeries(DATA_PATH / "response_times.json", "metrics")
+THROUGHPUT = TimeSeries(DATA_PATH / "throughput.json", "metrics")
+RESOURCE_USAGE = TimeSeries(DATA_PATH / "resource_usage.json", "metrics")
+ERROR_RATES = TimeSeries(DATA_PATH / "error_rates.json", "error_rates")
+
+# Per-service numeric columns for downsampling and trend statistics
+RESPONSE_TIME_COLUMNS = ColumnarMetrics(RESPONSE_TIMES)
+THROUGHPUT_COLUMNS = ColumnarMetrics(THROUGHPUT)
+RESOURCE_USAGE_COLUMNS = ColumnarMetrics(RESOURCE_USAGE)
+ERROR_RATE_COLUMNS = ColumnarMetrics(ERROR_RATES)
+
+# Precomputed trend summaries, parsed once; None when the data file is absent
+TRENDS_FILE = DATA_PATH / "trends.json"
+TRENDS = json.loads(TRENDS_FILE.read_text()) if TRENDS_FILE.exists() else None
+
+# metric_type -> (columns, field, unit)
+PERFORMANCE_FIELDS = {
+    "response_time": (RESPONSE_TIME_COLUMNS, "response_time_ms", "ms"),
+    "throughput": (THROUGHPUT_COLUMNS, "requests_per_second", "requests/s"),
+    "cpu_usage": (RESOURCE_USAGE_COLUMNS, "cpu_usage_percent", "percent"),
+    "memory_usage": (RESOURCE_USAGE_COLUMNS, "memory_usage_mb", "MB"),
+}
+
+# resource_type -> fields of resource_usage.json
+RESOURCE_FIELDS = {
+    "cpu": ["cpu_usage_percent"],
+    "memory": ["memory_usage_mb", "memory_usage_percent"],
+    "disk": ["disk_io_read_mb", "disk_io_write_mb"],
+    "network": ["network_in_mb", "network_out_mb"],
+}
+
+# metric_name keyword -> (columns, field) used for computed trend statistics
+TREND_FIELDS = {
+    "response": (RESPONSE_TIME_COLUMNS, "response_time_ms"),
+    "error": (ERROR_RATE_COLUMNS, "error_rate"),
+    "cpu": (RESOURCE_USAGE_COLUMNS, "cpu_usage_percent"),
+    "memory": (RESOURCE_USAGE_COLUMNS, "memory_usage_percent"),
+}
 
 
 @app.get("/metrics/performance")
@@ -92,58 +88,63 @@ async def get_performance_metrics(
     start_time: Optional[str] = Query(None, description="Start time for metrics"),
     end_time: Optional[str] = Query(None, description="End time for metrics"),
     service: Optional[str] = Query(None, description="Filter by service name"),
+    step: Optional[str] = Query(
+        None,
+        description="Return per-bucket aggregates (avg/min/max/p50/p95/p99) of this width, e.g. 5m or 1h, instead of raw points",
+    ),
     api_key: str = Depends(_validate_api_key),
 ):
     """Retrieve performance data"""
     try:
-        metrics = []
+        if step:
+            step_seconds = parse_step(step)
+            metric_types = [metric_type] if metric_type else ["cpu_usage", "memory_usage"]
+            aggregates = []
+            for name in metric_types:
+                columns, field, unit = PERFORMANCE_FIELDS[name]
+                for bucket in columns.downsample(
+                    field, step_seconds, service, start_time, end_time
+                ):
+                    aggregates.append({**bucket, "unit": unit})
+            return {"step_seconds": step_seconds, "aggregates": aggregates}
 
         if metric_type == "response_time":
-            with open(DATA_PATH / "response_times.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
+            metrics = RESPONSE_TIMES.between(start_time, end_time)
         elif metric_type == "throughput":
-            with open(DATA_PATH / "throughput.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
+            metrics = THROUGHPUT.between(start_time, end_time)
         elif metric_type in ["cpu_usage", "memory_usage"]:
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                raw_metrics = data.get("metrics", [])
-                # Transform resource metrics to match expected format
-                metrics = []
-                for m in raw_metrics:
-                    if metric_type == "cpu_usage":
-                        metrics.append(
-                            {
-                                "timestamp": m["timestamp"],
-                                "service": m["service"],
-                                "value": m["cpu_usage_percent"],
-                                "unit": "percent",
-                            }
-                        )
-                    else:  # memory_usage
-                        metrics.append(
-                            {
-                                "timestamp": m["timestamp"],
-                                "service": m["service"],
-                                "value": m["memory_usage_mb"],
-                                "unit": "MB",
-                            }
-                        )
+            raw_metrics = RESOURCE_USAGE.between(start_time, end_time)
+            # Transform resource metrics to match expected format
+            metrics = []
+            for m in raw_metrics:
+                if metric_type == "cpu_usage":
+                    metrics.append(
+                        {
+                            "timestamp": m["timestamp"],
+                            "service": m["service"],
+                            "value": m["cpu_usage_percent"],
+                            "unit": "percent",
+                        }
+                    )
+                else:  # memory_usage
+                    metrics.append(
+                        {
+                            "timestamp": m["timestamp"],
+                            "service": m["service"],
+                            "value": m["memory_usage_mb"],
+                            "unit": "MB",
+                        }
+                    )
         else:
             # Return combined metrics for demo
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
+            metrics = RESOURCE_USAGE.between(start_time, end_time)
 
         if service:
             metrics = [m for m in metrics if m.get("service") == service]
 
-        # Filter by time range
-        metrics = _filter_metrics_by_time(metrics, start_time, end_time)
-
         return {"metrics": metrics}
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
     except Exception as e:
         logging.error(f"Error retrieving performance metrics: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -159,10 +160,7 @@ async def get_error_rates(
 ):
     """Fetch error rate statistics"""
     try:
-        with open(DATA_PATH / "error_rates.json", "r") as f:
-            data = json.load(f)
-
-        error_rates = data.get("error_rates", [])
+        error_rates = ERROR_RATES.records
 
         if service:
             error_rates = [e for e in error_rates if e.get("service") == service]
@@ -186,14 +184,26 @@ async def get_resource_metrics(
     time_window: Optional[str] = Query(
         "24h", enum=["1h", "6h", "24h", "7d"], description="Time window for metrics"
     ),
+    step: Optional[str] = Query(
+        None,
+        description="Return per-bucket aggregates (avg/min/max/p50/p95/p99) of this width, e.g. 5m or 1h, instead of raw points",
+    ),
     api_key: str = Depends(_validate_api_key),
 ):
     """Monitor resource utilization"""
     try:
-        with open(DATA_PATH / "resource_usage.json", "r") as f:
-            data = json.load(f)
-
-        metrics = data.get("metrics", [])
+        if step:
+            step_seconds = parse_step(step)
+            resource_types = [resource_type] if resource_type else list(RESOURCE_FIELDS)
+            aggregates = []
+            for name in resource_types:
+                for field in RESOURCE_FIELDS[name]:
+                    aggregates.extend(
+                        RESOURCE_USAGE_COLUMNS.downsample(field, step_seconds, service)
+                    )
+            return {"step_seconds": step_seconds, "aggregates": aggregates}
+
+        metrics = RESOURCE_USAGE.records
 
         if service:
             metrics = [m for m in metrics if m.get("service") == service]
@@ -218,6 +228,8 @@ async def get_resource_metrics(
             metrics = filtered_metrics
 
         return {"metrics": metrics}
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
     except Exception as e:
         logging.error(f"Error retrieving resource metrics: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -269,19 +281,15 @@ async def analyze_trends(
 ):
     """Identify metric trends and anomalies"""
     try:
-        # Read trends from actual data file
-        trends_file = DATA_PATH / "trends.json"
-        if not trends_file.exists():
+        if TRENDS is None:
             return {
                 "trend": "no_data",
                 "average_value": 0,
                 "standard_deviation": 0,
                 "anomalies": [],
             }
-        
-        with open(trends_file, "r") as f:
-            data = json.load(f)
-        
+        data = TRENDS
+
         # Determine which trend data to use based on metric name
         if "response" in metric_name.lower():
             trend_data = data.get("response_time_trends", {})
@@ -300,11 +308,19 @@ async def analyze_trends(
         standard_deviation = trend_data.get("standard_deviation", 0)
         anomalies = trend_data.get("anomalies", [])
 
+        # Slope and statistics computed from the raw series, per service
+        computed = {}
+        for keyword, (columns, field) in TREND_FIELDS.items():
+            if keyword in metric_name.lower():
+                computed = columns.trend(field, service)
+                break
+
         return {
             "trend": trend,
             "average_value": average_value,
             "standard_deviation": standard_deviation,
             "anomalies": anomalies,
+            "series_statistics": computed,
         }
     except Exception as e:
         logging.error(f"Error analyzing trends: {str(e)}")
@@ -0,0 +1,213 @@
+import bisect
+import math
+import re
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from time_index import TimeSeries, to_epoch
+
+_STEP_RE = re.compile(r"^(\d+)([smhd]?)$")
+_STEP_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Relative change over the window below which a series counts as stable
+STABLE_CHANGE_RATIO = 0.05
+
+
+def parse_step(step: str) -> int:
+    """Parse a bucket width such as "30s", "5m", "1h" or "300" into seconds"""
+    match = _STEP_RE.match(step.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid step '{step}'. Use e.g. 30s, 5m, 1h or 1d")
+    return int(match.group(1)) * _STEP_UNITS[match.group(2)]
+
+
+def _format_epoch(epoch: float) -> str:
+    return (
+        datetime.fromtimestamp(epoch, tz=timezone.utc)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+def _percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """Linear-interpolated percentile of an already sorted, non-empty sequence"""
+    rank = (len(sorted_values) - 1) * percent / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = rank - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def _summarize(values: Sequence[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 3),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p50": round(_percentile(ordered, 50), 3),
+        "p95": round(_percentile(ordered, 95), 3),
+        "p99": round(_percentile(ordered, 99), 3),
+    }
+
+
+class MetricColumns:
+    """Time-sorted epoch and value columns for one metric of one service"""
+
+    def __init__(self) -> None:
+        self.epochs = array("d")
+        self.values = array("d")
+
+    def window(
+        self, start_time: Optional[str] = None, end_time: Optional[str] = None
+    ) -> Tuple[Sequence[float], Sequence[float]]:
+        """Return the (epochs, values) slices within the time range"""
+        lo = bisect.bisect_left(self.epochs, to_epoch(start_time)) if start_time else 0
+        hi = (
+            bisect.bisect_right(self.epochs, to_epoch(end_time))
+            if end_time
+            else len(self.epochs)
+        )
+        return self.epochs[lo:hi], self.values[lo:hi]
+
+
+class ColumnarMetrics:
+    """
+    Columnar view of a metrics TimeSeries.
+
+    Every numeric field of every service is kept as a pair of parallel
+    `array('d')` columns sorted by time, rebuilt only when the underlying
+    data file changes. Downsampling and trend statistics are computed from
+    those columns in a single pass, so callers get a handful of aggregates
+    instead of every raw point.
+    """
+
+    def __init__(self, series: TimeSeries) -> None:
+        self.series = series
+        self._lock = threading.Lock()
+        self._source: Optional[List[dict]] = None
+        self._columns: Dict[Tuple[str, str], MetricColumns] = {}
+
+    def _refresh(self) -> Dict[Tuple[str, str], MetricColumns]:
+        records = self.series.records
+        with self._lock:
+            if records is not self._source:
+                self._columns = self._build(records)
+                self._source = records
+            return self._columns
+
+    @staticmethod
+    def _build(records: List[dict]) -> Dict[Tuple[str, str], MetricColumns]:
+        rows: Dict[Tuple[str, str], List[Tuple[float, float]]] = {}
+        for record in records:
+            timestamp = record.get("timestamp")
+            if not timestamp:
+                continue
+            epoch = to_epoch(timestamp)
+            service = record.get("service", "")
+            for field, value in record.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    rows.setdefault((service, field), []).append((epoch, value))
+
+        columns = {}
+        for key, points in rows.items():
+            points.sort()
+            column = MetricColumns()
+            column.epochs.extend(epoch for epoch, _ in points)
+            column.values.extend(value for _, value in points)
+            columns[key] = column
+        return columns
+
+    def _select(
+        self, field: str, service: Optional[str]
+    ) -> List[Tuple[str, MetricColumns]]:
+        columns = self._refresh()
+        return sorted(
+            (svc, column)
+            for (svc, col_field), column in columns.items()
+            if col_field == field and (not service or svc == service)
+        )
+
+    def downsample(
+        self,
+        field: str,
+        step_seconds: int,
+        service: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> List[dict]:
+        """Aggregate `field` into fixed-width time buckets per service"""
+        buckets = []
+        for svc, column in self._select(field, service):
+            epochs, values = column.window(start_time, end_time)
+            i = 0
+            while i < len(epochs):
+                bucket_start = epochs[i] - epochs[i] % step_seconds
+                bucket_end = bucket_start + step_seconds
+                # Columns are sorted, so a bucket is a contiguous run
+                j = bisect.bisect_left(epochs, bucket_end, i)
+                buckets.append(
+                    {
+                        "service": svc,
+                        "metric": field,
+                        "bucket_start": _format_epoch(bucket_start),
+                        **_summarize(values[i:j]),
+                    }
+                )
+                i = j
+        return buckets
+
+    def trend(
+        self,
+        field: str,
+        service: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> Dict[str, dict]:
+        """Least-squares slope and summary statistics of `field` per service"""
+        results = {}
+        for svc, column in self._select(field, service):
+            epochs, values = column.window(start_time, end_time)
+            n = len(values)
+            if n == 0:
+                continue
+
+            # Single pass over the columns for all regression sums
+            origin = epochs[0]
+            sum_x = sum_y = sum_xx = sum_xy = sum_yy = 0.0
+            for epoch, value in zip(epochs, values):
+                x = (epoch - origin) / 60  # minutes
+                sum_x += x
+                sum_y += value
+                sum_xx += x * x
+                sum_xy += x * value
+                sum_yy += value * value
+
+            mean = sum_y / n
+            variance = max(sum_yy / n - mean * mean, 0.0)
+            denominator = n * sum_xx - sum_x * sum_x
+            slope = (n * sum_xy - sum_x * sum_y) / denominator if denominator else 0.0
+
+            span_minutes = (epochs[-1] - origin) / 60
+            change = slope * span_minutes
+            if mean and abs(change) < abs(mean) * STABLE_CHANGE_RATIO:
+                direction = "stable"
+            elif change > 0:
+                direction = "increasing"
+            elif change < 0:
+                direction = "decreasing"
+            else:
+                direction = "stable"
+
+            results[svc] = {
+                "trend": direction,
+                "slope_per_minute": round(slope, 4),
+                "average_value": round(mean, 3),
+                "standard_deviation": round(math.sqrt(variance), 3),
+                "data_points": n,
+                "first_timestamp": _format_epoch(epochs[0]),
+                "last_timestamp": _format_epoch(epochs[-1]),
+            }
+        return results
@@ -1,9 +1,13 @@
+import argparse
 import logging
 import subprocess
 import sys
 import time
 import threading
 from pathlib import Path
+
+# Add parent directory to path to import config_utils
+sys.path.append(str(Path(__file__).parent.parent))
 from config_utils import get_server_ports
 
 # Configure logging with basicConfig
@@ -27,8 +31,8 @@ def _stream_output(process, name):
             print(f"[{name} ERROR] {line.decode().rstrip()}", file=sys.stderr)
 
 
-def _run_servers():
-    """Run all stub servers concurrently"""
+def _run_servers(server_args: list):
+    """Run all stub servers concurrently, one subprocess each"""
     # Get ports from OpenAPI specifications
     ports = get_server_ports()
 
@@ -57,7 +61,7 @@ def _run_servers():
     for name, script, port in servers:
         logging.info(f"Starting {name} on port {port}...")
         process = subprocess.Popen(
-            [sys.executable, script],
+            [sys.executable, script, *server_args],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             cwd=project_dir,
@@ -116,8 +120,34 @@ def _run_servers():
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Run all demo API servers")
+    parser.add_argument("--host", type=str, default="localhost",
+                       help="Host to bind to (must match SSL certificate hostname if using SSL)")
+    parser.add_argument("--ssl-keyfile", type=str, help="Path to SSL private key file")
+    parser.add_argument("--ssl-certfile", type=str, help="Path to SSL certificate file")
+    parser.add_argument("--combined", action="store_true",
+                       help="Serve all APIs from a single process (one event loop, one copy of the data) instead of one subprocess per server")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Number of combined-mode worker processes sharing the ports via SO_REUSEPORT")
+    args = parser.parse_args()
+
+    ssl_config = {}
+    if args.ssl_keyfile and args.ssl_certfile:
+        ssl_config = {
+            "ssl_keyfile": args.ssl_keyfile,
+            "ssl_certfile": args.ssl_certfile,
+        }
+
     try:
-        _run_servers()
+        if args.combined:
+            from combined_app import run_combined
+
+            run_combined(args.host, get_server_ports(), args.workers, ssl_config)
+        else:
+            server_args = ["--host", args.host]
+            for option, value in ssl_config.items():
+                server_args += [f"--{option.replace('_', '-')}", value]
+            _run_servers(server_args)
     except Exception as e:
         logging.error(f"Error running servers: {str(e)}")
         sys.exit(1)
@@ -0,0 +1,264 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MARKDOWN_ID_RE = re.compile(r"\*\*[\w ]*ID:\*\*\s*`([^`]+)`")
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Fields that carry more signal than the body of a runbook
+TITLE_WEIGHT = 3
+
+SNIPPET_CHARS = 160
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _flatten(value) -> Iterator[str]:
+    """Yield every string nested inside a JSON value"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _flatten(item)
+
+
+def _slugify(text: str) -> str:
+    return "-".join(_tokenize(text))
+
+
+class RunbookDocument:
+    """One indexed unit: a JSON runbook entry or a markdown section"""
+
+    __slots__ = ("doc_id", "title", "source", "payload", "lines", "length", "terms")
+
+    def __init__(
+        self, doc_id: str, title: str, source: str, payload: dict, lines: List[str]
+    ) -> None:
+        self.doc_id = doc_id
+        self.title = title
+        self.source = source
+        self.payload = payload
+        self.lines = lines
+        terms = Counter(_tokenize(" ".join(lines)))
+        for token in _tokenize(title):
+            terms[token] += TITLE_WEIGHT
+        self.terms = terms
+        self.length = sum(terms.values())
+
+
+class RunbookIndex:
+    """
+    BM25 index over every runbook JSON file and markdown document.
+
+    Built once from `data_path` and rebuilt when any indexed file is added,
+    removed or modified; each search only stats the files. Queries return
+    the top-k documents with their score and a snippet around the best
+    matching line.
+    """
+
+    def __init__(self, data_path: Path) -> None:
+        self.data_path = Path(data_path)
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple] = None
+        self._documents: List[RunbookDocument] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._average_length = 0.0
+
+    def _files(self) -> List[Path]:
+        files = sorted(self.data_path.glob("*.json"))
+        files += sorted((self.data_path / "markdown").glob("*.md"))
+        return files
+
+    def _current_signature(self, files: List[Path]) -> Tuple:
+        signature = []
+        for path in files:
+            stat = os.stat(path)
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def refresh(self) -> None:
+        """Rebuild the index if the runbook files changed"""
+        with self._lock:
+            files = self._files()
+            signature = self._current_signature(files)
+            if signature == self._signature:
+                return
+
+            documents: List[RunbookDocument] = []
+            by_id: Dict[str, int] = {}
+            for path in files:
+                try:
+                    if path.suffix == ".json":
+                        loaded = list(self._load_json(path))
+                    else:
+                        loaded = list(self._load_markdown(path))
+                except Exception as e:
+                    logging.error(f"Error indexing runbook file {path}: {str(e)}")
+                    continue
+
+                for document in loaded:
+                    existing = by_id.get(document.doc_id)
+                    if existing is not None and document.source.startswith("markdown/"):
+                        # Markdown rendering of a JSON runbook: index its text
+                        # under the structured entry instead of duplicating it
+                        base = documents[existing]
+                        documents[existing] = RunbookDocument(
+                            base.doc_id,
+                            base.title,
+                            base.source,
+                            base.payload,
+                            base.lines + document.lines,
+                        )
+                        continue
+                    by_id.setdefault(document.doc_id, len(documents))
+                    documents.append(document)
+
+            postings: Dict[str, List[Tuple[int, int]]] = {}
+            for doc_number, document in enumerate(documents):
+                for term, frequency in document.terms.items():
+                    postings.setdefault(term, []).append((doc_number, frequency))
+
+            self._documents = documents
+            self._postings = postings
+            self._average_length = (
+                sum(d.length for d in documents) / len(documents) if documents else 0.0
+            )
+            self._signature = signature
+            logging.info(
+                f"📚 Indexed {len(documents)} runbook documents from {len(files)} files"
+            )
+
+    @staticmethod
+    def _load_json(path: Path) -> Iterator[RunbookDocument]:
+        with open(path, "r") as f:
+            data = json.load(f)
+        for collection, items in data.items():
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                title = item.get("title") or item.get("issue") or item.get("id", "")
+                yield RunbookDocument(
+                    doc_id=item.get("id", f"{path.stem}-{collection}"),
+                    title=title,
+                    source=path.name,
+                    payload=item,
+                    lines=list(_flatten(item)),
+                )
+
+    @staticmethod
+    def _load_markdown(path: Path) -> Iterator[RunbookDocument]:
+        sections = re.split(r"^## ", path.read_text(), flags=re.MULTILINE)
+        # sections[0] is the document preamble before the first heading
+        for section in sections[1:]:
+            heading, _, body = section.partition("\n")
+            heading = heading.strip()
+            match = _MARKDOWN_ID_RE.search(body)
+            doc_id = match.group(1) if match else _slugify(heading)
+            lines = [line.strip() for line in body.splitlines() if line.strip()]
+            yield RunbookDocument(
+                doc_id=doc_id,
+                title=heading,
+                source=f"markdown/{path.name}",
+                payload={"id": doc_id, "title": heading, "content": body.strip()},
+                lines=lines,
+            )
+
+    def entries(self, source: str) -> List[dict]:
+        """Return the payloads indexed from one JSON file, in file order"""
+        self.refresh()
+        with self._lock:
+            documents = self._documents
+        return [d.payload for d in documents if d.source == source]
+
+    @staticmethod
+    def _expand(token: str, postings: Dict[str, List[Tuple[int, int]]]) -> List[str]:
+        """Exact term if indexed, otherwise indexed terms it is a prefix of"""
+        if token in postings:
+            return [token]
+        return [term for term in postings if term.startswith(token)]
+
+    def _snippet(self, document: RunbookDocument, query_terms: set) -> str:
+        best_line, best_hits = document.title, 0
+        for line in document.lines:
+            if line == document.doc_id or line.startswith("#"):
+                continue
+            hits = sum(
+                1
+                for token in _tokenize(line)
+                if any(token.startswith(term) for term in query_terms)
+            )
+            if hits > best_hits:
+                best_line, best_hits = line, hits
+        if len(best_line) > SNIPPET_CHARS:
+            best_line = best_line[: SNIPPET_CHARS - 3] + "..."
+        return best_line
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[dict]:
+        """
+        Return the `limit` best matching documents for `query`.
+
+        `filters` restricts results to documents whose payload has the given
+        field values (e.g. incident_type, severity).
+        """
+        self.refresh()
+        with self._lock:
+            documents, postings = self._documents, self._postings
+            average_length = self._average_length or 1.0
+
+        total = len(documents)
+        scores: Dict[int, float] = {}
+        query_terms = set()
+        for token in set(_tokenize(query)):
+            for term in self._expand(token, postings):
+                query_terms.add(term)
+                term_postings = postings[term]
+                idf = math.log(
+                    1 + (total - len(term_postings) + 0.5) / (len(term_postings) + 0.5)
+                )
+                for doc_number, frequency in term_postings:
+                    length = documents[doc_number].length
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[doc_number] = scores.get(doc_number, 0.0) + idf * (
+                        frequency * (BM25_K1 + 1) / (frequency + norm)
+                    )
+
+        results = []
+        for doc_number, score in sorted(scores.items(), key=lambda kv: -kv[1]):
+            document = documents[doc_number]
+            if filters and any(
+                document.payload.get(field) != value for field, value in filters.items()
+            ):
+                continue
+            results.append(
+                {
+                    **document.payload,
+                    "score": round(score, 4),
+                    "source": document.source,
+                    "snippet": self._snippet(document, query_terms),
+                }
+            )
+            if len(results) >= limit:
+                break
+        return results
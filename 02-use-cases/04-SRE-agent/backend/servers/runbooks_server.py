@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -13,6 +14,8 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse
 
+from runbook_index import RunbookIndex
+
 # Configure logging with basicConfig
 logging.basicConfig(
     level=logging.INFO,  # Set the log level to INFO
@@ -27,6 +30,13 @@ DATA_PATH = Path(__file__).parent.parent / "data" / "runbooks_data"
 # API Key for authentication
 EXPECTED_API_KEY = "test-key-123"
 
+# Per-item details and full response payloads are only logged when enabled:
+# serializing them on every request dominates latency on large playbook sets
+DEBUG_PAYLOAD_LOGGING = os.getenv("RUNBOOKS_DEBUG_LOGGING", "false").lower() == "true"
+
+# Ranked search index over all runbook JSON files and markdown documents
+RUNBOOK_INDEX = RunbookIndex(DATA_PATH)
+
 
 def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     """Validate API key from header"""
@@ -35,6 +45,28 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
+def _log_items(kind: str, items: list, title_key: str = "title") -> None:
+    """Log each returned item with its first steps (debug flag only)"""
+    if not DEBUG_PAYLOAD_LOGGING:
+        return
+    for i, item in enumerate(items):
+        logging.info(
+            f"  📖 {kind} {i+1}: {item.get(title_key, f'No {title_key}')} (ID: {item.get('id', 'No ID')})"
+        )
+        steps = item.get("steps", [])
+        logging.info(f"     Steps count: {len(steps)}")
+        for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
+            logging.info(f"     Step {j+1}: {step}")
+        if len(steps) > 3:
+            logging.info(f"     ... and {len(steps) - 3} more steps")
+
+
+def _log_payload(label: str, data) -> None:
+    """Log a full response payload (debug flag only)"""
+    if DEBUG_PAYLOAD_LOGGING:
+        logging.info(f"📋 RUNBOOKS API: {label}: {json.dumps(data, indent=2)}")
+
+
 @app.get("/runbooks/search")
 async def search_runbooks(
     incident_type: Optional[str] = Query(
@@ -50,64 +82,52 @@ async def search_runbooks(
         enum=["low", "medium", "high", "critical"],
         description="Incident severity level",
     ),
+    limit: int = Query(
+        10, ge=1, le=50, description="Maximum number of runbooks to return"
+    ),
     api_key: str = Depends(_validate_api_key),
 ):
-    """Search runbooks by incident type/keyword"""
+    """Search runbooks by incident type/keyword, ranked by relevance"""
     try:
         logging.info(
             f"🔍 RUNBOOKS API: search_runbooks called - incident_type={incident_type}, keyword={keyword}, severity={severity}"
         )
 
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        runbooks = data.get("playbooks", [])
-        original_count = len(runbooks)
-
-        if incident_type:
-            runbooks = [r for r in runbooks if r.get("incident_type") == incident_type]
+        if keyword:
+            # Ranked BM25 search over every runbook file and markdown document
+            filters = {}
+            if incident_type:
+                filters["incident_type"] = incident_type
+            if severity:
+                filters["severity"] = severity
+            runbooks = RUNBOOK_INDEX.search(keyword, limit=limit, filters=filters)
             logging.info(
-                f"📋 RUNBOOKS API: Filtered by incident_type '{incident_type}': {len(runbooks)} runbooks"
+                f"📋 RUNBOOKS API: Ranked search for keyword '{keyword}': {len(runbooks)} runbooks"
             )
+        else:
+            runbooks = RUNBOOK_INDEX.entries("incident_playbooks.json")
 
-        if severity:
-            runbooks = [r for r in runbooks if r.get("severity") == severity]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by severity '{severity}': {len(runbooks)} runbooks"
-            )
+            if incident_type:
+                runbooks = [
+                    r for r in runbooks if r.get("incident_type") == incident_type
+                ]
+                logging.info(
+                    f"📋 RUNBOOKS API: Filtered by incident_type '{incident_type}': {len(runbooks)} runbooks"
+                )
 
-        if keyword:
-            runbooks = [
-                r
-                for r in runbooks
-                if keyword.lower() in r.get("title", "").lower()
-                or keyword.lower() in r.get("description", "").lower()
-                or any(keyword.lower() in step.lower() for step in r.get("steps", []))
-            ]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by keyword '{keyword}': {len(runbooks)} runbooks"
-            )
+            if severity:
+                runbooks = [r for r in runbooks if r.get("severity") == severity]
+                logging.info(
+                    f"📋 RUNBOOKS API: Filtered by severity '{severity}': {len(runbooks)} runbooks"
+                )
 
-        response_data = {"runbooks": runbooks}
+            runbooks = runbooks[:limit]
 
-        # Log detailed response
-        logging.info(
-            f"📤 RUNBOOKS API: Returning {len(runbooks)} runbooks out of {original_count} total"
-        )
-        for i, runbook in enumerate(runbooks):
-            logging.info(
-                f"  📖 Runbook {i+1}: {runbook.get('title', 'No title')} (ID: {runbook.get('id', 'No ID')})"
-            )
-            steps = runbook.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
+        response_data = {"runbooks": runbooks}
 
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
+        logging.info(f"📤 RUNBOOKS API: Returning {len(runbooks)} runbooks")
+        _log_items("Runbook", runbooks)
+        _log_payload("Full response data", response_data)
         return response_data
     except Exception as e:
         logging.error(f"❌ Error searching runbooks: {str(e)}")
@@ -125,10 +145,7 @@ async def get_incident_playbook(
             f"🔍 RUNBOOKS API: get_incident_playbook called for playbook_id='{playbook_id}'"
         )
 
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        playbooks = data.get("playbooks", [])
+        playbooks = RUNBOOK_INDEX.entries("incident_playbooks.json")
 
         for playbook in playbooks:
             if playbook.get("id") == playbook_id:
@@ -136,13 +153,8 @@ async def get_incident_playbook(
                     f"📖 RUNBOOKS API: Found playbook '{playbook.get('title', 'No title')}'"
                 )
                 steps = playbook.get("steps", [])
-                logging.info(f"📝 RUNBOOKS API: Playbook has {len(steps)} steps:")
-                for i, step in enumerate(steps):
-                    logging.info(f"   Step {i+1}: {step}")
-
-                logging.info(
-                    f"📤 RUNBOOKS API: Returning complete playbook data: {json.dumps(playbook, indent=2)}"
-                )
+                logging.info(f"📝 RUNBOOKS API: Playbook has {len(steps)} steps")
+                _log_payload("Returning complete playbook data", playbook)
                 return playbook
 
         logging.warning(f"❌ RUNBOOKS API: Playbook '{playbook_id}' not found")
@@ -168,10 +180,7 @@ async def get_troubleshooting_guide(
             f"🔍 RUNBOOKS API: get_troubleshooting_guide called - category={category}, issue_type={issue_type}"
         )
 
-        with open(DATA_PATH / "troubleshooting_guides.json", "r") as f:
-            data = json.load(f)
-
-        guides = data.get("guides", [])
+        guides = RUNBOOK_INDEX.entries("troubleshooting_guides.json")
         original_count = len(guides)
 
         if category:
@@ -193,24 +202,11 @@ async def get_troubleshooting_guide(
 
         response_data = {"guides": guides}
 
-        # Log detailed response
         logging.info(
             f"📤 RUNBOOKS API: Returning {len(guides)} guides out of {original_count} total"
         )
-        for i, guide in enumerate(guides):
-            logging.info(
-                f"  📖 Guide {i+1}: {guide.get('title', 'No title')} (ID: {guide.get('id', 'No ID')})"
-            )
-            steps = guide.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
+        _log_items("Guide", guides)
+        _log_payload("Full response data", response_data)
         return response_data
     except Exception as e:
         logging.error(f"❌ Error retrieving troubleshooting guides: {str(e)}")
@@ -229,10 +225,7 @@ async def get_escalation_procedures(
 ):
     """Retrieve escalation procedures"""
     try:
-        with open(DATA_PATH / "escalation_procedures.json", "r") as f:
-            data = json.load(f)
-
-        procedures = data.get("escalation_procedures", [])
+        procedures = RUNBOOK_INDEX.entries("escalation_procedures.json")
 
         if severity:
             procedures = [p for p in procedures if p.get("severity") == severity]
@@ -266,10 +259,7 @@ async def get_common_resolutions(
             f"🔍 RUNBOOKS API: get_common_resolutions called - issue='{issue}', service={service}"
         )
 
-        with open(DATA_PATH / "common_resolutions.json", "r") as f:
-            data = json.load(f)
-
-        resolutions = data.get("resolutions", [])
+        resolutions = RUNBOOK_INDEX.entries("common_resolutions.json")
         original_count = len(resolutions)
 
         # Filter by issue
@@ -298,24 +288,11 @@ async def get_common_resolutions(
 
         response_data = {"resolutions": matching_resolutions}
 
-        # Log detailed response
         logging.info(
             f"📤 RUNBOOKS API: Returning {len(matching_resolutions)} resolutions out of {original_count} total"
         )
-        for i, resolution in enumerate(matching_resolutions):
-            logging.info(
-                f"  📖 Resolution {i+1}: {resolution.get('issue', 'No issue title')} (ID: {resolution.get('id', 'No ID')})"
-            )
-            steps = resolution.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
+        _log_items("Resolution", matching_resolutions, title_key="issue")
+        _log_payload("Full response data", response_data)
         return response_data
     except Exception as e:
         logging.error(f"❌ Error retrieving common resolutions: {str(e)}")
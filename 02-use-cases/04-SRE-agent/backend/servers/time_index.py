@@ -0,0 +1,157 @@
+import bisect
+import json
+import os
+import threading
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+
+def parse_timestamp(timestamp_str: str) -> datetime:
+    """Parse ISO timestamp string to datetime object"""
+    try:
+        # Handle both with and without timezone
+        if timestamp_str.endswith("Z"):
+            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        elif "+" in timestamp_str or timestamp_str.endswith("0"):
+            return datetime.fromisoformat(timestamp_str)
+        else:
+            return datetime.fromisoformat(timestamp_str + "+00:00")
+    except:
+        # Fallback: assume current time if parsing fails
+        return datetime.now(timezone.utc)
+
+
+def to_epoch(timestamp_str: str) -> float:
+    """Convert an ISO timestamp string to epoch seconds (naive values are UTC)"""
+    parsed = parse_timestamp(timestamp_str)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class TimeIndex:
+    """
+    Sorted epoch column over a sequence of records.
+
+    Timestamps are parsed once, when a record is added, and kept sorted in a
+    compact `array('d')` next to the ids (positions) of their records. A time
+    range query is then two binary searches plus a slice instead of parsing
+    every record. Records without a timestamp are not indexed and therefore
+    never match a time-bounded query.
+    """
+
+    def __init__(self, timestamps: Iterable[Optional[str]] = ()) -> None:
+        pairs = sorted(
+            (to_epoch(timestamp), record_id)
+            for record_id, timestamp in enumerate(timestamps)
+            if timestamp
+        )
+        self._epochs = array("d", (epoch for epoch, _ in pairs))
+        self._ids = array("q", (record_id for _, record_id in pairs))
+
+    def add(self, record_id: int, timestamp: Optional[str]) -> None:
+        """Index one more record, keeping the epoch column sorted"""
+        if not timestamp:
+            return
+        epoch = to_epoch(timestamp)
+        position = bisect.bisect_right(self._epochs, epoch)
+        self._epochs.insert(position, epoch)
+        self._ids.insert(position, record_id)
+
+    def remove(self, record_id: int, timestamp: Optional[str]) -> None:
+        """Drop a record indexed with add()"""
+        if not timestamp:
+            return
+        epoch = to_epoch(timestamp)
+        position = bisect.bisect_left(self._epochs, epoch)
+        while position < len(self._epochs) and self._epochs[position] == epoch:
+            if self._ids[position] == record_id:
+                break
+            position += 1
+        else:
+            # An unparseable timestamp was indexed at the time it was added
+            if record_id not in self._ids:
+                return
+            position = self._ids.index(record_id)
+        del self._epochs[position]
+        del self._ids[position]
+
+    def _bounds(
+        self, start_time: Optional[str], end_time: Optional[str]
+    ) -> Tuple[int, int]:
+        lo = bisect.bisect_left(self._epochs, to_epoch(start_time)) if start_time else 0
+        hi = (
+            bisect.bisect_right(self._epochs, to_epoch(end_time))
+            if end_time
+            else len(self._epochs)
+        )
+        return lo, max(lo, hi)
+
+    def ids_between(
+        self, start_time: Optional[str] = None, end_time: Optional[str] = None
+    ) -> List[int]:
+        """Return ids of records with start_time <= timestamp <= end_time, in record order"""
+        lo, hi = self._bounds(start_time, end_time)
+        return sorted(self._ids[lo:hi])
+
+    def count_between(
+        self, start_time: Optional[str] = None, end_time: Optional[str] = None
+    ) -> int:
+        """Return how many records fall in the time range"""
+        lo, hi = self._bounds(start_time, end_time)
+        return hi - lo
+
+    def __len__(self) -> int:
+        return len(self._epochs)
+
+
+class TimeSeries:
+    """
+    Records stored under `key` in a JSON data file, with a TimeIndex.
+
+    The file is parsed and indexed once and re-read only when its size or
+    modification time changes.
+    """
+
+    def __init__(self, file_path: Path, key: str) -> None:
+        self.file_path = Path(file_path)
+        self.key = key
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple] = None
+        self._records: List[dict] = []
+        self._index = TimeIndex()
+
+    def refresh(self) -> None:
+        """Reload and re-index the file if it changed since the last load"""
+        with self._lock:
+            stat = os.stat(self.file_path)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return
+
+            with open(self.file_path, "r") as f:
+                data = json.load(f)
+            records = data.get(self.key, []) if isinstance(data, dict) else data
+
+            self._records = records
+            self._index = TimeIndex(record.get("timestamp") for record in records)
+            self._signature = signature
+
+    @property
+    def records(self) -> List[dict]:
+        """All records, in file order"""
+        self.refresh()
+        return self._records
+
+    def between(
+        self, start_time: Optional[str] = None, end_time: Optional[str] = None
+    ) -> List[dict]:
+        """Return records in the time range, in file order"""
+        self.refresh()
+        with self._lock:
+            records, index = self._records, self._index
+        if not start_time and not end_time:
+            return list(records)
+        return [records[i] for i in index.ids_between(start_time, end_time)]
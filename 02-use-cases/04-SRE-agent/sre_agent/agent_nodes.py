@@ -6,13 +6,18 @@ from pathlib import Path
 from typing import Any, Dict, List
 
 import yaml
-from langchain_anthropic import ChatAnthropic
-from langchain_aws import ChatBedrock
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.tools import BaseTool
 from langgraph.prebuilt import create_react_agent
 
 from .agent_state import AgentState
+from .context_budget import (
+    DEFAULT_MAX_HISTORY_TOKENS,
+    DEFAULT_MAX_MESSAGE_TOKENS,
+    build_context,
+    context_usage,
+)
+from .llm_registry import get_llm
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -39,27 +44,6 @@ def _load_agent_config() -> Dict[str, Any]:
         return yaml.safe_load(f)
 
 
-def _create_llm(provider: str = "anthropic", **kwargs):
-    """Create LLM instance based on provider."""
-    if provider == "anthropic":
-        return ChatAnthropic(
-            model=kwargs.get("model_id", "claude-sonnet-4-20250514"),
-            max_tokens=kwargs.get("max_tokens", 4096),
-            temperature=kwargs.get("temperature", 0.1),
-        )
-    elif provider == "bedrock":
-        return ChatBedrock(
-            model_id=kwargs.get("model_id", "us.amazon.nova-micro-v1:0"),
-            region_name=kwargs.get("region_name", "us-east-1"),
-            model_kwargs={
-                "temperature": kwargs.get("temperature", 0.1),
-                "max_tokens": kwargs.get("max_tokens", 4096),
-            },
-        )
-    else:
-        raise ValueError(f"Unsupported provider: {provider}")
-
-
 def _filter_tools_for_agent(
     all_tools: List[BaseTool], agent_name: str, config: Dict[str, Any]
 ) -> List[BaseTool]:
@@ -99,7 +83,15 @@ class BaseAgentNode:
         self.name = name
         self.description = description
         self.tools = tools
-        self.llm = _create_llm(llm_provider, **llm_kwargs)
+        self.llm = get_llm(llm_provider, **llm_kwargs)
+
+        context_config = _load_agent_config().get("context", {})
+        self.max_history_tokens = context_config.get(
+            "max_history_tokens", DEFAULT_MAX_HISTORY_TOKENS
+        )
+        self.max_message_tokens = context_config.get(
+            "max_message_tokens", DEFAULT_MAX_MESSAGE_TOKENS
+        )
 
         # Create the react agent
         self.agent = create_react_agent(self.llm, self.tools)
@@ -254,8 +246,11 @@ FORBIDDEN EXAMPLES:
     async def __call__(self, state: AgentState) -> Dict[str, Any]:
         """Process the current state and return updated state."""
         try:
-            # Get the last user message
+            # Bound the shared history sent to this agent
             messages = state["messages"]
+            context = build_context(
+                messages, self.max_history_tokens, self.max_message_tokens
+            )
 
             # Create a focused query for this agent
             agent_prompt = (
@@ -272,7 +267,7 @@ FORBIDDEN EXAMPLES:
 
             # Stream the agent execution to capture tool calls
             async for chunk in self.agent.astream(
-                {"messages": [system_message] + messages + [user_message]}
+                {"messages": [system_message] + context + [user_message]}
             ):
                 if "agent" in chunk:
                     agent_step = chunk["agent"]
@@ -300,28 +295,39 @@ FORBIDDEN EXAMPLES:
             if agent_response:
                 logger.info(f"{self.name} - Full response: {str(agent_response)}")
 
-            # Update state with streaming info
+            usage = context_usage(messages, context, all_messages)
+            logger.info(
+                f"{self.name} - Context: {usage['context_messages']}/{usage['history_messages']} "
+                f"messages, ~{usage['context_tokens_estimated']} tokens; "
+                f"{usage['input_tokens_reported']} input tokens over "
+                f"{usage['model_calls']} model calls"
+            )
+
+            # Update state with streaming info. Only this agent's entries are
+            # returned: the state reducers merge them with the results of
+            # agents running in parallel branches. The tool-call trace stays
+            # in metadata; the shared history only gets the agent's findings
+            agent_key = self.name.replace(" ", "_")
             return {
-                "agent_results": {
-                    **state.get("agent_results", {}),
-                    self.name: agent_response,
-                },
-                "agents_invoked": state.get("agents_invoked", []) + [self.name],
-                "messages": messages + all_messages,
+                "agent_results": {self.name: agent_response},
+                "agents_invoked": [self.name],
+                "messages": [
+                    AIMessage(
+                        content=f"{self.name} findings:\n{agent_response}",
+                        name=agent_key,
+                    )
+                ],
                 "metadata": {
-                    **state.get("metadata", {}),
-                    f"{self.name.replace(' ', '_')}_trace": all_messages,
+                    f"{agent_key}_trace": all_messages,
+                    f"{agent_key}_context": usage,
                 },
             }
 
         except Exception as e:
             logger.error(f"Error in {self.name}: {e}")
             return {
-                "agent_results": {
-                    **state.get("agent_results", {}),
-                    self.name: f"Error: {str(e)}",
-                },
-                "agents_invoked": state.get("agents_invoked", []) + [self.name],
+                "agent_results": {self.name: f"Error: {str(e)}"},
+                "agents_invoked": [self.name],
             }
 
 
@@ -16,6 +16,38 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Update value that clears a field reduced with merge_dicts or append_unique,
+# which would otherwise merge an empty value into what earlier turns left in a
+# checkpointed thread
+RESET = None
+
+
+def merge_dicts(
+    left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Reducer that merges dict updates, including concurrent ones from parallel agents.
+
+    An update of RESET clears the dict.
+    """
+    if right is RESET:
+        return {}
+    return {**(left or {}), **right}
+
+
+def append_unique(left: Optional[List[str]], right: Optional[List[str]]) -> List[str]:
+    """Reducer that appends new entries in order, skipping ones already present.
+
+    An update of RESET clears the list.
+    """
+    if right is RESET:
+        return []
+    merged = list(left or [])
+    for item in right:
+        if item not in merged:
+            merged.append(item)
+    return merged
+
+
 class AgentState(TypedDict):
     """State shared across all agents in the multi-agent system.
 
@@ -29,20 +61,23 @@ class AgentState(TypedDict):
     # Which agent should act next (set by supervisor)
     next: Literal["kubernetes", "logs", "metrics", "runbooks", "FINISH"]
 
-    # Intermediate results from each agent
-    agent_results: Dict[str, Any]
+    # Agents to run concurrently for the current plan stage (set by supervisor)
+    next_agents: List[str]
+
+    # Intermediate results from each agent, merged across parallel branches
+    agent_results: Annotated[Dict[str, Any], merge_dicts]
 
     # Current query being processed
     current_query: Optional[str]
 
     # Metadata about the conversation
-    metadata: Dict[str, Any]
+    metadata: Annotated[Dict[str, Any], merge_dicts]
 
     # Flag to indicate if we need multiple agents
     requires_collaboration: bool
 
     # List of agents that have already responded
-    agents_invoked: List[str]
+    agents_invoked: Annotated[List[str], append_unique]
 
     # Final aggregated response (set by supervisor)
     final_response: Optional[str]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+import logging
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.messages import BaseMessage, ToolMessage, trim_messages
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio used to estimate prompt size without a tokenizer
+CHARS_PER_TOKEN = 4
+
+DEFAULT_MAX_HISTORY_TOKENS = 8000
+DEFAULT_MAX_MESSAGE_TOKENS = 1500
+
+
+def _content_text(message: BaseMessage) -> str:
+    """Return the text of a message, flattening content blocks."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict):
+            parts.append(str(block.get("text") or block.get("input") or ""))
+    return "".join(parts)
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Estimate the number of tokens a list of messages costs to send."""
+    chars = 0
+    for message in messages:
+        chars += len(_content_text(message))
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            chars += len(str(tool_call.get("args", "")))
+    return chars // CHARS_PER_TOKEN
+
+
+def dedupe_messages(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Drop repeated messages with the same ID, keeping the first occurrence."""
+    seen = set()
+    unique = []
+    for message in messages:
+        if message.id is not None:
+            if message.id in seen:
+                continue
+            seen.add(message.id)
+        unique.append(message)
+    return unique
+
+
+def truncate_message(message: BaseMessage, max_tokens: int) -> BaseMessage:
+    """Return a copy of the message with its text cut to roughly max_tokens."""
+    text = _content_text(message)
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return message
+
+    kind = "tool output" if isinstance(message, ToolMessage) else "message"
+    truncated = (
+        f"{text[:max_chars]}\n... [{kind} truncated, "
+        f"{len(text) - max_chars} of {len(text)} characters omitted]"
+    )
+    return message.model_copy(update={"content": truncated})
+
+
+def build_context(
+    messages: Sequence[BaseMessage],
+    max_history_tokens: int = DEFAULT_MAX_HISTORY_TOKENS,
+    max_message_tokens: int = DEFAULT_MAX_MESSAGE_TOKENS,
+) -> List[BaseMessage]:
+    """Bound the shared conversation history sent to an agent.
+
+    Messages are de-duplicated by ID, every message except the latest one is
+    truncated to max_message_tokens, and the most recent messages that fit in
+    max_history_tokens are kept, starting on a human turn so tool calls and
+    their results are never split.
+
+    Args:
+        messages: Shared conversation history from the graph state
+        max_history_tokens: Token budget for the whole history
+        max_message_tokens: Token budget for any single prior message
+
+    Returns:
+        The bounded history, oldest first
+    """
+    unique = dedupe_messages(messages)
+    if not unique:
+        return []
+
+    bounded = [truncate_message(message, max_message_tokens) for message in unique[:-1]]
+    bounded.append(unique[-1])
+
+    return trim_messages(
+        bounded,
+        max_tokens=max_history_tokens,
+        token_counter=estimate_tokens,
+        strategy="last",
+        start_on="human",
+        allow_partial=False,
+    )
+
+
+def reported_input_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Sum the input tokens the provider reported for each model call."""
+    total = 0
+    for message in messages:
+        usage = getattr(message, "usage_metadata", None) or {}
+        total += usage.get("input_tokens", 0)
+    return total
+
+
+def context_usage(
+    history: Sequence[BaseMessage],
+    context: Sequence[BaseMessage],
+    trace: Sequence[BaseMessage],
+) -> Dict[str, Any]:
+    """Summarize what one agent hop sent to the model.
+
+    Args:
+        history: Shared history before trimming
+        context: Messages actually sent as the agent's starting context
+        trace: Messages produced during the agent's run
+
+    Returns:
+        Dictionary with message counts and estimated/reported token usage
+    """
+    model_calls = sum(1 for message in trace if getattr(message, "usage_metadata", None))
+    return {
+        "history_messages": len(history),
+        "context_messages": len(context),
+        "history_tokens_estimated": estimate_tokens(history),
+        "context_tokens_estimated": estimate_tokens(context),
+        "model_calls": model_calls,
+        "input_tokens_reported": reported_input_tokens(trace),
+    }
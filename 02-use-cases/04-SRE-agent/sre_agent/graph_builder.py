@@ -1,20 +1,23 @@
 #!/usr/bin/env python3
 
 import logging
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
 from langgraph.graph import END, StateGraph
 
 from .agent_nodes import (
+    _load_agent_config,
     create_kubernetes_agent,
     create_logs_agent,
     create_metrics_agent,
     create_runbooks_agent,
 )
-from .agent_state import AgentState
+from .agent_state import RESET, AgentState
+from .llm_registry import DEFAULT_MAX_CONNECTIONS, configure_llm_pool, llm_pool_stats
 from .supervisor import SupervisorAgent
+from .tool_cache import ToolResultCache
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -42,8 +45,12 @@ def _should_continue(state: AgentState) -> Literal["supervisor", "FINISH"]:
     return "supervisor"
 
 
-def _route_supervisor(state: AgentState) -> str:
-    """Route from supervisor to the appropriate agent or finish."""
+def _route_supervisor(state: AgentState) -> Union[str, List[str]]:
+    """Route from supervisor to the appropriate agent(s) or finish.
+
+    Returning several node names fans out to parallel branches; LangGraph runs
+    them in the same step and the supervisor resumes once all of them finish.
+    """
     next_agent = state.get("next", "FINISH")
 
     if next_agent == "FINISH":
@@ -57,7 +64,12 @@ def _route_supervisor(state: AgentState) -> str:
         "runbooks": "runbooks_agent",
     }
 
-    return agent_map.get(next_agent, "aggregate")
+    next_agents = state.get("next_agents") or [next_agent]
+    nodes = [agent_map[agent] for agent in next_agents if agent in agent_map]
+    if not nodes:
+        return "aggregate"
+
+    return nodes if len(nodes) > 1 else nodes[0]
 
 
 async def _prepare_initial_state(state: AgentState) -> Dict[str, Any]:
@@ -71,23 +83,28 @@ async def _prepare_initial_state(state: AgentState) -> Dict[str, Any]:
             current_query = msg.content
             break
 
+    # Clear what earlier turns of a checkpointed thread left in the merged fields
     return {
         "current_query": current_query,
-        "agent_results": {},
-        "agents_invoked": [],
+        "agent_results": RESET,
+        "agents_invoked": RESET,
         "requires_collaboration": False,
-        "metadata": {},
+        "metadata": RESET,
     }
 
 
 def build_multi_agent_graph(
-    tools: List[BaseTool], llm_provider: str = "anthropic", **llm_kwargs
+    tools: List[BaseTool],
+    llm_provider: str = "anthropic",
+    tool_cache: Optional[ToolResultCache] = None,
+    **llm_kwargs,
 ) -> StateGraph:
     """Build the multi-agent collaboration graph.
 
     Args:
         tools: List of all available tools
         llm_provider: LLM provider to use
+        tool_cache: Cache the tools were wrapped with, for reporting its stats
         **llm_kwargs: Additional arguments for LLM
 
     Returns:
@@ -95,11 +112,19 @@ def build_multi_agent_graph(
     """
     logger.info("Building multi-agent collaboration graph")
 
+    # Size the shared LLM connection pool before any client is created
+    llm_client_config = _load_agent_config().get("llm_client", {})
+    configure_llm_pool(
+        llm_client_config.get("max_connections", DEFAULT_MAX_CONNECTIONS)
+    )
+
     # Create the state graph
     workflow = StateGraph(AgentState)
 
     # Create supervisor
-    supervisor = SupervisorAgent(llm_provider=llm_provider, **llm_kwargs)
+    supervisor = SupervisorAgent(
+        llm_provider=llm_provider, tool_cache=tool_cache, **llm_kwargs
+    )
 
     # Create agent nodes with filtered tools
     kubernetes_agent = create_kubernetes_agent(
@@ -139,7 +164,7 @@ def build_multi_agent_graph(
         },
     )
 
-    # Add edges from agents back to supervisor
+    # Add edges from agents back to supervisor (parallel branches join there)
     workflow.add_edge("kubernetes_agent", "supervisor")
     workflow.add_edge("logs_agent", "supervisor")
     workflow.add_edge("metrics_agent", "supervisor")
@@ -151,5 +176,6 @@ def build_multi_agent_graph(
     # Compile the graph
     compiled_graph = workflow.compile()
 
+    logger.info(f"LLM client pool: {llm_pool_stats()}")
     logger.info("Multi-agent collaboration graph built successfully")
     return compiled_graph
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import threading
+from typing import Any, Dict, Tuple
+
+import boto3
+from botocore.config import Config
+from langchain_anthropic import ChatAnthropic
+from langchain_aws import ChatBedrock
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 20
+
+_lock = threading.Lock()
+_llms: Dict[Tuple[str, str], Any] = {}
+_bedrock_clients: Dict[Tuple[str, int], Any] = {}
+_stats = {
+    "llm_clients_created": 0,
+    "llm_clients_reused": 0,
+    "bedrock_clients_created": 0,
+    "bedrock_clients_reused": 0,
+}
+_max_connections = DEFAULT_MAX_CONNECTIONS
+
+
+def configure_llm_pool(max_connections: int = DEFAULT_MAX_CONNECTIONS) -> None:
+    """Set the connection pool size used for clients created from now on.
+
+    Args:
+        max_connections: Maximum pooled HTTP connections per Bedrock runtime client
+    """
+    global _max_connections
+    with _lock:
+        _max_connections = max_connections
+
+
+def _llm_params(provider: str, **kwargs) -> Dict[str, Any]:
+    """Resolve the constructor parameters for a provider's chat model."""
+    if provider == "anthropic":
+        return {
+            "model": kwargs.get("model_id", "claude-sonnet-4-20250514"),
+            "max_tokens": kwargs.get("max_tokens", 4096),
+            "temperature": kwargs.get("temperature", 0.1),
+        }
+    elif provider == "bedrock":
+        return {
+            "model_id": kwargs.get("model_id", "us.amazon.nova-micro-v1:0"),
+            "region_name": kwargs.get("region_name", "us-east-1"),
+            "model_kwargs": {
+                "temperature": kwargs.get("temperature", 0.1),
+                "max_tokens": kwargs.get("max_tokens", 4096),
+            },
+        }
+    else:
+        raise ValueError(f"Unsupported provider: {provider}")
+
+
+def _bedrock_runtime_client(region_name: str) -> Any:
+    """Return the shared keep-alive bedrock-runtime client for a region.
+
+    Must be called with _lock held.
+    """
+    key = (region_name, _max_connections)
+    client = _bedrock_clients.get(key)
+    if client is not None:
+        _stats["bedrock_clients_reused"] += 1
+        return client
+
+    client = boto3.client(
+        "bedrock-runtime",
+        region_name=region_name,
+        config=Config(
+            max_pool_connections=_max_connections,
+            tcp_keepalive=True,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+        ),
+    )
+    _bedrock_clients[key] = client
+    _stats["bedrock_clients_created"] += 1
+    logger.info(
+        f"Created bedrock-runtime client for {region_name} "
+        f"(max {_max_connections} pooled connections)"
+    )
+    return client
+
+
+def get_llm(provider: str = "anthropic", **kwargs) -> Any:
+    """Return a shared chat model for the provider, model and parameters.
+
+    Chat models are stateless between calls, so every agent and the supervisor
+    asking for the same configuration get one instance and therefore one
+    client with one keep-alive connection pool. Bedrock models additionally
+    share a bedrock-runtime client per region.
+
+    Args:
+        provider: LLM provider ("anthropic" or "bedrock")
+        **kwargs: model_id, max_tokens, temperature and region_name overrides
+
+    Returns:
+        ChatAnthropic or ChatBedrock instance
+    """
+    params = _llm_params(provider, **kwargs)
+    key = (provider, json.dumps(params, sort_keys=True))
+
+    with _lock:
+        llm = _llms.get(key)
+        if llm is not None:
+            _stats["llm_clients_reused"] += 1
+            return llm
+
+        if provider == "anthropic":
+            llm = ChatAnthropic(**params)
+        else:
+            llm = ChatBedrock(
+                client=_bedrock_runtime_client(params["region_name"]), **params
+            )
+
+        _llms[key] = llm
+        _stats["llm_clients_created"] += 1
+        logger.info(f"Created {provider} LLM client for {key[1]}")
+        return llm
+
+
+def llm_pool_stats() -> Dict[str, int]:
+    """Return counters of created and reused LLM and Bedrock clients."""
+    with _lock:
+        return {**_stats, "llm_clients_cached": len(_llms)}
@@ -19,8 +19,10 @@ from langchain_core.tools import tool
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.errors import GraphRecursionError
 
+from .agent_nodes import _load_agent_config
 from .agent_state import AgentState
 from .graph_builder import build_multi_agent_graph
+from .tool_cache import ToolResultCache
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -245,12 +247,16 @@ async def create_multi_agent_system(
 
     # Create MCP client and get tools
     mcp_tools = []
+    tool_cache = ToolResultCache.from_config(_load_agent_config())
     try:
         client = create_mcp_client()
         all_mcp_tools = await client.get_tools()
 
         # Don't filter out x-amz-agentcore-search as it's a global tool
         mcp_tools = all_mcp_tools
+        if tool_cache:
+            # Identical gateway calls from different agents share results
+            mcp_tools = tool_cache.wrap_all(mcp_tools)
 
         logger.info(f"Retrieved {len(mcp_tools)} tools from MCP")
 
@@ -281,7 +287,7 @@ async def create_multi_agent_system(
 
     # Build the multi-agent graph
     graph = build_multi_agent_graph(
-        tools=all_tools, llm_provider=provider, **llm_kwargs
+        tools=all_tools, llm_provider=provider, tool_cache=tool_cache, **llm_kwargs
     )
 
     return graph, all_tools
@@ -550,6 +556,7 @@ async def _run_interactive_session(
                     for node_name, node_output in event.items():
                         if node_name == "supervisor":
                             next_agent = node_output.get("next", "unknown")
+                            next_agents = node_output.get("next_agents") or [next_agent]
                             metadata = node_output.get("metadata", {})
                             reasoning = metadata.get("routing_reasoning", "")
 
@@ -568,11 +575,16 @@ async def _run_interactive_session(
                                 metadata["plan_shown"] = True
 
                             if next_agent != "FINISH":
-                                print(f"🧭 Supervisor: Routing to {next_agent}")
+                                print(
+                                    f"🧭 Supervisor: Routing to {', '.join(next_agents)}"
+                                )
                                 if reasoning:
                                     print(f"   Reasoning: {reasoning}")
-                                # Start spinner for next agent
-                                agent_display = next_agent.replace("_", " ").title()
+                                # Start spinner for the next agent(s)
+                                agent_display = ", ".join(
+                                    agent.replace("_", " ").title()
+                                    for agent in next_agents
+                                )
                                 spinner = Spinner(f"🤖 {agent_display} thinking")
                                 spinner.start()
                             elif metadata.get("plan_pending_approval"):
@@ -805,6 +817,7 @@ async def main():
                     for node_name, node_output in event.items():
                         if node_name == "supervisor":
                             next_agent = node_output.get("next", "unknown")
+                            next_agents = node_output.get("next_agents") or [next_agent]
                             metadata = node_output.get("metadata", {})
                             reasoning = metadata.get("routing_reasoning", "")
 
@@ -823,11 +836,16 @@ async def main():
                                 metadata["plan_shown"] = True
 
                             if next_agent != "FINISH":
-                                print(f"🧭 Supervisor: Routing to {next_agent}")
+                                print(
+                                    f"🧭 Supervisor: Routing to {', '.join(next_agents)}"
+                                )
                                 if reasoning:
                                     print(f"   Reasoning: {reasoning}")
-                                # Start spinner for next agent
-                                agent_display = next_agent.replace("_", " ").title()
+                                # Start spinner for the next agent(s)
+                                agent_display = ", ".join(
+                                    agent.replace("_", " ").title()
+                                    for agent in next_agents
+                                )
                                 spinner = Spinner(f"🤖 {agent_display} thinking")
                                 spinner.start()
                             elif metadata.get("plan_pending_approval"):
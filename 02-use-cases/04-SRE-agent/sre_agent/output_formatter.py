@@ -126,8 +126,36 @@ class SREOutputFormatter:
             output.append("All planned investigation steps have been executed.")
             output.append("")
 
+        # Tool cache statistics
+        cache_stats = metadata.get("tool_cache")
+        if cache_stats:
+            output.extend(self._format_tool_cache_stats(cache_stats))
+
         return "\n".join(output)
 
+    def _format_tool_cache_stats(self, cache_stats: Dict[str, Any]) -> List[str]:
+        """Format tool result cache hit/miss counters as a markdown section."""
+        output = ["## 🗄️ Tool Cache (this session)", ""]
+        output.append(
+            f"**Hits:** {cache_stats['hits']} | **Misses:** {cache_stats['misses']} | "
+            f"**Shared in-flight:** {cache_stats['coalesced']} | "
+            f"**Hit rate:** {cache_stats['hit_rate']:.0%}"
+        )
+        output.append("")
+
+        per_tool = cache_stats.get("per_tool", {})
+        if per_tool:
+            output.append("| Tool | Hits | Misses | Shared in-flight |")
+            output.append("|------|------|--------|------------------|")
+            for tool_name, counts in sorted(per_tool.items()):
+                output.append(
+                    f"| {tool_name} | {counts['hits']} | {counts['misses']} | "
+                    f"{counts['coalesced']} |"
+                )
+            output.append("")
+
+        return output
+
 
     def _generate_executive_summary(
         self,
@@ -140,12 +168,14 @@ class SREOutputFormatter:
             return ""
 
         try:
-            from langchain_anthropic import ChatAnthropic
             from langchain_core.messages import HumanMessage, SystemMessage
-            
-            # Create LLM instance
-            llm = ChatAnthropic(
-                model="claude-sonnet-4-20250514",
+
+            from .llm_registry import get_llm
+
+            # Shared LLM instance (reuses its client across reports)
+            llm = get_llm(
+                "anthropic",
+                model_id="claude-sonnet-4-20250514",
                 max_tokens=1000,
                 temperature=0.1,
             )
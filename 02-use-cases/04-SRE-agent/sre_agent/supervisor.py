@@ -3,15 +3,16 @@
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Literal, Optional
 
-from langchain_anthropic import ChatAnthropic
-from langchain_aws import ChatBedrock
 from langchain_core.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 
+from .agent_nodes import _load_agent_config
 from .agent_state import AgentState
+from .llm_registry import get_llm
 from .output_formatter import create_formatter
+from .tool_cache import ToolResultCache
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -29,6 +30,9 @@ for logger_name in mcp_loggers:
 
 logger = logging.getLogger(__name__)
 
+# Agents the supervisor can route to
+AGENT_NAMES = ["kubernetes", "logs", "metrics", "runbooks"]
+
 
 class InvestigationPlan(BaseModel):
     """Investigation plan created by supervisor."""
@@ -39,6 +43,15 @@ class InvestigationPlan(BaseModel):
     agents_sequence: List[str] = Field(
         description="Sequence of agents to invoke (kubernetes, logs, metrics, runbooks)"
     )
+    parallel_groups: List[List[str]] = Field(
+        default_factory=list,
+        description=(
+            "agents_sequence split into ordered stages. Agents in the same stage do "
+            "not depend on each other's findings and run at the same time, e.g. "
+            '[["kubernetes", "logs", "metrics"], ["runbooks"]]. Leave empty to run '
+            "the agents one after another"
+        ),
+    )
     complexity: Literal["simple", "complex"] = Field(
         description="Whether this plan is simple (auto-execute) or complex (needs approval)"
     )
@@ -106,31 +119,20 @@ Always consider if a query requires multiple perspectives. For example:
 class SupervisorAgent:
     """Supervisor agent that orchestrates other agents."""
 
-    def __init__(self, llm_provider: str = "anthropic", **llm_kwargs):
+    def __init__(
+        self,
+        llm_provider: str = "anthropic",
+        tool_cache: Optional[ToolResultCache] = None,
+        **llm_kwargs,
+    ):
         self.llm_provider = llm_provider
-        self.llm = self._create_llm(**llm_kwargs)
+        self.tool_cache = tool_cache
+        self.llm = get_llm(llm_provider, **llm_kwargs)
         self.system_prompt = _read_supervisor_prompt()
         self.formatter = create_formatter()
-
-    def _create_llm(self, **kwargs):
-        """Create LLM instance based on provider."""
-        if self.llm_provider == "anthropic":
-            return ChatAnthropic(
-                model=kwargs.get("model_id", "claude-sonnet-4-20250514"),
-                max_tokens=kwargs.get("max_tokens", 4096),
-                temperature=kwargs.get("temperature", 0.1),
-            )
-        elif self.llm_provider == "bedrock":
-            return ChatBedrock(
-                model_id=kwargs.get("model_id", "us.amazon.nova-micro-v1:0"),
-                region_name=kwargs.get("region_name", "us-east-1"),
-                model_kwargs={
-                    "temperature": kwargs.get("temperature", 0.1),
-                    "max_tokens": kwargs.get("max_tokens", 4096),
-                },
-            )
-        else:
-            raise ValueError(f"Unsupported provider: {self.llm_provider}")
+        self.parallel_agents = (
+            _load_agent_config().get("execution", {}).get("parallel_agents", True)
+        )
 
     async def create_investigation_plan(self, state: AgentState) -> InvestigationPlan:
         """Create an investigation plan for the user's query."""
@@ -145,6 +147,9 @@ Create a simple, focused investigation plan with 2-3 steps maximum. Consider:
 - Add one follow-up agent only if clearly needed
 - Keep it simple - most queries need only 1-2 agents
 - Mark as simple unless it involves production changes or multiple domains
+- Group agents that gather independent evidence (e.g. kubernetes, logs and metrics)
+  into the same parallel group; put agents that need earlier findings (e.g. runbooks
+  for a diagnosed issue) in a later group
 
 Return a structured plan."""
 
@@ -183,8 +188,83 @@ Return a structured plan."""
             )
             plan_text += f"**👥 Agents involved:** {agents_list}\n"
 
+        # Show which agents run side by side
+        stages = self._plan_stages(plan)
+        if any(len(stage) > 1 for stage in stages):
+            stages_text = " → ".join(
+                " + ".join(agent.title() for agent in stage) for stage in stages
+            )
+            plan_text += f"**⚡ Execution stages:** {stages_text}\n"
+
         return plan_text
 
+    def _plan_stages(self, plan: InvestigationPlan) -> List[List[str]]:
+        """Split a plan into stages; agents within a stage run concurrently."""
+        if not self.parallel_agents or not plan.parallel_groups:
+            return [[agent] for agent in plan.agents_sequence]
+
+        stages = []
+        staged = set()
+        for group in plan.parallel_groups:
+            stage = []
+            for agent in group:
+                if agent in AGENT_NAMES and agent not in staged:
+                    stage.append(agent)
+                    staged.add(agent)
+            if stage:
+                stages.append(stage)
+
+        # Sequenced agents the planner left out of every group run afterwards
+        for agent in plan.agents_sequence:
+            if agent not in staged:
+                stages.append([agent])
+                staged.add(agent)
+        return stages
+
+    def _stage_update(
+        self, plan: InvestigationPlan, stages: List[List[str]], stage_index: int
+    ) -> Dict[str, Any]:
+        """Routing fields and metadata for starting the given plan stage."""
+        # plan_step keeps indexing agents_sequence/steps so progress reporting
+        # is the same whether agents run one by one or in parallel
+        plan_step = sum(len(stage) for stage in stages[:stage_index])
+
+        if stage_index >= len(stages):
+            return {
+                "next": "FINISH",
+                "next_agents": [],
+                "metadata": {
+                    "routing_reasoning": "Investigation plan completed. Presenting results.",
+                    "plan_step": plan_step,
+                    "plan_stage": stage_index,
+                },
+            }
+
+        stage = stages[stage_index]
+        if len(stage) > 1:
+            reasoning = (
+                f"Executing plan steps {plan_step + 1}-{plan_step + len(stage)} "
+                f"in parallel: {', '.join(stage)}"
+            )
+        else:
+            step_description = (
+                plan.steps[plan_step]
+                if plan_step < len(plan.steps)
+                else f"Execute {stage[0]}"
+            )
+            reasoning = f"Executing plan step {plan_step + 1}: {step_description}"
+
+        return {
+            "next": stage[0],
+            "next_agents": stage,
+            "metadata": {
+                "routing_reasoning": reasoning,
+                "plan_step": plan_step,
+                "plan_stage": stage_index,
+                "plan_stages": stages,
+            },
+        }
+
     async def route(self, state: AgentState) -> Dict[str, Any]:
         """Determine which agent should handle the query next."""
         agents_invoked = state.get("agents_invoked", [])
@@ -210,60 +290,31 @@ Return a structured plan."""
                     },
                 }
             else:
-                # Simple plan - start execution
-                next_agent = (
-                    plan.agents_sequence[0] if plan.agents_sequence else "FINISH"
-                )
-                plan_text = self._format_plan_markdown(plan)
-                return {
-                    "next": next_agent,
-                    "metadata": {
-                        **state.get("metadata", {}),
+                # Simple plan - start execution with the first stage
+                stages = self._plan_stages(plan)
+                update = self._stage_update(plan, stages, 0)
+                update["metadata"].update(
+                    {
                         "investigation_plan": plan.model_dump(),
-                        "routing_reasoning": f"Executing plan step 1: {plan.steps[0] if plan.steps else 'Start'}",
-                        "plan_step": 0,
-                        "plan_text": plan_text,
+                        "plan_text": self._format_plan_markdown(plan),
                         "show_plan": True,
-                    },
-                }
+                    }
+                )
+                return update
         else:
             # Continue executing existing plan
             plan = InvestigationPlan(**existing_plan)
-            current_step = state.get("metadata", {}).get("plan_step", 0)
+            metadata = state.get("metadata", {})
+            stages = metadata.get("plan_stages") or self._plan_stages(plan)
+            current_stage = metadata.get("plan_stage", 0)
 
             # Check if plan is complete
-            if current_step >= len(plan.agents_sequence) or not agents_invoked:
-                next_step = current_step
-            else:
-                next_step = current_step + 1
-
-            if next_step >= len(plan.agents_sequence):
-                # Plan complete
-                return {
-                    "next": "FINISH",
-                    "metadata": {
-                        **state.get("metadata", {}),
-                        "routing_reasoning": "Investigation plan completed. Presenting results.",
-                        "plan_step": next_step,
-                    },
-                }
+            if current_stage >= len(stages) or not agents_invoked:
+                next_stage = current_stage
             else:
-                # Continue with next agent in plan
-                next_agent = plan.agents_sequence[next_step]
-                step_description = (
-                    plan.steps[next_step]
-                    if next_step < len(plan.steps)
-                    else f"Execute {next_agent}"
-                )
+                next_stage = current_stage + 1
 
-                return {
-                    "next": next_agent,
-                    "metadata": {
-                        **state.get("metadata", {}),
-                        "routing_reasoning": f"Executing plan step {next_step + 1}: {step_description}",
-                        "plan_step": next_step,
-                    },
-                }
+            return self._stage_update(plan, stages, next_stage)
 
     async def aggregate_responses(self, state: AgentState) -> Dict[str, Any]:
         """Aggregate responses from multiple agents into a final response."""
@@ -304,6 +355,9 @@ You can:
         if not agent_results:
             return {"final_response": "No agent responses to aggregate."}
 
+        if self.tool_cache:
+            metadata = {**metadata, "tool_cache": self.tool_cache.stats()}
+
         # Use enhanced formatting for investigation results
         query = state.get("current_query", "Investigation")
         plan = metadata.get("investigation_plan")
@@ -367,4 +421,7 @@ Keep the response professional and focused."""
 
             final_response = response.content
 
-        return {"final_response": final_response, "next": "FINISH"}
+        update = {"final_response": final_response, "next": "FINISH"}
+        if "tool_cache" in metadata:
+            update["metadata"] = {"tool_cache": metadata["tool_cache"]}
+        return update
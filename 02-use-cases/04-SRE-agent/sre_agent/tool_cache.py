@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 512
+
+
+def _base_tool_name(tool_name: str) -> str:
+    """Strip the gateway target prefix (target___tool) from a tool name."""
+    return tool_name.split("___")[-1] if "___" in tool_name else tool_name
+
+
+def _canonical_args(args: Dict[str, Any]) -> str:
+    """Serialize tool arguments so equivalent calls produce the same key."""
+    return json.dumps(
+        {name: value for name, value in args.items() if value is not None},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+class ToolResultCache:
+    """TTL cache for gateway tool results shared by all agents.
+
+    Results are keyed on (tool name, canonicalized arguments) and kept for the
+    tool's configured TTL. Concurrent identical calls, e.g. from agents running
+    in parallel, share a single in-flight request. Failed calls are never
+    cached.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+        tool_ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.default_ttl = default_ttl
+        self.tool_ttls = tool_ttls or {}
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ToolResultCache"]:
+        """Create a cache from the tool_cache section of agent_config.yaml.
+
+        Returns:
+            ToolResultCache, or None if caching is disabled
+        """
+        cache_config = config.get("tool_cache", {})
+        if not cache_config.get("enabled", True):
+            return None
+        return cls(
+            default_ttl=cache_config.get("default_ttl_seconds", DEFAULT_TTL_SECONDS),
+            tool_ttls=cache_config.get("ttl_seconds", {}),
+            max_entries=cache_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+        )
+
+    def ttl_for(self, tool_name: str) -> float:
+        """Return the TTL in seconds for a tool; 0 disables caching."""
+        return self.tool_ttls.get(_base_tool_name(tool_name), self.default_ttl)
+
+    def _count(self, tool_name: str, outcome: str) -> None:
+        counts = self._stats.setdefault(
+            _base_tool_name(tool_name), {"hits": 0, "misses": 0, "coalesced": 0}
+        )
+        counts[outcome] += 1
+
+    def _store(self, key: Tuple[str, str], ttl: float, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._entries[key] = (time.monotonic() + ttl, future.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def call(self, tool: BaseTool, args: Dict[str, Any]) -> Any:
+        """Return the tool's result for args, from cache when still fresh."""
+        key = (tool.name, _canonical_args(args))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._count(tool.name, "hits")
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count(tool.name, "coalesced")
+            return await asyncio.shield(inflight)
+
+        self._count(tool.name, "misses")
+        ttl = self.ttl_for(tool.name)
+        future = asyncio.ensure_future(tool.coroutine(**args))
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._store(key, ttl, done))
+        # Shielded so a cancelled caller does not cancel the other waiters
+        return await asyncio.shield(future)
+
+    def wrap(self, tool: BaseTool) -> BaseTool:
+        """Return a tool with the same interface that goes through the cache."""
+        if self.ttl_for(tool.name) <= 0 or getattr(tool, "coroutine", None) is None:
+            return tool
+
+        async def cached_call(**kwargs):
+            return await self.call(tool, kwargs)
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            coroutine=cached_call,
+            response_format=tool.response_format,
+            handle_tool_error=tool.handle_tool_error,
+            metadata=tool.metadata,
+        )
+
+    def wrap_all(self, tools: List[BaseTool]) -> List[BaseTool]:
+        """Wrap every cacheable tool in a list."""
+        return [self.wrap(tool) for tool in tools]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters overall and per tool."""
+        hits = sum(counts["hits"] for counts in self._stats.values())
+        misses = sum(counts["misses"] for counts in self._stats.values())
+        coalesced = sum(counts["coalesced"] for counts in self._stats.values())
+        calls = hits + misses + coalesced
+        return {
+            "hits": hits,
+            "misses": misses,
+            "coalesced": coalesced,
+            "hit_rate": round((hits + coalesced) / calls, 3) if calls else 0.0,
+            "entries": len(self._entries),
+            "per_tool": {name: dict(counts) for name, counts in self._stats.items()},
+        }
@@ -1,135 +1,321 @@
 """
 DynamoDB Conversation Manager
 Handles conversation persistence and retrieval with 15-minute TTL eviction
+
+Table layout (partition key conversation_id, numeric sort key seq):
+- seq 0 is the conversation header: last_seq counter, history_start,
+  message_count, updated_at and the conversation TTL. Only headers carry
+  list_key, so the sparse HEADERS_INDEX (list_key, updated_at) lists
+  conversations without reading any message item
+- seq history_start..last_seq are the messages, one item each, written
+  append-only; a new header starts its sequence at the current time in
+  milliseconds, so stale messages of an expired conversation with the same ID
+  always sort before the new history
+
+Appending a turn costs one UpdateItem on the header (which also refreshes the
+TTL and reserves sequence numbers) plus one batch write for the messages, and
+reading the last N messages is a single Query, independent of history length.
+
+boto3 is blocking, so every public coroutine runs its DynamoDB calls on a
+bounded thread pool (DYNAMODB_MAX_WORKERS threads, each with its own boto3
+session) instead of on the event loop.
 """
-import json
+import asyncio
 import boto3
+import functools
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+HEADER_SEQ = 0
+# Sparse GSI over header items, most recently updated last
+HEADERS_INDEX = 'conversation-headers'
+LIST_KEY = 'conversation'
+
 class ConversationManager:
-    def __init__(self, table_name: str, region: str = "us-east-1"):
+    def __init__(self, table_name: str, region: str = "us-east-1", endpoint_url: Optional[str] = None):
         self.table_name = table_name
-        self.dynamodb = boto3.resource('dynamodb', region_name=region)
-        self.table = self.dynamodb.Table(table_name)
-        
+        self.region = region
+        # DYNAMODB_ENDPOINT_URL points at a local DynamoDB stand-in for development
+        self.endpoint_url = endpoint_url or os.environ.get('DYNAMODB_ENDPOINT_URL')
+
+        # boto3 resources are not thread-safe, so each pool thread gets its own
+        self._local = threading.local()
+        self.max_workers = int(os.environ.get('DYNAMODB_MAX_WORKERS', '8'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='dynamodb')
+
         # Get TTL minutes from environment variable, default to 15 minutes
         self.ttl_minutes = int(os.environ.get('CONVERSATION_TTL_MINUTES', '15'))
+        # Message items outlive the conversation TTL by this much; the header
+        # TTL decides whether a conversation is alive, so an active
+        # conversation keeps its messages while it is refreshed within this window
+        self.message_retention_hours = int(os.environ.get('CONVERSATION_MESSAGE_RETENTION_HOURS', '24'))
         logger.info(f"ConversationManager initialized with {self.ttl_minutes}-minute TTL")
-        
+
+    @property
+    def table(self):
+        """DynamoDB Table resource of the calling thread"""
+        table = getattr(self._local, 'table', None)
+        if table is None:
+            session = boto3.session.Session()
+            dynamodb = session.resource('dynamodb', region_name=self.region, endpoint_url=self.endpoint_url)
+            table = self._local.table = dynamodb.Table(self.table_name)
+        return table
+
+    async def _run(self, func, *args):
+        """Run a blocking DynamoDB operation on the thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    def close(self):
+        """Wait for running DynamoDB operations and stop the thread pool"""
+        self._executor.shutdown(wait=True)
+
     def _calculate_ttl_timestamp(self) -> int:
         """Calculate TTL timestamp for DynamoDB (current time + TTL minutes)"""
         ttl_time = datetime.utcnow() + timedelta(minutes=self.ttl_minutes)
         return int(ttl_time.timestamp())
-        
-    async def get_conversation_history(self, conversation_id: str, max_messages: int = 50) -> List[Dict]:
-        """Retrieve conversation history from DynamoDB"""
+
+    def _calculate_message_ttl_timestamp(self) -> int:
+        """TTL timestamp for message items (conversation TTL + retention window)"""
+        ttl_time = datetime.utcnow() + timedelta(minutes=self.ttl_minutes, hours=self.message_retention_hours)
+        return int(ttl_time.timestamp())
+
+    @staticmethod
+    def _sequence_base() -> int:
+        """Sequence number a new conversation header starts counting from"""
+        return int(time.time() * 1000)
+
+    @staticmethod
+    def _is_expired(header: Dict) -> bool:
+        item_ttl = int(header.get('ttl', 0))
+        return item_ttl > 0 and int(datetime.utcnow().timestamp()) > item_ttl
+
+    def _get_header(self, conversation_id: str, **kwargs) -> Optional[Dict]:
+        response = self.table.get_item(
+            Key={'conversation_id': conversation_id, 'seq': HEADER_SEQ}, **kwargs
+        )
+        return response.get('Item')
+
+    def _reserve_sequence(self, conversation_id: str, count: int) -> int:
+        """
+        Refresh the header TTL and reserve `count` sequence numbers in one UpdateItem
+
+        Returns:
+            The last reserved sequence number
+        """
+        ttl_timestamp = self._calculate_ttl_timestamp()
+        base = self._sequence_base()
+        # DynamoDB rejects values that an expression does not use, so each
+        # update gets the shared values plus only its own
+        values = {
+            ':n': count,
+            ':list_key': LIST_KEY,
+            ':ttl': ttl_timestamp,
+            ':ttl_hr': datetime.fromtimestamp(ttl_timestamp).isoformat(),
+            ':updated': datetime.utcnow().isoformat(),
+        }
+        names = {'#ttl': 'ttl'}
+        touch = 'list_key = :list_key, updated_at = :updated, #ttl = :ttl, ttl_human_readable = :ttl_hr'
         try:
-            response = self.table.get_item(
-                Key={'conversation_id': conversation_id}
+            response = self.table.update_item(
+                Key={'conversation_id': conversation_id, 'seq': HEADER_SEQ},
+                UpdateExpression=(
+                    f'SET {touch}, '
+                    'last_seq = if_not_exists(last_seq, :base) + :n, '
+                    'message_count = if_not_exists(message_count, :zero) + :n, '
+                    'history_start = if_not_exists(history_start, :start)'
+                ),
+                ConditionExpression='attribute_not_exists(conversation_id) OR #ttl >= :now',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues={
+                    **values,
+                    ':zero': 0,
+                    ':base': base,
+                    ':start': base + 1,
+                    ':now': int(datetime.utcnow().timestamp()),
+                },
+                ReturnValues='UPDATED_NEW'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # The conversation expired: start a new history after the stale messages
+            logger.info(f"Conversation {conversation_id} expired, starting a new history")
+            response = self.table.update_item(
+                Key={'conversation_id': conversation_id, 'seq': HEADER_SEQ},
+                UpdateExpression=(
+                    f'SET {touch}, '
+                    'history_start = last_seq + :one, '
+                    'last_seq = last_seq + :n, '
+                    'message_count = :n'
+                ),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues={**values, ':one': 1},
+                ReturnValues='UPDATED_NEW'
             )
-            
-            if 'Item' not in response:
+        return int(response['Attributes']['last_seq'])
+
+    async def get_conversation_history(self, conversation_id: str, max_messages: int = 50) -> List[Dict]:
+        """Retrieve the last max_messages messages of a conversation from DynamoDB"""
+        return await self._run(self._get_conversation_history, conversation_id, max_messages)
+
+    def _get_conversation_history(self, conversation_id: str, max_messages: int) -> List[Dict]:
+        try:
+            header = self._get_header(conversation_id)
+
+            if not header:
                 logger.info(f"No conversation found for ID: {conversation_id}")
                 return []
-            
-            item = response['Item']
-            
+
             # Check if item has expired (additional safety check)
-            current_time = int(datetime.utcnow().timestamp())
-            item_ttl = item.get('ttl', 0)
-            
-            if item_ttl > 0 and current_time > item_ttl:
-                logger.info(f"Conversation {conversation_id} has expired (TTL: {item_ttl}, Current: {current_time})")
+            if self._is_expired(header):
+                logger.info(f"Conversation {conversation_id} has expired (TTL: {header.get('ttl')})")
                 # Optionally delete the expired item
-                await self.delete_conversation(conversation_id)
+                self._delete_conversation(conversation_id)
                 return []
-            
-            messages = json.loads(item.get('messages', '[]'))
-            
-            # Return last N messages to keep context manageable
-            if len(messages) > max_messages:
-                messages = messages[-max_messages:]
-                logger.info(f"Trimmed conversation to last {max_messages} messages")
-            
+
+            if max_messages <= 0:
+                return []
+
+            # Newest first, stopping after max_messages items
+            response = self.table.query(
+                KeyConditionExpression=(
+                    Key('conversation_id').eq(conversation_id)
+                    & Key('seq').gte(max(int(header.get('history_start', 1)), 1))
+                ),
+                ProjectionExpression='#role, #content, #ts',
+                ExpressionAttributeNames={'#role': 'role', '#content': 'content', '#ts': 'timestamp'},
+                ScanIndexForward=False,
+                Limit=max_messages
+            )
+
+            messages = [
+                {
+                    "role": item['role'],
+                    "content": item['content'],
+                    "timestamp": item.get('timestamp')
+                }
+                for item in reversed(response.get('Items', []))
+            ]
+
             logger.info(f"Retrieved {len(messages)} messages for conversation {conversation_id}")
             return messages
-            
+
         except ClientError as e:
             logger.error(f"Error retrieving conversation {conversation_id}: {str(e)}")
             return []
         except Exception as e:
             logger.error(f"Unexpected error retrieving conversation {conversation_id}: {str(e)}")
             return []
-    
-    async def save_conversation_history(self, conversation_id: str, messages: List[Dict]) -> bool:
-        """Save conversation history to DynamoDB with 15-minute TTL"""
+
+    async def add_messages_to_conversation(self, conversation_id: str, messages: List[Dict]) -> bool:
+        """
+        Append messages (dicts with role and content) to a conversation
+
+        Reserves sequence numbers and refreshes the TTL with one UpdateItem,
+        then writes all messages in one batch, so a whole turn (user and
+        assistant message) costs two requests regardless of history length.
+        """
+        return await self._run(self._add_messages_to_conversation, conversation_id, messages)
+
+    def _add_messages_to_conversation(self, conversation_id: str, messages: List[Dict]) -> bool:
+        if not messages:
+            return True
         try:
-            # Keep only last 100 messages to prevent item size limits
-            if len(messages) > 100:
-                messages = messages[-100:]
-            
-            # Calculate TTL timestamp (15 minutes from now)
-            ttl_timestamp = self._calculate_ttl_timestamp()
-            
-            # Prepare item for DynamoDB
-            item = {
-                'conversation_id': conversation_id,
-                'messages': json.dumps(messages),
-                'updated_at': datetime.utcnow().isoformat(),
-                'message_count': len(messages),
-                'ttl': ttl_timestamp,  # TTL in seconds since epoch
-                'ttl_human_readable': datetime.fromtimestamp(ttl_timestamp).isoformat()  # For debugging
-            }
-            
-            # Save to DynamoDB
-            self.table.put_item(Item=item)
-            
-            logger.info(f"Saved {len(messages)} messages for conversation {conversation_id} with TTL: {item['ttl_human_readable']}")
+            last_seq = self._reserve_sequence(conversation_id, len(messages))
+            first_seq = last_seq - len(messages) + 1
+            message_ttl = self._calculate_message_ttl_timestamp()
+            timestamp = datetime.utcnow().isoformat()
+
+            with self.table.batch_writer() as batch:
+                for seq, message in enumerate(messages, first_seq):
+                    batch.put_item(Item={
+                        'conversation_id': conversation_id,
+                        'seq': seq,
+                        'role': message['role'],
+                        'content': message['content'],
+                        'timestamp': message.get('timestamp') or timestamp,
+                        'ttl': message_ttl
+                    })
+
+            logger.info(f"Appended {len(messages)} messages to conversation {conversation_id} (seq {first_seq}-{last_seq})")
             return True
-            
+
         except ClientError as e:
             logger.error(f"Error saving conversation {conversation_id}: {str(e)}")
             return False
         except Exception as e:
             logger.error(f"Unexpected error saving conversation {conversation_id}: {str(e)}")
             return False
-    
+
+    async def save_conversation_history(self, conversation_id: str, messages: List[Dict]) -> bool:
+        """Replace conversation history with messages (an empty list clears it)"""
+        try:
+            if not await self.clear_conversation(conversation_id):
+                return False
+            return await self.add_messages_to_conversation(conversation_id, messages)
+        except Exception as e:
+            logger.error(f"Unexpected error saving conversation {conversation_id}: {str(e)}")
+            return False
+
     async def add_message_to_conversation(self, conversation_id: str, role: str, content: str) -> bool:
         """Add a single message to conversation history with updated TTL"""
+        return await self.add_messages_to_conversation(
+            conversation_id, [{"role": role, "content": content}]
+        )
+
+    async def clear_conversation(self, conversation_id: str) -> bool:
+        """Start an empty history for a conversation, keeping its ID"""
+        return await self._run(self._clear_conversation, conversation_id)
+
+    def _clear_conversation(self, conversation_id: str) -> bool:
         try:
-            # Get current history
-            current_messages = await self.get_conversation_history(conversation_id)
-            
-            # Add new message
-            new_message = {
-                "role": role,
-                "content": content,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            current_messages.append(new_message)
-            
-            # Save updated history (this will reset the TTL to 15 minutes from now)
-            return await self.save_conversation_history(conversation_id, current_messages)
-            
-        except Exception as e:
-            logger.error(f"Error adding message to conversation {conversation_id}: {str(e)}")
+            ttl_timestamp = self._calculate_ttl_timestamp()
+            self.table.update_item(
+                Key={'conversation_id': conversation_id, 'seq': HEADER_SEQ},
+                UpdateExpression=(
+                    'SET history_start = if_not_exists(last_seq, :base) + :one, '
+                    'last_seq = if_not_exists(last_seq, :base), message_count = :zero, '
+                    'list_key = :list_key, updated_at = :updated, #ttl = :ttl, ttl_human_readable = :ttl_hr'
+                ),
+                ExpressionAttributeNames={'#ttl': 'ttl'},
+                ExpressionAttributeValues={
+                    ':list_key': LIST_KEY,
+                    ':zero': 0,
+                    ':one': 1,
+                    ':base': self._sequence_base(),
+                    ':ttl': ttl_timestamp,
+                    ':ttl_hr': datetime.fromtimestamp(ttl_timestamp).isoformat(),
+                    ':updated': datetime.utcnow().isoformat()
+                }
+            )
+            logger.info(f"Cleared history of conversation {conversation_id}")
+            return True
+        except ClientError as e:
+            logger.error(f"Error clearing conversation {conversation_id}: {str(e)}")
             return False
-    
+
     async def refresh_conversation_ttl(self, conversation_id: str) -> bool:
         """Refresh the TTL for an existing conversation (extend by 15 minutes)"""
+        return await self._run(self._refresh_conversation_ttl, conversation_id)
+
+    def _refresh_conversation_ttl(self, conversation_id: str) -> bool:
         try:
             # Calculate new TTL timestamp
             new_ttl = self._calculate_ttl_timestamp()
-            
-            # Update only the TTL field
+
+            # Update only the header; it alone decides whether the conversation is alive
             response = self.table.update_item(
-                Key={'conversation_id': conversation_id},
+                Key={'conversation_id': conversation_id, 'seq': HEADER_SEQ},
                 UpdateExpression='SET #ttl = :ttl, #ttl_hr = :ttl_hr, #updated = :updated',
                 ExpressionAttributeNames={
                     '#ttl': 'ttl',
@@ -144,10 +330,10 @@ class ConversationManager:
                 ConditionExpression='attribute_exists(conversation_id)',
                 ReturnValues='UPDATED_NEW'
             )
-            
+
             logger.info(f"Refreshed TTL for conversation {conversation_id} to {datetime.fromtimestamp(new_ttl).isoformat()}")
             return True
-            
+
         except ClientError as e:
             if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
                 logger.warning(f"Conversation {conversation_id} does not exist, cannot refresh TTL")
@@ -157,47 +343,85 @@ class ConversationManager:
         except Exception as e:
             logger.error(f"Unexpected error refreshing TTL for conversation {conversation_id}: {str(e)}")
             return False
-    
+
     async def delete_conversation(self, conversation_id: str) -> bool:
-        """Delete a conversation from DynamoDB"""
+        """Delete a conversation (header and all message items) from DynamoDB"""
+        return await self._run(self._delete_conversation, conversation_id)
+
+    def _delete_conversation(self, conversation_id: str) -> bool:
         try:
-            self.table.delete_item(
-                Key={'conversation_id': conversation_id}
-            )
-            logger.info(f"Deleted conversation {conversation_id}")
+            query_kwargs = {
+                'KeyConditionExpression': Key('conversation_id').eq(conversation_id),
+                'ProjectionExpression': 'conversation_id, seq'
+            }
+            deleted = 0
+            with self.table.batch_writer() as batch:
+                while True:
+                    response = self.table.query(**query_kwargs)
+                    for item in response.get('Items', []):
+                        batch.delete_item(Key={'conversation_id': conversation_id, 'seq': item['seq']})
+                        deleted += 1
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            logger.info(f"Deleted conversation {conversation_id} ({deleted} items)")
             return True
-            
+
         except ClientError as e:
             logger.error(f"Error deleting conversation {conversation_id}: {str(e)}")
             return False
-    
+
     async def get_conversation_metadata(self, conversation_id: str) -> Optional[Dict]:
         """Get conversation metadata without full message history"""
+        return await self._run(self._get_conversation_metadata, conversation_id)
+
+    def _get_conversation_metadata(self, conversation_id: str) -> Optional[Dict]:
         try:
-            response = self.table.get_item(
-                Key={'conversation_id': conversation_id},
+            item = self._get_header(
+                conversation_id,
                 ProjectionExpression='conversation_id, updated_at, message_count, #ttl, ttl_human_readable',
                 ExpressionAttributeNames={'#ttl': 'ttl'}
             )
-            
-            if 'Item' in response:
-                item = response['Item']
-                
+
+            if item:
                 # Check if item has expired
-                current_time = int(datetime.utcnow().timestamp())
-                item_ttl = item.get('ttl', 0)
-                
-                if item_ttl > 0 and current_time > item_ttl:
+                if self._is_expired(item):
                     logger.info(f"Conversation {conversation_id} metadata shows expired item")
                     return None
-                
+
                 return item
             return None
-            
+
         except ClientError as e:
             logger.error(f"Error getting metadata for conversation {conversation_id}: {str(e)}")
             return None
-    
+
+    async def list_conversations(self) -> List[Dict]:
+        """List conversation headers (ID, last update, message count), most recent first"""
+        return await self._run(self._list_conversations)
+
+    def _list_conversations(self) -> List[Dict]:
+        # Message items have no list_key, so this reads header items only
+        query_kwargs = {
+            'IndexName': HEADERS_INDEX,
+            'KeyConditionExpression': Key('list_key').eq(LIST_KEY),
+            'ProjectionExpression': 'conversation_id, updated_at, message_count',
+            'ScanIndexForward': False
+        }
+        conversations = []
+        while True:
+            response = self.table.query(**query_kwargs)
+            for item in response.get('Items', []):
+                conversations.append({
+                    'conversation_id': item.get('conversation_id'),
+                    'updated_at': item.get('updated_at'),
+                    'message_count': int(item.get('message_count', 0))
+                })
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return conversations
+
     def get_ttl_info(self) -> Dict:
         """Get TTL configuration information"""
         return {
@@ -11,12 +11,13 @@ import asyncio
 import requests
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
 # Strands SDK imports
 from strands import Agent, tool
@@ -41,6 +42,9 @@ DEFAULT_MAX_TOKENS = 4000
 strands_mcp_client = None
 conversation_manager = None
 
+# Conversation turns still being written to DynamoDB, by conversation ID
+_pending_saves: Dict[str, asyncio.Task] = {}
+
 # MCP Tools caching
 _mcp_tools_cache = None
 _mcp_tools_cache_time = None
@@ -88,6 +92,36 @@ def get_cached_mcp_tools():
     
     return _mcp_tools_cache or []
 
+async def _save_turn(conversation_id: str, messages: List[Dict], previous: Optional[asyncio.Task]):
+    """Append a turn after any earlier turn of the same conversation is written"""
+    if previous:
+        await asyncio.wait({previous})
+    try:
+        if not await conversation_manager.add_messages_to_conversation(conversation_id, messages):
+            logger.error(f"Failed to save turn of conversation {conversation_id}")
+    except Exception as e:
+        logger.error(f"Error saving turn of conversation {conversation_id}: {str(e)}")
+
+def schedule_turn_save(conversation_id: str, messages: List[Dict]) -> asyncio.Task:
+    """Write a conversation turn to DynamoDB in the background, in order per conversation"""
+    task = asyncio.create_task(
+        _save_turn(conversation_id, messages, _pending_saves.get(conversation_id))
+    )
+    _pending_saves[conversation_id] = task
+
+    def forget(done):
+        if _pending_saves.get(conversation_id) is done:
+            del _pending_saves[conversation_id]
+
+    task.add_done_callback(forget)
+    return task
+
+async def wait_for_pending_save(conversation_id: str):
+    """Wait until every scheduled turn of a conversation is written"""
+    pending = _pending_saves.get(conversation_id)
+    if pending:
+        await asyncio.wait({pending})
+
 def create_bedrock_model(temperature: float = DEFAULT_TEMPERATURE, max_tokens: int = DEFAULT_MAX_TOKENS) -> BedrockModel:
     """Create a BedrockModel with specified parameters"""
     return BedrockModel(
@@ -166,6 +200,11 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    if _pending_saves:
+        logger.info(f"Waiting for {len(_pending_saves)} conversation saves")
+        await asyncio.wait(list(_pending_saves.values()))
+    if conversation_manager:
+        conversation_manager.close()
     if strands_mcp_client:
         await strands_mcp_client.close()
         logger.info("MCP client closed")
@@ -225,7 +264,8 @@ async def stream(request: Request):
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
         
-        # Load conversation history from DynamoDB
+        # Load conversation history from DynamoDB, including a previous turn still being saved
+        await wait_for_pending_save(conversation_id)
         conversation_history = await conversation_manager.get_conversation_history(conversation_id)
         
         # Set up MCP client if needed
@@ -276,21 +316,25 @@ async def stream(request: Request):
                         full_response += chunk_text
                         yield chunk_text
                 
-                # Save conversation to DynamoDB after streaming completes
-                await conversation_manager.add_message_to_conversation(
-                    conversation_id, "user", message
-                )
-                await conversation_manager.add_message_to_conversation(
-                    conversation_id, "assistant", full_response
+                # Save the turn in the background; the client is not kept waiting for DynamoDB
+                schedule_turn_save(
+                    conversation_id,
+                    [
+                        {"role": "user", "content": message},
+                        {"role": "assistant", "content": full_response}
+                    ]
                 )
                     
             except Exception as e:
                 yield f"Error: {str(e)}"
         
+        # The background task runs once the response body is sent and keeps the
+        # invocation open until the turn is written, so Lambda does not freeze mid-save
         return StreamingResponse(
             generate_response(),
             media_type="text/plain",
-            headers={"Cache-Control": "no-cache", "Connection": "keep-alive"}
+            headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+            background=BackgroundTask(wait_for_pending_save, conversation_id)
         )
         
     except Exception as e:
@@ -302,26 +346,8 @@ async def stream(request: Request):
 async def list_conversations():
     """List all conversation IDs from DynamoDB"""
     try:
-        # Get all conversations from DynamoDB
-        # This is a simple scan - in production, you might want pagination
-        import boto3
-        dynamodb = boto3.resource('dynamodb', region_name=BEDROCK_REGION)
-        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
-        
-        response = table.scan(
-            ProjectionExpression='conversation_id, updated_at, message_count'
-        )
-        
-        conversations = []
-        for item in response.get('Items', []):
-            conversations.append({
-                'conversation_id': item.get('conversation_id'),
-                'updated_at': item.get('updated_at'),
-                'message_count': item.get('message_count', 0)
-            })
-        
-        # Sort by updated_at descending (most recent first)
-        conversations.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
+        # Conversation headers only, most recent first
+        conversations = await conversation_manager.list_conversations()
         
         return {
             "conversations": conversations,
@@ -336,19 +362,13 @@ async def list_conversations():
 async def clear_all_conversations():
     """Clear all conversations from DynamoDB"""
     try:
-        import boto3
-        dynamodb = boto3.resource('dynamodb', region_name=BEDROCK_REGION)
-        table = dynamodb.Table(DYNAMODB_TABLE_NAME)
-        
-        # Scan to get all conversation IDs
-        response = table.scan(ProjectionExpression='conversation_id')
-        
-        deleted_count = 0
-        # Delete each conversation
-        for item in response.get('Items', []):
-            conversation_id = item.get('conversation_id')
-            table.delete_item(Key={'conversation_id': conversation_id})
-            deleted_count += 1
+        # Delete each conversation with all of its messages, in parallel on the DynamoDB pool
+        conversations = await conversation_manager.list_conversations()
+        results = await asyncio.gather(*(
+            conversation_manager.delete_conversation(conversation['conversation_id'])
+            for conversation in conversations
+        ))
+        deleted_count = sum(1 for deleted in results if deleted)
         
         logger.info(f"Cleared {deleted_count} conversations from DynamoDB")
         return {
@@ -364,8 +384,11 @@ async def clear_all_conversations():
 async def get_conversation(conversation_id: str):
     """Get conversation history and metadata"""
     try:
-        history = await conversation_manager.get_conversation_history(conversation_id)
-        metadata = await conversation_manager.get_conversation_metadata(conversation_id)
+        await wait_for_pending_save(conversation_id)
+        history, metadata = await asyncio.gather(
+            conversation_manager.get_conversation_history(conversation_id),
+            conversation_manager.get_conversation_metadata(conversation_id)
+        )
         
         return {
             "conversation_id": conversation_id,
@@ -381,6 +404,7 @@ async def get_conversation(conversation_id: str):
 async def delete_conversation(conversation_id: str):
     """Delete a conversation"""
     try:
+        await wait_for_pending_save(conversation_id)
         success = await conversation_manager.delete_conversation(conversation_id)
         if success:
             return {"message": f"Conversation {conversation_id} deleted successfully"}
@@ -394,7 +418,8 @@ async def delete_conversation(conversation_id: str):
 async def clear_conversation(conversation_id: str):
     """Clear conversation history but keep the conversation ID"""
     try:
-        success = await conversation_manager.save_conversation_history(conversation_id, [])
+        await wait_for_pending_save(conversation_id)
+        success = await conversation_manager.clear_conversation(conversation_id)
         if success:
             return {"message": f"Conversation {conversation_id} cleared successfully"}
         else:
@@ -0,0 +1,128 @@
+"""
+Concurrent /stream load test for the AWS Operations Agent API
+
+Sends `--requests` chat requests to /stream with up to `--concurrency` in
+flight, each in its own conversation (or all in one with --same-conversation),
+and reports streams per second together with time-to-first-byte and total
+latency percentiles. Run the API locally, for example against DynamoDB Local:
+
+    DYNAMODB_ENDPOINT_URL=http://localhost:8000 uvicorn main:app --port 8080
+    python tests/load_test_stream.py --url http://localhost:8080 --concurrency 20
+
+To compare two versions, run the same command against each build and compare
+the "streams/s" and "ttfb" lines: when DynamoDB calls block the event loop,
+time to first byte grows with concurrency even though the model is streaming.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import aiohttp
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_stream(session, url, payload):
+    """Send one /stream request and time the first byte and the full body"""
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    async with session.post(f"{url}/stream", json=payload) as response:
+        response.raise_for_status()
+        async for chunk in response.content.iter_any():
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            size += len(chunk)
+    total = time.perf_counter() - started
+    return {'ttfb': first_byte if first_byte is not None else total, 'total': total, 'bytes': size}
+
+
+async def load_test(args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    shared_conversation = str(uuid.uuid4())
+    results = []
+    errors = []
+
+    async def one(index):
+        payload = {
+            'message': args.message,
+            'conversation_id': shared_conversation if args.same_conversation else str(uuid.uuid4()),
+            'use_tools': False,
+        }
+        async with semaphore:
+            try:
+                results.append(await run_stream(session, args.url, payload))
+            except Exception as e:
+                errors.append(f"request {index}: {str(e)}")
+
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    return results, errors, elapsed
+
+
+def report(args, results, errors, elapsed):
+    ttfb = [r['ttfb'] for r in results]
+    total = [r['total'] for r in results]
+    summary = {
+        'url': args.url,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'completed': len(results),
+        'errors': len(errors),
+        'elapsed_seconds': round(elapsed, 3),
+        'streams_per_second': round(len(results) / elapsed, 2) if elapsed else 0.0,
+    }
+    for name, values in (('ttfb', ttfb), ('total', total)):
+        summary[name] = {
+            'mean': round(statistics.mean(values), 3) if values else 0.0,
+            'p50': round(percentile(values, 50), 3),
+            'p95': round(percentile(values, 95), 3),
+            'max': round(max(values), 3) if values else 0.0,
+        }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{summary['completed']}/{args.requests} streams, concurrency {args.concurrency}, "
+          f"{summary['errors']} errors in {summary['elapsed_seconds']}s")
+    print(f"streams/s: {summary['streams_per_second']}")
+    for name in ('ttfb', 'total'):
+        stats = summary[name]
+        print(f"{name:>6} (s): mean {stats['mean']}  p50 {stats['p50']}  "
+              f"p95 {stats['p95']}  max {stats['max']}")
+    for error in errors[:5]:
+        print(f"  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /stream load test")
+    parser.add_argument('--url', default='http://localhost:8080', help='Base URL of the API')
+    parser.add_argument('--requests', type=int, default=100, help='Total number of chat requests')
+    parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once')
+    parser.add_argument('--message', default='Reply with one short sentence.', help='Chat message to send')
+    parser.add_argument('--same-conversation', action='store_true',
+                        help='Send every request to one conversation instead of one each')
+    parser.add_argument('--timeout', type=float, default=300, help='Per-request timeout in seconds')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    results, errors, elapsed = asyncio.run(load_test(args))
+    report(args, results, errors, elapsed)
+
+
+if __name__ == '__main__':
+    main()
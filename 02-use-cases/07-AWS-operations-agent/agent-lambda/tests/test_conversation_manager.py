@@ -0,0 +1,206 @@
+"""
+Tests for the append-only DynamoDB ConversationManager
+
+DynamoDB is replaced by moto's in-process stand-in, so no AWS account or
+network access is needed:
+
+    pip install -r src/requirements.txt moto pytest
+    python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+from moto.dynamodb.models import DynamoDBBackend
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from conversation_manager import ConversationManager, HEADER_SEQ, HEADERS_INDEX  # noqa: E402
+
+TABLE_NAME = 'test-conversations'
+REGION = 'us-east-1'
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def atomic_updates(monkeypatch):
+    """Apply moto's UpdateItem one at a time, as DynamoDB does for a single item"""
+    lock = threading.Lock()
+    update_item = DynamoDBBackend.update_item
+
+    def locked(self, *args, **kwargs):
+        with lock:
+            return update_item(self, *args, **kwargs)
+
+    monkeypatch.setattr(DynamoDBBackend, 'update_item', locked)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    atomic_updates(monkeypatch)
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.delenv('DYNAMODB_ENDPOINT_URL', raising=False)
+    with mock_aws():
+        boto3.client('dynamodb', region_name=REGION).create_table(
+            TableName=TABLE_NAME,
+            AttributeDefinitions=[
+                {'AttributeName': 'conversation_id', 'AttributeType': 'S'},
+                {'AttributeName': 'seq', 'AttributeType': 'N'},
+                {'AttributeName': 'list_key', 'AttributeType': 'S'},
+                {'AttributeName': 'updated_at', 'AttributeType': 'S'},
+            ],
+            KeySchema=[
+                {'AttributeName': 'conversation_id', 'KeyType': 'HASH'},
+                {'AttributeName': 'seq', 'KeyType': 'RANGE'},
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': HEADERS_INDEX,
+                'KeySchema': [
+                    {'AttributeName': 'list_key', 'KeyType': 'HASH'},
+                    {'AttributeName': 'updated_at', 'KeyType': 'RANGE'},
+                ],
+                'Projection': {'ProjectionType': 'INCLUDE', 'NonKeyAttributes': ['message_count']},
+            }],
+            BillingMode='PAY_PER_REQUEST',
+        )
+        manager = ConversationManager(TABLE_NAME, region=REGION)
+        yield manager
+        manager.close()
+
+
+def turn(user, assistant):
+    return [{'role': 'user', 'content': user}, {'role': 'assistant', 'content': assistant}]
+
+
+def test_turn_is_stored_one_message_per_item(manager):
+    assert run(manager.add_messages_to_conversation('c1', turn('hi', 'hello')))
+
+    items = manager.table.scan()['Items']
+    assert len(items) == 3
+    header = next(item for item in items if item['seq'] == HEADER_SEQ)
+    assert header['message_count'] == 2
+    assert [m['content'] for m in run(manager.get_conversation_history('c1'))] == ['hi', 'hello']
+
+
+def test_history_returns_last_messages_in_order(manager):
+    for i in range(10):
+        run(manager.add_messages_to_conversation('c1', turn(f'q{i}', f'a{i}')))
+    run(manager.add_message_to_conversation('c1', 'user', 'last'))
+
+    history = run(manager.get_conversation_history('c1', max_messages=3))
+    assert [m['content'] for m in history] == ['q9', 'a9', 'last']
+    assert [m['role'] for m in history] == ['user', 'assistant', 'user']
+    assert run(manager.get_conversation_metadata('c1'))['message_count'] == 21
+
+
+def test_concurrent_appends_run_off_the_event_loop(manager):
+    async def append_all():
+        loop_thread = threading.get_ident()
+        threads = set()
+        original = manager._add_messages_to_conversation
+
+        def add(conversation_id, messages):
+            threads.add(threading.get_ident())
+            return original(conversation_id, messages)
+
+        manager._add_messages_to_conversation = add
+        results = await asyncio.gather(*(
+            manager.add_messages_to_conversation('c1', turn(f'q{i}', f'a{i}')) for i in range(8)
+        ))
+        return results, loop_thread, threads
+
+    results, loop_thread, threads = run(append_all())
+    assert all(results)
+    assert loop_thread not in threads
+    history = run(manager.get_conversation_history('c1'))
+    assert len(history) == 16
+    assert len({m['content'] for m in history}) == 16
+
+
+def test_conversations_are_isolated(manager):
+    run(manager.add_message_to_conversation('c1', 'user', 'one'))
+    run(manager.add_message_to_conversation('c2', 'user', 'two'))
+    assert [m['content'] for m in run(manager.get_conversation_history('c2'))] == ['two']
+    assert run(manager.get_conversation_history('missing')) == []
+
+
+def test_append_refreshes_ttl_with_header_update(manager):
+    run(manager.add_message_to_conversation('c1', 'user', 'one'))
+    header = manager.table.get_item(Key={'conversation_id': 'c1', 'seq': HEADER_SEQ})['Item']
+    manager.table.update_item(
+        Key={'conversation_id': 'c1', 'seq': HEADER_SEQ},
+        UpdateExpression='SET #ttl = :ttl',
+        ExpressionAttributeNames={'#ttl': 'ttl'},
+        ExpressionAttributeValues={':ttl': int(time.time()) + 5},
+    )
+
+    run(manager.add_message_to_conversation('c1', 'assistant', 'two'))
+    refreshed = manager.table.get_item(Key={'conversation_id': 'c1', 'seq': HEADER_SEQ})['Item']
+    assert refreshed['ttl'] >= header['ttl']
+    assert len(run(manager.get_conversation_history('c1'))) == 2
+
+
+def test_expired_conversation_starts_new_history(manager):
+    run(manager.add_messages_to_conversation('c1', turn('old question', 'old answer')))
+    manager.table.update_item(
+        Key={'conversation_id': 'c1', 'seq': HEADER_SEQ},
+        UpdateExpression='SET #ttl = :ttl',
+        ExpressionAttributeNames={'#ttl': 'ttl'},
+        ExpressionAttributeValues={':ttl': int(time.time()) - 60},
+    )
+
+    run(manager.add_message_to_conversation('c1', 'user', 'new question'))
+    assert [m['content'] for m in run(manager.get_conversation_history('c1'))] == ['new question']
+    assert run(manager.get_conversation_metadata('c1'))['message_count'] == 1
+
+
+def test_clear_keeps_conversation_but_drops_history(manager):
+    run(manager.add_messages_to_conversation('c1', turn('q', 'a')))
+    assert run(manager.clear_conversation('c1'))
+    assert run(manager.get_conversation_history('c1')) == []
+
+    run(manager.add_message_to_conversation('c1', 'user', 'again'))
+    assert [m['content'] for m in run(manager.get_conversation_history('c1'))] == ['again']
+
+
+def test_save_conversation_history_replaces_messages(manager):
+    run(manager.add_messages_to_conversation('c1', turn('q', 'a')))
+    assert run(manager.save_conversation_history('c1', turn('x', 'y')))
+    assert [m['content'] for m in run(manager.get_conversation_history('c1'))] == ['x', 'y']
+
+
+def test_delete_and_list(manager):
+    for conversation_id in ('c1', 'c2'):
+        run(manager.add_messages_to_conversation(conversation_id, turn('q', 'a')))
+
+    listed = run(manager.list_conversations())
+    assert sorted(c['conversation_id'] for c in listed) == ['c1', 'c2']
+    assert all(c['message_count'] == 2 for c in listed)
+
+    assert run(manager.delete_conversation('c1'))
+    assert [c['conversation_id'] for c in run(manager.list_conversations())] == ['c2']
+    assert manager.table.query(
+        KeyConditionExpression='conversation_id = :id',
+        ExpressionAttributeValues={':id': 'c1'},
+    )['Items'] == []
+
+
+def test_list_reads_header_items_only(manager):
+    run(manager.add_messages_to_conversation('old', turn('q', 'a')))
+    time.sleep(0.01)
+    run(manager.add_messages_to_conversation('new', turn('q', 'a') + turn('q2', 'a2')))
+
+    indexed = manager.table.query(
+        IndexName=HEADERS_INDEX,
+        KeyConditionExpression='list_key = :key',
+        ExpressionAttributeValues={':key': 'conversation'},
+    )['Items']
+    assert len(indexed) == 2
+    assert [c['conversation_id'] for c in run(manager.list_conversations())] == ['new', 'old']
@@ -1,13 +1,22 @@
 """
 AWS Operations Agent Gateway Lambda Handler - Optimized Version
-Handles AWS resource inspection tools via Strands Agent integration
+Handles AWS resource inspection tools via a direct boto3 fast path for common
+read queries and Strands Agent integration for everything else
 Updated: 2025-07-15 - Fixed Strands import issue
 """
 import json
 import logging
 import os
+import re
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+import boto3
+import jmespath
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
 # Import Strands components at module level
 try:
@@ -49,11 +58,408 @@ SERVICE_QUERIES = {
     'sagemaker_read_operations': "List and describe SageMaker resources including endpoints, models, training jobs, and notebook instances. Include status and configurations."
 }
 
+# Direct boto3 fast path: common read intents per service tool, answered with
+# paginated boto3 calls instead of a nested agent. 'nouns' is a regex for the
+# resource words of the query, 'items' a JMESPath expression selecting the
+# resources from each response page and 'fields' the columns shown per resource
+# (a resource that is a plain string, such as an ARN, is shown as is).
+_NAME_TAG = "Tags[?Key=='Name'].Value | [0]"
+FAST_PATH_INTENTS = {
+    'ec2_read_operations': [
+        {'name': 'running_instances', 'nouns': r"running (?:ec2 )?instances", 'label': 'running EC2 instances',
+         'service': 'ec2', 'operation': 'describe_instances',
+         'params': {'Filters': [{'Name': 'instance-state-name', 'Values': ['running']}]},
+         'items': 'Reservations[].Instances[]',
+         'fields': {'id': 'InstanceId', 'name': _NAME_TAG, 'type': 'InstanceType',
+                    'az': 'Placement.AvailabilityZone'}},
+        {'name': 'instances', 'nouns': r"(?:ec2 )?instances", 'label': 'EC2 instances',
+         'service': 'ec2', 'operation': 'describe_instances',
+         'items': 'Reservations[].Instances[]',
+         'fields': {'id': 'InstanceId', 'name': _NAME_TAG, 'type': 'InstanceType', 'state': 'State.Name'}},
+        {'name': 'security_groups', 'nouns': r"(?:ec2 )?security groups", 'label': 'security groups',
+         'service': 'ec2', 'operation': 'describe_security_groups', 'items': 'SecurityGroups[]',
+         'fields': {'id': 'GroupId', 'name': 'GroupName', 'vpc': 'VpcId'}},
+        {'name': 'vpcs', 'nouns': r"vpcs", 'label': 'VPCs',
+         'service': 'ec2', 'operation': 'describe_vpcs', 'items': 'Vpcs[]',
+         'fields': {'id': 'VpcId', 'name': _NAME_TAG, 'cidr': 'CidrBlock', 'default': 'IsDefault'}},
+        {'name': 'subnets', 'nouns': r"subnets", 'label': 'subnets',
+         'service': 'ec2', 'operation': 'describe_subnets', 'items': 'Subnets[]',
+         'fields': {'id': 'SubnetId', 'vpc': 'VpcId', 'cidr': 'CidrBlock', 'az': 'AvailabilityZone'}},
+        {'name': 'key_pairs', 'nouns': r"(?:ec2 )?key pairs", 'label': 'key pairs',
+         'service': 'ec2', 'operation': 'describe_key_pairs', 'items': 'KeyPairs[]',
+         'fields': {'name': 'KeyName', 'type': 'KeyType'}},
+    ],
+    's3_read_operations': [
+        {'name': 'buckets', 'nouns': r"(?:s3 )?buckets", 'label': 'S3 buckets',
+         'service': 's3', 'operation': 'list_buckets', 'items': 'Buckets[]',
+         'fields': {'name': 'Name', 'created': 'CreationDate'}},
+    ],
+    'lambda_read_operations': [
+        {'name': 'functions', 'nouns': r"(?:lambda )?functions|lambdas", 'label': 'Lambda functions',
+         'service': 'lambda', 'operation': 'list_functions', 'items': 'Functions[]',
+         'fields': {'name': 'FunctionName', 'runtime': 'Runtime', 'memory_mb': 'MemorySize',
+                    'timeout_s': 'Timeout', 'modified': 'LastModified'}},
+        {'name': 'layers', 'nouns': r"(?:lambda )?layers", 'label': 'Lambda layers',
+         'service': 'lambda', 'operation': 'list_layers', 'items': 'Layers[]',
+         'fields': {'name': 'LayerName', 'version': 'LatestMatchingVersion.Version'}},
+    ],
+    'cloudformation_read_operations': [
+        {'name': 'failed_stacks', 'nouns': r"failed (?:cloudformation )?stacks", 'label': 'failed or rolled back stacks',
+         'service': 'cloudformation', 'operation': 'list_stacks',
+         'params': {'StackStatusFilter': [
+             'CREATE_FAILED', 'ROLLBACK_FAILED', 'ROLLBACK_COMPLETE', 'DELETE_FAILED', 'UPDATE_FAILED',
+             'UPDATE_ROLLBACK_FAILED', 'UPDATE_ROLLBACK_COMPLETE', 'IMPORT_ROLLBACK_FAILED',
+             'IMPORT_ROLLBACK_COMPLETE']},
+         'items': 'StackSummaries[]',
+         'fields': {'name': 'StackName', 'status': 'StackStatus', 'reason': 'StackStatusReason'}},
+        {'name': 'stacks', 'nouns': r"(?:cloudformation )?stacks", 'label': 'CloudFormation stacks',
+         'service': 'cloudformation', 'operation': 'describe_stacks', 'items': 'Stacks[]',
+         'fields': {'name': 'StackName', 'status': 'StackStatus', 'created': 'CreationTime'}},
+    ],
+    'iam_read_operations': [
+        {'name': 'users', 'nouns': r"(?:iam )?users", 'label': 'IAM users',
+         'service': 'iam', 'operation': 'list_users', 'items': 'Users[]',
+         'fields': {'name': 'UserName', 'created': 'CreateDate'}},
+        {'name': 'roles', 'nouns': r"(?:iam )?roles", 'label': 'IAM roles',
+         'service': 'iam', 'operation': 'list_roles', 'items': 'Roles[]',
+         'fields': {'name': 'RoleName', 'created': 'CreateDate'}},
+        {'name': 'groups', 'nouns': r"(?:iam )?groups", 'label': 'IAM groups',
+         'service': 'iam', 'operation': 'list_groups', 'items': 'Groups[]',
+         'fields': {'name': 'GroupName', 'created': 'CreateDate'}},
+        # Only asked-for customer managed policies: Scope 'Local' leaves out AWS managed ones,
+        # so a plain "list policies" goes to the agent
+        {'name': 'customer_managed_policies', 'nouns': r"(?:iam )?customer[- ]managed (?:iam )?policies",
+         'label': 'customer managed IAM policies',
+         'service': 'iam', 'operation': 'list_policies', 'params': {'Scope': 'Local'}, 'items': 'Policies[]',
+         'fields': {'name': 'PolicyName', 'attachments': 'AttachmentCount'}},
+    ],
+    'rds_read_operations': [
+        {'name': 'db_instances', 'nouns': r"(?:rds )?(?:db |database )?instances|(?:rds )?databases",
+         'label': 'RDS DB instances',
+         'service': 'rds', 'operation': 'describe_db_instances', 'items': 'DBInstances[]',
+         'fields': {'id': 'DBInstanceIdentifier', 'engine': 'Engine', 'version': 'EngineVersion',
+                    'class': 'DBInstanceClass', 'status': 'DBInstanceStatus'}},
+        {'name': 'db_clusters', 'nouns': r"(?:rds |aurora )?(?:db |database )?clusters", 'label': 'RDS DB clusters',
+         'service': 'rds', 'operation': 'describe_db_clusters', 'items': 'DBClusters[]',
+         'fields': {'id': 'DBClusterIdentifier', 'engine': 'Engine', 'status': 'Status'}},
+        {'name': 'db_snapshots', 'nouns': r"(?:rds )?(?:db )?snapshots", 'label': 'RDS DB snapshots',
+         'service': 'rds', 'operation': 'describe_db_snapshots', 'items': 'DBSnapshots[]',
+         'fields': {'id': 'DBSnapshotIdentifier', 'instance': 'DBInstanceIdentifier',
+                    'created': 'SnapshotCreateTime', 'status': 'Status'}},
+    ],
+    'cloudwatch_read_operations': [
+        {'name': 'alarms_in_alarm', 'nouns': r"(?:active |firing |triggered )(?:cloudwatch )?alarms|(?:cloudwatch )?alarms in alarm(?: state)?",
+         'label': 'CloudWatch alarms in ALARM state',
+         'service': 'cloudwatch', 'operation': 'describe_alarms', 'params': {'StateValue': 'ALARM'},
+         'items': 'MetricAlarms[]',
+         'fields': {'name': 'AlarmName', 'metric': 'MetricName', 'since': 'StateUpdatedTimestamp'}},
+        {'name': 'alarms', 'nouns': r"(?:cloudwatch )?alarms", 'label': 'CloudWatch alarms',
+         'service': 'cloudwatch', 'operation': 'describe_alarms', 'items': 'MetricAlarms[]',
+         'fields': {'name': 'AlarmName', 'state': 'StateValue', 'metric': 'MetricName'}},
+        {'name': 'log_groups', 'nouns': r"(?:cloudwatch )?log groups", 'label': 'CloudWatch log groups',
+         'service': 'logs', 'operation': 'describe_log_groups', 'items': 'logGroups[]',
+         'fields': {'name': 'logGroupName', 'retention_days': 'retentionInDays', 'stored_bytes': 'storedBytes'}},
+        {'name': 'dashboards', 'nouns': r"(?:cloudwatch )?dashboards", 'label': 'CloudWatch dashboards',
+         'service': 'cloudwatch', 'operation': 'list_dashboards', 'items': 'DashboardEntries[]',
+         'fields': {'name': 'DashboardName', 'modified': 'LastModified'}},
+    ],
+    'ecs_read_operations': [
+        {'name': 'clusters', 'nouns': r"(?:ecs )?clusters", 'label': 'ECS clusters',
+         'service': 'ecs', 'operation': 'list_clusters', 'items': 'clusterArns[]'},
+        {'name': 'task_definitions', 'nouns': r"(?:ecs )?task definitions", 'label': 'ECS task definitions',
+         'service': 'ecs', 'operation': 'list_task_definitions', 'items': 'taskDefinitionArns[]'},
+    ],
+    'eks_read_operations': [
+        {'name': 'clusters', 'nouns': r"(?:eks |kubernetes )?clusters", 'label': 'EKS clusters',
+         'service': 'eks', 'operation': 'list_clusters', 'items': 'clusters[]'},
+    ],
+    'sns_read_operations': [
+        {'name': 'topics', 'nouns': r"(?:sns )?topics", 'label': 'SNS topics',
+         'service': 'sns', 'operation': 'list_topics', 'items': 'Topics[]', 'fields': {'arn': 'TopicArn'}},
+        {'name': 'subscriptions', 'nouns': r"(?:sns )?subscriptions", 'label': 'SNS subscriptions',
+         'service': 'sns', 'operation': 'list_subscriptions', 'items': 'Subscriptions[]',
+         'fields': {'topic': 'TopicArn', 'protocol': 'Protocol', 'endpoint': 'Endpoint'}},
+    ],
+    'sqs_read_operations': [
+        {'name': 'queues', 'nouns': r"(?:sqs )?queues", 'label': 'SQS queues',
+         'service': 'sqs', 'operation': 'list_queues', 'items': 'QueueUrls[]'},
+    ],
+    'dynamodb_read_operations': [
+        {'name': 'tables', 'nouns': r"(?:dynamodb )?tables", 'label': 'DynamoDB tables',
+         'service': 'dynamodb', 'operation': 'list_tables', 'items': 'TableNames[]'},
+    ],
+    'route53_read_operations': [
+        {'name': 'hosted_zones', 'nouns': r"(?:route ?53 )?(?:hosted )?zones", 'label': 'Route53 hosted zones',
+         'service': 'route53', 'operation': 'list_hosted_zones', 'items': 'HostedZones[]',
+         'fields': {'name': 'Name', 'id': 'Id', 'private': 'Config.PrivateZone', 'records': 'ResourceRecordSetCount'}},
+        {'name': 'health_checks', 'nouns': r"(?:route ?53 )?health checks", 'label': 'Route53 health checks',
+         'service': 'route53', 'operation': 'list_health_checks', 'items': 'HealthChecks[]',
+         'fields': {'id': 'Id', 'type': 'HealthCheckConfig.Type', 'target': 'HealthCheckConfig.FullyQualifiedDomainName'}},
+    ],
+    'apigateway_read_operations': [
+        {'name': 'rest_apis', 'nouns': r"(?:api gateway )?(?:rest )?apis", 'label': 'API Gateway REST APIs',
+         'service': 'apigateway', 'operation': 'get_rest_apis', 'items': 'items[]',
+         'fields': {'id': 'id', 'name': 'name', 'created': 'createdDate'}},
+    ],
+    'ses_read_operations': [
+        {'name': 'identities', 'nouns': r"(?:ses |verified )*identities", 'label': 'SES identities',
+         'service': 'ses', 'operation': 'list_identities', 'items': 'Identities[]'},
+    ],
+    'bedrock_read_operations': [
+        {'name': 'foundation_models', 'nouns': r"(?:bedrock )?(?:foundation )?models", 'label': 'Bedrock foundation models',
+         'service': 'bedrock', 'operation': 'list_foundation_models', 'items': 'modelSummaries[]',
+         'fields': {'id': 'modelId', 'provider': 'providerName'}},
+    ],
+    'sagemaker_read_operations': [
+        {'name': 'endpoints', 'nouns': r"(?:sagemaker )?endpoints", 'label': 'SageMaker endpoints',
+         'service': 'sagemaker', 'operation': 'list_endpoints', 'items': 'Endpoints[]',
+         'fields': {'name': 'EndpointName', 'status': 'EndpointStatus'}},
+        {'name': 'notebook_instances', 'nouns': r"(?:sagemaker )?notebook instances|(?:sagemaker )?notebooks",
+         'label': 'SageMaker notebook instances',
+         'service': 'sagemaker', 'operation': 'list_notebook_instances', 'items': 'NotebookInstances[]',
+         'fields': {'name': 'NotebookInstanceName', 'status': 'NotebookInstanceStatus', 'type': 'InstanceType'}},
+        {'name': 'training_jobs', 'nouns': r"(?:sagemaker )?training jobs", 'label': 'SageMaker training jobs',
+         'service': 'sagemaker', 'operation': 'list_training_jobs', 'items': 'TrainingJobSummaries[]',
+         'fields': {'name': 'TrainingJobName', 'status': 'TrainingJobStatus', 'created': 'CreationTime'}},
+        {'name': 'models', 'nouns': r"(?:sagemaker )?models", 'label': 'SageMaker models',
+         'service': 'sagemaker', 'operation': 'list_models', 'items': 'Models[]',
+         'fields': {'name': 'ModelName', 'created': 'CreationTime'}},
+    ],
+}
+
+# Query grammar the fast path accepts: a listing or counting verb, filler
+# words, exactly one intent's nouns and an optional closing phrase. Anything
+# else (filters, names, regions, time ranges) goes to the agent.
+_LIST_VERBS = r"(?:list|show(?: me)?|get|describe|display|find|what are|which are)"
+_COUNT_VERBS = r"(?:count|how many|number of|total number of)"
+_FILLER = r"(?:(?:all|my|the|of|current|existing|aws) )*"
+_SUFFIX = r"(?: (?:are there|do i have|do we have|exist|in (?:this|my|the) account))*"
+
+FAST_PATH_MAX_ITEMS = int(os.environ.get('FAST_PATH_MAX_ITEMS', '1000'))
+FAST_PATH_MAX_LISTED = int(os.environ.get('FAST_PATH_MAX_LISTED', '50'))
+
+# Recent results per tool, served again for repeated queries within the TTL
+TOOL_RESULT_CACHE_TTL = int(os.environ.get('TOOL_RESULT_CACHE_TTL', '60'))
+TOOL_RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('TOOL_RESULT_CACHE_MAX_ENTRIES', '32'))
+
+for _intents in FAST_PATH_INTENTS.values():
+    for _intent in _intents:
+        _intent['pattern'] = re.compile(
+            rf"^(?:please )?(?:(?P<count>{_COUNT_VERBS})|{_LIST_VERBS}) {_FILLER}(?:{_intent['nouns']}){_SUFFIX}$"
+        )
+
+# Nested agent configuration, shared by all AWS service tools
+AGENT_MODEL_REGION = 'us-east-1'
+AGENT_MODEL_ID = 'us.anthropic.claude-3-7-sonnet-20250219-v1:0'
+AGENT_SYSTEM_PROMPT = "You are an AWS Operational Support Agent executing read-only AWS operations. You receive natural language queries and must perform the requested AWS operations efficiently.\n\nFor each query:\n1. Identify the specific AWS service and operation needed\n2. Execute only the minimum required AWS calls to answer the query\n3. Return structured, actionable results in a clear format\n4. Focus on the specific information requested, avoid unnecessary details\n\nExamples:\n- Query: 'list running instances' → Use EC2 describe-instances with running state filter\n- Query: 'count S3 buckets' → Use S3 list-buckets and return count\n- Query: 'show failed stacks' → Use CloudFormation list-stacks with failed status filter\n\nAlways optimize for speed and relevance. Return concise, well-structured responses."
+
+# CloudWatch embedded metric format namespace for tool timings
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'AWSOperationsAgent/MCPTool')
+
 BASIC_TOOLS = ['hello_world', 'get_time']
 AWS_SERVICE_TOOLS = list(SERVICE_QUERIES.keys())
 ALL_TOOLS = BASIC_TOOLS + AWS_SERVICE_TOOLS
 
 
+# Per-process state, kept between invocations of a warm Lambda container
+_process_started = time.time()
+_invocation_count = 0
+_bedrock_model = None
+_service_agents: Dict[str, Any] = {}
+_boto3_clients: Dict[str, Any] = {}
+_result_cache: Dict[str, OrderedDict] = {}
+
+
+def get_service_agent(tool_name: str):
+    """
+    Return the Strands Agent for a service tool, creating it on first use
+
+    The Bedrock model client is created once per process and shared; each
+    service tool keeps its own agent. Lambda runs one invocation per process at
+    a time, so an agent is never used concurrently, but its message history is
+    reset here so no state leaks from one tool call into the next.
+
+    Returns:
+        tuple: (agent, cold) where cold is True if the agent was just created
+    """
+    global _bedrock_model
+
+    agent = _service_agents.get(tool_name)
+    if agent is not None:
+        agent.messages = []
+        return agent, False
+
+    logger.info(f"Initializing Strands Agent for: {tool_name}")
+    if _bedrock_model is None:
+        _bedrock_model = BedrockModel(
+            region_name=AGENT_MODEL_REGION,
+            model_id=AGENT_MODEL_ID,
+            temperature=0.1,
+            system_prompt=AGENT_SYSTEM_PROMPT
+        )
+    agent = Agent(model=_bedrock_model, tools=[use_aws])
+    _service_agents[tool_name] = agent
+    return agent, True
+
+
+def _emit_metrics(dimensions: Dict[str, str], metrics: Dict[str, float], properties: Dict[str, Any]):
+    """Print one CloudWatch embedded metric format record (a JSON line on stdout)"""
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [list(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': 'Milliseconds'} for name in metrics]
+            }]
+        },
+        **dimensions,
+        **{name: round(value, 1) for name, value in metrics.items()},
+        **properties,
+        'Invocation': _invocation_count,
+        'ProcessAgeSeconds': round(time.time() - _process_started, 1)
+    }
+    print(json.dumps(record, default=str), flush=True)
+
+
+def emit_timing_metrics(tool_name: str, agent_cold: bool, agent_init_ms: float, agent_call_ms: float, success: bool):
+    """
+    Log the timing of one nested agent call as a CloudWatch embedded metric
+
+    CloudWatch Logs turns the record into metrics by Tool and StartType:
+    "cold" for the first invocation of a process, "agent_cold" for a warm
+    process creating this tool's agent, and "warm" when the cached agent was
+    reused.
+    """
+    if _invocation_count == 1:
+        start_type = 'cold'
+    elif agent_cold:
+        start_type = 'agent_cold'
+    else:
+        start_type = 'warm'
+
+    _emit_metrics(
+        {'Tool': tool_name, 'StartType': start_type},
+        {'AgentInitMs': agent_init_ms, 'AgentCallMs': agent_call_ms, 'TotalMs': agent_init_ms + agent_call_ms},
+        {'Success': success, 'CachedAgents': len(_service_agents)}
+    )
+
+
+def emit_path_metrics(tool_name: str, path: str, duration_ms: float, intent: Optional[str]):
+    """Log which path (fast_path, agent or cache) served a service tool call and how long it took"""
+    _emit_metrics({'Tool': tool_name, 'Path': path}, {'DurationMs': duration_ms}, {'Intent': intent})
+
+
+def normalize_tool_query(query: str) -> str:
+    """Lower-case a query, drop punctuation and collapse whitespace"""
+    return ' '.join(re.sub(r"[?.!,;:]+", ' ', query.lower()).split())
+
+
+def match_fast_path_intent(tool_name: str, normalized_query: str) -> Optional[Tuple[Dict[str, Any], bool]]:
+    """
+    Match a normalized query against the fast path intents of a service tool
+
+    Returns:
+        tuple: (intent, count_only) for the first intent whose pattern matches
+        the whole query, or None if the query needs the agent
+    """
+    for intent in FAST_PATH_INTENTS.get(tool_name, []):
+        match = intent['pattern'].match(normalized_query)
+        if match:
+            return intent, bool(match.group('count'))
+    return None
+
+
+def get_boto3_client(service: str):
+    """boto3 client per service, reused across warm invocations"""
+    client = _boto3_clients.get(service)
+    if client is None:
+        client = boto3.client(service, config=Config(retries={'max_attempts': 3, 'mode': 'standard'}))
+        _boto3_clients[service] = client
+    return client
+
+
+def _format_value(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def run_fast_path(intent: Dict[str, Any], count_only: bool) -> str:
+    """
+    Answer a matched intent with boto3, following pagination
+
+    At most FAST_PATH_MAX_ITEMS resources are read; a count is exact below
+    that limit. Listings show the first FAST_PATH_MAX_LISTED resources with the
+    intent's fields.
+
+    Raises:
+        ClientError, BotoCoreError: If the AWS call fails
+    """
+    client = get_boto3_client(intent['service'])
+    params = intent.get('params', {})
+    if client.can_paginate(intent['operation']):
+        pages = client.get_paginator(intent['operation']).paginate(**params)
+        items_iter = pages.search(intent['items'])
+    else:
+        response = getattr(client, intent['operation'])(**params)
+        items_iter = iter(jmespath.search(intent['items'], response) or [])
+
+    items = []
+    limited = False
+    for item in items_iter:
+        # Pages without the result key yield None
+        if item is None:
+            continue
+        if len(items) == FAST_PATH_MAX_ITEMS:
+            limited = True
+            break
+        items.append(item)
+
+    count = f"more than {FAST_PATH_MAX_ITEMS}" if limited else str(len(items))
+    summary = f"Found {count} {intent['label']}"
+    if count_only or not items:
+        return summary + '.'
+
+    lines = [summary + ':']
+    fields = intent.get('fields')
+    for item in items[:FAST_PATH_MAX_LISTED]:
+        if not fields:
+            lines.append(f"- {_format_value(item)}")
+            continue
+        values = [
+            f"{label}: {_format_value(value)}"
+            for label, value in ((label, jmespath.search(expr, item)) for label, expr in fields.items())
+            if value is not None
+        ]
+        lines.append('- ' + ', '.join(values))
+    if len(items) > FAST_PATH_MAX_LISTED:
+        lines.append(f"... and {len(items) - FAST_PATH_MAX_LISTED} more")
+    return '\n'.join(lines)
+
+
+def get_cached_result(tool_name: str, key: str) -> Optional[Dict[str, Any]]:
+    """Return a tool's cached result for key if it is younger than TOOL_RESULT_CACHE_TTL"""
+    entries = _result_cache.get(tool_name)
+    entry = entries.get(key) if entries else None
+    if entry is None:
+        return None
+    if time.time() - entry['stored_at'] > TOOL_RESULT_CACHE_TTL:
+        del entries[key]
+        return None
+    entries.move_to_end(key)
+    return entry
+
+
+def put_cached_result(tool_name: str, key: str, path: str, result: str):
+    """Remember a tool result, evicting the tool's least recently used entries"""
+    entries = _result_cache.setdefault(tool_name, OrderedDict())
+    entries[key] = {'result': result, 'path': path, 'stored_at': time.time()}
+    entries.move_to_end(key)
+    while len(entries) > TOOL_RESULT_CACHE_MAX_ENTRIES:
+        entries.popitem(last=False)
+
+
 def extract_tool_name(context, event: Dict[str, Any]) -> Optional[str]:
     """Extract tool name from Gateway context or event."""
     
@@ -107,17 +513,54 @@ def handle_get_time(event: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def handle_aws_service_tool(tool_name: str, event: Dict[str, Any]) -> Dict[str, Any]:
-    """Handle AWS service tools using Strands Agent."""
+def run_service_agent(tool_name: str, user_query: str) -> str:
+    """Answer a service tool query with the tool's nested Strands Agent"""
+    # Reuse this tool's agent from an earlier invocation when the process is warm
+    init_started = time.perf_counter()
+    agent, agent_cold = get_service_agent(tool_name)
+    agent_init_ms = (time.perf_counter() - init_started) * 1000
     
-    # Check if Strands is available
-    if not STRANDS_AVAILABLE:
-        return {
-            'success': False,
-            'error': f"Strands modules not available for {tool_name}. Please check Lambda dependencies.",
-            'tool': tool_name,
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
-        }
+    # Build the final query combining service context with user query
+    service_context = SERVICE_QUERIES.get(tool_name, f"AWS {tool_name.replace('_read_operations', '').upper()} service operations")
+    final_query = f"AWS Service: {tool_name.replace('_read_operations', '').upper()}\nUser Request: {user_query}\nContext: {service_context}\n\nExecute this AWS operation and return structured results."
+    
+    logger.info(f"Executing simplified query for {tool_name}: {user_query}")
+    
+    # Execute query
+    call_started = time.perf_counter()
+    try:
+        response = agent(final_query)
+    except Exception:
+        # Do not keep an agent whose state is unknown after a failure
+        _service_agents.pop(tool_name, None)
+        emit_timing_metrics(tool_name, agent_cold, agent_init_ms, (time.perf_counter() - call_started) * 1000, False)
+        raise
+    emit_timing_metrics(tool_name, agent_cold, agent_init_ms, (time.perf_counter() - call_started) * 1000, True)
+    
+    # Extract response text
+    response_text = ""
+    if hasattr(response, 'message') and 'content' in response.message:
+        for content_block in response.message['content']:
+            if content_block.get('type') == 'text' or 'text' in content_block:
+                response_text += content_block.get('text', '')
+    else:
+        response_text = str(response)
+    
+    logger.info(f"Response length: {len(response_text)} characters")
+    return response_text
+
+
+def handle_aws_service_tool(tool_name: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handle AWS service tools
+
+    A result cached for the same query within TOOL_RESULT_CACHE_TTL is
+    returned as is. Otherwise a query matching one of the tool's
+    FAST_PATH_INTENTS is answered directly with boto3, and any other query (or
+    a failed fast path call) goes to the nested Strands Agent. The response's
+    'path' field says which of cache, fast_path or agent served it.
+    """
+    service = tool_name.replace('_read_operations', '').replace('_', '-')
     
     try:
         # Get the natural language query from the simplified schema
@@ -130,58 +573,62 @@ def handle_aws_service_tool(tool_name: str, event: Dict[str, Any]) -> Dict[str,
                 'timestamp': datetime.utcnow().isoformat() + 'Z'
             }
         
-        logger.info(f"Initializing Strands Agent for: {tool_name}")
-        
-        # Initialize Bedrock model
-        bedrock_model = BedrockModel(
-            region_name='us-east-1',
-            model_id='us.anthropic.claude-3-7-sonnet-20250219-v1:0',
-            temperature=0.1,
-            system_prompt="You are an AWS Operational Support Agent executing read-only AWS operations. You receive natural language queries and must perform the requested AWS operations efficiently.\n\nFor each query:\n1. Identify the specific AWS service and operation needed\n2. Execute only the minimum required AWS calls to answer the query\n3. Return structured, actionable results in a clear format\n4. Focus on the specific information requested, avoid unnecessary details\n\nExamples:\n- Query: 'list running instances' → Use EC2 describe-instances with running state filter\n- Query: 'count S3 buckets' → Use S3 list-buckets and return count\n- Query: 'show failed stacks' → Use CloudFormation list-stacks with failed status filter\n\nAlways optimize for speed and relevance. Return concise, well-structured responses."
-        )
-        
-        # Create Strands Agent
-        agent = Agent(model=bedrock_model, tools=[use_aws])
-        
-        # Build query
-        # Get the natural language query from the simplified schema
-        user_query = event.get('query', '')
-        if not user_query:
-            return {
-                'success': False,
-                'error': f"Missing required 'query' parameter for {tool_name}",
-                'tool': tool_name,
-                'timestamp': datetime.utcnow().isoformat() + 'Z'
-            }
-        
-        # Build the final query combining service context with user query
-        service_context = SERVICE_QUERIES.get(tool_name, f"AWS {tool_name.replace('_read_operations', '').upper()} service operations")
-        final_query = f"AWS Service: {tool_name.replace('_read_operations', '').upper()}\nUser Request: {user_query}\nContext: {service_context}\n\nExecute this AWS operation and return structured results."
-        
-        logger.info(f"Executing simplified query for {tool_name}: {user_query}")
-        
-        # Execute query
-        response = agent(final_query)
+        started = time.perf_counter()
+        normalized_query = normalize_tool_query(user_query)
+        matched = match_fast_path_intent(tool_name, normalized_query)
+        intent_name = matched[0]['name'] if matched else None
+        # Queries with the same intent share a cache entry, whatever their wording
+        if matched:
+            cache_key = f"intent:{intent_name}:{'count' if matched[1] else 'list'}"
+        else:
+            cache_key = f"query:{normalized_query}"
         
-        # Extract response text
-        response_text = ""
-        if hasattr(response, 'message') and 'content' in response.message:
-            for content_block in response.message['content']:
-                if content_block.get('type') == 'text' or 'text' in content_block:
-                    response_text += content_block.get('text', '')
+        cached = get_cached_result(tool_name, cache_key)
+        if cached:
+            path = 'cache'
+            result_text = cached['result']
         else:
-            response_text = str(response)
+            result_text = None
+            if matched:
+                try:
+                    result_text = run_fast_path(*matched)
+                    path = 'fast_path'
+                except (ClientError, BotoCoreError) as e:
+                    logger.warning(f"Fast path {intent_name} failed for {tool_name}, falling back to agent: {str(e)}")
+            
+            if result_text is None:
+                # Check if Strands is available
+                if not STRANDS_AVAILABLE:
+                    return {
+                        'success': False,
+                        'error': f"Strands modules not available for {tool_name}. Please check Lambda dependencies.",
+                        'tool': tool_name,
+                        'timestamp': datetime.utcnow().isoformat() + 'Z'
+                    }
+                result_text = run_service_agent(tool_name, user_query)
+                path = 'agent'
+            
+            put_cached_result(tool_name, cache_key, path, result_text)
         
-        logger.info(f"Response length: {len(response_text)} characters")
+        duration_ms = (time.perf_counter() - started) * 1000
+        emit_path_metrics(tool_name, path, duration_ms, intent_name)
+        logger.info(f"{tool_name} served by {path} in {duration_ms:.0f} ms")
         
-        return {
+        result = {
             'success': True,
-            'result': response_text,
+            'result': result_text,
             'tool': tool_name,
-            'service': tool_name.replace('_read_operations', '').replace('_', '-'),
+            'service': service,
             'user_query': user_query,
+            'path': path,
             'timestamp': datetime.utcnow().isoformat() + 'Z'
         }
+        if intent_name:
+            result['intent'] = intent_name
+        if cached:
+            result['cached_path'] = cached['path']
+            result['cache_age_seconds'] = round(time.time() - cached['stored_at'], 1)
+        return result
         
     except Exception as e:
         logger.error(f"AWS service tool error: {str(e)}")
@@ -189,7 +636,7 @@ def handle_aws_service_tool(tool_name: str, event: Dict[str, Any]) -> Dict[str,
             'success': False,
             'error': f"AWS Service Tool Error: {str(e)}",
             'tool': tool_name,
-            'service': tool_name.replace('_read_operations', '').replace('_', '-'),
+            'service': service,
             'timestamp': datetime.utcnow().isoformat() + 'Z'
         }
 
@@ -201,6 +648,8 @@ def lambda_handler(event, context):
     Handles basic tools (hello_world, get_time) and AWS service tools
     via Strands Agent integration with comprehensive error handling.
     """
+    global _invocation_count
+    _invocation_count += 1
     logger.info("AWS Operations Agent Gateway Lambda Handler - START")
     logger.info(f"Event: {json.dumps(event, default=str)}")
     
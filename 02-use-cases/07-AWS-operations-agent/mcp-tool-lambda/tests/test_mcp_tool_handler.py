@@ -0,0 +1,269 @@
+"""
+Tests for the MCP tool Lambda: fast path intents, the per-tool result cache
+and the nested agent fallback
+
+AWS is replaced by moto's in-process stand-in and the Strands Agent by a fake,
+so no AWS account, Bedrock access or network is needed:
+
+    pip install -r lambda/requirements.txt moto pytest
+    python -m pytest tests
+"""
+import importlib.util
+import os
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+_spec = importlib.util.spec_from_file_location(
+    'mcp_tool_handler',
+    os.path.join(os.path.dirname(__file__), '..', 'lambda', 'mcp-tool-handler.py')
+)
+handler = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(handler)
+
+REGION = 'us-east-1'
+
+
+class FakeModel:
+    created = 0
+
+    def __init__(self, **kwargs):
+        FakeModel.created += 1
+        self.kwargs = kwargs
+
+
+class FakeAgent:
+    """Stands in for strands.Agent: answers every query with a fixed text"""
+    instances = []
+    fail = False
+
+    def __init__(self, model, tools):
+        self.model = model
+        self.tools = tools
+        self.messages = []
+        self.queries = []
+        FakeAgent.instances.append(self)
+
+    def __call__(self, query):
+        if FakeAgent.fail:
+            raise RuntimeError('model error')
+        self.queries.append(query)
+        self.messages.append({'role': 'user', 'content': [{'text': query}]})
+        return f"agent answer {len(self.queries)}"
+
+
+@pytest.fixture(autouse=True)
+def process_state(monkeypatch):
+    """Start every test with the state of a fresh Lambda process"""
+    monkeypatch.setattr(handler, '_service_agents', {})
+    monkeypatch.setattr(handler, '_boto3_clients', {})
+    monkeypatch.setattr(handler, '_result_cache', {})
+    monkeypatch.setattr(handler, '_bedrock_model', None)
+    monkeypatch.setattr(handler, '_emit_metrics', lambda *args: None)
+
+
+@pytest.fixture
+def agents(monkeypatch):
+    FakeModel.created = 0
+    FakeAgent.instances = []
+    FakeAgent.fail = False
+    monkeypatch.setattr(handler, 'STRANDS_AVAILABLE', True)
+    monkeypatch.setattr(handler, 'Agent', FakeAgent, raising=False)
+    monkeypatch.setattr(handler, 'BedrockModel', FakeModel, raising=False)
+    monkeypatch.setattr(handler, 'use_aws', object(), raising=False)
+    return FakeAgent
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'testing')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', REGION)
+    with mock_aws():
+        yield
+
+
+def ask(tool_name, query):
+    return handler.handle_aws_service_tool(tool_name, {'query': query})
+
+
+@pytest.mark.parametrize('tool_name, query, expected', [
+    ('ec2_read_operations', 'List running instances', ('running_instances', False)),
+    ('ec2_read_operations', 'Show me all my EC2 instances.', ('instances', False)),
+    ('ec2_read_operations', 'How many EC2 instances do I have?', ('instances', True)),
+    ('ec2_read_operations', 'number of security groups in this account', ('security_groups', True)),
+    ('iam_read_operations', 'list customer managed policies', ('customer_managed_policies', False)),
+    ('iam_read_operations', 'List all customer-managed IAM policies', ('customer_managed_policies', False)),
+    ('cloudwatch_read_operations', 'list the alarms in alarm state', ('alarms_in_alarm', False)),
+    ('cloudwatch_read_operations', 'list alarms', ('alarms', False)),
+    ('cloudformation_read_operations', 'show failed stacks', ('failed_stacks', False)),
+    ('s3_read_operations', 'please count buckets', ('buckets', True)),
+    # Anything beyond the grammar goes to the agent
+    ('iam_read_operations', 'list policies', None),
+    ('iam_read_operations', 'list all iam policies', None),
+    ('ec2_read_operations', 'list instances in us-west-2', None),
+    ('ec2_read_operations', 'describe instance i-0123456789', None),
+    ('ec2_read_operations', 'why is my instance slow', None),
+    ('s3_read_operations', 'list running instances', None),
+    ('hello_world', 'list buckets', None),
+])
+def test_match_fast_path_intent(tool_name, query, expected):
+    matched = handler.match_fast_path_intent(tool_name, handler.normalize_tool_query(query))
+    if expected is None:
+        assert matched is None
+    else:
+        intent, count_only = matched
+        assert (intent['name'], count_only) == expected
+
+
+def test_fast_path_lists_and_counts_instances(aws):
+    ec2 = boto3.client('ec2', region_name=REGION)
+    image_id = ec2.describe_images()['Images'][0]['ImageId']
+    instance_ids = [
+        i['InstanceId'] for i in ec2.run_instances(ImageId=image_id, MinCount=3, MaxCount=3)['Instances']
+    ]
+    ec2.stop_instances(InstanceIds=instance_ids[:1])
+
+    intents = {i['name']: i for i in handler.FAST_PATH_INTENTS['ec2_read_operations']}
+    assert handler.run_fast_path(intents['instances'], True) == 'Found 3 EC2 instances.'
+
+    listing = handler.run_fast_path(intents['running_instances'], False).splitlines()
+    assert listing[0] == 'Found 2 running EC2 instances:'
+    assert sorted(line.split(',')[0] for line in listing[1:]) == sorted(
+        f"- id: {instance_id}" for instance_id in instance_ids[1:]
+    )
+
+
+def test_fast_path_limits_what_it_reads_and_lists(aws, monkeypatch):
+    s3 = boto3.client('s3', region_name=REGION)
+    for i in range(5):
+        s3.create_bucket(Bucket=f'bucket-{i}')
+    intent = handler.FAST_PATH_INTENTS['s3_read_operations'][0]
+
+    monkeypatch.setattr(handler, 'FAST_PATH_MAX_LISTED', 2)
+    lines = handler.run_fast_path(intent, False).splitlines()
+    assert lines[0] == 'Found 5 S3 buckets:'
+    assert lines[1].startswith('- name: bucket-0, created: ')
+    assert lines[-1] == '... and 3 more'
+
+    monkeypatch.setattr(handler, 'FAST_PATH_MAX_ITEMS', 4)
+    assert handler.run_fast_path(intent, True) == 'Found more than 4 S3 buckets.'
+
+
+def test_fast_path_lists_customer_managed_policies_only(aws):
+    boto3.client('iam').create_policy(
+        PolicyName='app-read',
+        PolicyDocument='{"Version": "2012-10-17", "Statement": [{"Effect": "Allow", "Action": "s3:GetObject", "Resource": "*"}]}'
+    )
+    result = ask('iam_read_operations', 'list customer managed policies')
+    assert result['path'] == 'fast_path'
+    assert result['result'] == 'Found 1 customer managed IAM policies:\n- name: app-read, attachments: 0'
+
+
+def test_fast_path_shows_plain_string_items(aws):
+    sqs = boto3.client('sqs', region_name=REGION)
+    url = sqs.create_queue(QueueName='jobs')['QueueUrl']
+    result = ask('sqs_read_operations', 'list queues')
+    assert result['result'] == f'Found 1 SQS queues:\n- {url}'
+
+
+def test_repeated_intent_is_served_from_the_cache(aws):
+    boto3.client('s3', region_name=REGION).create_bucket(Bucket='first')
+    assert ask('s3_read_operations', 'list buckets')['path'] == 'fast_path'
+
+    # Other wording, same intent
+    boto3.client('s3', region_name=REGION).create_bucket(Bucket='second')
+    cached = ask('s3_read_operations', 'Show me all S3 buckets')
+    assert cached['path'] == 'cache'
+    assert cached['cached_path'] == 'fast_path'
+    assert cached['result'].startswith('Found 1 S3 buckets')
+
+    # Counting is a different entry
+    assert ask('s3_read_operations', 'how many buckets')['result'] == 'Found 2 S3 buckets.'
+
+
+def test_cached_results_expire(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(handler.time, 'time', lambda: clock[0])
+    monkeypatch.setattr(handler, 'TOOL_RESULT_CACHE_TTL', 60)
+
+    handler.put_cached_result('s3_read_operations', 'intent:buckets:list', 'fast_path', 'two buckets')
+    clock[0] += 60
+    assert handler.get_cached_result('s3_read_operations', 'intent:buckets:list')['result'] == 'two buckets'
+
+    clock[0] += 1
+    assert handler.get_cached_result('s3_read_operations', 'intent:buckets:list') is None
+    assert 'intent:buckets:list' not in handler._result_cache['s3_read_operations']
+
+
+def test_cache_evicts_least_recently_used_per_tool(monkeypatch):
+    monkeypatch.setattr(handler, 'TOOL_RESULT_CACHE_MAX_ENTRIES', 2)
+    handler.put_cached_result('s3_read_operations', 'a', 'agent', 'A')
+    handler.put_cached_result('s3_read_operations', 'b', 'agent', 'B')
+    handler.put_cached_result('ec2_read_operations', 'c', 'agent', 'C')
+    assert handler.get_cached_result('s3_read_operations', 'a')
+    handler.put_cached_result('s3_read_operations', 'd', 'agent', 'D')
+
+    assert list(handler._result_cache['s3_read_operations']) == ['a', 'd']
+    assert handler.get_cached_result('ec2_read_operations', 'c')['result'] == 'C'
+
+
+def test_unmatched_query_goes_to_the_agent(agents):
+    result = ask('iam_read_operations', 'list policies')
+    assert result['path'] == 'agent'
+    assert result['result'] == 'agent answer 1'
+    assert 'intent' not in result
+    assert 'User Request: list policies' in agents.instances[0].queries[0]
+
+    # The agent's answer is cached under the normalized query
+    assert ask('iam_read_operations', 'List policies?')['path'] == 'cache'
+    assert len(agents.instances[0].queries) == 1
+
+
+def test_failed_fast_path_falls_back_to_the_agent(agents, monkeypatch):
+    def denied(intent, count_only):
+        raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, intent['operation'])
+
+    monkeypatch.setattr(handler, 'run_fast_path', denied)
+    result = ask('s3_read_operations', 'list buckets')
+    assert result['path'] == 'agent'
+    assert result['intent'] == 'buckets'
+    assert result['result'] == 'agent answer 1'
+
+
+def test_agent_fallback_needs_strands(monkeypatch):
+    monkeypatch.setattr(handler, 'STRANDS_AVAILABLE', False)
+    result = ask('iam_read_operations', 'list policies')
+    assert result['success'] is False
+    assert 'Strands modules not available' in result['error']
+    assert handler._result_cache == {}
+
+
+def test_service_agent_is_reused_with_a_fresh_history(agents):
+    first, cold = handler.get_service_agent('ec2_read_operations')
+    assert cold
+    first('describe instance i-1')
+    assert first.messages
+
+    again, cold = handler.get_service_agent('ec2_read_operations')
+    assert again is first and not cold
+    assert again.messages == []
+
+    other, cold = handler.get_service_agent('s3_read_operations')
+    assert other is not first and cold
+    # One Bedrock model client per process, shared by the tools' agents
+    assert FakeModel.created == 1
+    assert other.model is first.model
+
+
+def test_failed_agent_is_not_reused(agents):
+    agents.fail = True
+    result = ask('ec2_read_operations', 'why is my instance slow')
+    assert result['success'] is False
+    assert handler._service_agents == {}
+
+    agents.fail = False
+    assert ask('ec2_read_operations', 'why is my instance slow')['result'] == 'agent answer 1'
+    assert len(agents.instances) == 2